@@ -99,5 +99,19 @@ def dev(
     )
 
 
+@app.command()
+def rebuild_vector_index():
+    """
+    Rebuild the vector database indexes with the current settings.
+    """
+    from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+
+    try:
+        VECTOR_DB_CLIENT.rebuild_index()
+    except NotImplementedError as e:
+        typer.echo(str(e))
+        raise typer.Exit(1)
+
+
 if __name__ == "__main__":
     app()
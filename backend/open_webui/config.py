@@ -4,6 +4,8 @@ import os
 import shutil
 import base64
 import redis
+import threading
+import time
 
 from datetime import datetime
 from pathlib import Path
@@ -212,9 +214,23 @@ class PersistentConfig(Generic[T]):
 
 
 class AppConfig:
+    """
+    Config values are read from memory. With Redis, updates are written to
+    Redis and announced on a pub/sub channel, and a listener thread applies
+    them on every instance. Each update bumps a version counter in Redis,
+    so an instance that missed an announcement (e.g. while reconnecting)
+    reloads all values instead.
+
+    Values are registered one by one at startup, so they are loaded from
+    Redis together, with a single MGET on the first read.
+    """
+
     _state: dict[str, PersistentConfig]
+    _unloaded: set[str]
+    _load_lock: threading.Lock
     _redis: Optional[redis.Redis] = None
     _redis_key_prefix: str
+    _version: int = 0
 
     def __init__(
         self,
@@ -223,46 +239,122 @@ class AppConfig:
         redis_key_prefix: str = "open-webui",
     ):
         super().__setattr__("_state", {})
+        super().__setattr__("_unloaded", set())
+        super().__setattr__("_load_lock", threading.Lock())
         super().__setattr__("_redis_key_prefix", redis_key_prefix)
         if redis_url:
             super().__setattr__(
                 "_redis",
                 get_redis_connection(redis_url, redis_sentinels, decode_responses=True),
             )
+            threading.Thread(
+                target=self._listen, name="config-listener", daemon=True
+            ).start()
 
     def __setattr__(self, key, value):
         if isinstance(value, PersistentConfig):
             self._state[key] = value
+
+            if self._redis:
+                self._unloaded.add(key)
         else:
+            self._unloaded.discard(key)
             self._state[key].value = value
             self._state[key].save()
 
             if self._redis:
-                redis_key = f"{self._redis_key_prefix}:config:{key}"
-                self._redis.set(redis_key, json.dumps(self._state[key].value))
+                pipe = self._redis.pipeline()
+                pipe.set(self._get_redis_key(key), json.dumps(self._state[key].value))
+                pipe.incr(self._get_redis_key("version"))
+                _, version = pipe.execute()
+                self._redis.publish(
+                    self._get_redis_key("updates"),
+                    json.dumps({"key": key, "version": version}),
+                )
 
     def __getattr__(self, key):
+        if self._unloaded:
+            self._load_unloaded()
+
         if key not in self._state:
             raise AttributeError(f"Config key '{key}' not found")
 
-        # If Redis is available, check for an updated value
-        if self._redis:
-            redis_key = f"{self._redis_key_prefix}:config:{key}"
-            redis_value = self._redis.get(redis_key)
-
-            if redis_value is not None:
-                try:
-                    decoded_value = json.loads(redis_value)
+        return self._state[key].value
 
-                    # Update the in-memory value if different
-                    if self._state[key].value != decoded_value:
-                        self._state[key].value = decoded_value
-                        log.info(f"Updated {key} from Redis: {decoded_value}")
+    def _get_redis_key(self, key: str) -> str:
+        return f"{self._redis_key_prefix}:config:{key}"
 
-                except json.JSONDecodeError:
-                    log.error(f"Invalid JSON format in Redis for {key}: {redis_value}")
+    def _load(self, key: str, redis_value: Optional[str]):
+        self._unloaded.discard(key)
+        if redis_value is None:
+            return
 
-        return self._state[key].value
+        try:
+            decoded_value = json.loads(redis_value)
+
+            # Update the in-memory value if different
+            if self._state[key].value != decoded_value:
+                self._state[key].value = decoded_value
+                log.info(f"Updated {key} from Redis: {decoded_value}")
+
+        except json.JSONDecodeError:
+            log.error(f"Invalid JSON format in Redis for {key}: {redis_value}")
+
+    def _load_many(self, keys: list[str]):
+        if keys:
+            values = self._redis.mget([self._get_redis_key(key) for key in keys])
+            for key, redis_value in zip(keys, values):
+                self._load(key, redis_value)
+
+    def _load_unloaded(self):
+        with self._load_lock:
+            keys = [key for key in self._state if key in self._unloaded]
+            if not keys:
+                return
+            try:
+                self._load_many(keys)
+            except redis.RedisError as e:
+                self._unloaded.difference_update(keys)
+                log.error(f"Could not load config from Redis: {e}")
+
+    def _sync(self):
+        # The version is read first, so updates made while loading are
+        # applied again when their announcement arrives
+        version = self._redis.get(self._get_redis_key("version"))
+        self._load_many(list(self._state.keys()))
+
+        super().__setattr__("_version", int(version or 0))
+
+    def _on_update(self, data: str):
+        update = json.loads(data)
+        key, version = update.get("key"), update.get("version", 0)
+
+        if version > self._version + 1:
+            log.info("Missed config updates, reloading config from Redis")
+            self._sync()
+        elif key in self._state:
+            self._load(key, self._redis.get(self._get_redis_key(key)))
+
+        super().__setattr__("_version", max(self._version, version))
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self._get_redis_key("updates"))
+
+                # Catch up on anything published before subscribing
+                self._sync()
+
+                for message in pubsub.listen():
+                    if message["type"] == "message":
+                        try:
+                            self._on_update(message["data"])
+                        except (json.JSONDecodeError, TypeError, AttributeError):
+                            log.error(f"Invalid config update: {message['data']}")
+            except Exception as e:
+                log.error(f"Config listener disconnected from Redis: {e}")
+                time.sleep(1)
 
 
 ####################################
@@ -767,6 +859,32 @@ LICENSE_KEY = os.environ.get("LICENSE_KEY", "")
 
 STORAGE_PROVIDER = os.environ.get("STORAGE_PROVIDER", "local")  # defaults to local, s3
 
+# Size of the chunks files are copied and uploaded in, and the part size of
+# S3, GCS and Azure multipart uploads
+STORAGE_UPLOAD_CHUNK_SIZE = os.environ.get("STORAGE_UPLOAD_CHUNK_SIZE", "8388608")
+try:
+    # GCS requires a multiple of 256 KiB
+    STORAGE_UPLOAD_CHUNK_SIZE = (
+        max(int(STORAGE_UPLOAD_CHUNK_SIZE) // 262144, 1) * 262144
+    )
+except ValueError:
+    STORAGE_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Local copies of files kept in UPLOAD_DIR by the S3, GCS and Azure providers
+# are evicted least recently used first beyond this many bytes, 0 for no limit
+STORAGE_CACHE_MAX_SIZE = os.environ.get("STORAGE_CACHE_MAX_SIZE", "10737418240")
+try:
+    STORAGE_CACHE_MAX_SIZE = max(int(STORAGE_CACHE_MAX_SIZE), 0)
+except ValueError:
+    STORAGE_CACHE_MAX_SIZE = 10 * 1024 * 1024 * 1024
+
+# Seconds a local copy is served before its ETag/generation is checked again
+STORAGE_CACHE_VALIDATION_TTL = os.environ.get("STORAGE_CACHE_VALIDATION_TTL", "300")
+try:
+    STORAGE_CACHE_VALIDATION_TTL = max(float(STORAGE_CACHE_VALIDATION_TTL), 0.0)
+except ValueError:
+    STORAGE_CACHE_VALIDATION_TTL = 300.0
+
 S3_ACCESS_KEY_ID = os.environ.get("S3_ACCESS_KEY_ID", None)
 S3_SECRET_ACCESS_KEY = os.environ.get("S3_SECRET_ACCESS_KEY", None)
 S3_REGION_NAME = os.environ.get("S3_REGION_NAME", None)
@@ -1925,6 +2043,80 @@ else:
     except Exception:
         PGVECTOR_POOL_RECYCLE = 3600
 
+# ANN index on document_chunk: "hnsw", "ivfflat" or "none" (exact search).
+# Changing the index settings of an existing deployment takes effect after
+# `open-webui rebuild-vector-index`
+PGVECTOR_INDEX_METHOD = os.environ.get("PGVECTOR_INDEX_METHOD", "hnsw").lower()
+PGVECTOR_HNSW_M = os.environ.get("PGVECTOR_HNSW_M", 16)
+
+if PGVECTOR_HNSW_M == "":
+    PGVECTOR_HNSW_M = 16
+else:
+    try:
+        PGVECTOR_HNSW_M = int(PGVECTOR_HNSW_M)
+    except Exception:
+        PGVECTOR_HNSW_M = 16
+
+PGVECTOR_HNSW_EF_CONSTRUCTION = os.environ.get("PGVECTOR_HNSW_EF_CONSTRUCTION", 64)
+
+if PGVECTOR_HNSW_EF_CONSTRUCTION == "":
+    PGVECTOR_HNSW_EF_CONSTRUCTION = 64
+else:
+    try:
+        PGVECTOR_HNSW_EF_CONSTRUCTION = int(PGVECTOR_HNSW_EF_CONSTRUCTION)
+    except Exception:
+        PGVECTOR_HNSW_EF_CONSTRUCTION = 64
+
+# Query time: candidates kept per search, must be at least the top k
+PGVECTOR_HNSW_EF_SEARCH = os.environ.get("PGVECTOR_HNSW_EF_SEARCH", 100)
+
+if PGVECTOR_HNSW_EF_SEARCH == "":
+    PGVECTOR_HNSW_EF_SEARCH = 100
+else:
+    try:
+        PGVECTOR_HNSW_EF_SEARCH = int(PGVECTOR_HNSW_EF_SEARCH)
+    except Exception:
+        PGVECTOR_HNSW_EF_SEARCH = 100
+
+# "relaxed_order" or "strict_order" keep scanning until enough rows of the
+# searched collection are found (requires pgvector >= 0.8)
+PGVECTOR_HNSW_ITERATIVE_SCAN = os.environ.get("PGVECTOR_HNSW_ITERATIVE_SCAN", "")
+
+# 0 derives the number of lists from the row count when the index is built
+PGVECTOR_IVFFLAT_LISTS = os.environ.get("PGVECTOR_IVFFLAT_LISTS", 0)
+
+if PGVECTOR_IVFFLAT_LISTS == "":
+    PGVECTOR_IVFFLAT_LISTS = 0
+else:
+    try:
+        PGVECTOR_IVFFLAT_LISTS = int(PGVECTOR_IVFFLAT_LISTS)
+    except Exception:
+        PGVECTOR_IVFFLAT_LISTS = 0
+
+PGVECTOR_IVFFLAT_PROBES = os.environ.get("PGVECTOR_IVFFLAT_PROBES", 10)
+
+if PGVECTOR_IVFFLAT_PROBES == "":
+    PGVECTOR_IVFFLAT_PROBES = 10
+else:
+    try:
+        PGVECTOR_IVFFLAT_PROBES = int(PGVECTOR_IVFFLAT_PROBES)
+    except Exception:
+        PGVECTOR_IVFFLAT_PROBES = 10
+
+# Collections with at least this many chunks get their own partial index when
+# the index is rebuilt, 0 disables per-collection indexes
+PGVECTOR_COLLECTION_INDEX_MIN_ROWS = os.environ.get(
+    "PGVECTOR_COLLECTION_INDEX_MIN_ROWS", 0
+)
+
+if PGVECTOR_COLLECTION_INDEX_MIN_ROWS == "":
+    PGVECTOR_COLLECTION_INDEX_MIN_ROWS = 0
+else:
+    try:
+        PGVECTOR_COLLECTION_INDEX_MIN_ROWS = int(PGVECTOR_COLLECTION_INDEX_MIN_ROWS)
+    except Exception:
+        PGVECTOR_COLLECTION_INDEX_MIN_ROWS = 0
+
 # Pinecone
 PINECONE_API_KEY = os.environ.get("PINECONE_API_KEY", None)
 PINECONE_ENVIRONMENT = os.environ.get("PINECONE_ENVIRONMENT", None)
@@ -2169,6 +2361,10 @@ ENABLE_RAG_HYBRID_SEARCH = PersistentConfig(
     os.environ.get("ENABLE_RAG_HYBRID_SEARCH", "").lower() == "true",
 )
 
+# Persistent per-collection BM25 indexes used by hybrid search
+RAG_BM25_INDEX_DIR = os.environ.get("RAG_BM25_INDEX_DIR", f"{CACHE_DIR}/bm25")
+RAG_BM25_INDEX_MAX_LOADED = int(os.environ.get("RAG_BM25_INDEX_MAX_LOADED", "32"))
+
 RAG_FULL_CONTEXT = PersistentConfig(
     "RAG_FULL_CONTEXT",
     "rag.full_context",
@@ -2263,6 +2459,12 @@ RAG_EMBEDDING_BATCH_SIZE = PersistentConfig(
     ),
 )
 
+RAG_EMBEDDING_CONCURRENT_REQUESTS = int(
+    os.environ.get("RAG_EMBEDDING_CONCURRENT_REQUESTS", "4")
+)
+
+RAG_EMBEDDING_MAX_RETRIES = int(os.environ.get("RAG_EMBEDDING_MAX_RETRIES", "5"))
+
 RAG_EMBEDDING_QUERY_PREFIX = os.environ.get("RAG_EMBEDDING_QUERY_PREFIX", None)
 
 RAG_EMBEDDING_CONTENT_PREFIX = os.environ.get("RAG_EMBEDDING_CONTENT_PREFIX", None)
@@ -2271,6 +2473,16 @@ RAG_EMBEDDING_PREFIX_FIELD_NAME = os.environ.get(
     "RAG_EMBEDDING_PREFIX_FIELD_NAME", None
 )
 
+ENABLE_RAG_EMBEDDING_CACHE = (
+    os.environ.get("ENABLE_RAG_EMBEDDING_CACHE", "True").lower() == "true"
+)
+RAG_EMBEDDING_CACHE_PATH = os.environ.get(
+    "RAG_EMBEDDING_CACHE_PATH", f"{CACHE_DIR}/embeddings.db"
+)
+RAG_EMBEDDING_CACHE_MAX_ENTRIES = int(
+    os.environ.get("RAG_EMBEDDING_CACHE_MAX_ENTRIES", "200000")
+)
+
 RAG_RERANKING_ENGINE = PersistentConfig(
     "RAG_RERANKING_ENGINE",
     "rag.reranking_engine",
@@ -2295,6 +2507,12 @@ RAG_RERANKING_MODEL_TRUST_REMOTE_CODE = (
     os.environ.get("RAG_RERANKING_MODEL_TRUST_REMOTE_CODE", "True").lower() == "true"
 )
 
+ENABLE_RAG_RERANKING_BATCHING = (
+    os.environ.get("ENABLE_RAG_RERANKING_BATCHING", "True").lower() == "true"
+)
+RAG_RERANKING_BATCH_SIZE = int(os.environ.get("RAG_RERANKING_BATCH_SIZE", "64"))
+RAG_RERANKING_BATCH_WAIT_MS = float(os.environ.get("RAG_RERANKING_BATCH_WAIT_MS", "10"))
+
 RAG_EXTERNAL_RERANKER_URL = PersistentConfig(
     "RAG_EXTERNAL_RERANKER_URL",
     "rag.external_reranker_url",
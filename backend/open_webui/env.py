@@ -343,6 +343,154 @@ ENABLE_REALTIME_CHAT_SAVE = (
     os.environ.get("ENABLE_REALTIME_CHAT_SAVE", "False").lower() == "true"
 )
 
+# Store chat messages as rows of the chat_message table instead of inside the
+# chat JSON, so single message reads and writes don't touch the whole history
+ENABLE_CHAT_MESSAGE_TABLE = (
+    os.environ.get("ENABLE_CHAT_MESSAGE_TABLE", "False").lower() == "true"
+)
+
+# Streamed deltas are coalesced in memory and written at most once per interval
+# (seconds) or once this many characters have accumulated, whichever comes first
+REALTIME_CHAT_SAVE_INTERVAL = os.environ.get("REALTIME_CHAT_SAVE_INTERVAL", "1.0")
+try:
+    REALTIME_CHAT_SAVE_INTERVAL = max(float(REALTIME_CHAT_SAVE_INTERVAL), 0.0)
+except ValueError:
+    REALTIME_CHAT_SAVE_INTERVAL = 1.0
+
+REALTIME_CHAT_SAVE_BUFFER_SIZE = os.environ.get(
+    "REALTIME_CHAT_SAVE_BUFFER_SIZE", "4096"
+)
+try:
+    REALTIME_CHAT_SAVE_BUFFER_SIZE = max(int(REALTIME_CHAT_SAVE_BUFFER_SIZE), 0)
+except ValueError:
+    REALTIME_CHAT_SAVE_BUFFER_SIZE = 4096
+
+####################################
+# JOB QUEUE
+####################################
+
+# Process uploaded files in the background job queue, so uploads return as
+# soon as the file is stored
+ENABLE_FILE_INGESTION_QUEUE = (
+    os.environ.get("ENABLE_FILE_INGESTION_QUEUE", "True").lower() == "true"
+)
+
+# Number of jobs each instance runs concurrently, independent of the request
+# thread pool (THREAD_POOL_SIZE). Set to 0 on instances that should only
+# serve the API and leave ingestion to dedicated worker instances
+JOB_QUEUE_WORKERS = os.environ.get("JOB_QUEUE_WORKERS", "4")
+try:
+    JOB_QUEUE_WORKERS = max(int(JOB_QUEUE_WORKERS), 0)
+except ValueError:
+    JOB_QUEUE_WORKERS = 4
+
+# Maximum number of jobs of a single user running at once across all
+# instances, 0 for no limit
+JOB_QUEUE_MAX_RUNNING_PER_USER = os.environ.get("JOB_QUEUE_MAX_RUNNING_PER_USER", "2")
+try:
+    JOB_QUEUE_MAX_RUNNING_PER_USER = max(int(JOB_QUEUE_MAX_RUNNING_PER_USER), 0)
+except ValueError:
+    JOB_QUEUE_MAX_RUNNING_PER_USER = 2
+
+JOB_QUEUE_MAX_ATTEMPTS = os.environ.get("JOB_QUEUE_MAX_ATTEMPTS", "3")
+try:
+    JOB_QUEUE_MAX_ATTEMPTS = max(int(JOB_QUEUE_MAX_ATTEMPTS), 1)
+except ValueError:
+    JOB_QUEUE_MAX_ATTEMPTS = 3
+
+# Base delay in seconds before a failed job is retried, doubled on every attempt
+JOB_QUEUE_RETRY_DELAY = os.environ.get("JOB_QUEUE_RETRY_DELAY", "10")
+try:
+    JOB_QUEUE_RETRY_DELAY = max(float(JOB_QUEUE_RETRY_DELAY), 0.0)
+except ValueError:
+    JOB_QUEUE_RETRY_DELAY = 10.0
+
+JOB_QUEUE_POLL_INTERVAL = os.environ.get("JOB_QUEUE_POLL_INTERVAL", "2")
+try:
+    JOB_QUEUE_POLL_INTERVAL = max(float(JOB_QUEUE_POLL_INTERVAL), 0.1)
+except ValueError:
+    JOB_QUEUE_POLL_INTERVAL = 2.0
+
+# Running jobs whose instance stopped renewing their lease for this many
+# seconds are handed to another worker
+JOB_QUEUE_LEASE_TIMEOUT = os.environ.get("JOB_QUEUE_LEASE_TIMEOUT", "120")
+try:
+    JOB_QUEUE_LEASE_TIMEOUT = max(int(JOB_QUEUE_LEASE_TIMEOUT), 10)
+except ValueError:
+    JOB_QUEUE_LEASE_TIMEOUT = 120
+
+# Seconds a stopping instance waits for its running jobs before it shuts down,
+# jobs that stopped are handed to another instance right away
+JOB_QUEUE_SHUTDOWN_TIMEOUT = os.environ.get("JOB_QUEUE_SHUTDOWN_TIMEOUT", "30")
+try:
+    JOB_QUEUE_SHUTDOWN_TIMEOUT = max(float(JOB_QUEUE_SHUTDOWN_TIMEOUT), 0.0)
+except ValueError:
+    JOB_QUEUE_SHUTDOWN_TIMEOUT = 30.0
+
+# Number of files a knowledge reindex job processes at once
+KNOWLEDGE_REINDEX_WORKERS = os.environ.get("KNOWLEDGE_REINDEX_WORKERS", "2")
+try:
+    KNOWLEDGE_REINDEX_WORKERS = max(int(KNOWLEDGE_REINDEX_WORKERS), 1)
+except ValueError:
+    KNOWLEDGE_REINDEX_WORKERS = 2
+
+# Limits how many files a knowledge reindex job starts per minute, so it
+# doesn't saturate the embedding backend. 0 for no limit
+KNOWLEDGE_REINDEX_FILES_PER_MINUTE = os.environ.get(
+    "KNOWLEDGE_REINDEX_FILES_PER_MINUTE", "0"
+)
+try:
+    KNOWLEDGE_REINDEX_FILES_PER_MINUTE = max(
+        float(KNOWLEDGE_REINDEX_FILES_PER_MINUTE), 0.0
+    )
+except ValueError:
+    KNOWLEDGE_REINDEX_FILES_PER_MINUTE = 0.0
+
+####################################
+# DOCUMENT EXTRACTION
+####################################
+
+# Number of worker processes that parse documents with the local loaders
+# (PDF, Word, Unstructured, ...), 0 to parse them in the calling thread
+DOCUMENT_EXTRACTION_WORKERS = os.environ.get("DOCUMENT_EXTRACTION_WORKERS", "0")
+try:
+    DOCUMENT_EXTRACTION_WORKERS = max(int(DOCUMENT_EXTRACTION_WORKERS), 0)
+except ValueError:
+    DOCUMENT_EXTRACTION_WORKERS = 0
+
+# Seconds a single document may take before its worker is killed, 0 for no limit
+DOCUMENT_EXTRACTION_TIMEOUT = os.environ.get("DOCUMENT_EXTRACTION_TIMEOUT", "300")
+try:
+    DOCUMENT_EXTRACTION_TIMEOUT = max(float(DOCUMENT_EXTRACTION_TIMEOUT), 0.0)
+except ValueError:
+    DOCUMENT_EXTRACTION_TIMEOUT = 300.0
+
+# Address space limit of each worker process in MB, 0 for no limit
+DOCUMENT_EXTRACTION_MAX_MEMORY = os.environ.get("DOCUMENT_EXTRACTION_MAX_MEMORY", "0")
+try:
+    DOCUMENT_EXTRACTION_MAX_MEMORY = max(int(DOCUMENT_EXTRACTION_MAX_MEMORY), 0)
+except ValueError:
+    DOCUMENT_EXTRACTION_MAX_MEMORY = 0
+
+# Chunks are embedded and inserted into the vector database in batches of
+# this size while the document is still being read, with at most this many
+# batches waiting to be embedded
+DOCUMENT_INGESTION_BATCH_SIZE = os.environ.get("DOCUMENT_INGESTION_BATCH_SIZE", "256")
+try:
+    DOCUMENT_INGESTION_BATCH_SIZE = max(int(DOCUMENT_INGESTION_BATCH_SIZE), 1)
+except ValueError:
+    DOCUMENT_INGESTION_BATCH_SIZE = 256
+
+DOCUMENT_INGESTION_MAX_PENDING_BATCHES = os.environ.get(
+    "DOCUMENT_INGESTION_MAX_PENDING_BATCHES", "2"
+)
+try:
+    DOCUMENT_INGESTION_MAX_PENDING_BATCHES = max(
+        int(DOCUMENT_INGESTION_MAX_PENDING_BATCHES), 1
+    )
+except ValueError:
+    DOCUMENT_INGESTION_MAX_PENDING_BATCHES = 2
+
 ####################################
 # REDIS
 ####################################
@@ -384,6 +532,14 @@ BYPASS_MODEL_ACCESS_CONTROL = (
     os.environ.get("BYPASS_MODEL_ACCESS_CONTROL", "False").lower() == "true"
 )
 
+# Seconds a user's compiled groups and permissions are reused before being
+# reloaded. Changes made through this instance take effect immediately.
+ACCESS_CONTROL_CACHE_TTL = os.environ.get("ACCESS_CONTROL_CACHE_TTL", "5")
+try:
+    ACCESS_CONTROL_CACHE_TTL = max(float(ACCESS_CONTROL_CACHE_TTL), 0.0)
+except ValueError:
+    ACCESS_CONTROL_CACHE_TTL = 5.0
+
 WEBUI_AUTH_SIGNOUT_REDIRECT_URL = os.environ.get(
     "WEBUI_AUTH_SIGNOUT_REDIRECT_URL", None
 )
@@ -504,6 +660,70 @@ AIOHTTP_CLIENT_SESSION_TOOL_SERVER_SSL = (
     os.environ.get("AIOHTTP_CLIENT_SESSION_TOOL_SERVER_SSL", "True").lower() == "true"
 )
 
+# Connection pools shared by all requests to an OpenAI or Ollama upstream
+AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST = os.environ.get(
+    "AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST", "100"
+)
+
+try:
+    AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST = max(int(AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST), 0)
+except Exception:
+    AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST = 100
+
+AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT = os.environ.get(
+    "AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT", "60"
+)
+
+try:
+    AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT = max(float(AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT), 0.0)
+except Exception:
+    AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT = 60.0
+
+AIOHTTP_CLIENT_DNS_CACHE_TTL = os.environ.get("AIOHTTP_CLIENT_DNS_CACHE_TTL", "300")
+
+try:
+    AIOHTTP_CLIENT_DNS_CACHE_TTL = max(int(AIOHTTP_CLIENT_DNS_CACHE_TTL), 0)
+except Exception:
+    AIOHTTP_CLIENT_DNS_CACHE_TTL = 300
+
+# How requests for a model are spread over the Ollama and OpenAI connections
+# serving it: random, least_outstanding, weighted, ewma or model_affinity
+UPSTREAM_ROUTING_STRATEGY = os.environ.get(
+    "UPSTREAM_ROUTING_STRATEGY", "least_outstanding"
+).lower()
+
+if UPSTREAM_ROUTING_STRATEGY not in [
+    "random",
+    "least_outstanding",
+    "weighted",
+    "ewma",
+    "model_affinity",
+]:
+    UPSTREAM_ROUTING_STRATEGY = "least_outstanding"
+
+# Consecutive failures after which a connection is taken out of rotation
+UPSTREAM_MAX_FAILURES = os.environ.get("UPSTREAM_MAX_FAILURES", "3")
+
+try:
+    UPSTREAM_MAX_FAILURES = max(int(UPSTREAM_MAX_FAILURES), 1)
+except Exception:
+    UPSTREAM_MAX_FAILURES = 3
+
+UPSTREAM_EJECTION_TIME = os.environ.get("UPSTREAM_EJECTION_TIME", "30")
+
+try:
+    UPSTREAM_EJECTION_TIME = max(int(UPSTREAM_EJECTION_TIME), 1)
+except Exception:
+    UPSTREAM_EJECTION_TIME = 30
+
+# Seconds between active health probes of every connection, 0 disables them
+UPSTREAM_HEALTH_CHECK_INTERVAL = os.environ.get("UPSTREAM_HEALTH_CHECK_INTERVAL", "15")
+
+try:
+    UPSTREAM_HEALTH_CHECK_INTERVAL = max(int(UPSTREAM_HEALTH_CHECK_INTERVAL), 0)
+except Exception:
+    UPSTREAM_HEALTH_CHECK_INTERVAL = 15
+
 
 ####################################
 # SENTENCE TRANSFORMERS
@@ -77,6 +77,7 @@ from open_webui.routers import (
     groups,
     files,
     functions,
+    jobs,
     memories,
     models,
     knowledge,
@@ -398,6 +399,7 @@ from open_webui.env import (
     AUDIT_EXCLUDED_PATHS,
     AUDIT_LOG_LEVEL,
     CHANGELOG,
+    ENABLE_CHAT_MESSAGE_TABLE,
     REDIS_URL,
     REDIS_KEY_PREFIX,
     REDIS_SENTINEL_HOSTS,
@@ -429,6 +431,7 @@ from open_webui.env import (
 from open_webui.utils.models import (
     get_all_models,
     get_all_base_models,
+    model_catalog_listener,
     check_model_access,
 )
 from open_webui.utils.chat import (
@@ -451,6 +454,15 @@ from open_webui.utils.plugin import install_tool_and_function_dependencies
 from open_webui.utils.oauth import OAuthManager
 from open_webui.utils.security_headers import SecurityHeadersMiddleware
 from open_webui.utils.redis import get_redis_connection
+from open_webui.utils.jobs import JobWorkerPool
+from open_webui.utils.http_client import UPSTREAM_CLIENT_POOL
+from open_webui.utils.routing import (
+    OLLAMA_ROUTER,
+    OPENAI_ROUTER,
+    run_upstream_health_checks,
+)
+from open_webui.retrieval.loaders.main import EXTRACTION_EXECUTOR
+from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
 
 from open_webui.tasks import (
     redis_task_command_listener,
@@ -531,6 +543,9 @@ async def lifespan(app: FastAPI):
         app.state.redis_task_command_listener = asyncio.create_task(
             redis_task_command_listener(app)
         )
+        app.state.model_catalog_listener = asyncio.create_task(
+            model_catalog_listener(app)
+        )
 
     if THREAD_POOL_SIZE and THREAD_POOL_SIZE > 0:
         limiter = anyio.to_thread.current_default_thread_limiter()
@@ -538,6 +553,18 @@ async def lifespan(app: FastAPI):
 
     asyncio.create_task(periodic_usage_pool_cleanup())
 
+    app.state.upstream_health_checks = asyncio.create_task(
+        run_upstream_health_checks(app)
+    )
+
+    app.state.job_worker_pool = JobWorkerPool(app)
+    await app.state.job_worker_pool.start()
+
+    if ENABLE_CHAT_MESSAGE_TABLE:
+        # Chats that still keep their messages inline, e.g. from before the
+        # setting was enabled
+        asyncio.create_task(asyncio.to_thread(Chats.move_messages_to_table))
+
     if app.state.config.ENABLE_BASE_MODELS_CACHE:
         await get_all_models(
             Request(
@@ -564,6 +591,19 @@ async def lifespan(app: FastAPI):
     if hasattr(app.state, "redis_task_command_listener"):
         app.state.redis_task_command_listener.cancel()
 
+    if hasattr(app.state, "model_catalog_listener"):
+        app.state.model_catalog_listener.cancel()
+
+    app.state.upstream_health_checks.cancel()
+
+    await app.state.job_worker_pool.stop()
+
+    if EXTRACTION_EXECUTOR:
+        EXTRACTION_EXECUTOR.shutdown()
+
+    await VECTOR_DB_CLIENT.close_async()
+    await UPSTREAM_CLIENT_POOL.close()
+
 
 app = FastAPI(
     title="Open WebUI",
@@ -1205,6 +1245,7 @@ app.include_router(memories.router, prefix="/api/v1/memories", tags=["memories"]
 app.include_router(folders.router, prefix="/api/v1/folders", tags=["folders"])
 app.include_router(groups.router, prefix="/api/v1/groups", tags=["groups"])
 app.include_router(files.router, prefix="/api/v1/files", tags=["files"])
+app.include_router(jobs.router, prefix="/api/v1/jobs", tags=["jobs"])
 app.include_router(functions.router, prefix="/api/v1/functions", tags=["functions"])
 app.include_router(
     evaluations.router, prefix="/api/v1/evaluations", tags=["evaluations"]
@@ -1250,10 +1291,13 @@ async def get_models(
                     filtered_models.append(model)
                 continue
 
-            model_info = Models.get_model_by_id(model["id"])
-            if model_info:
-                if user.id == model_info.user_id or has_access(
-                    user.id, type="read", access_control=model_info.access_control
+            # Models with a workspace entry carry it as "info"
+            model_info = model.get("info")
+            if model_info and "user_id" in model_info:
+                if user.id == model_info["user_id"] or has_access(
+                    user.id,
+                    type="read",
+                    access_control=model_info.get("access_control"),
                 ):
                     filtered_models.append(model)
 
@@ -1261,27 +1305,12 @@ async def get_models(
 
     all_models = await get_all_models(request, refresh=refresh, user=user)
 
-    models = []
-    for model in all_models:
-        # Filter out filter pipelines
-        if "pipeline" in model and model["pipeline"].get("type", None) == "filter":
-            continue
-
-        try:
-            model_tags = [
-                tag.get("name")
-                for tag in model.get("info", {}).get("meta", {}).get("tags", [])
-            ]
-            tags = [tag.get("name") for tag in model.get("tags", [])]
-
-            tags = list(set(model_tags + tags))
-            model["tags"] = [{"name": tag} for tag in tags]
-        except Exception as e:
-            log.debug(f"Error processing model tags: {e}")
-            model["tags"] = []
-            pass
-
-        models.append(model)
+    # Filter out filter pipelines
+    models = [
+        model
+        for model in all_models
+        if not ("pipeline" in model and model["pipeline"].get("type", None) == "filter")
+    ]
 
     model_order_list = request.app.state.config.MODEL_ORDER_LIST
     if model_order_list:
@@ -1726,6 +1755,19 @@ async def get_current_usage(user=Depends(get_verified_user)):
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
+@app.get("/api/usage/upstreams")
+async def get_upstream_usage(user=Depends(get_admin_user)):
+    """
+    Get connection pool and routing statistics for each OpenAI and Ollama
+    upstream.
+    """
+    return {
+        "pools": UPSTREAM_CLIENT_POOL.get_metrics(),
+        "ollama": OLLAMA_ROUTER.get_status(),
+        "openai": OPENAI_ROUTER.get_status(),
+    }
+
+
 ############################
 # OAuth Login & Callback
 ############################
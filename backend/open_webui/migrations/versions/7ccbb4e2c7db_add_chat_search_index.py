@@ -0,0 +1,163 @@
+"""Add chat search index
+
+Revision ID: 7ccbb4e2c7db
+Revises: eeb5f66ae82a
+Create Date: 2025-07-22 03:00:00.000000
+
+"""
+
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import table, column
+
+revision = "7ccbb4e2c7db"
+down_revision = "eeb5f66ae82a"
+branch_labels = None
+depends_on = None
+
+log = logging.getLogger(__name__)
+
+POSTGRES_MAX_CONTENT_LENGTH = 200_000
+
+chat_table = table(
+    "chat",
+    column("id", sa.String()),
+    column("user_id", sa.String()),
+    column("title", sa.Text()),
+    column("chat", sa.JSON()),
+)
+
+chat_message_table = table(
+    "chat_message",
+    column("chat_id", sa.Text()),
+    column("content", sa.Text()),
+)
+
+
+def get_chat_search_content(conn, chat_id, chat):
+    history = chat.get("history") or {}
+    if isinstance(history, dict) and history.get("storage") == "chat_message":
+        rows = conn.execute(
+            sa.select(chat_message_table.c.content).where(
+                chat_message_table.c.chat_id == chat_id
+            )
+        )
+        contents = [row.content for row in rows]
+    else:
+        messages = history.get("messages") if isinstance(history, dict) else None
+        if not messages:
+            messages = {i: m for i, m in enumerate(chat.get("messages") or [])}
+        contents = (
+            [
+                message.get("content")
+                for message in messages.values()
+                if isinstance(message, dict)
+            ]
+            if isinstance(messages, dict)
+            else []
+        )
+
+    return "\n".join(c for c in contents if isinstance(c, str)).replace("\x00", "")
+
+
+def upgrade():
+    conn = op.get_bind()
+    dialect_name = conn.dialect.name
+
+    if dialect_name == "sqlite":
+        op.execute(
+            "CREATE TABLE chat_search ("
+            "id INTEGER PRIMARY KEY, chat_id TEXT NOT NULL UNIQUE, "
+            "title TEXT, content TEXT)"
+        )
+        try:
+            op.execute(
+                "CREATE VIRTUAL TABLE chat_fts USING fts5("
+                "title, content, content='chat_search', content_rowid='id', "
+                "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            )
+        except Exception as e:
+            # Without FTS5 chat search keeps scanning the chat JSON
+            log.warning(
+                f"SQLite FTS5 is not available, skipping chat search index: {e}"
+            )
+            op.execute("DROP TABLE chat_search")
+            return
+
+        op.execute(
+            "CREATE TRIGGER chat_search_ai AFTER INSERT ON chat_search BEGIN "
+            "INSERT INTO chat_fts (rowid, title, content) "
+            "VALUES (new.id, new.title, new.content); END"
+        )
+        op.execute(
+            "CREATE TRIGGER chat_search_ad AFTER DELETE ON chat_search BEGIN "
+            "INSERT INTO chat_fts (chat_fts, rowid, title, content) "
+            "VALUES ('delete', old.id, old.title, old.content); END"
+        )
+        op.execute(
+            "CREATE TRIGGER chat_search_au AFTER UPDATE ON chat_search BEGIN "
+            "INSERT INTO chat_fts (chat_fts, rowid, title, content) "
+            "VALUES ('delete', old.id, old.title, old.content); "
+            "INSERT INTO chat_fts (rowid, title, content) "
+            "VALUES (new.id, new.title, new.content); END"
+        )
+        insert_sql = sa.text(
+            "INSERT INTO chat_search (chat_id, title, content) "
+            "VALUES (:chat_id, :title, :content)"
+        )
+    elif dialect_name == "postgresql":
+        op.execute(
+            "CREATE TABLE chat_search (chat_id TEXT PRIMARY KEY, document TSVECTOR)"
+        )
+        op.execute(
+            "CREATE INDEX chat_search_document_idx ON chat_search USING GIN (document)"
+        )
+        insert_sql = sa.text(
+            "INSERT INTO chat_search (chat_id, document) VALUES (:chat_id, "
+            "setweight(to_tsvector('simple', :title), 'A') || "
+            "setweight(to_tsvector('simple', :content), 'B'))"
+        )
+    else:
+        return
+
+    # Backfill the index, shared chat snapshots are never searched
+    chat_ids = [
+        row.id
+        for row in conn.execute(
+            sa.select(chat_table.c.id).where(
+                sa.not_(chat_table.c.user_id.like("shared-%"))
+            )
+        )
+    ]
+    for chat_id in chat_ids:
+        row = conn.execute(
+            sa.select(chat_table.c.title, chat_table.c.chat).where(
+                chat_table.c.id == chat_id
+            )
+        ).first()
+        content = get_chat_search_content(
+            conn, chat_id, row.chat if isinstance(row.chat, dict) else {}
+        )
+        if dialect_name == "postgresql":
+            content = content[:POSTGRES_MAX_CONTENT_LENGTH]
+
+        conn.execute(
+            insert_sql,
+            {
+                "chat_id": chat_id,
+                "title": (row.title or "").replace("\x00", ""),
+                "content": content,
+            },
+        )
+
+
+def downgrade():
+    conn = op.get_bind()
+    if conn.dialect.name == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS chat_search_ai")
+        op.execute("DROP TRIGGER IF EXISTS chat_search_ad")
+        op.execute("DROP TRIGGER IF EXISTS chat_search_au")
+        op.execute("DROP TABLE IF EXISTS chat_fts")
+    op.execute("DROP TABLE IF EXISTS chat_search")
@@ -0,0 +1,50 @@
+"""Add job table
+
+Revision ID: a1d4c2b9e6f3
+Revises: f795fc70cce9
+Create Date: 2025-07-26 03:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "a1d4c2b9e6f3"
+down_revision = "f795fc70cce9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "job",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("user_id", sa.String(), nullable=True),
+        sa.Column("type", sa.Text(), nullable=True),
+        sa.Column("item_id", sa.Text(), nullable=True),
+        sa.Column("status", sa.Text(), nullable=True),
+        sa.Column("payload", sa.JSON(), nullable=True),
+        sa.Column("progress", sa.JSON(), nullable=True),
+        sa.Column("result", sa.JSON(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=True),
+        sa.Column("max_attempts", sa.Integer(), nullable=True),
+        sa.Column("worker_id", sa.Text(), nullable=True),
+        sa.Column("available_at", sa.BigInteger(), nullable=True),
+        sa.Column("lease_expires_at", sa.BigInteger(), nullable=True),
+        sa.Column("created_at", sa.BigInteger(), nullable=True),
+        sa.Column("updated_at", sa.BigInteger(), nullable=True),
+        sa.Column("started_at", sa.BigInteger(), nullable=True),
+        sa.Column("finished_at", sa.BigInteger(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("job_status_available_at_idx", "job", ["status", "available_at"])
+    op.create_index("job_item_id_idx", "job", ["item_id"])
+    op.create_index("job_user_id_idx", "job", ["user_id"])
+
+
+def downgrade():
+    op.drop_index("job_user_id_idx", table_name="job")
+    op.drop_index("job_item_id_idx", table_name="job")
+    op.drop_index("job_status_available_at_idx", table_name="job")
+    op.drop_table("job")
@@ -0,0 +1,98 @@
+"""Add chat message table
+
+Revision ID: eeb5f66ae82a
+Revises: d31026856c01
+Create Date: 2025-07-20 03:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import table, column
+
+revision = "eeb5f66ae82a"
+down_revision = "d31026856c01"
+branch_labels = None
+depends_on = None
+
+MESSAGE_STORAGE_KEY = "storage"
+MESSAGE_STORAGE_TABLE = "chat_message"
+
+chat_table = table(
+    "chat",
+    column("id", sa.String()),
+    column("chat", sa.JSON()),
+)
+
+chat_message_table = table(
+    "chat_message",
+    column("chat_id", sa.Text()),
+    column("message_id", sa.Text()),
+    column("parent_id", sa.Text()),
+    column("role", sa.Text()),
+    column("content", sa.Text()),
+    column("meta", sa.JSON()),
+    column("created_at", sa.BigInteger()),
+    column("updated_at", sa.BigInteger()),
+)
+
+
+def row_to_message(row):
+    message = {**(row.meta or {}), "id": row.message_id, "parentId": row.parent_id}
+    if row.role is not None:
+        message["role"] = row.role
+    if row.content is not None:
+        message["content"] = row.content
+    return message
+
+
+def upgrade():
+    op.create_table(
+        "chat_message",
+        sa.Column("chat_id", sa.Text(), nullable=False),
+        sa.Column("message_id", sa.Text(), nullable=False),
+        sa.Column("parent_id", sa.Text(), nullable=True),
+        sa.Column("role", sa.Text(), nullable=True),
+        sa.Column("content", sa.Text(), nullable=True),
+        sa.Column("meta", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.BigInteger(), nullable=True),
+        sa.Column("updated_at", sa.BigInteger(), nullable=True),
+        sa.PrimaryKeyConstraint("chat_id", "message_id", name="pk_chat_id_message_id"),
+    )
+
+    # Chats are moved to the table by the application when
+    # ENABLE_CHAT_MESSAGE_TABLE is set, see Chats.move_messages_to_table
+
+
+def downgrade():
+    # Move messages back into the chat JSON before dropping the table
+    conn = op.get_bind()
+    chat_ids = [
+        row.chat_id
+        for row in conn.execute(sa.select(chat_message_table.c.chat_id).distinct())
+    ]
+
+    for chat_id in chat_ids:
+        chat = conn.execute(
+            sa.select(chat_table.c.chat).where(chat_table.c.id == chat_id)
+        ).scalar()
+        history = chat.get("history") if isinstance(chat, dict) else None
+        if not isinstance(history, dict) or MESSAGE_STORAGE_KEY not in history:
+            continue
+
+        rows = conn.execute(
+            sa.select(chat_message_table).where(chat_message_table.c.chat_id == chat_id)
+        )
+        history = {
+            **history,
+            "messages": {row.message_id: row_to_message(row) for row in rows},
+        }
+        history.pop(MESSAGE_STORAGE_KEY)
+
+        conn.execute(
+            sa.update(chat_table)
+            .where(chat_table.c.id == chat_id)
+            .values(chat={**chat, "history": history})
+        )
+
+    op.drop_table("chat_message")
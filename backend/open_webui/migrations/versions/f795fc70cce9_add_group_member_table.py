@@ -0,0 +1,59 @@
+"""Add group member table
+
+Revision ID: f795fc70cce9
+Revises: 7ccbb4e2c7db
+Create Date: 2025-07-24 03:00:00.000000
+
+"""
+
+import time
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import table, column
+
+revision = "f795fc70cce9"
+down_revision = "7ccbb4e2c7db"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "group_member",
+        sa.Column("group_id", sa.Text(), nullable=False),
+        sa.Column("user_id", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.BigInteger(), nullable=True),
+        sa.PrimaryKeyConstraint("group_id", "user_id", name="pk_group_id_user_id"),
+    )
+    op.create_index("group_member_user_id_idx", "group_member", ["user_id"])
+
+    # Backfill memberships from the group.user_ids JSON column
+    group_table = table(
+        "group",
+        column("id", sa.Text()),
+        column("user_ids", sa.JSON()),
+    )
+    group_member_table = table(
+        "group_member",
+        column("group_id", sa.Text()),
+        column("user_id", sa.Text()),
+        column("created_at", sa.BigInteger()),
+    )
+
+    conn = op.get_bind()
+    now = int(time.time())
+    rows = [
+        {"group_id": group.id, "user_id": user_id, "created_at": now}
+        for group in conn.execute(sa.select(group_table.c.id, group_table.c.user_ids))
+        if isinstance(group.user_ids, list)
+        for user_id in dict.fromkeys(group.user_ids)
+        if isinstance(user_id, str)
+    ]
+    if rows:
+        op.bulk_insert(group_member_table, rows)
+
+
+def downgrade():
+    op.drop_index("group_member_user_id_idx", table_name="group_member")
+    op.drop_table("group_member")
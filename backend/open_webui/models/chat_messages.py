@@ -0,0 +1,190 @@
+import logging
+import time
+from typing import Optional
+
+from open_webui.internal.db import Base, get_db
+from open_webui.env import SRC_LOG_LEVELS
+
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import BigInteger, Column, Text, JSON, PrimaryKeyConstraint
+from sqlalchemy.orm import Session
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+####################
+# ChatMessage DB Schema
+####################
+
+# Message fields that have their own column, everything else is kept in `meta`
+MESSAGE_COLUMN_FIELDS = {"id", "parentId", "role", "content"}
+
+
+class ChatMessage(Base):
+    __tablename__ = "chat_message"
+
+    chat_id = Column(Text, nullable=False)
+    message_id = Column(Text, nullable=False)
+    parent_id = Column(Text, nullable=True)
+
+    role = Column(Text, nullable=True)
+    content = Column(Text, nullable=True)
+    meta = Column(JSON, nullable=True)
+
+    created_at = Column(BigInteger)
+    updated_at = Column(BigInteger)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("chat_id", "message_id", name="pk_chat_id_message_id"),
+    )
+
+
+class ChatMessageModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    chat_id: str
+    message_id: str
+    parent_id: Optional[str] = None
+
+    role: Optional[str] = None
+    content: Optional[str] = None
+    meta: Optional[dict] = None
+
+    created_at: int  # timestamp in epoch
+    updated_at: int  # timestamp in epoch
+
+
+def message_to_row(chat_id: str, message_id: str, message: dict) -> dict:
+    content = message.get("content")
+    if isinstance(content, str):
+        content = content.replace("\x00", "")
+
+    meta = {k: v for k, v in message.items() if k not in MESSAGE_COLUMN_FIELDS}
+    if content is not None and not isinstance(content, str):
+        # Non-text content (e.g. multimodal parts) is kept verbatim in meta
+        meta["content"] = content
+        content = None
+
+    now = int(time.time())
+    timestamp = message.get("timestamp")
+    return {
+        "chat_id": chat_id,
+        "message_id": message_id,
+        "parent_id": message.get("parentId"),
+        "role": message.get("role"),
+        "content": content,
+        "meta": meta,
+        "created_at": timestamp if isinstance(timestamp, int) else now,
+        "updated_at": now,
+    }
+
+
+def row_to_message(row) -> dict:
+    message = {**(row.meta or {}), "id": row.message_id, "parentId": row.parent_id}
+    if row.role is not None:
+        message["role"] = row.role
+    if row.content is not None:
+        message["content"] = row.content
+    return message
+
+
+class ChatMessageTable:
+    """
+    Reads use their own session unless given one. Writes happen within the
+    caller's transaction, so the message rows commit together with the chat
+    row that points at them.
+    """
+
+    def get_messages_by_chat_id(
+        self, chat_id: str, db: Optional[Session] = None
+    ) -> dict:
+        if db is None:
+            with get_db() as db:
+                return self.get_messages_by_chat_id(chat_id, db)
+
+        rows = db.query(ChatMessage).filter_by(chat_id=chat_id).all()
+        return {row.message_id: row_to_message(row) for row in rows}
+
+    def get_messages_by_chat_ids(self, chat_ids: list[str]) -> dict[str, dict]:
+        if not chat_ids:
+            return {}
+
+        with get_db() as db:
+            rows = db.query(ChatMessage).filter(ChatMessage.chat_id.in_(chat_ids)).all()
+
+            messages = {chat_id: {} for chat_id in chat_ids}
+            for row in rows:
+                messages[row.chat_id][row.message_id] = row_to_message(row)
+            return messages
+
+    def get_message_by_chat_id_and_message_id(
+        self, chat_id: str, message_id: str
+    ) -> Optional[dict]:
+        with get_db() as db:
+            row = db.get(ChatMessage, (chat_id, message_id))
+            return row_to_message(row) if row else None
+
+    def upsert_message(
+        self, db: Session, chat_id: str, message_id: str, message: dict
+    ) -> dict:
+        """
+        Merge `message` into the stored message, creating it if needed, and
+        return the merged message.
+        """
+        row = db.get(ChatMessage, (chat_id, message_id))
+        if row:
+            message = {**row_to_message(row), **message}
+
+        values = message_to_row(chat_id, message_id, message)
+        if row:
+            values.pop("created_at")
+            for key, value in values.items():
+                setattr(row, key, value)
+        else:
+            db.add(ChatMessage(**values))
+
+        db.flush()
+        return message
+
+    def sync_messages(self, db: Session, chat_id: str, messages: dict) -> None:
+        """
+        Make the stored messages of a chat match `messages` exactly.
+        """
+        existing = {
+            row.message_id: row
+            for row in db.query(ChatMessage).filter_by(chat_id=chat_id).all()
+        }
+
+        for message_id, message in messages.items():
+            values = message_to_row(chat_id, message_id, message)
+            row = existing.pop(message_id, None)
+            if row is None:
+                db.add(ChatMessage(**values))
+            elif row_to_message(row) != row_to_message(ChatMessage(**values)):
+                values.pop("created_at")
+                for key, value in values.items():
+                    setattr(row, key, value)
+
+        if existing:
+            db.query(ChatMessage).filter(
+                ChatMessage.chat_id == chat_id,
+                ChatMessage.message_id.in_(list(existing.keys())),
+            ).delete(synchronize_session=False)
+
+        db.flush()
+
+    def copy_messages(self, db: Session, from_chat_id: str, to_chat_id: str) -> None:
+        self.sync_messages(
+            db, to_chat_id, self.get_messages_by_chat_id(from_chat_id, db)
+        )
+
+    def delete_messages_by_chat_id(self, db: Session, chat_id: str) -> None:
+        db.query(ChatMessage).filter_by(chat_id=chat_id).delete()
+
+    def delete_messages_by_chat_ids(self, db: Session, chat_ids: list[str]) -> None:
+        db.query(ChatMessage).filter(ChatMessage.chat_id.in_(chat_ids)).delete(
+            synchronize_session=False
+        )
+
+
+ChatMessages = ChatMessageTable()
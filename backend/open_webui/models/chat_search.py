@@ -0,0 +1,191 @@
+import logging
+import re
+from typing import Optional
+
+from open_webui.env import SRC_LOG_LEVELS
+
+from sqlalchemy import bindparam, inspect, text
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.sql import column, table
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+####################
+# Chat search index
+#
+# SQLite: `chat_search` holds the indexed text of every chat and the FTS5
+# table `chat_fts` indexes it as external content, kept in sync by triggers.
+# PostgreSQL: `chat_search` holds a weighted tsvector with a GIN index.
+#
+# Both are created by the add_chat_search_index migration.
+####################
+
+chat_search_table = table(
+    "chat_search",
+    column("id"),
+    column("chat_id"),
+)
+chat_fts_table = table("chat_fts", column("rowid"))
+
+# PostgreSQL rejects tsvectors larger than 1MB, so very long chats are only
+# indexed up to this many characters of message content
+POSTGRES_MAX_CONTENT_LENGTH = 200_000
+
+# Matches in the title rank higher than matches in message content
+SQLITE_RANK = "bm25(chat_fts, 10.0, 1.0)"
+POSTGRES_QUERY = "to_tsquery('simple', :search_query)"
+
+
+def get_chat_search_content(chat: dict) -> str:
+    """
+    Returns the searchable message text of a chat, covering every branch of
+    the conversation tree.
+    """
+    history = chat.get("history") or {}
+    messages = history.get("messages") if isinstance(history, dict) else None
+    if not messages:
+        messages = {i: m for i, m in enumerate(chat.get("messages") or [])}
+    if not isinstance(messages, dict):
+        return ""
+
+    return "\n".join(
+        message["content"]
+        for message in messages.values()
+        if isinstance(message, dict) and isinstance(message.get("content"), str)
+    ).replace("\x00", "")
+
+
+def get_search_terms(search_text: str) -> list[str]:
+    return re.findall(r"\w+", search_text.lower())
+
+
+class ChatSearchTable:
+    def __init__(self):
+        self._available: dict[str, bool] = {}
+
+    def is_available(self, db: Session) -> bool:
+        dialect_name = db.bind.dialect.name
+        if dialect_name not in self._available:
+            table_name = {"sqlite": "chat_fts", "postgresql": "chat_search"}.get(
+                dialect_name
+            )
+            self._available[dialect_name] = table_name is not None and inspect(
+                db.bind
+            ).has_table(table_name)
+            if not self._available[dialect_name]:
+                log.warning(
+                    "Chat search index is not available, falling back to scanning chats"
+                )
+        return self._available[dialect_name]
+
+    def upsert_chat(self, db: Session, chat_id: str, title: str, chat: dict) -> None:
+        """
+        Indexes a chat within the caller's transaction.
+        """
+        if not self.is_available(db):
+            return
+
+        params = {
+            "chat_id": chat_id,
+            "title": (title or "").replace("\x00", ""),
+            "content": get_chat_search_content(chat),
+        }
+
+        if db.bind.dialect.name == "sqlite":
+            db.execute(
+                text(
+                    "INSERT INTO chat_search (chat_id, title, content) "
+                    "VALUES (:chat_id, :title, :content) "
+                    "ON CONFLICT (chat_id) DO UPDATE SET "
+                    "title = excluded.title, content = excluded.content"
+                ),
+                params,
+            )
+        else:
+            params["content"] = params["content"][:POSTGRES_MAX_CONTENT_LENGTH]
+            db.execute(
+                text(
+                    "INSERT INTO chat_search (chat_id, document) VALUES (:chat_id, "
+                    "setweight(to_tsvector('simple', :title), 'A') || "
+                    "setweight(to_tsvector('simple', :content), 'B')) "
+                    "ON CONFLICT (chat_id) DO UPDATE SET document = excluded.document"
+                ),
+                params,
+            )
+
+    def upsert_chat_by_id(self, db: Session, chat_id: str) -> None:
+        """
+        Reindexes a chat from the JSON stored on its row, within the caller's
+        transaction and without loading the chat. PostgreSQL only, for
+        messages updated in place with jsonb_set.
+        """
+        if db.bind.dialect.name != "postgresql" or not self.is_available(db):
+            return
+
+        db.execute(
+            text(
+                "INSERT INTO chat_search (chat_id, document) "
+                "SELECT id, "
+                "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+                "setweight(to_tsvector('simple', left(coalesce(("
+                "SELECT string_agg(message.value ->> 'content', E'\\n') "
+                "FROM jsonb_each(chat::jsonb #> '{history,messages}') AS message "
+                "WHERE jsonb_typeof(message.value -> 'content') = 'string'"
+                "), ''), :max_length)), 'B') "
+                "FROM chat WHERE id = :chat_id "
+                "ON CONFLICT (chat_id) DO UPDATE SET document = excluded.document"
+            ),
+            {"chat_id": chat_id, "max_length": POSTGRES_MAX_CONTENT_LENGTH},
+        )
+
+    def delete_chats(self, db: Session, chat_ids: list[str]) -> None:
+        """
+        Removes chats from the index within the caller's transaction.
+        """
+        if not chat_ids or not self.is_available(db):
+            return
+
+        db.execute(
+            text("DELETE FROM chat_search WHERE chat_id IN :chat_ids").bindparams(
+                bindparam("chat_ids", expanding=True)
+            ),
+            {"chat_ids": list(chat_ids)},
+        )
+
+    def apply_search(
+        self, db: Session, query: Query, chat_id_column, search_text: str
+    ) -> Optional[Query]:
+        """
+        Restricts `query` to chats matching every word of `search_text` (as a
+        prefix) and orders them by relevance. Returns None if the index can't
+        serve the search, in which case callers should fall back to scanning.
+        """
+        terms = get_search_terms(search_text)
+        if not terms or not self.is_available(db):
+            return None
+
+        query = query.join(
+            chat_search_table, chat_search_table.c.chat_id == chat_id_column
+        )
+
+        if db.bind.dialect.name == "sqlite":
+            search_query = " ".join(f'"{term}"*' for term in terms)
+            return (
+                query.join(
+                    chat_fts_table, chat_fts_table.c.rowid == chat_search_table.c.id
+                )
+                .filter(text("chat_fts MATCH :search_query"))
+                .order_by(text(SQLITE_RANK))
+                .params(search_query=search_query)
+            )
+        else:
+            search_query = " & ".join(f"{term}:*" for term in terms)
+            return (
+                query.filter(text(f"chat_search.document @@ {POSTGRES_QUERY}"))
+                .order_by(text(f"ts_rank(chat_search.document, {POSTGRES_QUERY}) DESC"))
+                .params(search_query=search_query)
+            )
+
+
+ChatSearch = ChatSearchTable()
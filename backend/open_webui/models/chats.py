@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import json
 import time
@@ -6,11 +7,14 @@ from typing import Optional
 
 from open_webui.internal.db import Base, get_db
 from open_webui.models.tags import TagModel, Tag, Tags
-from open_webui.env import SRC_LOG_LEVELS
+from open_webui.models.chat_messages import ChatMessages
+from open_webui.models.chat_search import ChatSearch
+from open_webui.env import SRC_LOG_LEVELS, ENABLE_CHAT_MESSAGE_TABLE
 
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON
 from sqlalchemy import or_, func, select, and_, text
+from sqlalchemy.orm import Session
 from sqlalchemy.sql import exists
 from sqlalchemy.sql.expression import bindparam
 
@@ -21,6 +25,10 @@ from sqlalchemy.sql.expression import bindparam
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
 
+# Marks chats whose history.messages live in the chat_message table
+MESSAGE_STORAGE_KEY = "storage"
+MESSAGE_STORAGE_TABLE = "chat_message"
+
 
 class Chat(Base):
     __tablename__ = "chat"
@@ -108,6 +116,109 @@ class ChatTitleIdResponse(BaseModel):
 
 
 class ChatTable:
+    @staticmethod
+    def _is_normalized(chat: dict) -> bool:
+        history = chat.get("history") if isinstance(chat, dict) else None
+        return (
+            isinstance(history, dict)
+            and history.get(MESSAGE_STORAGE_KEY) == MESSAGE_STORAGE_TABLE
+        )
+
+    def _store_messages(self, db: Session, id: str, chat: dict) -> dict:
+        """
+        Returns the chat dict to persist on the chat row. With
+        ENABLE_CHAT_MESSAGE_TABLE the messages of the conversation tree are
+        written to the chat_message table, within the caller's transaction,
+        and stripped from the chat JSON.
+        """
+        history = chat.get("history")
+        if (
+            not ENABLE_CHAT_MESSAGE_TABLE
+            or not isinstance(history, dict)
+            or self._is_normalized(chat)
+        ):
+            return chat
+
+        ChatMessages.sync_messages(db, id, history.get("messages") or {})
+        return {
+            **chat,
+            "history": {
+                **history,
+                "messages": {},
+                MESSAGE_STORAGE_KEY: MESSAGE_STORAGE_TABLE,
+            },
+        }
+
+    def move_messages_to_table(self, batch_size: int = 100) -> int:
+        """
+        Moves the messages of chats that still keep them inline to the
+        chat_message table, e.g. after ENABLE_CHAT_MESSAGE_TABLE was turned
+        on for an existing instance. Chats that were already moved are
+        skipped, so this can be interrupted and run again.
+        """
+        if not ENABLE_CHAT_MESSAGE_TABLE:
+            return 0
+
+        moved = 0
+        last_id = ""
+        while True:
+            with get_db() as db:
+                ids = [
+                    row.id
+                    for row in db.query(Chat.id)
+                    .filter(Chat.id > last_id)
+                    .order_by(Chat.id)
+                    .limit(batch_size)
+                    .all()
+                ]
+            if not ids:
+                return moved
+            last_id = ids[-1]
+
+            for id in ids:
+                try:
+                    with get_db() as db:
+                        # Locked, so instances moving chats at the same time
+                        # don't both move it
+                        chat_item = (
+                            db.query(Chat).filter_by(id=id).with_for_update().first()
+                        )
+                        if chat_item is None or self._is_normalized(chat_item.chat):
+                            continue
+
+                        chat_item.chat = self._store_messages(db, id, chat_item.chat)
+                        db.commit()
+                        moved += 1
+                except Exception as e:
+                    log.exception(f"Error moving the messages of chat {id}: {e}")
+
+    def _to_chat_models(self, chats) -> list[ChatModel]:
+        """
+        Validates chat rows, loading the messages of chats stored in the
+        chat_message table back into `chat.history.messages` so callers always
+        see the same shape regardless of the storage mode.
+        """
+        chat_models = [ChatModel.model_validate(chat) for chat in chats]
+
+        normalized_ids = [
+            chat.id for chat in chat_models if self._is_normalized(chat.chat)
+        ]
+        if normalized_ids:
+            messages = ChatMessages.get_messages_by_chat_ids(normalized_ids)
+            for chat in chat_models:
+                if chat.id in messages:
+                    history = {
+                        **chat.chat["history"],
+                        "messages": messages[chat.id],
+                    }
+                    history.pop(MESSAGE_STORAGE_KEY, None)
+                    chat.chat = {**chat.chat, "history": history}
+
+        return chat_models
+
+    def _to_chat_model(self, chat) -> ChatModel:
+        return self._to_chat_models([chat])[0]
+
     def insert_new_chat(self, user_id: str, form_data: ChatForm) -> Optional[ChatModel]:
         with get_db() as db:
             id = str(uuid.uuid4())
@@ -120,7 +231,7 @@ class ChatTable:
                         if "title" in form_data.chat
                         else "New Chat"
                     ),
-                    "chat": form_data.chat,
+                    "chat": self._store_messages(db, id, form_data.chat),
                     "folder_id": form_data.folder_id,
                     "created_at": int(time.time()),
                     "updated_at": int(time.time()),
@@ -129,9 +240,10 @@ class ChatTable:
 
             result = Chat(**chat.model_dump())
             db.add(result)
+            ChatSearch.upsert_chat(db, id, chat.title, form_data.chat)
             db.commit()
             db.refresh(result)
-            return ChatModel.model_validate(result) if result else None
+            return self._to_chat_model(result) if result else None
 
     def import_chat(
         self, user_id: str, form_data: ChatImportForm
@@ -147,7 +259,7 @@ class ChatTable:
                         if "title" in form_data.chat
                         else "New Chat"
                     ),
-                    "chat": form_data.chat,
+                    "chat": self._store_messages(db, id, form_data.chat),
                     "meta": form_data.meta,
                     "pinned": form_data.pinned,
                     "folder_id": form_data.folder_id,
@@ -166,21 +278,29 @@ class ChatTable:
 
             result = Chat(**chat.model_dump())
             db.add(result)
+            ChatSearch.upsert_chat(db, id, chat.title, form_data.chat)
             db.commit()
             db.refresh(result)
-            return ChatModel.model_validate(result) if result else None
+            return self._to_chat_model(result) if result else None
 
     def update_chat_by_id(self, id: str, chat: dict) -> Optional[ChatModel]:
         try:
             with get_db() as db:
                 chat_item = db.get(Chat, id)
-                chat_item.chat = chat
+                if not ENABLE_CHAT_MESSAGE_TABLE and self._is_normalized(
+                    chat_item.chat
+                ):
+                    # The chat is moved back inline, drop its message rows
+                    ChatMessages.delete_messages_by_chat_id(db, id)
+
+                chat_item.chat = self._store_messages(db, id, chat)
                 chat_item.title = chat["title"] if "title" in chat else "New Chat"
                 chat_item.updated_at = int(time.time())
+                ChatSearch.upsert_chat(db, id, chat_item.title, chat)
                 db.commit()
                 db.refresh(chat_item)
 
-                return ChatModel.model_validate(chat_item)
+                return self._to_chat_model(chat_item)
         except Exception:
             return None
 
@@ -222,6 +342,11 @@ class ChatTable:
         return chat.chat.get("title", "New Chat")
 
     def get_messages_by_chat_id(self, id: str) -> Optional[dict]:
+        if ENABLE_CHAT_MESSAGE_TABLE:
+            messages = ChatMessages.get_messages_by_chat_id(id)
+            if messages:
+                return messages
+
         chat = self.get_chat_by_id(id)
         if chat is None:
             return None
@@ -231,23 +356,76 @@ class ChatTable:
     def get_message_by_id_and_message_id(
         self, id: str, message_id: str
     ) -> Optional[dict]:
+        if ENABLE_CHAT_MESSAGE_TABLE:
+            message = ChatMessages.get_message_by_chat_id_and_message_id(id, message_id)
+            if message is not None:
+                return message
+
         chat = self.get_chat_by_id(id)
         if chat is None:
             return None
 
         return chat.chat.get("history", {}).get("messages", {}).get(message_id, {})
 
+    def _upsert_message_row(
+        self,
+        id: str,
+        message_id: str,
+        message: dict,
+        set_current: bool = True,
+        index: bool = True,
+    ) -> bool:
+        """
+        Writes a single message of a chat stored in the chat_message table,
+        only touching that message's row and, with set_current, the chat's
+        currentId. Returns False if the chat does not exist or still keeps its
+        messages inline.
+        """
+        with get_db() as db:
+            chat_item = db.get(Chat, id)
+            if chat_item is None or not self._is_normalized(chat_item.chat):
+                return False
+
+            ChatMessages.upsert_message(db, id, message_id, message)
+            if set_current:
+                chat_item.chat = {
+                    **chat_item.chat,
+                    "history": {**chat_item.chat["history"], "currentId": message_id},
+                }
+                chat_item.updated_at = int(time.time())
+
+            if index and "content" in message:
+                messages = ChatMessages.get_messages_by_chat_id(id, db)
+                ChatSearch.upsert_chat(
+                    db, id, chat_item.title, {"history": {"messages": messages}}
+                )
+            db.commit()
+        return True
+
     def upsert_message_to_chat_by_id_and_message_id(
-        self, id: str, message_id: str, message: dict
-    ) -> Optional[ChatModel]:
-        chat = self.get_chat_by_id(id)
-        if chat is None:
-            return None
+        self, id: str, message_id: str, message: dict, index: bool = True
+    ) -> bool:
+        """
+        Returns whether the chat exists. Chats stored in the chat_message
+        table only write the message's row, so this is cheap enough to call
+        for every streamed delta.
 
+        Reindexing the chat for search reads all its messages, `index=False`
+        leaves that to a later write, e.g. the last one of a stream.
+        """
         # Sanitize message content for null characters before upserting
         if isinstance(message.get("content"), str):
             message["content"] = message["content"].replace("\x00", "")
 
+        if ENABLE_CHAT_MESSAGE_TABLE and self._upsert_message_row(
+            id, message_id, message, index=index
+        ):
+            return True
+
+        chat = self.get_chat_by_id(id)
+        if chat is None:
+            return False
+
         chat = chat.chat
         history = chat.get("history", {})
 
@@ -262,14 +440,91 @@ class ChatTable:
         history["currentId"] = message_id
 
         chat["history"] = history
-        return self.update_chat_by_id(id, chat)
+        return self.update_chat_by_id(id, chat) is not None
+
+    def patch_message_to_chat_by_id_and_message_id(
+        self, id: str, message_id: str, message: dict, index: bool = True
+    ) -> bool:
+        """
+        Merge `message` into an existing message without rewriting the rest of
+        the chat. Chats stored in the chat_message table only update the
+        message's row; on PostgreSQL only the history.messages.<message_id>
+        path is updated in place; otherwise this falls back to a full upsert.
+        See upsert_message_to_chat_by_id_and_message_id for `index`.
+        """
+        if isinstance(message.get("content"), str):
+            message["content"] = message["content"].replace("\x00", "")
+
+        if ENABLE_CHAT_MESSAGE_TABLE and self._upsert_message_row(
+            id, message_id, message, index=index
+        ):
+            return True
+
+        try:
+            with get_db() as db:
+                if db.bind.dialect.name != "postgresql":
+                    return self.upsert_message_to_chat_by_id_and_message_id(
+                        id, message_id, message, index=index
+                    )
+
+                result = db.execute(
+                    text(
+                        """
+                        UPDATE chat SET
+                            chat = jsonb_set(
+                                jsonb_set(
+                                    chat::jsonb,
+                                    ARRAY['history', 'messages', :message_id],
+                                    COALESCE(
+                                        chat::jsonb #> ARRAY['history', 'messages', :message_id],
+                                        '{}'::jsonb
+                                    ) || CAST(:message AS jsonb)
+                                ),
+                                '{history,currentId}',
+                                to_jsonb(CAST(:message_id AS text))
+                            )::json,
+                            updated_at = :updated_at
+                        WHERE id = :id
+                            AND chat::jsonb #> '{history,storage}' IS NULL
+                        """
+                    ),
+                    {
+                        "id": id,
+                        "message_id": message_id,
+                        "message": json.dumps(message),
+                        "updated_at": int(time.time()),
+                    },
+                )
+                if result.rowcount > 0 and index and "content" in message:
+                    ChatSearch.upsert_chat_by_id(db, id)
+                db.commit()
+                if result.rowcount > 0:
+                    return True
+        except Exception as e:
+            log.exception(f"Error patching message {message_id} in chat {id}: {e}")
+            return False
+
+        # The chat keeps its messages in the chat_message table
+        return self.upsert_message_to_chat_by_id_and_message_id(
+            id, message_id, message, index=index
+        )
 
     def add_message_status_to_chat_by_id_and_message_id(
         self, id: str, message_id: str, status: dict
-    ) -> Optional[ChatModel]:
+    ) -> bool:
+        if ENABLE_CHAT_MESSAGE_TABLE:
+            message = ChatMessages.get_message_by_chat_id_and_message_id(id, message_id)
+            if message is not None:
+                return self._upsert_message_row(
+                    id,
+                    message_id,
+                    {"statusHistory": [*message.get("statusHistory", []), status]},
+                    set_current=False,
+                )
+
         chat = self.get_chat_by_id(id)
         if chat is None:
-            return None
+            return False
 
         chat = chat.chat
         history = chat.get("history", {})
@@ -280,7 +535,7 @@ class ChatTable:
             history["messages"][message_id]["statusHistory"] = status_history
 
         chat["history"] = history
-        return self.update_chat_by_id(id, chat)
+        return self.update_chat_by_id(id, chat) is not None
 
     def insert_shared_chat_by_chat_id(self, chat_id: str) -> Optional[ChatModel]:
         with get_db() as db:
@@ -300,6 +555,9 @@ class ChatTable:
                     "updated_at": int(time.time()),
                 }
             )
+            if self._is_normalized(chat.chat):
+                ChatMessages.copy_messages(db, chat_id, shared_chat.id)
+
             shared_result = Chat(**shared_chat.model_dump())
             db.add(shared_result)
             db.commit()
@@ -312,7 +570,9 @@ class ChatTable:
                 .update({"share_id": shared_chat.id})
             )
             db.commit()
-            return shared_chat if (shared_result and result) else None
+            return (
+                self._to_chat_model(shared_chat) if (shared_result and result) else None
+            )
 
     def update_shared_chat_by_chat_id(self, chat_id: str) -> Optional[ChatModel]:
         try:
@@ -325,6 +585,9 @@ class ChatTable:
                 if shared_chat is None:
                     return self.insert_shared_chat_by_chat_id(chat_id)
 
+                if self._is_normalized(chat.chat):
+                    ChatMessages.copy_messages(db, chat_id, shared_chat.id)
+
                 shared_chat.title = chat.title
                 shared_chat.chat = chat.chat
 
@@ -332,14 +595,19 @@ class ChatTable:
                 db.commit()
                 db.refresh(shared_chat)
 
-                return ChatModel.model_validate(shared_chat)
+                return self._to_chat_model(shared_chat)
         except Exception:
             return None
 
     def delete_shared_chat_by_chat_id(self, chat_id: str) -> bool:
         try:
             with get_db() as db:
-                db.query(Chat).filter_by(user_id=f"shared-{chat_id}").delete()
+                query = db.query(Chat).filter_by(user_id=f"shared-{chat_id}")
+                chat_ids = [chat.id for chat in query.with_entities(Chat.id).all()]
+                ChatMessages.delete_messages_by_chat_ids(db, chat_ids)
+                ChatSearch.delete_chats(db, chat_ids)
+
+                query.delete()
                 db.commit()
 
                 return True
@@ -355,7 +623,7 @@ class ChatTable:
                 chat.share_id = share_id
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(chat)
         except Exception:
             return None
 
@@ -367,7 +635,7 @@ class ChatTable:
                 chat.updated_at = int(time.time())
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(chat)
         except Exception:
             return None
 
@@ -379,7 +647,7 @@ class ChatTable:
                 chat.updated_at = int(time.time())
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(chat)
         except Exception:
             return None
 
@@ -427,7 +695,7 @@ class ChatTable:
                 query = query.limit(limit)
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(all_chats)
 
     def get_chat_list_by_user_id(
         self,
@@ -466,7 +734,7 @@ class ChatTable:
                 query = query.limit(limit)
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(all_chats)
 
     def get_chat_title_id_list_by_user_id(
         self,
@@ -517,13 +785,13 @@ class ChatTable:
                 .order_by(Chat.updated_at.desc())
                 .all()
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(all_chats)
 
     def get_chat_by_id(self, id: str) -> Optional[ChatModel]:
         try:
             with get_db() as db:
                 chat = db.get(Chat, id)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(chat)
         except Exception:
             return None
 
@@ -545,7 +813,7 @@ class ChatTable:
         try:
             with get_db() as db:
                 chat = db.query(Chat).filter_by(id=id, user_id=user_id).first()
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(chat)
         except Exception:
             return None
 
@@ -556,7 +824,7 @@ class ChatTable:
                 # .limit(limit).offset(skip)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(all_chats)
 
     def get_chats_by_user_id(self, user_id: str) -> list[ChatModel]:
         with get_db() as db:
@@ -565,7 +833,7 @@ class ChatTable:
                 .filter_by(user_id=user_id)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(all_chats)
 
     def get_pinned_chats_by_user_id(self, user_id: str) -> list[ChatModel]:
         with get_db() as db:
@@ -574,7 +842,7 @@ class ChatTable:
                 .filter_by(user_id=user_id, pinned=True, archived=False)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(all_chats)
 
     def get_archived_chats_by_user_id(self, user_id: str) -> list[ChatModel]:
         with get_db() as db:
@@ -583,7 +851,7 @@ class ChatTable:
                 .filter_by(user_id=user_id, archived=True)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(all_chats)
 
     def get_chats_by_user_id_and_search_text(
         self,
@@ -594,7 +862,8 @@ class ChatTable:
         limit: int = 60,
     ) -> list[ChatModel]:
         """
-        Filters chats based on a search query using Python, allowing pagination using skip and limit.
+        Filters chats based on a search query, allowing pagination using skip and limit.
+        Uses the chat search index when available, ranking the best matches first.
         """
         search_text = search_text.replace("\u0000", "").lower().strip()
 
@@ -624,25 +893,32 @@ class ChatTable:
             if not include_archived:
                 query = query.filter(Chat.archived == False)
 
+            search_query = ChatSearch.apply_search(db, query, Chat.id, search_text)
+            use_index = search_query is not None
+            if use_index:
+                query = search_query
+
             query = query.order_by(Chat.updated_at.desc())
 
             # Check if the database dialect is either 'sqlite' or 'postgresql'
             dialect_name = db.bind.dialect.name
             if dialect_name == "sqlite":
-                # SQLite case: using JSON1 extension for JSON searching
-                sqlite_content_sql = (
-                    "EXISTS ("
-                    "    SELECT 1 "
-                    "    FROM json_each(Chat.chat, '$.messages') AS message "
-                    "    WHERE LOWER(message.value->>'content') LIKE '%' || :content_key || '%'"
-                    ")"
-                )
-                sqlite_content_clause = text(sqlite_content_sql)
-                query = query.filter(
-                    or_(
-                        Chat.title.ilike(bindparam("title_key")), sqlite_content_clause
-                    ).params(title_key=f"%{search_text}%", content_key=search_text)
-                )
+                if not use_index:
+                    # SQLite case: using JSON1 extension for JSON searching
+                    sqlite_content_sql = (
+                        "EXISTS ("
+                        "    SELECT 1 "
+                        "    FROM json_each(Chat.chat, '$.messages') AS message "
+                        "    WHERE LOWER(message.value->>'content') LIKE '%' || :content_key || '%'"
+                        ")"
+                    )
+                    sqlite_content_clause = text(sqlite_content_sql)
+                    query = query.filter(
+                        or_(
+                            Chat.title.ilike(bindparam("title_key")),
+                            sqlite_content_clause,
+                        ).params(title_key=f"%{search_text}%", content_key=search_text)
+                    )
 
                 # Check if there are any tags to filter, it should have all the tags
                 if "none" in tag_ids:
@@ -675,21 +951,22 @@ class ChatTable:
                     )
 
             elif dialect_name == "postgresql":
-                # PostgreSQL relies on proper JSON query for search
-                postgres_content_sql = (
-                    "EXISTS ("
-                    "    SELECT 1 "
-                    "    FROM json_array_elements(Chat.chat->'messages') AS message "
-                    "    WHERE LOWER(message->>'content') LIKE '%' || :content_key || '%'"
-                    ")"
-                )
-                postgres_content_clause = text(postgres_content_sql)
-                query = query.filter(
-                    or_(
-                        Chat.title.ilike(bindparam("title_key")),
-                        postgres_content_clause,
-                    ).params(title_key=f"%{search_text}%", content_key=search_text)
-                )
+                if not use_index:
+                    # PostgreSQL relies on proper JSON query for search
+                    postgres_content_sql = (
+                        "EXISTS ("
+                        "    SELECT 1 "
+                        "    FROM json_array_elements(Chat.chat->'messages') AS message "
+                        "    WHERE LOWER(message->>'content') LIKE '%' || :content_key || '%'"
+                        ")"
+                    )
+                    postgres_content_clause = text(postgres_content_sql)
+                    query = query.filter(
+                        or_(
+                            Chat.title.ilike(bindparam("title_key")),
+                            postgres_content_clause,
+                        ).params(title_key=f"%{search_text}%", content_key=search_text)
+                    )
 
                 # Check if there are any tags to filter, it should have all the tags
                 if "none" in tag_ids:
@@ -731,7 +1008,7 @@ class ChatTable:
             log.info(f"The number of chats: {len(all_chats)}")
 
             # Validate and return chats
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(all_chats)
 
     def get_chats_by_folder_id_and_user_id(
         self, folder_id: str, user_id: str
@@ -744,7 +1021,7 @@ class ChatTable:
             query = query.order_by(Chat.updated_at.desc())
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(all_chats)
 
     def get_chats_by_folder_ids_and_user_id(
         self, folder_ids: list[str], user_id: str
@@ -759,7 +1036,7 @@ class ChatTable:
             query = query.order_by(Chat.updated_at.desc())
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(all_chats)
 
     def update_chat_folder_id_by_id_and_user_id(
         self, id: str, user_id: str, folder_id: str
@@ -772,7 +1049,7 @@ class ChatTable:
                 chat.pinned = False
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(chat)
         except Exception:
             return None
 
@@ -811,7 +1088,7 @@ class ChatTable:
 
             all_chats = query.all()
             log.debug(f"all_chats: {all_chats}")
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(all_chats)
 
     def add_chat_tag_by_id_and_user_id_and_tag_name(
         self, id: str, user_id: str, tag_name: str
@@ -832,7 +1109,7 @@ class ChatTable:
 
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(chat)
         except Exception:
             return None
 
@@ -908,6 +1185,9 @@ class ChatTable:
     def delete_chat_by_id(self, id: str) -> bool:
         try:
             with get_db() as db:
+                ChatMessages.delete_messages_by_chat_id(db, id)
+                ChatSearch.delete_chats(db, [id])
+
                 db.query(Chat).filter_by(id=id).delete()
                 db.commit()
 
@@ -918,7 +1198,12 @@ class ChatTable:
     def delete_chat_by_id_and_user_id(self, id: str, user_id: str) -> bool:
         try:
             with get_db() as db:
-                db.query(Chat).filter_by(id=id, user_id=user_id).delete()
+                query = db.query(Chat).filter_by(id=id, user_id=user_id)
+                if query.with_entities(Chat.id).first():
+                    ChatMessages.delete_messages_by_chat_id(db, id)
+                    ChatSearch.delete_chats(db, [id])
+
+                query.delete()
                 db.commit()
 
                 return True and self.delete_shared_chat_by_chat_id(id)
@@ -930,7 +1215,12 @@ class ChatTable:
             with get_db() as db:
                 self.delete_shared_chats_by_user_id(user_id)
 
-                db.query(Chat).filter_by(user_id=user_id).delete()
+                query = db.query(Chat).filter_by(user_id=user_id)
+                chat_ids = [chat.id for chat in query.with_entities(Chat.id).all()]
+                ChatMessages.delete_messages_by_chat_ids(db, chat_ids)
+                ChatSearch.delete_chats(db, chat_ids)
+
+                query.delete()
                 db.commit()
 
                 return True
@@ -942,7 +1232,12 @@ class ChatTable:
     ) -> bool:
         try:
             with get_db() as db:
-                db.query(Chat).filter_by(user_id=user_id, folder_id=folder_id).delete()
+                query = db.query(Chat).filter_by(user_id=user_id, folder_id=folder_id)
+                chat_ids = [chat.id for chat in query.with_entities(Chat.id).all()]
+                ChatMessages.delete_messages_by_chat_ids(db, chat_ids)
+                ChatSearch.delete_chats(db, chat_ids)
+
+                query.delete()
                 db.commit()
 
                 return True
@@ -955,7 +1250,12 @@ class ChatTable:
                 chats_by_user = db.query(Chat).filter_by(user_id=user_id).all()
                 shared_chat_ids = [f"shared-{chat.id}" for chat in chats_by_user]
 
-                db.query(Chat).filter(Chat.user_id.in_(shared_chat_ids)).delete()
+                query = db.query(Chat).filter(Chat.user_id.in_(shared_chat_ids))
+                chat_ids = [chat.id for chat in query.with_entities(Chat.id).all()]
+                ChatMessages.delete_messages_by_chat_ids(db, chat_ids)
+                ChatSearch.delete_chats(db, chat_ids)
+
+                query.delete()
                 db.commit()
 
                 return True
@@ -964,3 +1264,82 @@ class ChatTable:
 
 
 Chats = ChatTable()
+
+
+class ChatMessageWriteBuffer:
+    """
+    Write-behind buffer for a message that is being streamed.
+
+    Updates are coalesced in memory and written to the database once
+    `interval` seconds have passed since the last write or once roughly
+    `max_bytes` characters of new content have accumulated. Call
+    flush(final=True) when the stream ends so the final state is persisted;
+    only that write reindexes the chat for search.
+
+    The buffer belongs to a single response handler and is only used from the
+    event loop thread, so it needs no locking.
+    """
+
+    def __init__(
+        self,
+        chat_id: str,
+        message_id: str,
+        interval: float = 1.0,
+        max_bytes: int = 4096,
+    ):
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.interval = interval
+        self.max_bytes = max_bytes
+
+        self.pending: dict = {}
+        self.final = False
+        # Written without reindexing the chat, see flush
+        self.unindexed: dict = {}
+        self.flushed_size = 0
+        self.last_flush = time.monotonic()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @staticmethod
+    def _get_size(message: dict) -> int:
+        return sum(len(v) for v in message.values() if isinstance(v, str))
+
+    def update(self, message: dict) -> None:
+        self.pending.update(message)
+
+        elapsed = time.monotonic() - self.last_flush
+        if (
+            elapsed >= self.interval
+            or self._get_size(self.pending) - self.flushed_size >= self.max_bytes
+        ):
+            self.flush()
+        elif self._timer is None:
+            # Make sure a stalled stream still gets written within the interval
+            self._timer = asyncio.get_running_loop().call_later(
+                self.interval - elapsed, self.flush
+            )
+
+    def flush(self, final: bool = False) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if final:
+            self.final = True
+            if not self.pending:
+                # Written already, but not indexed yet
+                self.pending, self.unindexed = self.unindexed, {}
+        if not self.pending:
+            return
+
+        message, self.pending = self.pending, {}
+        self.last_flush = time.monotonic()
+
+        if Chats.patch_message_to_chat_by_id_and_message_id(
+            self.chat_id, self.message_id, {**message}, index=self.final
+        ):
+            self.flushed_size = self._get_size(message)
+            self.unindexed = {} if self.final else {**self.unindexed, **message}
+        else:
+            # Keep the update around so the next flush retries it
+            self.pending = {**message, **self.pending}
@@ -11,7 +11,14 @@ from open_webui.models.files import FileMetadataResponse
 
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, String, Text, JSON, func
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Index,
+    PrimaryKeyConstraint,
+    Text,
+    JSON,
+)
 
 
 log = logging.getLogger(__name__)
@@ -41,6 +48,19 @@ class Group(Base):
     updated_at = Column(BigInteger)
 
 
+class GroupMember(Base):
+    __tablename__ = "group_member"
+
+    group_id = Column(Text, nullable=False)
+    user_id = Column(Text, nullable=False)
+    created_at = Column(BigInteger)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("group_id", "user_id", name="pk_group_id_user_id"),
+        Index("group_member_user_id_idx", "user_id"),
+    )
+
+
 class GroupModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     id: str
@@ -87,7 +107,37 @@ class GroupUpdateForm(GroupForm):
     user_ids: Optional[list[str]] = None
 
 
+# Bumped on every membership or group change so derived caches (see
+# utils/access_control.py) can tell their entries are stale
+_groups_version = 0
+
+
+def get_groups_version() -> int:
+    return _groups_version
+
+
+def bump_groups_version():
+    global _groups_version
+    _groups_version += 1
+
+
 class GroupTable:
+    def _set_group_members(self, db, group_id: str, user_ids: list[str]) -> None:
+        """
+        Replaces the group_member rows of a group within the caller's transaction.
+        Group.user_ids is kept as is for API responses, group_member is used for
+        membership lookups.
+        """
+        db.query(GroupMember).filter_by(group_id=group_id).delete()
+        now = int(time.time())
+        db.add_all(
+            [
+                GroupMember(group_id=group_id, user_id=user_id, created_at=now)
+                for user_id in dict.fromkeys(user_ids or [])
+            ]
+        )
+        bump_groups_version()
+
     def insert_new_group(
         self, user_id: str, form_data: GroupForm
     ) -> Optional[GroupModel]:
@@ -105,6 +155,7 @@ class GroupTable:
             try:
                 result = Group(**group.model_dump())
                 db.add(result)
+                self._set_group_members(db, group.id, group.user_ids)
                 db.commit()
                 db.refresh(result)
                 if result:
@@ -127,12 +178,8 @@ class GroupTable:
             return [
                 GroupModel.model_validate(group)
                 for group in db.query(Group)
-                .filter(
-                    func.json_array_length(Group.user_ids) > 0
-                )  # Ensure array exists
-                .filter(
-                    Group.user_ids.cast(String).like(f'%"{user_id}"%')
-                )  # String-based check
+                .join(GroupMember, GroupMember.group_id == Group.id)
+                .filter(GroupMember.user_id == user_id)
                 .order_by(Group.updated_at.desc())
                 .all()
             ]
@@ -163,7 +210,10 @@ class GroupTable:
                         "updated_at": int(time.time()),
                     }
                 )
+                if form_data.user_ids is not None:
+                    self._set_group_members(db, id, form_data.user_ids)
                 db.commit()
+                bump_groups_version()
                 return self.get_group_by_id(id=id)
         except Exception as e:
             log.exception(e)
@@ -173,7 +223,9 @@ class GroupTable:
         try:
             with get_db() as db:
                 db.query(Group).filter_by(id=id).delete()
+                db.query(GroupMember).filter_by(group_id=id).delete()
                 db.commit()
+                bump_groups_version()
                 return True
         except Exception:
             return False
@@ -182,7 +234,9 @@ class GroupTable:
         with get_db() as db:
             try:
                 db.query(Group).delete()
+                db.query(GroupMember).delete()
                 db.commit()
+                bump_groups_version()
 
                 return True
             except Exception:
@@ -201,7 +255,10 @@ class GroupTable:
                             "updated_at": int(time.time()),
                         }
                     )
-                    db.commit()
+
+                db.query(GroupMember).filter_by(user_id=user_id).delete()
+                db.commit()
+                bump_groups_version()
 
                 return True
             except Exception:
@@ -257,6 +314,9 @@ class GroupTable:
                                 "updated_at": int(time.time()),
                             }
                         )
+                        db.query(GroupMember).filter_by(
+                            group_id=group.id, user_id=user_id
+                        ).delete()
 
                 # Add user to new groups
                 for group in groups:
@@ -268,8 +328,16 @@ class GroupTable:
                                 "updated_at": int(time.time()),
                             }
                         )
+                        db.merge(
+                            GroupMember(
+                                group_id=group.id,
+                                user_id=user_id,
+                                created_at=int(time.time()),
+                            )
+                        )
 
                 db.commit()
+                bump_groups_version()
                 return True
             except Exception as e:
                 log.exception(e)
@@ -0,0 +1,530 @@
+import logging
+import time
+import uuid
+from typing import Optional
+
+from open_webui.internal.db import Base, get_db
+from open_webui.env import SRC_LOG_LEVELS
+
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import BigInteger, Column, Index, Integer, String, Text, JSON, func
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+####################
+# Job DB Schema
+####################
+
+JOB_STATUS_PENDING = "pending"
+JOB_STATUS_RUNNING = "running"
+JOB_STATUS_COMPLETED = "completed"
+JOB_STATUS_FAILED = "failed"
+JOB_STATUS_CANCELLED = "cancelled"
+
+JOB_FINAL_STATUSES = {JOB_STATUS_COMPLETED, JOB_STATUS_FAILED, JOB_STATUS_CANCELLED}
+
+
+class Job(Base):
+    __tablename__ = "job"
+
+    id = Column(String, primary_key=True)
+    user_id = Column(String)
+    type = Column(Text)
+
+    # The object the job works on, e.g. a file id
+    item_id = Column(Text, nullable=True)
+
+    status = Column(Text)
+    payload = Column(JSON, nullable=True)
+    progress = Column(JSON, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=1)
+
+    worker_id = Column(Text, nullable=True)
+    available_at = Column(BigInteger)  # time_ns
+    lease_expires_at = Column(BigInteger, nullable=True)  # time_ns
+
+    created_at = Column(BigInteger)  # time_ns
+    updated_at = Column(BigInteger)  # time_ns
+    started_at = Column(BigInteger, nullable=True)  # time_ns
+    finished_at = Column(BigInteger, nullable=True)  # time_ns
+
+    __table_args__ = (
+        Index("job_status_available_at_idx", "status", "available_at"),
+        Index("job_item_id_idx", "item_id"),
+        Index("job_user_id_idx", "user_id"),
+    )
+
+
+class JobModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    user_id: str
+    type: str
+
+    item_id: Optional[str] = None
+
+    status: str
+    payload: Optional[dict] = None
+    progress: Optional[dict] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+
+    attempts: int = 0
+    max_attempts: int = 1
+
+    worker_id: Optional[str] = None
+    available_at: int
+    lease_expires_at: Optional[int] = None
+
+    created_at: int  # timestamp in epoch
+    updated_at: int  # timestamp in epoch
+    started_at: Optional[int] = None
+    finished_at: Optional[int] = None
+
+
+####################
+# Forms
+####################
+
+
+class JobResponse(BaseModel):
+    id: str
+    user_id: str
+    type: str
+    item_id: Optional[str] = None
+
+    status: str
+    progress: Optional[dict] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+
+    attempts: int
+    max_attempts: int
+
+    created_at: int
+    updated_at: int
+    started_at: Optional[int] = None
+    finished_at: Optional[int] = None
+
+
+class JobTable:
+    def insert_new_job(
+        self,
+        user_id: str,
+        type: str,
+        item_id: Optional[str] = None,
+        payload: Optional[dict] = None,
+        max_attempts: int = 1,
+    ) -> Optional[JobModel]:
+        with get_db() as db:
+            now = int(time.time_ns())
+            job = JobModel(
+                **{
+                    "id": str(uuid.uuid4()),
+                    "user_id": user_id,
+                    "type": type,
+                    "item_id": item_id,
+                    "status": JOB_STATUS_PENDING,
+                    "payload": payload,
+                    "max_attempts": max_attempts,
+                    "available_at": now,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            )
+
+            try:
+                result = Job(**job.model_dump())
+                db.add(result)
+                db.commit()
+                db.refresh(result)
+                return JobModel.model_validate(result) if result else None
+            except Exception as e:
+                log.exception(f"Error inserting a new job: {e}")
+                return None
+
+    def get_job_by_id(self, id: str) -> Optional[JobModel]:
+        with get_db() as db:
+            job = db.get(Job, id)
+            return JobModel.model_validate(job) if job else None
+
+    def get_jobs(
+        self, user_id: Optional[str] = None, status: Optional[str] = None, limit=100
+    ) -> list[JobModel]:
+        with get_db() as db:
+            query = db.query(Job)
+            if user_id:
+                query = query.filter_by(user_id=user_id)
+            if status:
+                query = query.filter_by(status=status)
+
+            return [
+                JobModel.model_validate(job)
+                for job in query.order_by(Job.created_at.desc()).limit(limit).all()
+            ]
+
+    def get_latest_job_by_item_id(
+        self, item_id: str, type: Optional[str] = None
+    ) -> Optional[JobModel]:
+        with get_db() as db:
+            query = db.query(Job).filter_by(item_id=item_id)
+            if type:
+                query = query.filter_by(type=type)
+
+            job = query.order_by(Job.created_at.desc()).first()
+            return JobModel.model_validate(job) if job else None
+
+    def get_latest_job_by_type(self, type: str) -> Optional[JobModel]:
+        with get_db() as db:
+            job = (
+                db.query(Job)
+                .filter_by(type=type)
+                .order_by(Job.created_at.desc())
+                .first()
+            )
+            return JobModel.model_validate(job) if job else None
+
+    def claim_next_job(
+        self,
+        worker_id: str,
+        types: list[str],
+        lease_timeout: int,
+        max_running_per_user: int = 0,
+    ) -> Optional[JobModel]:
+        """
+        Atomically takes the next runnable job, or returns None if there is
+        none. Users are served round-robin: the oldest job of the user with
+        the fewest running jobs, who was served least recently, goes first,
+        so one user's large batch doesn't hold up everyone else's uploads.
+        """
+        if not types:
+            return None
+
+        now = int(time.time_ns())
+        with get_db() as db:
+            running = dict(
+                db.query(Job.user_id, func.count(Job.id))
+                .filter(Job.status == JOB_STATUS_RUNNING)
+                .group_by(Job.user_id)
+                .all()
+            )
+
+            waiting = (
+                db.query(Job.user_id, func.min(Job.created_at))
+                .filter(
+                    Job.status == JOB_STATUS_PENDING,
+                    Job.type.in_(types),
+                    Job.available_at <= now,
+                )
+                .group_by(Job.user_id)
+                .all()
+            )
+
+            last_started = dict(
+                db.query(Job.user_id, func.max(Job.started_at))
+                .filter(Job.user_id.in_([user_id for user_id, _ in waiting]))
+                .group_by(Job.user_id)
+                .all()
+            )
+
+            # Fewest running jobs first, then the user served least recently
+            for user_id, _ in sorted(
+                waiting,
+                key=lambda row: (
+                    running.get(row[0], 0),
+                    last_started.get(row[0]) or 0,
+                    row[1],
+                ),
+            ):
+                if max_running_per_user and (
+                    running.get(user_id, 0) >= max_running_per_user
+                ):
+                    continue
+
+                job_id = (
+                    db.query(Job.id)
+                    .filter(
+                        Job.user_id == user_id,
+                        Job.status == JOB_STATUS_PENDING,
+                        Job.type.in_(types),
+                        Job.available_at <= now,
+                    )
+                    .order_by(Job.created_at, Job.id)
+                    .limit(1)
+                    .scalar()
+                )
+                if job_id is None:
+                    continue
+
+                # Another worker may have taken the job since it was read
+                claimed = (
+                    db.query(Job)
+                    .filter(Job.id == job_id, Job.status == JOB_STATUS_PENDING)
+                    .update(
+                        {
+                            "status": JOB_STATUS_RUNNING,
+                            "worker_id": worker_id,
+                            "attempts": Job.attempts + 1,
+                            "lease_expires_at": now + lease_timeout * 1_000_000_000,
+                            "started_at": now,
+                            "updated_at": now,
+                        },
+                        synchronize_session=False,
+                    )
+                )
+                db.commit()
+
+                if claimed:
+                    return JobModel.model_validate(db.get(Job, job_id))
+
+            return None
+
+    def renew_leases(
+        self, worker_id: str, ids: list[str], lease_timeout: int
+    ) -> list[str]:
+        """
+        Extends the leases of the given running jobs and returns the ids of
+        those no longer held by `worker_id`, e.g. because they were cancelled.
+        """
+        if not ids:
+            return []
+
+        now = int(time.time_ns())
+        with get_db() as db:
+            db.query(Job).filter(
+                Job.id.in_(ids),
+                Job.status == JOB_STATUS_RUNNING,
+                Job.worker_id == worker_id,
+            ).update(
+                {"lease_expires_at": now + lease_timeout * 1_000_000_000},
+                synchronize_session=False,
+            )
+            db.commit()
+
+            held = {
+                id
+                for (id,) in db.query(Job.id).filter(
+                    Job.id.in_(ids),
+                    Job.status == JOB_STATUS_RUNNING,
+                    Job.worker_id == worker_id,
+                )
+            }
+            return [id for id in ids if id not in held]
+
+    def requeue_expired_jobs(self) -> list[JobModel]:
+        """
+        Returns running jobs whose lease expired (their instance died) to the
+        queue, or fails them if they are out of attempts. Returns the jobs
+        that were requeued or failed; failed ones have no worker left to
+        finish them, that is up to the caller.
+        """
+        now = int(time.time_ns())
+        with get_db() as db:
+            expired = (
+                db.query(Job.id, Job.attempts, Job.max_attempts)
+                .filter(Job.status == JOB_STATUS_RUNNING, Job.lease_expires_at < now)
+                .all()
+            )
+
+            ids = []
+            for id, attempts, max_attempts in expired:
+                values = {
+                    "worker_id": None,
+                    "lease_expires_at": None,
+                    "updated_at": now,
+                }
+                if attempts >= max_attempts:
+                    values.update(
+                        {
+                            "status": JOB_STATUS_FAILED,
+                            "error": "Job was interrupted",
+                            "finished_at": now,
+                        }
+                    )
+                else:
+                    values.update({"status": JOB_STATUS_PENDING, "available_at": now})
+
+                # Another instance may be requeueing the same jobs
+                updated = (
+                    db.query(Job)
+                    .filter(
+                        Job.id == id,
+                        Job.status == JOB_STATUS_RUNNING,
+                        Job.lease_expires_at < now,
+                    )
+                    .update(values, synchronize_session=False)
+                )
+                if updated:
+                    ids.append(id)
+            db.commit()
+
+            return [
+                JobModel.model_validate(job)
+                for job in db.query(Job).filter(Job.id.in_(ids)).all()
+            ]
+
+    def release_jobs(self, worker_id: str, ids: list[str]) -> None:
+        """
+        Puts running jobs back in the queue without counting the attempt, used
+        when an instance shuts down.
+        """
+        if not ids:
+            return
+
+        now = int(time.time_ns())
+        with get_db() as db:
+            db.query(Job).filter(
+                Job.id.in_(ids),
+                Job.status == JOB_STATUS_RUNNING,
+                Job.worker_id == worker_id,
+            ).update(
+                {
+                    "status": JOB_STATUS_PENDING,
+                    "worker_id": None,
+                    "lease_expires_at": None,
+                    "attempts": Job.attempts - 1,
+                    "available_at": now,
+                    "updated_at": now,
+                },
+                synchronize_session=False,
+            )
+            db.commit()
+
+    def update_job_progress(
+        self, id: str, worker_id: str, progress: dict
+    ) -> Optional[JobModel]:
+        """
+        Records the progress of a running job. Returns None if the job is no
+        longer held by `worker_id`.
+        """
+        with get_db() as db:
+            updated = (
+                db.query(Job)
+                .filter(
+                    Job.id == id,
+                    Job.status == JOB_STATUS_RUNNING,
+                    Job.worker_id == worker_id,
+                )
+                .update(
+                    {"progress": progress, "updated_at": int(time.time_ns())},
+                    synchronize_session=False,
+                )
+            )
+            db.commit()
+            return JobModel.model_validate(db.get(Job, id)) if updated else None
+
+    def finish_job(
+        self,
+        id: str,
+        worker_id: str,
+        status: str,
+        result: Optional[dict] = None,
+        error: Optional[str] = None,
+        retry_at: Optional[int] = None,
+    ) -> Optional[JobModel]:
+        """
+        Ends the current attempt of a running job. With `retry_at` the job is
+        queued again instead. Jobs cancelled in the meantime are left as is.
+        """
+        now = int(time.time_ns())
+        values = {
+            "worker_id": None,
+            "lease_expires_at": None,
+            "error": error,
+            "updated_at": now,
+        }
+        if retry_at is not None:
+            values.update({"status": JOB_STATUS_PENDING, "available_at": retry_at})
+        else:
+            values.update({"status": status, "result": result, "finished_at": now})
+
+        with get_db() as db:
+            updated = (
+                db.query(Job)
+                .filter(
+                    Job.id == id,
+                    Job.status == JOB_STATUS_RUNNING,
+                    Job.worker_id == worker_id,
+                )
+                .update(values, synchronize_session=False)
+            )
+            db.commit()
+            return JobModel.model_validate(db.get(Job, id)) if updated else None
+
+    def cancel_job_by_id(self, id: str) -> tuple[Optional[JobModel], Optional[str]]:
+        """
+        Cancels a pending or running job. Running jobs stop at their next
+        checkpoint. Returns the job and the status it was cancelled from,
+        None if it had already finished. Running jobs whose lease expired
+        count as pending, as no worker is left to finish them.
+        """
+        now = int(time.time_ns())
+        cancelled_from = None
+        with get_db() as db:
+            # One status at a time, so a job claimed meanwhile is reported
+            # as running
+            for status, condition in (
+                (JOB_STATUS_PENDING, Job.status == JOB_STATUS_PENDING),
+                (
+                    JOB_STATUS_PENDING,
+                    (Job.status == JOB_STATUS_RUNNING) & (Job.lease_expires_at < now),
+                ),
+                (JOB_STATUS_RUNNING, Job.status == JOB_STATUS_RUNNING),
+            ):
+                updated = (
+                    db.query(Job)
+                    .filter(Job.id == id, condition)
+                    .update(
+                        {
+                            "status": JOB_STATUS_CANCELLED,
+                            "finished_at": now,
+                            "updated_at": now,
+                        },
+                        synchronize_session=False,
+                    )
+                )
+                if updated:
+                    cancelled_from = status
+                    break
+            db.commit()
+
+            job = db.get(Job, id)
+            return (JobModel.model_validate(job) if job else None), cancelled_from
+
+    def cancel_jobs_by_item_id(self, item_id: str) -> None:
+        now = int(time.time_ns())
+        with get_db() as db:
+            db.query(Job).filter(
+                Job.item_id == item_id,
+                Job.status.in_([JOB_STATUS_PENDING, JOB_STATUS_RUNNING]),
+            ).update(
+                {
+                    "status": JOB_STATUS_CANCELLED,
+                    "finished_at": now,
+                    "updated_at": now,
+                },
+                synchronize_session=False,
+            )
+            db.commit()
+
+    def delete_finished_jobs(self, older_than: int) -> int:
+        with get_db() as db:
+            deleted = (
+                db.query(Job)
+                .filter(
+                    Job.status.in_(list(JOB_FINAL_STATUSES)),
+                    Job.updated_at < older_than,
+                )
+                .delete(synchronize_session=False)
+            )
+            db.commit()
+            return deleted
+
+
+Jobs = JobTable()
@@ -0,0 +1,404 @@
+import hashlib
+import logging
+import math
+import os
+import pickle
+import threading
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from open_webui.config import RAG_BM25_INDEX_DIR, RAG_BM25_INDEX_MAX_LOADED
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.retrieval.vector.main import GetResult
+
+try:
+    import fcntl
+except ImportError:
+    # Windows, single worker setups don't need the file lock
+    fcntl = None
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+def default_preprocessing_func(text: str) -> List[str]:
+    # Whitespace tokenization, as in langchain's BM25Retriever
+    return text.split()
+
+
+class BM25CollectionIndex:
+    """
+    Okapi BM25 inverted index over the chunks of a single collection.
+
+    Unlike rank_bm25.BM25Okapi the statistics are kept as raw term/document
+    frequencies, so chunks can be added and removed without re-tokenizing
+    the rest of the collection. Terms are weighted with Lucene's idf, which
+    stays positive for terms in most chunks, so scores differ from
+    langchain's BM25Retriever (rank_bm25).
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+
+        self.documents: Dict[str, str] = {}
+        self.metadatas: Dict[str, Any] = {}
+        self.term_freqs: Dict[str, Dict[str, int]] = {}
+        self.doc_lengths: Dict[str, int] = {}
+        self.postings: Dict[str, set] = defaultdict(set)
+        self.total_length = 0
+
+        self._lock = threading.RLock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def add(self, ids: List[str], texts: List[str], metadatas: List[Any]) -> None:
+        with self._lock:
+            self._add(ids, texts, metadatas)
+
+    def _add(self, ids: List[str], texts: List[str], metadatas: List[Any]) -> None:
+        for id, text, metadata in zip(ids, texts, metadatas):
+            if id in self.documents:
+                self._remove_one(id)
+
+            tokens = default_preprocessing_func(text)
+            freqs: Dict[str, int] = defaultdict(int)
+            for token in tokens:
+                freqs[token] += 1
+
+            self.documents[id] = text
+            self.metadatas[id] = metadata
+            self.term_freqs[id] = dict(freqs)
+            self.doc_lengths[id] = len(tokens)
+            self.total_length += len(tokens)
+            for token in freqs:
+                self.postings[token].add(id)
+
+    def remove(
+        self, ids: Optional[List[str]] = None, filter: Optional[Dict] = None
+    ) -> int:
+        if ids is None:
+            ids = []
+
+        if filter:
+            ids = list(ids) + [
+                id
+                for id, metadata in list(self.metadatas.items())
+                if isinstance(metadata, dict)
+                and all(metadata.get(key) == value for key, value in filter.items())
+            ]
+
+        removed = 0
+        with self._lock:
+            for id in set(ids):
+                if id in self.documents:
+                    self._remove_one(id)
+                    removed += 1
+        return removed
+
+    def _remove_one(self, id: str) -> None:
+        for token in self.term_freqs.pop(id):
+            posting = self.postings.get(token)
+            if posting is not None:
+                posting.discard(id)
+                if not posting:
+                    del self.postings[token]
+
+        self.total_length -= self.doc_lengths.pop(id)
+        del self.documents[id]
+        del self.metadatas[id]
+
+    def search(self, query: str, k: int) -> List[Document]:
+        with self._lock:
+            return self._search(query, k)
+
+    def _search(self, query: str, k: int) -> List[Document]:
+        n = len(self.documents)
+        if n == 0 or k <= 0:
+            return []
+
+        avgdl = self.total_length / n if self.total_length else 1.0
+        scores: Dict[str, float] = defaultdict(float)
+
+        for token in set(default_preprocessing_func(query)):
+            posting = self.postings.get(token)
+            if not posting:
+                continue
+
+            df = len(posting)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for id in posting:
+                tf = self.term_freqs[id][token]
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[id] / avgdl)
+                scores[id] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        top = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [
+            Document(
+                page_content=self.documents[id],
+                # Copy so downstream scoring can't mutate the indexed metadata
+                metadata=dict(self.metadatas[id] or {}),
+            )
+            for id, _ in top
+        ]
+
+
+class BM25IndexManager:
+    """
+    Keeps one BM25CollectionIndex per vector DB collection.
+
+    Indexes are built lazily from the vector DB on first use, kept up to date
+    incrementally by the ingestion and knowledge routes, and persisted to
+    RAG_BM25_INDEX_DIR so they survive restarts. Only the most recently used
+    indexes are held in memory.
+
+    On disk an index is a snapshot plus a journal of the changes made since,
+    so a write only appends the changed chunks. The journal is folded into a
+    new snapshot once it outgrows the snapshot. Every access checks the
+    files, so changes made by other workers are replayed from the journal
+    (or the index reloaded after a new snapshot) before the index is used.
+    """
+
+    def __init__(self, index_dir: str, max_loaded: int = 32):
+        self.index_dir = index_dir
+        self.max_loaded = max_loaded
+        self._indexes: "OrderedDict[str, BM25CollectionIndex]" = OrderedDict()
+        # Snapshot identity and journal offset each loaded index reflects
+        self._positions: Dict[str, tuple] = {}
+        # Guards the two maps above; the collections themselves have their own
+        # locks so building one index doesn't hold up queries on the others
+        self._lock = threading.RLock()
+        self._collection_locks: Dict[str, threading.RLock] = {}
+
+        os.makedirs(self.index_dir, exist_ok=True)
+
+    def _path(self, collection_name: str) -> str:
+        name = hashlib.sha256(collection_name.encode()).hexdigest()
+        return os.path.join(self.index_dir, f"{name}.pkl")
+
+    @contextmanager
+    def _collection_lock(self, collection_name: str):
+        # Serializes access to one collection between threads, then between
+        # worker processes through the lock file
+        with self._lock:
+            lock = self._collection_locks.setdefault(collection_name, threading.RLock())
+        with lock, open(f"{self._path(collection_name)}.lock", "a") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _snapshot_id(self, path: str) -> Optional[tuple]:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _journal_size(self, path: str) -> int:
+        try:
+            return os.path.getsize(f"{path}.journal")
+        except FileNotFoundError:
+            return 0
+
+    def _write_snapshot(self, collection_name: str, index: BM25CollectionIndex) -> None:
+        path = self._path(collection_name)
+        tmp_path = f"{path}.tmp"
+        try:
+            with index._lock, open(tmp_path, "wb") as f:
+                pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            with open(f"{path}.journal", "wb"):
+                pass
+            with self._lock:
+                self._positions[collection_name] = (self._snapshot_id(path), 0)
+        except Exception as e:
+            log.exception(f"Error persisting BM25 index for {collection_name}: {e}")
+
+    def _append(self, collection_name: str, index: BM25CollectionIndex, change):
+        path = self._path(collection_name)
+        try:
+            with open(f"{path}.journal", "ab") as f:
+                pickle.dump(change, f, protocol=pickle.HIGHEST_PROTOCOL)
+                offset = f.tell()
+        except Exception as e:
+            log.exception(f"Error persisting BM25 index for {collection_name}: {e}")
+            return
+
+        snapshot_id = self._snapshot_id(path)
+        with self._lock:
+            self._positions[collection_name] = (snapshot_id, offset)
+        if snapshot_id is None or offset > snapshot_id[2]:
+            self._write_snapshot(collection_name, index)
+
+    def _replay(
+        self, collection_name: str, index: BM25CollectionIndex, offset: int
+    ) -> int:
+        with open(f"{self._path(collection_name)}.journal", "rb") as f:
+            f.seek(offset)
+            while True:
+                try:
+                    op, args = pickle.load(f)
+                except EOFError:
+                    break
+                except Exception:
+                    # A change cut off by a crash, the ones before it apply
+                    log.warning(f"Ignoring truncated BM25 journal of {collection_name}")
+                    break
+
+                if op == "add":
+                    index.add(*args)
+                else:
+                    index.remove(*args)
+                offset = f.tell()
+        return offset
+
+    def _remember(
+        self, collection_name: str, index: BM25CollectionIndex, position: tuple
+    ) -> None:
+        with self._lock:
+            self._indexes[collection_name] = index
+            self._indexes.move_to_end(collection_name)
+            self._positions[collection_name] = position
+            while len(self._indexes) > self.max_loaded:
+                evicted, _ = self._indexes.popitem(last=False)
+                self._positions.pop(evicted, None)
+
+    def _forget(self, collection_name: str) -> None:
+        with self._lock:
+            self._indexes.pop(collection_name, None)
+            self._positions.pop(collection_name, None)
+
+    def _load(self, collection_name: str) -> Optional[BM25CollectionIndex]:
+        # Called with the collection lock held
+        path = self._path(collection_name)
+        snapshot_id = self._snapshot_id(path)
+        if snapshot_id is None:
+            self._forget(collection_name)
+            return None
+
+        with self._lock:
+            index = self._indexes.get(collection_name)
+            position = self._positions.get(collection_name)
+        if index is not None and position and position[0] == snapshot_id:
+            offset = position[1]
+            if self._journal_size(path) > offset:
+                offset = self._replay(collection_name, index, offset)
+            self._remember(collection_name, index, (snapshot_id, offset))
+            return index
+
+        # Not loaded yet, or another worker wrote a new snapshot
+        try:
+            with open(path, "rb") as f:
+                index = pickle.load(f)
+            offset = 0
+            if self._journal_size(path):
+                offset = self._replay(collection_name, index, 0)
+        except Exception as e:
+            log.warning(f"Discarding unreadable BM25 index {path}: {e}")
+            self._forget(collection_name)
+            os.remove(path)
+            return None
+
+        self._remember(collection_name, index, (snapshot_id, offset))
+        return index
+
+    def get_or_build(
+        self,
+        collection_name: str,
+        loader: Callable[[], Optional[GetResult]],
+    ) -> Optional[BM25CollectionIndex]:
+        with self._collection_lock(collection_name):
+            index = self._load(collection_name)
+            if index is not None:
+                return index
+
+            log.info(f"Building BM25 index for collection {collection_name}")
+            result = loader()
+            if result is None or not result.ids:
+                return None
+
+            index = BM25CollectionIndex()
+            index.add(result.ids[0], result.documents[0], result.metadatas[0])
+            self._remember(collection_name, index, (None, 0))
+            self._write_snapshot(collection_name, index)
+            return index
+
+    def add(
+        self,
+        collection_name: str,
+        ids: List[str],
+        texts: List[str],
+        metadatas: List[Any],
+    ) -> None:
+        # Collections without an index are built from the vector DB on first
+        # query, which will already include these chunks.
+        with self._collection_lock(collection_name):
+            index = self._load(collection_name)
+            if index is None:
+                return
+            index.add(ids, texts, metadatas)
+            self._append(collection_name, index, ("add", (ids, texts, metadatas)))
+
+    def remove(
+        self,
+        collection_name: str,
+        ids: Optional[List[str]] = None,
+        filter: Optional[Dict] = None,
+    ) -> None:
+        with self._collection_lock(collection_name):
+            index = self._load(collection_name)
+            if index is None:
+                return
+            if index.remove(ids=ids, filter=filter):
+                self._append(collection_name, index, ("remove", (ids, filter)))
+
+    def delete(self, collection_name: str) -> None:
+        with self._collection_lock(collection_name):
+            self._forget(collection_name)
+            path = self._path(collection_name)
+            for file_path in (path, f"{path}.journal"):
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._indexes.clear()
+            self._positions.clear()
+            for filename in os.listdir(self.index_dir):
+                if filename.endswith((".pkl", ".pkl.journal")):
+                    os.remove(os.path.join(self.index_dir, filename))
+
+
+class BM25IndexRetriever(BaseRetriever):
+    index: Any
+    k: int = 4
+
+    def _get_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: CallbackManagerForRetrieverRun,
+    ) -> list[Document]:
+        return self.index.search(query, self.k)
+
+
+BM25_INDEX = BM25IndexManager(RAG_BM25_INDEX_DIR, RAG_BM25_INDEX_MAX_LOADED)
@@ -0,0 +1,226 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Callable, Dict, List, Optional
+
+from opentelemetry import metrics
+
+from open_webui.config import (
+    ENABLE_RAG_EMBEDDING_CACHE,
+    RAG_EMBEDDING_CACHE_PATH,
+    RAG_EMBEDDING_CACHE_MAX_ENTRIES,
+)
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+# SQLite limits the number of bound parameters per statement
+SQLITE_MAX_VARIABLES = 500
+
+meter = metrics.get_meter(__name__)
+hit_counter = meter.create_counter(
+    name="rag.embedding_cache.hits",
+    description="Embeddings served from the embedding cache",
+    unit="1",
+)
+miss_counter = meter.create_counter(
+    name="rag.embedding_cache.misses",
+    description="Embeddings that had to be computed by the embedding engine",
+    unit="1",
+)
+
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding cache backed by a local SQLite database.
+
+    Entries are keyed by (engine, model, prefix, text) and evicted in least
+    recently used order once the cache grows beyond max_entries.
+    """
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embedding_cache ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS embedding_cache_accessed_at "
+            "ON embedding_cache (accessed_at)"
+        )
+        self._size = self._conn.execute(
+            "SELECT COUNT(*) FROM embedding_cache"
+        ).fetchone()[0]
+
+    @staticmethod
+    def make_key(engine: str, model: str, prefix: Optional[str], text: str) -> str:
+        text_hash = hashlib.sha256(text.encode()).hexdigest()
+        return hashlib.sha256(
+            "\x00".join([engine or "", model or "", prefix or "", text_hash]).encode()
+        ).hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+
+        with self._lock:
+            for i in range(0, len(unique_keys), SQLITE_MAX_VARIABLES):
+                batch = unique_keys[i : i + SQLITE_MAX_VARIABLES]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embedding_cache WHERE key IN ({placeholders})",
+                    batch,
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embedding_cache SET accessed_at = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+
+            hits = sum(1 for key in keys if key in found)
+            self.hits += hits
+            self.misses += len(keys) - hits
+
+        hit_counter.add(hits)
+        miss_counter.add(len(keys) - hits)
+        return found
+
+    def set_many(self, items: Dict[str, List[float]]) -> None:
+        if not items:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embedding_cache (key, vector, accessed_at) "
+                    "VALUES (?, ?, ?)",
+                    [
+                        (key, array("f", vector).tobytes(), now)
+                        for key, vector in items.items()
+                    ],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._size += len(items)
+
+            if self._size > self.max_entries:
+                self._evict()
+
+    def _evict(self) -> None:
+        # Re-count since INSERT OR REPLACE may have overwritten existing keys,
+        # then drop an extra 10% so eviction doesn't run on every insert.
+        self._size = self._conn.execute(
+            "SELECT COUNT(*) FROM embedding_cache"
+        ).fetchone()[0]
+        overflow = self._size - self.max_entries
+        if overflow <= 0:
+            return
+
+        overflow += self.max_entries // 10
+        self._conn.execute(
+            "DELETE FROM embedding_cache WHERE key IN "
+            "(SELECT key FROM embedding_cache ORDER BY accessed_at LIMIT ?)",
+            (overflow,),
+        )
+        self._size = max(self._size - overflow, 0)
+        log.debug(f"Evicted {overflow} entries from the embedding cache")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM embedding_cache")
+            self._size = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits, misses, size = self.hits, self.misses, self._size
+        total = hits + misses
+        return {
+            "entries": size,
+            "max_entries": self.max_entries,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / total if total else 0.0,
+        }
+
+
+def get_cached_embedding_function(
+    embedding_function: Callable,
+    engine: str,
+    model: str,
+    cache: "EmbeddingCache",
+) -> Callable:
+    def cached_embedding_function(query, prefix=None, user=None):
+        texts = query if isinstance(query, list) else [query]
+        keys = [cache.make_key(engine, model, prefix, text) for text in texts]
+
+        try:
+            embeddings = cache.get_many(keys)
+        except Exception as e:
+            log.exception(f"Error reading from the embedding cache: {e}")
+            return embedding_function(query, prefix=prefix, user=user)
+
+        # Identical chunks within one call are only embedded once
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in embeddings and key not in missing:
+                missing[key] = text
+
+        if missing:
+            new_embeddings = embedding_function(
+                list(missing.values()), prefix=prefix, user=user
+            )
+            if new_embeddings is None or len(new_embeddings) != len(missing):
+                raise ValueError("Embedding engine returned an unexpected result")
+
+            new_items = dict(zip(missing.keys(), new_embeddings))
+            embeddings.update(new_items)
+            try:
+                cache.set_many(new_items)
+            except Exception as e:
+                log.exception(f"Error writing to the embedding cache: {e}")
+
+        result = [embeddings[key] for key in keys]
+        return result if isinstance(query, list) else result[0]
+
+    return cached_embedding_function
+
+
+EMBEDDING_CACHE = (
+    EmbeddingCache(RAG_EMBEDDING_CACHE_PATH, RAG_EMBEDDING_CACHE_MAX_ENTRIES)
+    if ENABLE_RAG_EMBEDDING_CACHE
+    else None
+)
+
+if EMBEDDING_CACHE is not None:
+    meter.create_observable_gauge(
+        name="rag.embedding_cache.hit_rate",
+        callbacks=[
+            lambda options: [metrics.Observation(EMBEDDING_CACHE.stats()["hit_rate"])]
+        ],
+        description="Fraction of embedding lookups served from the cache",
+        unit="1",
+    )
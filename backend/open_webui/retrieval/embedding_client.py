@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Optional
+
+import aiohttp
+
+from open_webui.config import (
+    RAG_EMBEDDING_CONCURRENT_REQUESTS,
+    RAG_EMBEDDING_MAX_RETRIES,
+)
+from open_webui.env import (
+    AIOHTTP_CLIENT_TIMEOUT,
+    AIOHTTP_CLIENT_SESSION_SSL,
+    SRC_LOG_LEVELS,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+RETRY_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+MAX_BACKOFF_SECONDS = 60
+
+
+def get_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def get_backoff(attempt: int) -> float:
+    # Exponential backoff with full jitter
+    return random.uniform(0, min(MAX_BACKOFF_SECONDS, 2**attempt))
+
+
+class EmbeddingClient:
+    """
+    Shared HTTP client for the remote embedding engines.
+
+    Requests run on a dedicated event loop thread that owns a single pooled
+    aiohttp session, so the synchronous embedding functions (which are called
+    from worker threads) reuse connections across calls and keep up to
+    `concurrency` batches in flight at once. Rate limited (429) and transient
+    server errors are retried with backoff, honoring Retry-After.
+    """
+
+    def __init__(self, concurrency: int = 4, max_retries: int = 5):
+        self.concurrency = max(concurrency, 1)
+        self.max_retries = max_retries
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="embedding-client", daemon=True
+                ).start()
+                self._loop = loop
+        return self._loop
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        # Only ever called on the client's own loop, so no locking is needed
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.concurrency * 2,
+                    ssl=AIOHTTP_CLIENT_SESSION_SSL,
+                ),
+                timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
+                trust_env=True,
+            )
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._session
+
+    async def post(self, url: str, headers: dict, payload: dict) -> dict:
+        session = await self._get_session()
+
+        for attempt in range(self.max_retries + 1):
+            # Only the request holds a slot, not the wait before a retry
+            async with self._semaphore:
+                try:
+                    async with session.post(url, headers=headers, json=payload) as r:
+                        if (
+                            r.status not in RETRY_STATUS_CODES
+                            or attempt >= self.max_retries
+                        ):
+                            r.raise_for_status()
+                            return await r.json()
+
+                        delay = get_retry_after(r.headers.get("Retry-After"))
+                        if delay is None:
+                            delay = get_backoff(attempt)
+                        log.warning(
+                            f"Embedding request to {url} returned {r.status}, retrying in {delay:.1f}s"
+                        )
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    if attempt >= self.max_retries:
+                        raise
+                    delay = get_backoff(attempt)
+                    log.warning(
+                        f"Embedding request to {url} failed ({e}), retrying in {delay:.1f}s"
+                    )
+
+            await asyncio.sleep(delay)
+
+    async def _gather(self, requests: list[tuple[str, dict, dict]]) -> list[dict]:
+        return await asyncio.gather(
+            *[self.post(url, headers, payload) for url, headers, payload in requests]
+        )
+
+    def post_many(self, requests: list[tuple[str, dict, dict]]) -> list[dict]:
+        """
+        Send (url, headers, payload) requests concurrently and return the
+        decoded JSON responses in order. Blocks the calling thread.
+        """
+        future = asyncio.run_coroutine_threadsafe(
+            self._gather(requests), self._get_loop()
+        )
+        return future.result()
+
+
+EMBEDDING_CLIENT = EmbeddingClient(
+    concurrency=RAG_EMBEDDING_CONCURRENT_REQUESTS,
+    max_retries=RAG_EMBEDDING_MAX_RETRIES,
+)
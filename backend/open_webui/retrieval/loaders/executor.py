@@ -0,0 +1,130 @@
+import logging
+import multiprocessing
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+# Worker processes are replaced after this many documents, so memory
+# fragmented by large parses is given back
+MAX_TASKS_PER_WORKER = 50
+
+# Workers enforce the timeout themselves. The pool is only killed when a
+# document overruns it by this much (e.g. stuck in native code), which also
+# leaves room for starting a worker
+KILL_GRACE_PERIOD = 120
+
+
+def set_memory_limit(max_memory: int):
+    if not max_memory:
+        return
+
+    try:
+        import resource
+
+        limit = max_memory * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError) as e:
+        log.warning(f"Could not limit document extraction memory: {e}")
+
+
+def run_with_time_limit(timeout: float, fn: Callable, *args):
+    # Runs in the worker process, SIGALRM interrupts the parser between
+    # Python bytecodes
+    if not timeout or not hasattr(signal, "setitimer"):
+        return fn(*args)
+
+    def on_timeout(signum, frame):
+        raise TimeoutError(f"Document extraction timed out after {timeout} seconds")
+
+    signal.signal(signal.SIGALRM, on_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return fn(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+class ExtractionExecutor:
+    """
+    Runs CPU-bound document parsing in a pool of worker processes, so
+    concurrent extractions use all cores instead of contending for the GIL.
+
+    A document that crashes its worker, or runs past `timeout`, takes down
+    the pool; the pool is then recreated and the other documents that were
+    in flight are resubmitted once, so only the offending document fails.
+    """
+
+    def __init__(self, workers: int, timeout: float = 0, max_memory: int = 0):
+        self.workers = workers
+        self.timeout = timeout
+        self.max_memory = max_memory
+
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    # Forking a threaded server isn't safe
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=set_memory_limit,
+                    initargs=(self.max_memory,),
+                    max_tasks_per_child=MAX_TASKS_PER_WORKER,
+                )
+            return self.executor
+
+    def _reset(self, executor: ProcessPoolExecutor):
+        with self.lock:
+            if self.executor is not executor:
+                # Already replaced by another caller
+                return
+            self.executor = None
+
+        for process in list((executor._processes or {}).values()):
+            process.kill()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, fn: Callable, *args):
+        for attempt in range(2):
+            executor = self._get_executor()
+            try:
+                future = executor.submit(run_with_time_limit, self.timeout, fn, *args)
+            except (BrokenProcessPool, RuntimeError):
+                # The pool was reset between getting and using it
+                self._reset(executor)
+                continue
+
+            try:
+                return future.result(
+                    timeout=(self.timeout + KILL_GRACE_PERIOD) if self.timeout else None
+                )
+            except TimeoutError:
+                if future.done():
+                    # Timed out inside the worker, which is still usable
+                    raise
+                self._reset(executor)
+                raise TimeoutError(
+                    f"Document extraction timed out after {self.timeout} seconds"
+                )
+            except BrokenProcessPool:
+                self._reset(executor)
+                if attempt:
+                    raise RuntimeError("Document extraction crashed its worker process")
+                log.warning("Document extraction worker died, retrying")
+
+        raise RuntimeError("Document extraction worker pool is unavailable")
+
+    def shutdown(self):
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
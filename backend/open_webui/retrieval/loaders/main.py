@@ -3,6 +3,7 @@ import logging
 import ftfy
 import sys
 import json
+from typing import Iterator
 
 from langchain_community.document_loaders import (
     AzureAIDocumentIntelligenceLoader,
@@ -22,13 +23,20 @@ from langchain_community.document_loaders import (
 )
 from langchain_core.documents import Document
 
+from open_webui.retrieval.loaders.executor import ExtractionExecutor
 from open_webui.retrieval.loaders.external_document import ExternalDocumentLoader
 
 from open_webui.retrieval.loaders.mistral import MistralLoader
 from open_webui.retrieval.loaders.datalab_marker import DatalabMarkerLoader
 
 
-from open_webui.env import SRC_LOG_LEVELS, GLOBAL_LOG_LEVEL
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    GLOBAL_LOG_LEVEL,
+    DOCUMENT_EXTRACTION_WORKERS,
+    DOCUMENT_EXTRACTION_TIMEOUT,
+    DOCUMENT_EXTRACTION_MAX_MEMORY,
+)
 
 logging.basicConfig(stream=sys.stdout, level=GLOBAL_LOG_LEVEL)
 log = logging.getLogger(__name__)
@@ -206,7 +214,39 @@ class DoclingLoader:
             raise Exception(f"Error calling Docling: {error_msg}")
 
 
+EXTRACTION_EXECUTOR = (
+    ExtractionExecutor(
+        DOCUMENT_EXTRACTION_WORKERS,
+        timeout=DOCUMENT_EXTRACTION_TIMEOUT,
+        max_memory=DOCUMENT_EXTRACTION_MAX_MEMORY,
+    )
+    if DOCUMENT_EXTRACTION_WORKERS
+    else None
+)
+
+
+def extract_documents(
+    engine: str, kwargs: dict, filename: str, file_content_type: str, file_path: str
+) -> list[Document]:
+    # Runs in an extraction worker process
+    loader = Loader(engine, **kwargs)._get_loader(
+        filename, file_content_type, file_path
+    )
+    return Loader.fix_documents(loader.load())
+
+
 class Loader:
+    # Loaders that hand the document to a remote service, everything else
+    # parses it locally
+    REMOTE_LOADERS = (
+        ExternalDocumentLoader,
+        TikaLoader,
+        DatalabMarkerLoader,
+        DoclingLoader,
+        AzureAIDocumentIntelligenceLoader,
+        MistralLoader,
+    )
+
     def __init__(self, engine: str = "", **kwargs):
         self.engine = engine
         self.kwargs = kwargs
@@ -215,8 +255,48 @@ class Loader:
         self, filename: str, file_content_type: str, file_path: str
     ) -> list[Document]:
         loader = self._get_loader(filename, file_content_type, file_path)
-        docs = loader.load()
 
+        if EXTRACTION_EXECUTOR and not isinstance(loader, self.REMOTE_LOADERS):
+            return EXTRACTION_EXECUTOR.run(
+                extract_documents,
+                self.engine,
+                self.kwargs,
+                filename,
+                file_content_type,
+                file_path,
+            )
+
+        return self.fix_documents(loader.load())
+
+    def lazy_load(
+        self, filename: str, file_content_type: str, file_path: str
+    ) -> Iterator[Document]:
+        """
+        Yields the document page by page where the loader supports it, so
+        large documents can be ingested without holding every page.
+        """
+        loader = self._get_loader(filename, file_content_type, file_path)
+
+        if EXTRACTION_EXECUTOR and not isinstance(loader, self.REMOTE_LOADERS):
+            # Worker processes return the whole document at once
+            yield from EXTRACTION_EXECUTOR.run(
+                extract_documents,
+                self.engine,
+                self.kwargs,
+                filename,
+                file_content_type,
+                file_path,
+            )
+            return
+
+        docs = loader.lazy_load() if hasattr(loader, "lazy_load") else loader.load()
+        for doc in docs:
+            yield Document(
+                page_content=ftfy.fix_text(doc.page_content), metadata=doc.metadata
+            )
+
+    @staticmethod
+    def fix_documents(docs: list[Document]) -> list[Document]:
         return [
             Document(
                 page_content=ftfy.fix_text(doc.page_content), metadata=doc.metadata
@@ -0,0 +1,115 @@
+import logging
+import queue
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+
+from open_webui.config import RAG_RERANKING_BATCH_SIZE, RAG_RERANKING_BATCH_WAIT_MS
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+class RerankRequest:
+    def __init__(self, model: Any, sentences: List[Tuple[str, str]]):
+        self.model = model
+        self.sentences = sentences
+        self.scores: Optional[List[float]] = None
+        self.error: Optional[Exception] = None
+        self.done = threading.Event()
+
+
+class RerankScheduler:
+    """
+    Micro-batches cross-encoder scoring across concurrent callers.
+
+    Every hybrid search thread submits its (query, passage) pairs here instead
+    of calling the model directly. A single worker thread gathers pairs until
+    max_batch_size is reached or max_wait_ms has passed since the first one
+    arrived, removes duplicate pairs and scores the batch in one forward pass.
+    """
+
+    def __init__(self, max_batch_size: int = 64, max_wait_ms: float = 10):
+        self.max_batch_size = max(max_batch_size, 1)
+        self.max_wait = max(max_wait_ms, 0) / 1000
+
+        self._queue: "queue.Queue[RerankRequest]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="rerank-scheduler", daemon=True
+                )
+                self._worker.start()
+
+    def predict(self, model: Any, sentences: List[Tuple[str, str]]) -> List[float]:
+        if not sentences:
+            return []
+
+        self._ensure_worker()
+        request = RerankRequest(model, [tuple(pair) for pair in sentences])
+        self._queue.put(request)
+        request.done.wait()
+
+        if request.error is not None:
+            raise request.error
+        return request.scores
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            num_pairs = len(batch[0].sentences)
+            deadline = time.monotonic() + self.max_wait
+
+            while num_pairs < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                batch.append(request)
+                num_pairs += len(request.sentences)
+
+            # Requests may target different models if the reranker was
+            # swapped while they were queued
+            groups: dict[int, List[RerankRequest]] = {}
+            for request in batch:
+                groups.setdefault(id(request.model), []).append(request)
+
+            for requests in groups.values():
+                self._process(requests)
+
+    def _process(self, requests: List[RerankRequest]) -> None:
+        pairs: dict[Tuple[str, str], int] = {}
+        for request in requests:
+            for pair in request.sentences:
+                pairs.setdefault(pair, len(pairs))
+
+        try:
+            log.debug(
+                f"RerankScheduler: scoring {len(pairs)} unique pairs for {len(requests)} requests"
+            )
+            scores = requests[0].model.predict(list(pairs.keys()))
+            scores = scores.tolist() if hasattr(scores, "tolist") else list(scores)
+
+            for request in requests:
+                request.scores = [scores[pairs[pair]] for pair in request.sentences]
+        except Exception as e:
+            log.exception(f"Error scoring rerank batch: {e}")
+            for request in requests:
+                request.error = e
+        finally:
+            for request in requests:
+                request.done.set()
+
+
+RERANK_SCHEDULER = RerankScheduler(
+    max_batch_size=RAG_RERANKING_BATCH_SIZE,
+    max_wait_ms=RAG_RERANKING_BATCH_WAIT_MS,
+)
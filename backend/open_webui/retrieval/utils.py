@@ -1,16 +1,15 @@
+import asyncio
 import logging
 import os
 from typing import Optional, Union
 
-import requests
 import hashlib
+import numpy as np
 from concurrent.futures import ThreadPoolExecutor
-import time
 
 from urllib.parse import quote
 from huggingface_hub import snapshot_download
 from langchain.retrievers import ContextualCompressionRetriever, EnsembleRetriever
-from langchain_community.retrievers import BM25Retriever
 from langchain_core.documents import Document
 
 from open_webui.config import VECTOR_DB
@@ -22,6 +21,14 @@ from open_webui.models.knowledge import Knowledges
 from open_webui.models.notes import Notes
 
 from open_webui.retrieval.vector.main import GetResult
+from open_webui.retrieval.bm25 import BM25_INDEX, BM25IndexRetriever
+from open_webui.retrieval.embedding_client import EMBEDDING_CLIENT
+from open_webui.retrieval.models.base_reranker import BaseReranker
+from open_webui.retrieval.rerank_scheduler import RERANK_SCHEDULER
+from open_webui.retrieval.embedding_cache import (
+    EMBEDDING_CACHE,
+    get_cached_embedding_function,
+)
 from open_webui.utils.access_control import has_access
 
 
@@ -31,6 +38,7 @@ from open_webui.env import (
     ENABLE_FORWARD_USER_INFO_HEADERS,
 )
 from open_webui.config import (
+    ENABLE_RAG_RERANKING_BATCHING,
     RAG_EMBEDDING_QUERY_PREFIX,
     RAG_EMBEDDING_CONTENT_PREFIX,
     RAG_EMBEDDING_PREFIX_FIELD_NAME,
@@ -39,6 +47,9 @@ from open_webui.config import (
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
+# Shared by the synchronous collection searches, instead of a pool per call
+RAG_SEARCH_EXECUTOR = ThreadPoolExecutor(thread_name_prefix="rag-search")
+
 
 from typing import Any
 
@@ -46,10 +57,22 @@ from langchain_core.callbacks import CallbackManagerForRetrieverRun
 from langchain_core.retrievers import BaseRetriever
 
 
+class SearchEmbeddings:
+    """
+    Vectors seen during a hybrid search: the query embedding and the stored
+    embeddings of the vector search hits, keyed by document content.
+    """
+
+    def __init__(self):
+        self.query: Optional[list[float]] = None
+        self.documents: dict[str, list[float]] = {}
+
+
 class VectorSearchRetriever(BaseRetriever):
     collection_name: Any
     embedding_function: Any
     top_k: int
+    search_embeddings: Any = None
 
     def _get_relevant_documents(
         self,
@@ -57,16 +80,25 @@ class VectorSearchRetriever(BaseRetriever):
         *,
         run_manager: CallbackManagerForRetrieverRun,
     ) -> list[Document]:
+        query_embedding = self.embedding_function(query, RAG_EMBEDDING_QUERY_PREFIX)
         result = VECTOR_DB_CLIENT.search(
             collection_name=self.collection_name,
-            vectors=[self.embedding_function(query, RAG_EMBEDDING_QUERY_PREFIX)],
+            vectors=[query_embedding],
             limit=self.top_k,
+            include_vectors=self.search_embeddings is not None,
         )
 
         ids = result.ids[0]
         metadatas = result.metadatas[0]
         documents = result.documents[0]
 
+        if self.search_embeddings is not None:
+            self.search_embeddings.query = query_embedding
+            if result.embeddings:
+                for document, embedding in zip(documents, result.embeddings[0]):
+                    if embedding is not None:
+                        self.search_embeddings.documents[document] = embedding
+
         results = []
         for idx in range(len(ids)):
             results.append(
@@ -112,9 +144,35 @@ def get_doc(collection_name: str, user: UserModel = None):
         raise e
 
 
+async def get_doc_async(collection_name: str, user: UserModel = None):
+    try:
+        log.debug(f"get_doc_async:doc {collection_name}")
+        result = await VECTOR_DB_CLIENT.get_async(collection_name=collection_name)
+
+        if result:
+            log.info(f"query_doc:result {result.ids} {result.metadatas}")
+
+        return result
+    except Exception as e:
+        log.exception(f"Error getting doc {collection_name}: {e}")
+        raise e
+
+
+def get_bm25_index(collection_name: str, collection_result: Optional[GetResult] = None):
+    # The full collection dump is only needed the first time a collection is
+    # searched; afterwards the persisted index is maintained incrementally.
+    return BM25_INDEX.get_or_build(
+        collection_name,
+        lambda: (
+            collection_result
+            if collection_result is not None
+            else VECTOR_DB_CLIENT.get(collection_name=collection_name)
+        ),
+    )
+
+
 def query_doc_with_hybrid_search(
     collection_name: str,
-    collection_result: GetResult,
     query: str,
     embedding_function,
     k: int,
@@ -122,19 +180,23 @@ def query_doc_with_hybrid_search(
     k_reranker: int,
     r: float,
     hybrid_bm25_weight: float,
+    collection_result: Optional[GetResult] = None,
 ) -> dict:
     try:
         log.debug(f"query_doc_with_hybrid_search:doc {collection_name}")
-        bm25_retriever = BM25Retriever.from_texts(
-            texts=collection_result.documents[0],
-            metadatas=collection_result.metadatas[0],
-        )
-        bm25_retriever.k = k
+        bm25_index = get_bm25_index(collection_name, collection_result)
+        if bm25_index is None:
+            raise ValueError(f"Collection {collection_name} has no documents")
+
+        bm25_retriever = BM25IndexRetriever(index=bm25_index, k=k)
 
+        # Stored vectors are only needed to score the hits without a reranker
+        search_embeddings = SearchEmbeddings() if reranking_function is None else None
         vector_search_retriever = VectorSearchRetriever(
             collection_name=collection_name,
             embedding_function=embedding_function,
             top_k=k,
+            search_embeddings=search_embeddings,
         )
 
         if hybrid_bm25_weight <= 0:
@@ -156,6 +218,7 @@ def query_doc_with_hybrid_search(
             top_n=k_reranker,
             reranking_function=reranking_function,
             r_score=r,
+            search_embeddings=search_embeddings,
         )
 
         compression_retriever = ContextualCompressionRetriever(
@@ -270,6 +333,27 @@ def get_all_items_from_collections(collection_names: list[str]) -> dict:
     return merge_get_results(results)
 
 
+async def get_all_items_from_collections_async(collection_names: list[str]) -> dict:
+    async def get_collection(collection_name):
+        try:
+            result = await get_doc_async(collection_name=collection_name)
+            if result is not None:
+                return result.model_dump()
+        except Exception as e:
+            log.exception(f"Error when querying the collection: {e}")
+        return None
+
+    results = await asyncio.gather(
+        *[
+            get_collection(collection_name)
+            for collection_name in collection_names
+            if collection_name
+        ]
+    )
+
+    return merge_get_results([result for result in results if result is not None])
+
+
 def query_collection(
     collection_names: list[str],
     queries: list[str],
@@ -300,15 +384,14 @@ def query_collection(
         f"query_collection: processing {len(queries)} queries across {len(collection_names)} collections"
     )
 
-    with ThreadPoolExecutor() as executor:
-        future_results = []
-        for query_embedding in query_embeddings:
-            for collection_name in collection_names:
-                result = executor.submit(
-                    process_query_collection, collection_name, query_embedding
-                )
-                future_results.append(result)
-        task_results = [future.result() for future in future_results]
+    future_results = []
+    for query_embedding in query_embeddings:
+        for collection_name in collection_names:
+            result = RAG_SEARCH_EXECUTOR.submit(
+                process_query_collection, collection_name, query_embedding
+            )
+            future_results.append(result)
+    task_results = [future.result() for future in future_results]
 
     for result, err in task_results:
         if err is not None:
@@ -322,6 +405,55 @@ def query_collection(
     return merge_and_sort_query_results(results, k=k)
 
 
+async def query_collection_async(
+    collection_names: list[str],
+    queries: list[str],
+    embedding_function,
+    k: int,
+    query_embeddings: Optional[list[list[float]]] = None,
+) -> dict:
+    """
+    Same as query_collection, but all queries and collections are searched
+    with a single search_many call on the event loop, so the vector DB
+    merges the top k across collections.
+    """
+    if query_embeddings is None:
+        # Generate all query embeddings (in one call)
+        query_embeddings = await asyncio.to_thread(
+            embedding_function, queries, prefix=RAG_EMBEDDING_QUERY_PREFIX
+        )
+    log.debug(
+        f"query_collection_async: processing {len(queries)} queries across {len(collection_names)} collections"
+    )
+
+    try:
+        result = await VECTOR_DB_CLIENT.search_many_async(
+            collection_names=[name for name in collection_names if name],
+            vectors=query_embeddings,
+            limit=k,
+        )
+    except Exception as e:
+        log.exception(f"All collection queries failed. No results returned: {e}")
+        result = None
+
+    results = []
+    if result is not None:
+        log.info(f"query_collection_async:result {result.ids} {result.metadatas}")
+        # One result per query, merged and deduplicated below
+        results = [
+            {
+                "distances": [distances],
+                "documents": [documents],
+                "metadatas": [metadatas],
+            }
+            for distances, documents, metadatas in zip(
+                result.distances, result.documents, result.metadatas
+            )
+        ]
+
+    return merge_and_sort_query_results(results, k=k)
+
+
 def query_collection_with_hybrid_search(
     collection_names: list[str],
     queries: list[str],
@@ -334,20 +466,17 @@ def query_collection_with_hybrid_search(
 ) -> dict:
     results = []
     error = False
-    # Fetch collection data once per collection sequentially
-    # Avoid fetching the same data multiple times later
-    collection_results = {}
+    # Load (or build, on first use) the BM25 index once per collection
+    bm25_indexes = {}
     for collection_name in collection_names:
         try:
             log.debug(
-                f"query_collection_with_hybrid_search:VECTOR_DB_CLIENT.get:collection {collection_name}"
-            )
-            collection_results[collection_name] = VECTOR_DB_CLIENT.get(
-                collection_name=collection_name
+                f"query_collection_with_hybrid_search:get_bm25_index:collection {collection_name}"
             )
+            bm25_indexes[collection_name] = get_bm25_index(collection_name)
         except Exception as e:
-            log.exception(f"Failed to fetch collection {collection_name}: {e}")
-            collection_results[collection_name] = None
+            log.exception(f"Failed to load collection {collection_name}: {e}")
+            bm25_indexes[collection_name] = None
 
     log.info(
         f"Starting hybrid search for {len(queries)} queries in {len(collection_names)} collections..."
@@ -357,7 +486,6 @@ def query_collection_with_hybrid_search(
         try:
             result = query_doc_with_hybrid_search(
                 collection_name=collection_name,
-                collection_result=collection_results[collection_name],
                 query=query,
                 embedding_function=embedding_function,
                 k=k,
@@ -372,17 +500,18 @@ def query_collection_with_hybrid_search(
             return None, e
 
     # Prepare tasks for all collections and queries
-    # Avoid running any tasks for collections that failed to fetch data (have assigned None)
+    # Avoid running any tasks for collections that failed to load (have assigned None)
     tasks = [
         (cn, q)
         for cn in collection_names
-        if collection_results[cn] is not None
+        if bm25_indexes[cn] is not None
         for q in queries
     ]
 
-    with ThreadPoolExecutor() as executor:
-        future_results = [executor.submit(process_query, cn, q) for cn, q in tasks]
-        task_results = [future.result() for future in future_results]
+    future_results = [
+        RAG_SEARCH_EXECUTOR.submit(process_query, cn, q) for cn, q in tasks
+    ]
+    task_results = [future.result() for future in future_results]
 
     for result, err in task_results:
         if err is not None:
@@ -406,13 +535,41 @@ def get_embedding_function(
     key,
     embedding_batch_size,
     azure_api_version=None,
+):
+    func = _get_embedding_function(
+        embedding_engine,
+        embedding_model,
+        embedding_function,
+        url,
+        key,
+        embedding_batch_size,
+        azure_api_version=azure_api_version,
+    )
+
+    if EMBEDDING_CACHE is not None:
+        return get_cached_embedding_function(
+            func, embedding_engine, embedding_model, EMBEDDING_CACHE
+        )
+    return func
+
+
+def _get_embedding_function(
+    embedding_engine,
+    embedding_model,
+    embedding_function,
+    url,
+    key,
+    embedding_batch_size,
+    azure_api_version=None,
 ):
     if embedding_engine == "":
         return lambda query, prefix=None, user=None: embedding_function.encode(
             query, **({"prompt": prefix} if prefix else {})
         ).tolist()
     elif embedding_engine in ["ollama", "openai", "azure_openai"]:
-        func = lambda query, prefix=None, user=None: generate_embeddings(
+        # Lists are split into embedding_batch_size batches that are sent
+        # concurrently over the shared EMBEDDING_CLIENT connection pool
+        return lambda query, prefix=None, user=None: generate_embeddings(
             engine=embedding_engine,
             model=embedding_model,
             text=query,
@@ -420,27 +577,9 @@ def get_embedding_function(
             url=url,
             key=key,
             user=user,
+            batch_size=embedding_batch_size,
             azure_api_version=azure_api_version,
         )
-
-        def generate_multiple(query, prefix, user, func):
-            if isinstance(query, list):
-                embeddings = []
-                for i in range(0, len(query), embedding_batch_size):
-                    embeddings.extend(
-                        func(
-                            query[i : i + embedding_batch_size],
-                            prefix=prefix,
-                            user=user,
-                        )
-                    )
-                return embeddings
-            else:
-                return func(query, prefix, user)
-
-        return lambda query, prefix=None, user=None: generate_multiple(
-            query, prefix, user, func
-        )
     else:
         raise ValueError(f"Unknown embedding engine: {embedding_engine}")
 
@@ -452,11 +591,18 @@ def get_reranking_function(reranking_engine, reranking_model, reranking_function
         return lambda sentences, user=None: reranking_function.predict(
             sentences, user=user
         )
+    elif ENABLE_RAG_RERANKING_BATCHING and not isinstance(
+        reranking_function, BaseReranker
+    ):
+        # Local CrossEncoder: score pairs from concurrent requests together
+        return lambda sentences, user=None: RERANK_SCHEDULER.predict(
+            reranking_function, sentences
+        )
     else:
         return lambda sentences, user=None: reranking_function.predict(sentences)
 
 
-def get_sources_from_items(
+async def get_sources_from_items(
     request,
     items,
     queries,
@@ -476,6 +622,121 @@ def get_sources_from_items(
 
     extracted_collections = []
     query_results = []
+    query_embeddings = None
+
+    async def get_query_embeddings():
+        # Embedded once and shared by the searches of all items
+        nonlocal query_embeddings
+        if query_embeddings is None:
+            query_embeddings = asyncio.ensure_future(
+                asyncio.to_thread(
+                    embedding_function, queries, prefix=RAG_EMBEDDING_QUERY_PREFIX
+                )
+            )
+        return await query_embeddings
+
+    async def search_collections(collection_names):
+        try:
+            if full_context:
+                return await get_all_items_from_collections_async(collection_names)
+
+            query_result = None
+            if hybrid_search:
+                try:
+                    # BM25 scoring and reranking are CPU-bound
+                    query_result = await asyncio.to_thread(
+                        query_collection_with_hybrid_search,
+                        collection_names=collection_names,
+                        queries=queries,
+                        embedding_function=embedding_function,
+                        k=k,
+                        reranking_function=reranking_function,
+                        k_reranker=k_reranker,
+                        r=r,
+                        hybrid_bm25_weight=hybrid_bm25_weight,
+                    )
+                except Exception as e:
+                    log.debug(
+                        "Error when using hybrid search, using non hybrid search as fallback."
+                    )
+
+            # fallback to non-hybrid search
+            if not hybrid_search and query_result is None:
+                query_result = await query_collection_async(
+                    collection_names=collection_names,
+                    queries=queries,
+                    embedding_function=embedding_function,
+                    k=k,
+                    query_embeddings=await get_query_embeddings(),
+                )
+            return query_result
+        except Exception as e:
+            log.exception(e)
+            return None
+
+    # The lookups below hit the database, they are run in threads so they
+    # don't block the event loop
+
+    def get_note_result(item):
+        note = Notes.get_note_by_id(item.get("id"))
+
+        if note and (
+            user.role == "admin" or has_access(user.id, "read", note.access_control)
+        ):
+            # User has access to the note
+            return {
+                "documents": [[note.data.get("content", {}).get("md", "")]],
+                "metadatas": [[{"file_id": note.id, "name": note.title}]],
+            }
+        return None
+
+    def get_file_result(item):
+        file_object = Files.get_file_by_id(item.get("id"))
+        if file_object:
+            return {
+                "documents": [[file_object.data.get("content", "")]],
+                "metadatas": [
+                    [
+                        {
+                            "file_id": item.get("id"),
+                            "name": file_object.filename,
+                            "source": file_object.filename,
+                        }
+                    ]
+                ],
+            }
+        return None
+
+    def get_knowledge_result(item):
+        knowledge_base = Knowledges.get_knowledge_by_id(item.get("id"))
+
+        if knowledge_base and (
+            user.role == "admin"
+            or has_access(user.id, "read", knowledge_base.access_control)
+        ):
+            file_ids = knowledge_base.data.get("file_ids", [])
+            files = {file.id: file for file in Files.get_files_by_ids(file_ids)}
+
+            documents = []
+            metadatas = []
+            for file_id in file_ids:
+                file_object = files.get(file_id)
+
+                if file_object:
+                    documents.append(file_object.data.get("content", ""))
+                    metadatas.append(
+                        {
+                            "file_id": file_id,
+                            "name": file_object.filename,
+                            "source": file_object.filename,
+                        }
+                    )
+
+            return {
+                "documents": [documents],
+                "metadatas": [metadatas],
+            }
+        return None
 
     for item in items:
         query_result = None
@@ -506,14 +767,7 @@ def get_sources_from_items(
 
         elif item.get("type") == "note":
             # Note Attached
-            note = Notes.get_note_by_id(item.get("id"))
-
-            if user.role == "admin" or has_access(user.id, "read", note.access_control):
-                # User has access to the note
-                query_result = {
-                    "documents": [[note.data.get("content", {}).get("md", "")]],
-                    "metadatas": [[{"file_id": note.id, "name": note.title}]],
-                }
+            query_result = asyncio.to_thread(get_note_result, item)
 
         elif item.get("type") == "file":
             if (
@@ -540,20 +794,7 @@ def get_sources_from_items(
                         ],
                     }
                 elif item.get("id"):
-                    file_object = Files.get_file_by_id(item.get("id"))
-                    if file_object:
-                        query_result = {
-                            "documents": [[file_object.data.get("content", "")]],
-                            "metadatas": [
-                                [
-                                    {
-                                        "file_id": item.get("id"),
-                                        "name": file_object.filename,
-                                        "source": file_object.filename,
-                                    }
-                                ]
-                            ],
-                        }
+                    query_result = asyncio.to_thread(get_file_result, item)
             else:
                 # Fallback to collection names
                 if item.get("legacy"):
@@ -567,34 +808,7 @@ def get_sources_from_items(
                 or request.app.state.config.BYPASS_EMBEDDING_AND_RETRIEVAL
             ):
                 # Manual Full Mode Toggle for Collection
-                knowledge_base = Knowledges.get_knowledge_by_id(item.get("id"))
-
-                if knowledge_base and (
-                    user.role == "admin"
-                    or has_access(user.id, "read", knowledge_base.access_control)
-                ):
-
-                    file_ids = knowledge_base.data.get("file_ids", [])
-
-                    documents = []
-                    metadatas = []
-                    for file_id in file_ids:
-                        file_object = Files.get_file_by_id(file_id)
-
-                        if file_object:
-                            documents.append(file_object.data.get("content", ""))
-                            metadatas.append(
-                                {
-                                    "file_id": file_id,
-                                    "name": file_object.filename,
-                                    "source": file_object.filename,
-                                }
-                            )
-
-                    query_result = {
-                        "documents": [documents],
-                        "metadatas": [metadatas],
-                    }
+                query_result = asyncio.to_thread(get_knowledge_result, item)
             else:
                 # Fallback to collection names
                 if item.get("legacy"):
@@ -620,48 +834,33 @@ def get_sources_from_items(
                 log.debug(f"skipping {item} as it has already been extracted")
                 continue
 
-            try:
-                if full_context:
-                    query_result = get_all_items_from_collections(collection_names)
-                else:
-                    query_result = None  # Initialize to None
-                    if hybrid_search:
-                        try:
-                            query_result = query_collection_with_hybrid_search(
-                                collection_names=collection_names,
-                                queries=queries,
-                                embedding_function=embedding_function,
-                                k=k,
-                                reranking_function=reranking_function,
-                                k_reranker=k_reranker,
-                                r=r,
-                                hybrid_bm25_weight=hybrid_bm25_weight,
-                            )
-                        except Exception as e:
-                            log.debug(
-                                "Error when using hybrid search, using non hybrid search as fallback."
-                            )
-
-                    # fallback to non-hybrid search
-                    if not hybrid_search and query_result is None:
-                        query_result = query_collection(
-                            collection_names=collection_names,
-                            queries=queries,
-                            embedding_function=embedding_function,
-                            k=k,
-                        )
-            except Exception as e:
-                log.exception(e)
-
+            # Searched concurrently once all items are collected
+            query_results.append((item, search_collections(collection_names)))
             extracted_collections.extend(collection_names)
+            continue
+
+        query_results.append((item, query_result))
+
+    search_results = await asyncio.gather(
+        *[
+            query_result
+            for _, query_result in query_results
+            if asyncio.iscoroutine(query_result)
+        ]
+    )
+    search_results = iter(search_results)
 
+    results = []
+    for item, query_result in query_results:
+        if asyncio.iscoroutine(query_result):
+            query_result = next(search_results)
         if query_result:
             if "data" in item:
                 del item["data"]
-            query_results.append({**query_result, "file": item})
+            results.append({**query_result, "file": item})
 
     sources = []
-    for query_result in query_results:
+    for query_result in results:
         try:
             if "documents" in query_result:
                 if "metadatas" in query_result:
@@ -721,6 +920,24 @@ def get_model_path(model: str, update_model: bool = False):
         return model
 
 
+def get_user_info_headers(user: UserModel = None) -> dict:
+    return (
+        {
+            "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
+            "X-OpenWebUI-User-Id": user.id,
+            "X-OpenWebUI-User-Email": user.email,
+            "X-OpenWebUI-User-Role": user.role,
+        }
+        if ENABLE_FORWARD_USER_INFO_HEADERS and user
+        else {}
+    )
+
+
+def get_batches(texts: list[str], batch_size: Optional[int] = None):
+    batch_size = batch_size if batch_size and batch_size > 0 else len(texts)
+    return [texts[i : i + batch_size] for i in range(0, len(texts), batch_size)]
+
+
 def generate_openai_batch_embeddings(
     model: str,
     texts: list[str],
@@ -728,39 +945,34 @@ def generate_openai_batch_embeddings(
     key: str = "",
     prefix: str = None,
     user: UserModel = None,
+    batch_size: Optional[int] = None,
 ) -> Optional[list[list[float]]]:
     try:
         log.debug(
             f"generate_openai_batch_embeddings:model {model} batch size: {len(texts)}"
         )
-        json_data = {"input": texts, "model": model}
-        if isinstance(RAG_EMBEDDING_PREFIX_FIELD_NAME, str) and isinstance(prefix, str):
-            json_data[RAG_EMBEDDING_PREFIX_FIELD_NAME] = prefix
-
-        r = requests.post(
-            f"{url}/embeddings",
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {key}",
-                **(
-                    {
-                        "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
-                        "X-OpenWebUI-User-Id": user.id,
-                        "X-OpenWebUI-User-Email": user.email,
-                        "X-OpenWebUI-User-Role": user.role,
-                    }
-                    if ENABLE_FORWARD_USER_INFO_HEADERS and user
-                    else {}
-                ),
-            },
-            json=json_data,
-        )
-        r.raise_for_status()
-        data = r.json()
-        if "data" in data:
-            return [elem["embedding"] for elem in data["data"]]
-        else:
-            raise "Something went wrong :/"
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {key}",
+            **get_user_info_headers(user),
+        }
+
+        batch_requests = []
+        for batch in get_batches(texts, batch_size):
+            json_data = {"input": batch, "model": model}
+            if isinstance(RAG_EMBEDDING_PREFIX_FIELD_NAME, str) and isinstance(
+                prefix, str
+            ):
+                json_data[RAG_EMBEDDING_PREFIX_FIELD_NAME] = prefix
+            batch_requests.append((f"{url}/embeddings", headers, json_data))
+
+        embeddings = []
+        for data in EMBEDDING_CLIENT.post_many(batch_requests):
+            if "data" in data:
+                embeddings.extend([elem["embedding"] for elem in data["data"]])
+            else:
+                raise Exception("Something went wrong :/")
+        return embeddings
     except Exception as e:
         log.exception(f"Error generating openai batch embeddings: {e}")
         return None
@@ -774,47 +986,35 @@ def generate_azure_openai_batch_embeddings(
     version: str = "",
     prefix: str = None,
     user: UserModel = None,
+    batch_size: Optional[int] = None,
 ) -> Optional[list[list[float]]]:
     try:
         log.debug(
             f"generate_azure_openai_batch_embeddings:deployment {model} batch size: {len(texts)}"
         )
-        json_data = {"input": texts}
-        if isinstance(RAG_EMBEDDING_PREFIX_FIELD_NAME, str) and isinstance(prefix, str):
-            json_data[RAG_EMBEDDING_PREFIX_FIELD_NAME] = prefix
-
         url = f"{url}/openai/deployments/{model}/embeddings?api-version={version}"
+        headers = {
+            "Content-Type": "application/json",
+            "api-key": key,
+            **get_user_info_headers(user),
+        }
 
-        for _ in range(5):
-            r = requests.post(
-                url,
-                headers={
-                    "Content-Type": "application/json",
-                    "api-key": key,
-                    **(
-                        {
-                            "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
-                            "X-OpenWebUI-User-Id": user.id,
-                            "X-OpenWebUI-User-Email": user.email,
-                            "X-OpenWebUI-User-Role": user.role,
-                        }
-                        if ENABLE_FORWARD_USER_INFO_HEADERS and user
-                        else {}
-                    ),
-                },
-                json=json_data,
-            )
-            if r.status_code == 429:
-                retry = float(r.headers.get("Retry-After", "1"))
-                time.sleep(retry)
-                continue
-            r.raise_for_status()
-            data = r.json()
+        batch_requests = []
+        for batch in get_batches(texts, batch_size):
+            json_data = {"input": batch}
+            if isinstance(RAG_EMBEDDING_PREFIX_FIELD_NAME, str) and isinstance(
+                prefix, str
+            ):
+                json_data[RAG_EMBEDDING_PREFIX_FIELD_NAME] = prefix
+            batch_requests.append((url, headers, json_data))
+
+        embeddings = []
+        for data in EMBEDDING_CLIENT.post_many(batch_requests):
             if "data" in data:
-                return [elem["embedding"] for elem in data["data"]]
+                embeddings.extend([elem["embedding"] for elem in data["data"]])
             else:
                 raise Exception("Something went wrong :/")
-        return None
+        return embeddings
     except Exception as e:
         log.exception(f"Error generating azure openai batch embeddings: {e}")
         return None
@@ -827,40 +1027,34 @@ def generate_ollama_batch_embeddings(
     key: str = "",
     prefix: str = None,
     user: UserModel = None,
+    batch_size: Optional[int] = None,
 ) -> Optional[list[list[float]]]:
     try:
         log.debug(
             f"generate_ollama_batch_embeddings:model {model} batch size: {len(texts)}"
         )
-        json_data = {"input": texts, "model": model}
-        if isinstance(RAG_EMBEDDING_PREFIX_FIELD_NAME, str) and isinstance(prefix, str):
-            json_data[RAG_EMBEDDING_PREFIX_FIELD_NAME] = prefix
-
-        r = requests.post(
-            f"{url}/api/embed",
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {key}",
-                **(
-                    {
-                        "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
-                        "X-OpenWebUI-User-Id": user.id,
-                        "X-OpenWebUI-User-Email": user.email,
-                        "X-OpenWebUI-User-Role": user.role,
-                    }
-                    if ENABLE_FORWARD_USER_INFO_HEADERS
-                    else {}
-                ),
-            },
-            json=json_data,
-        )
-        r.raise_for_status()
-        data = r.json()
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {key}",
+            **get_user_info_headers(user),
+        }
 
-        if "embeddings" in data:
-            return data["embeddings"]
-        else:
-            raise "Something went wrong :/"
+        batch_requests = []
+        for batch in get_batches(texts, batch_size):
+            json_data = {"input": batch, "model": model}
+            if isinstance(RAG_EMBEDDING_PREFIX_FIELD_NAME, str) and isinstance(
+                prefix, str
+            ):
+                json_data[RAG_EMBEDDING_PREFIX_FIELD_NAME] = prefix
+            batch_requests.append((f"{url}/api/embed", headers, json_data))
+
+        embeddings = []
+        for data in EMBEDDING_CLIENT.post_many(batch_requests):
+            if "embeddings" in data:
+                embeddings.extend(data["embeddings"])
+            else:
+                raise Exception("Something went wrong :/")
+        return embeddings
     except Exception as e:
         log.exception(f"Error generating ollama batch embeddings: {e}")
         return None
@@ -876,6 +1070,7 @@ def generate_embeddings(
     url = kwargs.get("url", "")
     key = kwargs.get("key", "")
     user = kwargs.get("user")
+    batch_size = kwargs.get("batch_size")
 
     if prefix is not None and RAG_EMBEDDING_PREFIX_FIELD_NAME is None:
         if isinstance(text, list):
@@ -892,12 +1087,19 @@ def generate_embeddings(
                 "key": key,
                 "prefix": prefix,
                 "user": user,
+                "batch_size": batch_size,
             }
         )
         return embeddings[0] if isinstance(text, str) else embeddings
     elif engine == "openai":
         embeddings = generate_openai_batch_embeddings(
-            model, text if isinstance(text, list) else [text], url, key, prefix, user
+            model,
+            text if isinstance(text, list) else [text],
+            url,
+            key,
+            prefix,
+            user,
+            batch_size,
         )
         return embeddings[0] if isinstance(text, str) else embeddings
     elif engine == "azure_openai":
@@ -910,6 +1112,7 @@ def generate_embeddings(
             azure_api_version,
             prefix,
             user,
+            batch_size,
         )
         return embeddings[0] if isinstance(text, str) else embeddings
 
@@ -921,16 +1124,60 @@ from langchain_core.callbacks import Callbacks
 from langchain_core.documents import BaseDocumentCompressor, Document
 
 
+def get_cosine_similarities(
+    query_embedding: list[float], document_embeddings: list[list[float]]
+) -> list[float]:
+    # Some backends (pgvector) zero-pad stored vectors, which doesn't change
+    # cosine similarity, so pad everything to the same length first.
+    dim = max([len(query_embedding)] + [len(e) for e in document_embeddings])
+    query = np.zeros(dim, dtype=np.float32)
+    query[: len(query_embedding)] = query_embedding
+    documents = np.zeros((len(document_embeddings), dim), dtype=np.float32)
+    for idx, embedding in enumerate(document_embeddings):
+        documents[idx, : len(embedding)] = embedding
+
+    norms = np.linalg.norm(documents, axis=1) * np.linalg.norm(query)
+    return (documents @ query / np.maximum(norms, 1e-12)).tolist()
+
+
 class RerankCompressor(BaseDocumentCompressor):
     embedding_function: Any
     top_n: int
     reranking_function: Any
     r_score: float
+    search_embeddings: Any = None
 
     class Config:
         extra = "forbid"
         arbitrary_types_allowed = True
 
+    def _get_embeddings(self, query: str, documents: Sequence[Document]):
+        stored = self.search_embeddings
+
+        if stored is not None and stored.query is not None:
+            query_embedding = stored.query
+        else:
+            query_embedding = self.embedding_function(query, RAG_EMBEDDING_QUERY_PREFIX)
+
+        document_embeddings = [
+            stored.documents.get(doc.page_content) if stored is not None else None
+            for doc in documents
+        ]
+
+        # Documents that only came from BM25 have no stored vector. Embed them
+        # the same way they were embedded at ingestion so the embedding cache
+        # can usually serve them.
+        missing = [idx for idx, e in enumerate(document_embeddings) if e is None]
+        if missing:
+            embeddings = self.embedding_function(
+                [documents[idx].page_content.replace("\n", " ") for idx in missing],
+                RAG_EMBEDDING_CONTENT_PREFIX,
+            )
+            for idx, embedding in zip(missing, embeddings):
+                document_embeddings[idx] = embedding
+
+        return query_embedding, document_embeddings
+
     def compress_documents(
         self,
         documents: Sequence[Document],
@@ -944,13 +1191,10 @@ class RerankCompressor(BaseDocumentCompressor):
                 [(query, doc.page_content) for doc in documents]
             )
         else:
-            from sentence_transformers import util
-
-            query_embedding = self.embedding_function(query, RAG_EMBEDDING_QUERY_PREFIX)
-            document_embedding = self.embedding_function(
-                [doc.page_content for doc in documents], RAG_EMBEDDING_CONTENT_PREFIX
+            query_embedding, document_embeddings = self._get_embeddings(
+                query, documents
             )
-            scores = util.cos_sim(query_embedding, document_embedding)[0]
+            scores = get_cosine_similarities(query_embedding, document_embeddings)
 
         docs_with_scores = list(
             zip(documents, scores.tolist() if not isinstance(scores, list) else scores)
@@ -69,7 +69,11 @@ class ChromaClient(VectorDBBase):
         return self.client.delete_collection(name=collection_name)
 
     def search(
-        self, collection_name: str, vectors: list[list[float | int]], limit: int
+        self,
+        collection_name: str,
+        vectors: list[list[float | int]],
+        limit: int,
+        include_vectors: bool = False,
     ) -> Optional[SearchResult]:
         # Search for the nearest neighbor items based on the vectors and return 'limit' number of results.
         try:
@@ -78,6 +82,8 @@ class ChromaClient(VectorDBBase):
                 result = collection.query(
                     query_embeddings=vectors,
                     n_results=limit,
+                    include=["documents", "metadatas", "distances"]
+                    + (["embeddings"] if include_vectors else []),
                 )
 
                 # chromadb has cosine distance, 2 (worst) -> 0 (best). Re-odering to 0 -> 1
@@ -86,12 +92,20 @@ class ChromaClient(VectorDBBase):
                 distances = [2 - dist for dist in distances]
                 distances = [[dist / 2 for dist in distances]]
 
+                # Embeddings may come back as numpy arrays
+                embeddings = result.get("embeddings") if include_vectors else None
+                if embeddings is not None and len(embeddings) > 0:
+                    embeddings = [[[float(x) for x in e] for e in embeddings[0]]]
+                else:
+                    embeddings = None
+
                 return SearchResult(
                     **{
                         "ids": result["ids"],
                         "distances": distances,
                         "documents": result["documents"],
                         "metadatas": result["metadatas"],
+                        "embeddings": embeddings,
                     }
                 )
             return None
@@ -1,7 +1,7 @@
-from elasticsearch import Elasticsearch, BadRequestError
+from elasticsearch import AsyncElasticsearch, Elasticsearch, BadRequestError
 from typing import Optional
 import ssl
-from elasticsearch.helpers import bulk, scan
+from elasticsearch.helpers import async_bulk, async_scan, bulk, scan
 from open_webui.retrieval.vector.main import (
     VectorDBBase,
     VectorItem,
@@ -30,18 +30,26 @@ class ElasticsearchClient(VectorDBBase):
 
     def __init__(self):
         self.index_prefix = ELASTICSEARCH_INDEX_PREFIX
-        self.client = Elasticsearch(
-            hosts=[ELASTICSEARCH_URL],
-            ca_certs=ELASTICSEARCH_CA_CERTS,
-            api_key=ELASTICSEARCH_API_KEY,
-            cloud_id=ELASTICSEARCH_CLOUD_ID,
-            basic_auth=(
+        self.client_kwargs = {
+            "hosts": [ELASTICSEARCH_URL],
+            "ca_certs": ELASTICSEARCH_CA_CERTS,
+            "api_key": ELASTICSEARCH_API_KEY,
+            "cloud_id": ELASTICSEARCH_CLOUD_ID,
+            "basic_auth": (
                 (ELASTICSEARCH_USERNAME, ELASTICSEARCH_PASSWORD)
                 if ELASTICSEARCH_USERNAME and ELASTICSEARCH_PASSWORD
                 else None
             ),
-            ssl_assert_fingerprint=SSL_ASSERT_FINGERPRINT,
-        )
+            "ssl_assert_fingerprint": SSL_ASSERT_FINGERPRINT,
+        }
+        self.client = Elasticsearch(**self.client_kwargs)
+        self.async_client = None
+
+    def _get_async_client(self) -> AsyncElasticsearch:
+        # Created on first use, so its connection pool belongs to the event loop
+        if self.async_client is None:
+            self.async_client = AsyncElasticsearch(**self.client_kwargs)
+        return self.async_client
 
     # Status: works
     def _get_index_name(self, dimension: int) -> str:
@@ -78,28 +86,33 @@ class ElasticsearchClient(VectorDBBase):
         return GetResult(ids=[ids], documents=[documents], metadatas=[metadatas])
 
     # Status: works
-    def _result_to_search_result(self, result) -> SearchResult:
+    def _result_to_search_result(
+        self, result, include_vectors: bool = False
+    ) -> SearchResult:
         ids = []
         distances = []
         documents = []
         metadatas = []
+        embeddings = []
 
         for hit in result["hits"]["hits"]:
             ids.append(hit["_id"])
             distances.append(hit["_score"])
             documents.append(hit["_source"].get("text"))
             metadatas.append(hit["_source"].get("metadata"))
+            embeddings.append(hit["_source"].get("vector"))
 
         return SearchResult(
             ids=[ids],
             distances=[distances],
             documents=[documents],
             metadatas=[metadatas],
+            embeddings=[embeddings] if include_vectors else None,
         )
 
     # Status: works
-    def _create_index(self, dimension: int):
-        body = {
+    def _get_index_body(self, dimension: int) -> dict:
+        return {
             "mappings": {
                 "dynamic_templates": [
                     {
@@ -123,7 +136,11 @@ class ElasticsearchClient(VectorDBBase):
                 },
             }
         }
-        self.client.indices.create(index=self._get_index_name(dimension), body=body)
+
+    def _create_index(self, dimension: int):
+        self.client.indices.create(
+            index=self._get_index_name(dimension), body=self._get_index_body(dimension)
+        )
 
     # Status: works
 
@@ -150,12 +167,16 @@ class ElasticsearchClient(VectorDBBase):
         self.client.delete_by_query(index=f"{self.index_prefix}*", body=query)
 
     # Status: works
-    def search(
-        self, collection_name: str, vectors: list[list[float]], limit: int
-    ) -> Optional[SearchResult]:
-        query = {
+    def _get_search_body(
+        self,
+        collection_name: str,
+        vectors: list[list[float]],
+        limit: int,
+        include_vectors: bool = False,
+    ) -> dict:
+        return {
             "size": limit,
-            "_source": ["text", "metadata"],
+            "_source": ["text", "metadata"] + (["vector"] if include_vectors else []),
             "query": {
                 "script_score": {
                     "query": {
@@ -171,36 +192,57 @@ class ElasticsearchClient(VectorDBBase):
             },
         }
 
+    def search(
+        self,
+        collection_name: str,
+        vectors: list[list[float]],
+        limit: int,
+        include_vectors: bool = False,
+    ) -> Optional[SearchResult]:
         result = self.client.search(
-            index=self._get_index_name(len(vectors[0])), body=query
+            index=self._get_index_name(len(vectors[0])),
+            body=self._get_search_body(
+                collection_name, vectors, limit, include_vectors
+            ),
         )
 
-        return self._result_to_search_result(result)
-
-    # Status: only tested halfwat
-    def query(
-        self, collection_name: str, filter: dict, limit: Optional[int] = None
-    ) -> Optional[GetResult]:
-        if not self.has_collection(collection_name):
-            return None
+        return self._result_to_search_result(result, include_vectors)
 
+    def _get_query_body(self, collection_name: str, filter: dict) -> dict:
         query_body = {
             "query": {"bool": {"filter": []}},
             "_source": ["text", "metadata"],
         }
 
         for field, value in filter.items():
-            query_body["query"]["bool"]["filter"].append({"term": {field: value}})
+            query_body["query"]["bool"]["filter"].append(
+                {"term": {f"metadata.{field}": value}}
+            )
         query_body["query"]["bool"]["filter"].append(
             {"term": {"collection": collection_name}}
         )
-        size = limit if limit else 10
+        return query_body
 
+    # Status: only tested halfwat
+    def query(
+        self, collection_name: str, filter: dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        if not self.has_collection(collection_name):
+            return None
+
+        query_body = self._get_query_body(collection_name, filter)
         try:
+            if limit is None:
+                # Every match, e.g. all chunks of a file
+                results = list(
+                    scan(self.client, index=f"{self.index_prefix}*", query=query_body)
+                )
+                return self._scan_result_to_get_result(results)
+
             result = self.client.search(
                 index=f"{self.index_prefix}*",
                 body=query_body,
-                size=size,
+                size=limit,
             )
 
             return self._result_to_get_result(result)
@@ -229,26 +271,28 @@ class ElasticsearchClient(VectorDBBase):
 
         return self._scan_result_to_get_result(results)
 
+    def _get_insert_actions(self, collection_name: str, items: list[VectorItem]):
+        return [
+            {
+                "_index": self._get_index_name(dimension=len(item["vector"])),
+                "_id": item["id"],
+                "_source": {
+                    "collection": collection_name,
+                    "vector": item["vector"],
+                    "text": item["text"],
+                    "metadata": item["metadata"],
+                },
+            }
+            for item in items
+        ]
+
     # Status: works
     def insert(self, collection_name: str, items: list[VectorItem]):
         if not self._has_index(dimension=len(items[0]["vector"])):
             self._create_index(dimension=len(items[0]["vector"]))
 
         for batch in self._create_batches(items):
-            actions = [
-                {
-                    "_index": self._get_index_name(dimension=len(items[0]["vector"])),
-                    "_id": item["id"],
-                    "_source": {
-                        "collection": collection_name,
-                        "vector": item["vector"],
-                        "text": item["text"],
-                        "metadata": item["metadata"],
-                    },
-                }
-                for item in batch
-            ]
-            bulk(self.client, actions)
+            bulk(self.client, self._get_insert_actions(collection_name, batch))
 
     # Upsert documents using the update API with doc_as_upsert=True.
     def upsert(self, collection_name: str, items: list[VectorItem]):
@@ -298,3 +342,72 @@ class ElasticsearchClient(VectorDBBase):
         indices = self.client.indices.get(index=f"{self.index_prefix}*")
         for index in indices:
             self.client.indices.delete(index=index)
+
+    async def search_async(
+        self,
+        collection_name: str,
+        vectors: list[list[float]],
+        limit: int,
+        include_vectors: bool = False,
+    ) -> Optional[SearchResult]:
+        result = await self._get_async_client().search(
+            index=self._get_index_name(len(vectors[0])),
+            body=self._get_search_body(
+                collection_name, vectors, limit, include_vectors
+            ),
+        )
+
+        return self._result_to_search_result(result, include_vectors)
+
+    async def query_async(
+        self, collection_name: str, filter: dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        client = self._get_async_client()
+        query_body = self._get_query_body(collection_name, filter)
+        try:
+            if limit is None:
+                results = [
+                    hit
+                    async for hit in async_scan(
+                        client, index=f"{self.index_prefix}*", query=query_body
+                    )
+                ]
+                return self._scan_result_to_get_result(results)
+
+            result = await client.search(
+                index=f"{self.index_prefix}*", body=query_body, size=limit
+            )
+            return self._result_to_get_result(result)
+        except Exception as e:
+            return None
+
+    async def get_async(self, collection_name: str) -> Optional[GetResult]:
+        query = {
+            "query": {"bool": {"filter": [{"term": {"collection": collection_name}}]}},
+            "_source": ["text", "metadata"],
+        }
+        results = [
+            hit
+            async for hit in async_scan(
+                self._get_async_client(), index=f"{self.index_prefix}*", query=query
+            )
+        ]
+
+        return self._scan_result_to_get_result(results)
+
+    async def insert_async(self, collection_name: str, items: list[VectorItem]):
+        client = self._get_async_client()
+        dimension = len(items[0]["vector"])
+        if not await client.indices.exists(index=self._get_index_name(dimension)):
+            await client.indices.create(
+                index=self._get_index_name(dimension),
+                body=self._get_index_body(dimension),
+            )
+
+        for batch in self._create_batches(items):
+            await async_bulk(client, self._get_insert_actions(collection_name, batch))
+
+    async def close_async(self):
+        if self.async_client is not None:
+            await self.async_client.close()
+            self.async_client = None
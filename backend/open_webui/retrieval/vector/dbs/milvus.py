@@ -1,5 +1,6 @@
 from pymilvus import MilvusClient as Client
 from pymilvus import FieldSchema, DataType
+import asyncio
 import json
 import logging
 from typing import Optional
@@ -8,6 +9,7 @@ from open_webui.retrieval.vector.main import (
     VectorItem,
     SearchResult,
     GetResult,
+    merge_search_results,
 )
 from open_webui.config import (
     MILVUS_URI,
@@ -56,16 +58,20 @@ class MilvusClient(VectorDBBase):
             }
         )
 
-    def _result_to_search_result(self, result) -> SearchResult:
+    def _result_to_search_result(
+        self, result, include_vectors: bool = False
+    ) -> SearchResult:
         ids = []
         distances = []
         documents = []
         metadatas = []
+        embeddings = []
         for match in result:
             _ids = []
             _distances = []
             _documents = []
             _metadatas = []
+            _embeddings = []
             for item in match:
                 _ids.append(item.get("id"))
                 # normalize milvus score from [-1, 1] to [0, 1] range
@@ -74,16 +80,19 @@ class MilvusClient(VectorDBBase):
                 _distances.append(_dist)
                 _documents.append(item.get("entity", {}).get("data", {}).get("text"))
                 _metadatas.append(item.get("entity", {}).get("metadata"))
+                _embeddings.append(item.get("entity", {}).get("vector"))
             ids.append(_ids)
             distances.append(_distances)
             documents.append(_documents)
             metadatas.append(_metadatas)
+            embeddings.append(_embeddings)
         return SearchResult(
             **{
                 "ids": ids,
                 "distances": distances,
                 "documents": documents,
                 "metadatas": metadatas,
+                "embeddings": embeddings if include_vectors else None,
             }
         )
 
@@ -169,7 +178,11 @@ class MilvusClient(VectorDBBase):
         )
 
     def search(
-        self, collection_name: str, vectors: list[list[float | int]], limit: int
+        self,
+        collection_name: str,
+        vectors: list[list[float | int]],
+        limit: int,
+        include_vectors: bool = False,
     ) -> Optional[SearchResult]:
         # Search for the nearest neighbor items based on the vectors and return 'limit' number of results.
         collection_name = collection_name.replace("-", "_")
@@ -180,10 +193,49 @@ class MilvusClient(VectorDBBase):
             collection_name=f"{self.collection_prefix}_{collection_name}",
             data=vectors,
             limit=limit,
-            output_fields=["data", "metadata"],
+            output_fields=["data", "metadata"]
+            + (["vector"] if include_vectors else []),
             # search_params=search_params # Potentially add later if needed
         )
-        return self._result_to_search_result(result)
+        return self._result_to_search_result(result, include_vectors)
+
+    def search_many(
+        self,
+        collection_names: list[str],
+        vectors: list[list[float | int]],
+        limit: int,
+    ) -> Optional[SearchResult]:
+        # Every collection is searched with all query vectors in one request
+        results = []
+        for collection_name in collection_names:
+            try:
+                results.append(self.search(collection_name, vectors, limit))
+            except Exception as e:
+                log.warning(f"Error searching collection {collection_name}: {e}")
+        return merge_search_results(results, len(vectors), limit)
+
+    async def search_many_async(
+        self,
+        collection_names: list[str],
+        vectors: list[list[float | int]],
+        limit: int,
+    ) -> Optional[SearchResult]:
+        async def search_collection(collection_name):
+            try:
+                return await asyncio.to_thread(
+                    self.search, collection_name, vectors, limit
+                )
+            except Exception as e:
+                log.warning(f"Error searching collection {collection_name}: {e}")
+                return None
+
+        results = await asyncio.gather(
+            *[
+                search_collection(collection_name)
+                for collection_name in collection_names
+            ]
+        )
+        return merge_search_results(results, len(vectors), limit)
 
     def query(self, collection_name: str, filter: dict, limit: Optional[int] = None):
         # Construct the filter string for querying
@@ -1,12 +1,14 @@
-from opensearchpy import OpenSearch
-from opensearchpy.helpers import bulk
+from opensearchpy import AsyncOpenSearch, OpenSearch
+from opensearchpy.helpers import async_bulk, bulk
 from typing import Optional
+import logging
 
 from open_webui.retrieval.vector.main import (
     VectorDBBase,
     VectorItem,
     SearchResult,
     GetResult,
+    merge_search_results,
 )
 from open_webui.config import (
     OPENSEARCH_URI,
@@ -15,17 +17,29 @@ from open_webui.config import (
     OPENSEARCH_USERNAME,
     OPENSEARCH_PASSWORD,
 )
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
 
 
 class OpenSearchClient(VectorDBBase):
     def __init__(self):
         self.index_prefix = "open_webui"
-        self.client = OpenSearch(
-            hosts=[OPENSEARCH_URI],
-            use_ssl=OPENSEARCH_SSL,
-            verify_certs=OPENSEARCH_CERT_VERIFY,
-            http_auth=(OPENSEARCH_USERNAME, OPENSEARCH_PASSWORD),
-        )
+        self.client_kwargs = {
+            "hosts": [OPENSEARCH_URI],
+            "use_ssl": OPENSEARCH_SSL,
+            "verify_certs": OPENSEARCH_CERT_VERIFY,
+            "http_auth": (OPENSEARCH_USERNAME, OPENSEARCH_PASSWORD),
+        }
+        self.client = OpenSearch(**self.client_kwargs)
+        self.async_client = None
+
+    def _get_async_client(self) -> AsyncOpenSearch:
+        # Created on first use, so its connection pool belongs to the event loop
+        if self.async_client is None:
+            self.async_client = AsyncOpenSearch(**self.client_kwargs)
+        return self.async_client
 
     def _get_index_name(self, collection_name: str) -> str:
         return f"{self.index_prefix}_{collection_name}"
@@ -45,7 +59,9 @@ class OpenSearchClient(VectorDBBase):
 
         return GetResult(ids=[ids], documents=[documents], metadatas=[metadatas])
 
-    def _result_to_search_result(self, result) -> SearchResult:
+    def _result_to_search_result(
+        self, result, include_vectors: bool = False
+    ) -> SearchResult:
         if not result["hits"]["hits"]:
             return None
 
@@ -53,22 +69,25 @@ class OpenSearchClient(VectorDBBase):
         distances = []
         documents = []
         metadatas = []
+        embeddings = []
 
         for hit in result["hits"]["hits"]:
             ids.append(hit["_id"])
             distances.append(hit["_score"])
             documents.append(hit["_source"].get("text"))
             metadatas.append(hit["_source"].get("metadata"))
+            embeddings.append(hit["_source"].get("vector"))
 
         return SearchResult(
             ids=[ids],
             distances=[distances],
             documents=[documents],
             metadatas=[metadatas],
+            embeddings=[embeddings] if include_vectors else None,
         )
 
-    def _create_index(self, collection_name: str, dimension: int):
-        body = {
+    def _get_index_body(self, dimension: int) -> dict:
+        return {
             "settings": {"index": {"knn": True}},
             "mappings": {
                 "properties": {
@@ -93,8 +112,11 @@ class OpenSearchClient(VectorDBBase):
                 }
             },
         }
+
+    def _create_index(self, collection_name: str, dimension: int):
         self.client.indices.create(
-            index=self._get_index_name(collection_name), body=body
+            index=self._get_index_name(collection_name),
+            body=self._get_index_body(dimension),
         )
 
     def _create_batches(self, items: list[VectorItem], batch_size=100):
@@ -111,45 +133,100 @@ class OpenSearchClient(VectorDBBase):
         # We are simply adapting to the norms of the other DBs.
         self.client.indices.delete(index=self._get_index_name(collection_name))
 
+    def _get_search_body(
+        self,
+        vectors: list[list[float | int]],
+        limit: int,
+        include_vectors: bool = False,
+    ) -> dict:
+        return {
+            "size": limit,
+            "_source": ["text", "metadata"] + (["vector"] if include_vectors else []),
+            "query": {
+                "script_score": {
+                    "query": {"match_all": {}},
+                    "script": {
+                        "source": "(cosineSimilarity(params.query_value, doc[params.field]) + 1.0) / 2.0",
+                        "params": {
+                            "field": "vector",
+                            "query_value": vectors[0],
+                        },  # Assuming single query vector
+                    },
+                }
+            },
+        }
+
     def search(
-        self, collection_name: str, vectors: list[list[float | int]], limit: int
+        self,
+        collection_name: str,
+        vectors: list[list[float | int]],
+        limit: int,
+        include_vectors: bool = False,
     ) -> Optional[SearchResult]:
         try:
             if not self.has_collection(collection_name):
                 return None
 
-            query = {
-                "size": limit,
-                "_source": ["text", "metadata"],
-                "query": {
-                    "script_score": {
-                        "query": {"match_all": {}},
-                        "script": {
-                            "source": "(cosineSimilarity(params.query_value, doc[params.field]) + 1.0) / 2.0",
-                            "params": {
-                                "field": "vector",
-                                "query_value": vectors[0],
-                            },  # Assuming single query vector
-                        },
-                    }
-                },
-            }
-
             result = self.client.search(
-                index=self._get_index_name(collection_name), body=query
+                index=self._get_index_name(collection_name),
+                body=self._get_search_body(vectors, limit, include_vectors),
             )
 
-            return self._result_to_search_result(result)
+            return self._result_to_search_result(result, include_vectors)
 
         except Exception as e:
             return None
 
-    def query(
-        self, collection_name: str, filter: dict, limit: Optional[int] = None
-    ) -> Optional[GetResult]:
-        if not self.has_collection(collection_name):
+    def _get_search_many_body(
+        self,
+        collection_names: list[str],
+        vectors: list[list[float | int]],
+        limit: int,
+    ) -> list[dict]:
+        # One search per query vector over the indices of all collections,
+        # so OpenSearch merges the top hits across them
+        header = {
+            "index": ",".join(
+                self._get_index_name(collection_name)
+                for collection_name in collection_names
+            ),
+            "ignore_unavailable": True,
+        }
+        body = []
+        for vector in vectors:
+            body.extend([header, self._get_search_body([vector], limit)])
+        return body
+
+    def _msearch_result_to_search_result(
+        self, result, num_vectors: int, limit: int
+    ) -> Optional[SearchResult]:
+        results = []
+        for idx, response in enumerate(result["responses"]):
+            if "error" in response:
+                log.warning(f"Error when searching collections: {response['error']}")
+                continue
+            results.append(
+                self._pad_search_result(
+                    self._result_to_search_result(response), idx, num_vectors
+                )
+            )
+        return merge_search_results(results, num_vectors, limit)
+
+    def search_many(
+        self,
+        collection_names: list[str],
+        vectors: list[list[float | int]],
+        limit: int,
+    ) -> Optional[SearchResult]:
+        if not collection_names or not vectors:
             return None
 
+        result = self.client.msearch(
+            body=self._get_search_many_body(collection_names, vectors, limit)
+        )
+        return self._msearch_result_to_search_result(result, len(vectors), limit)
+
+    def _get_query_body(self, filter: dict) -> dict:
         query_body = {
             "query": {"bool": {"filter": []}},
             "_source": ["text", "metadata"],
@@ -159,14 +236,19 @@ class OpenSearchClient(VectorDBBase):
             query_body["query"]["bool"]["filter"].append(
                 {"term": {"metadata." + str(field) + ".keyword": value}}
             )
+        return query_body
 
-        size = limit if limit else 10000
+    def query(
+        self, collection_name: str, filter: dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        if not self.has_collection(collection_name):
+            return None
 
         try:
             result = self.client.search(
                 index=self._get_index_name(collection_name),
-                body=query_body,
-                size=size,
+                body=self._get_query_body(filter),
+                size=limit if limit else 10000,
             )
 
             return self._result_to_get_result(result)
@@ -186,26 +268,28 @@ class OpenSearchClient(VectorDBBase):
         )
         return self._result_to_get_result(result)
 
+    def _get_insert_actions(self, collection_name: str, items: list[VectorItem]):
+        return [
+            {
+                "_op_type": "index",
+                "_index": self._get_index_name(collection_name),
+                "_id": item["id"],
+                "_source": {
+                    "vector": item["vector"],
+                    "text": item["text"],
+                    "metadata": item["metadata"],
+                },
+            }
+            for item in items
+        ]
+
     def insert(self, collection_name: str, items: list[VectorItem]):
         self._create_index_if_not_exists(
             collection_name=collection_name, dimension=len(items[0]["vector"])
         )
 
         for batch in self._create_batches(items):
-            actions = [
-                {
-                    "_op_type": "index",
-                    "_index": self._get_index_name(collection_name),
-                    "_id": item["id"],
-                    "_source": {
-                        "vector": item["vector"],
-                        "text": item["text"],
-                        "metadata": item["metadata"],
-                    },
-                }
-                for item in batch
-            ]
-            bulk(self.client, actions)
+            bulk(self.client, self._get_insert_actions(collection_name, batch))
         self.client.indices.refresh(self._get_index_name(collection_name))
 
     def upsert(self, collection_name: str, items: list[VectorItem]):
@@ -264,3 +348,85 @@ class OpenSearchClient(VectorDBBase):
         indices = self.client.indices.get(index=f"{self.index_prefix}_*")
         for index in indices:
             self.client.indices.delete(index=index)
+
+    async def search_async(
+        self,
+        collection_name: str,
+        vectors: list[list[float | int]],
+        limit: int,
+        include_vectors: bool = False,
+    ) -> Optional[SearchResult]:
+        client = self._get_async_client()
+        try:
+            if not await client.indices.exists(
+                index=self._get_index_name(collection_name)
+            ):
+                return None
+
+            result = await client.search(
+                index=self._get_index_name(collection_name),
+                body=self._get_search_body(vectors, limit, include_vectors),
+            )
+
+            return self._result_to_search_result(result, include_vectors)
+
+        except Exception as e:
+            return None
+
+    async def search_many_async(
+        self,
+        collection_names: list[str],
+        vectors: list[list[float | int]],
+        limit: int,
+    ) -> Optional[SearchResult]:
+        if not collection_names or not vectors:
+            return None
+
+        result = await self._get_async_client().msearch(
+            body=self._get_search_many_body(collection_names, vectors, limit)
+        )
+        return self._msearch_result_to_search_result(result, len(vectors), limit)
+
+    async def query_async(
+        self, collection_name: str, filter: dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        client = self._get_async_client()
+        if not await client.indices.exists(index=self._get_index_name(collection_name)):
+            return None
+
+        try:
+            result = await client.search(
+                index=self._get_index_name(collection_name),
+                body=self._get_query_body(filter),
+                size=limit if limit else 10000,
+            )
+
+            return self._result_to_get_result(result)
+
+        except Exception as e:
+            return None
+
+    async def get_async(self, collection_name: str) -> Optional[GetResult]:
+        query = {"query": {"match_all": {}}, "_source": ["text", "metadata"]}
+
+        result = await self._get_async_client().search(
+            index=self._get_index_name(collection_name), body=query
+        )
+        return self._result_to_get_result(result)
+
+    async def insert_async(self, collection_name: str, items: list[VectorItem]):
+        client = self._get_async_client()
+        index_name = self._get_index_name(collection_name)
+        if not await client.indices.exists(index=index_name):
+            await client.indices.create(
+                index=index_name, body=self._get_index_body(len(items[0]["vector"]))
+            )
+
+        for batch in self._create_batches(items):
+            await async_bulk(client, self._get_insert_actions(collection_name, batch))
+        await client.indices.refresh(index=index_name)
+
+    async def close_async(self):
+        if self.async_client is not None:
+            await self.async_client.close()
+            self.async_client = None
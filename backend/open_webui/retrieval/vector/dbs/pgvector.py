@@ -1,7 +1,13 @@
 from typing import Optional, List, Dict, Any
+import asyncio
+import hashlib
 import logging
+import math
 import json
+import shlex
+import ssl
 from sqlalchemy import (
+    Select,
     func,
     literal,
     cast,
@@ -15,6 +21,7 @@ from sqlalchemy import (
     text,
     Text,
     Table,
+    union_all,
     values,
 )
 from sqlalchemy.sql import true
@@ -25,6 +32,8 @@ from sqlalchemy.dialects.postgresql import JSONB, array
 from pgvector.sqlalchemy import Vector
 from sqlalchemy.ext.mutable import MutableDict
 from sqlalchemy.exc import NoSuchTableError
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 
 from open_webui.retrieval.vector.main import (
     VectorDBBase,
@@ -41,11 +50,21 @@ from open_webui.config import (
     PGVECTOR_POOL_MAX_OVERFLOW,
     PGVECTOR_POOL_TIMEOUT,
     PGVECTOR_POOL_RECYCLE,
+    PGVECTOR_INDEX_METHOD,
+    PGVECTOR_HNSW_M,
+    PGVECTOR_HNSW_EF_CONSTRUCTION,
+    PGVECTOR_HNSW_EF_SEARCH,
+    PGVECTOR_HNSW_ITERATIVE_SCAN,
+    PGVECTOR_IVFFLAT_LISTS,
+    PGVECTOR_IVFFLAT_PROBES,
+    PGVECTOR_COLLECTION_INDEX_MIN_ROWS,
 )
 
-from open_webui.env import SRC_LOG_LEVELS
+from open_webui.env import DATABASE_URL, SRC_LOG_LEVELS
 
 VECTOR_LENGTH = PGVECTOR_INITIALIZE_MAX_VECTOR_LENGTH
+VECTOR_INDEX_NAME = "idx_document_chunk_vector"
+COLLECTION_INDEX_PREFIX = "idx_document_chunk_vector_c_"
 Base = declarative_base()
 
 log = logging.getLogger(__name__)
@@ -75,12 +94,152 @@ class DocumentChunk(Base):
         vmetadata = Column(MutableDict.as_mutable(JSONB), nullable=True)
 
 
+def get_ivfflat_lists(rows: int) -> int:
+    if PGVECTOR_IVFFLAT_LISTS > 0:
+        return PGVECTOR_IVFFLAT_LISTS
+    # pgvector's recommendation: rows / 1000 up to 1M rows, sqrt(rows) above
+    if rows > 1_000_000:
+        return int(math.sqrt(rows))
+    return max(rows // 1000, 1)
+
+
+def get_collection_index_name(collection_name: str) -> str:
+    return (
+        COLLECTION_INDEX_PREFIX + hashlib.md5(collection_name.encode()).hexdigest()[:16]
+    )
+
+
+def get_vector_index_sql(
+    name: str,
+    rows: int,
+    collection_name: Optional[str] = None,
+    concurrently: bool = False,
+) -> Optional[str]:
+    if PGVECTOR_INDEX_METHOD == "hnsw":
+        method = (
+            "hnsw (vector vector_cosine_ops) "
+            f"WITH (m = {PGVECTOR_HNSW_M}, ef_construction = {PGVECTOR_HNSW_EF_CONSTRUCTION})"
+        )
+    elif PGVECTOR_INDEX_METHOD == "ivfflat":
+        method = (
+            "ivfflat (vector vector_cosine_ops) "
+            f"WITH (lists = {get_ivfflat_lists(rows)})"
+        )
+    else:
+        return None
+
+    sql = (
+        f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {name} "
+        f"ON document_chunk USING {method}"
+    )
+    if collection_name is not None:
+        # DDL can't take bind parameters
+        sql += " WHERE collection_name = '{}'".format(
+            collection_name.replace("'", "''")
+        )
+    return sql
+
+
+def get_asyncpg_url(url: URL) -> tuple[URL, dict]:
+    """
+    Turns a libpq URL (as used with psycopg2) into an asyncpg one. asyncpg
+    takes no libpq options in the URL, so the ones it has an equivalent for
+    are returned as arguments of asyncpg.connect, e.g. `sslmode=require`
+    becomes `ssl="require"`.
+    """
+    query = {
+        key: value[-1] if isinstance(value, tuple) else value
+        for key, value in url.query.items()
+    }
+    connect_args = {}
+    server_settings = {}
+
+    sslmode = query.pop("sslmode", None)
+    sslrootcert = query.pop("sslrootcert", None)
+    sslcert = query.pop("sslcert", None)
+    sslkey = query.pop("sslkey", None)
+    if sslmode != "disable" and (sslrootcert or sslcert):
+        context = ssl.create_default_context(cafile=sslrootcert)
+        context.check_hostname = sslmode == "verify-full"
+        if not sslrootcert and sslmode not in ("verify-ca", "verify-full"):
+            context.verify_mode = ssl.CERT_NONE
+        if sslcert:
+            context.load_cert_chain(sslcert, sslkey)
+        connect_args["ssl"] = context
+    elif sslmode:
+        connect_args["ssl"] = sslmode
+
+    if "connect_timeout" in query:
+        connect_args["timeout"] = float(query.pop("connect_timeout"))
+    if "target_session_attrs" in query:
+        connect_args["target_session_attrs"] = query.pop("target_session_attrs")
+    if "application_name" in query:
+        server_settings["application_name"] = query.pop("application_name")
+    if "options" in query:
+        # e.g. "-c search_path=vectors -c statement_timeout=5000"
+        args = iter(shlex.split(query.pop("options")))
+        for arg in args:
+            if arg == "-c":
+                arg = next(args, "")
+            elif arg.startswith("-c"):
+                arg = arg[2:]
+            else:
+                continue
+            key, _, value = arg.partition("=")
+            if key and value:
+                server_settings[key.replace("-", "_")] = value
+    if server_settings:
+        connect_args["server_settings"] = server_settings
+
+    if query:
+        log.warning(
+            f"Ignoring database URL options unsupported by asyncpg: {', '.join(query)}"
+        )
+
+    return url.set(drivername="postgresql+asyncpg", query={}), connect_args
+
+
+def create_async_vector_engine() -> Optional[AsyncEngine]:
+    """
+    Returns an asyncpg engine for the vector table, so RAG searches can run on
+    the event loop, or None when asyncpg isn't installed.
+    """
+    try:
+        import asyncpg  # noqa: F401
+    except ImportError:
+        log.info("asyncpg is not installed, async pgvector calls use threads")
+        return None
+
+    url, connect_args = get_asyncpg_url(make_url(PGVECTOR_DB_URL or DATABASE_URL))
+    if isinstance(PGVECTOR_POOL_SIZE, int):
+        if PGVECTOR_POOL_SIZE > 0:
+            return create_async_engine(
+                url,
+                connect_args=connect_args,
+                pool_size=PGVECTOR_POOL_SIZE,
+                max_overflow=PGVECTOR_POOL_MAX_OVERFLOW,
+                pool_timeout=PGVECTOR_POOL_TIMEOUT,
+                pool_recycle=PGVECTOR_POOL_RECYCLE,
+                pool_pre_ping=True,
+            )
+        return create_async_engine(
+            url, connect_args=connect_args, pool_pre_ping=True, poolclass=NullPool
+        )
+    return create_async_engine(url, connect_args=connect_args, pool_pre_ping=True)
+
+
 class PgvectorClient(VectorDBBase):
     def __init__(self) -> None:
 
+        if PGVECTOR_INDEX_METHOD not in ("hnsw", "ivfflat", "none"):
+            raise ValueError(
+                f"Unsupported PGVECTOR_INDEX_METHOD: '{PGVECTOR_INDEX_METHOD}'. "
+                "Supported methods: hnsw, ivfflat, none."
+            )
+
         # if no pgvector uri, use the existing database connection
         if not PGVECTOR_DB_URL:
-            from open_webui.internal.db import Session
+            from open_webui.internal.db import Session, engine
 
             self.session = Session
         else:
@@ -106,6 +265,7 @@ class PgvectorClient(VectorDBBase):
                 autocommit=False, autoflush=False, bind=engine, expire_on_commit=False
             )
             self.session = scoped_session(SessionLocal)
+        self.engine = engine
 
         try:
             # Ensure the pgvector extension is available
@@ -130,12 +290,7 @@ class PgvectorClient(VectorDBBase):
             Base.metadata.create_all(bind=connection)
 
             # Create an index on the vector column if it doesn't exist
-            self.session.execute(
-                text(
-                    "CREATE INDEX IF NOT EXISTS idx_document_chunk_vector "
-                    "ON document_chunk USING ivfflat (vector vector_cosine_ops) WITH (lists = 100);"
-                )
-            )
+            self.check_vector_index()
             self.session.execute(
                 text(
                     "CREATE INDEX IF NOT EXISTS idx_document_chunk_collection_name "
@@ -149,6 +304,12 @@ class PgvectorClient(VectorDBBase):
             log.exception(f"Error during initialization: {e}")
             raise
 
+        try:
+            self.async_engine = create_async_vector_engine()
+        except Exception as e:
+            log.warning(f"Could not create async pgvector engine: {e}")
+            self.async_engine = None
+
     def check_vector_length(self) -> None:
         """
         Check if the VECTOR_LENGTH matches the existing vector column dimension in the database.
@@ -184,6 +345,131 @@ class PgvectorClient(VectorDBBase):
                 "The 'vector' column does not exist in the 'document_chunk' table."
             )
 
+    def check_vector_index(self) -> None:
+        """
+        Creates the ANN index if it doesn't exist yet, or warns when the
+        existing one doesn't match the configured index settings.
+        """
+        indexdef = self.session.execute(
+            text("SELECT indexdef FROM pg_indexes WHERE indexname = :name"),
+            {"name": VECTOR_INDEX_NAME},
+        ).scalar()
+
+        if indexdef is None:
+            rows = 0
+            if PGVECTOR_INDEX_METHOD == "ivfflat":
+                rows = self.session.query(DocumentChunk).count()
+            sql = get_vector_index_sql(VECTOR_INDEX_NAME, rows)
+            if sql:
+                self.session.execute(text(sql))
+            return
+
+        expected = [f"USING {PGVECTOR_INDEX_METHOD} "]
+        if PGVECTOR_INDEX_METHOD == "hnsw":
+            expected += [
+                f"m='{PGVECTOR_HNSW_M}'",
+                f"ef_construction='{PGVECTOR_HNSW_EF_CONSTRUCTION}'",
+            ]
+        elif PGVECTOR_INDEX_METHOD == "ivfflat" and PGVECTOR_IVFFLAT_LISTS > 0:
+            expected.append(f"lists='{PGVECTOR_IVFFLAT_LISTS}'")
+
+        if not all(option in indexdef for option in expected):
+            log.warning(
+                f"The vector index doesn't match the configured settings ({indexdef}). "
+                "Run `open-webui rebuild-vector-index` to rebuild it."
+            )
+
+    def _replace_vector_index(
+        self,
+        connection,
+        name: str,
+        rows: int,
+        collection_name: Optional[str] = None,
+    ) -> None:
+        # Builds the new index next to the old one, so searches and writes
+        # continue while it is built
+        new_name = f"{name}_new"
+        connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {new_name}"))
+        sql = get_vector_index_sql(
+            new_name, rows, collection_name=collection_name, concurrently=True
+        )
+        if sql:
+            connection.execute(text(sql))
+        connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+        if sql:
+            connection.execute(text(f"ALTER INDEX {new_name} RENAME TO {name}"))
+
+    def rebuild_index(self) -> None:
+        """
+        Rebuilds the ANN index with the configured settings, and the partial
+        indexes of collections with at least PGVECTOR_COLLECTION_INDEX_MIN_ROWS
+        chunks.
+        """
+        with self.engine.connect().execution_options(
+            isolation_level="AUTOCOMMIT"
+        ) as connection:
+            rows = connection.execute(
+                select(func.count()).select_from(DocumentChunk)
+            ).scalar()
+            log.info(f"Rebuilding vector index for {rows} chunks")
+            self._replace_vector_index(connection, VECTOR_INDEX_NAME, rows)
+
+            collections = {}
+            if PGVECTOR_COLLECTION_INDEX_MIN_ROWS > 0:
+                collections = {
+                    get_collection_index_name(collection_name): (collection_name, count)
+                    for collection_name, count in connection.execute(
+                        select(DocumentChunk.collection_name, func.count())
+                        .group_by(DocumentChunk.collection_name)
+                        .having(func.count() >= PGVECTOR_COLLECTION_INDEX_MIN_ROWS)
+                    ).all()
+                }
+
+            existing = connection.execute(
+                text(
+                    "SELECT indexname FROM pg_indexes "
+                    "WHERE tablename = 'document_chunk' AND indexname LIKE :prefix"
+                ),
+                {"prefix": f"{COLLECTION_INDEX_PREFIX}%"},
+            ).scalars()
+            for name in set(existing) - set(collections):
+                connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+
+            for name, (collection_name, count) in collections.items():
+                log.info(f"Rebuilding vector index of collection '{collection_name}'")
+                self._replace_vector_index(
+                    connection, name, count, collection_name=collection_name
+                )
+
+            connection.execute(text("ANALYZE document_chunk"))
+        log.info("Vector index rebuild complete.")
+
+    def _get_search_settings_stmt(self, limit: Optional[int]) -> Optional[Select]:
+        # Transaction-local, so pooled connections keep their defaults
+        settings = {}
+        if PGVECTOR_INDEX_METHOD == "hnsw":
+            # HNSW returns at most ef_search rows
+            settings["hnsw.ef_search"] = min(
+                max(PGVECTOR_HNSW_EF_SEARCH, limit or 0), 1000
+            )
+            if PGVECTOR_HNSW_ITERATIVE_SCAN:
+                settings["hnsw.iterative_scan"] = PGVECTOR_HNSW_ITERATIVE_SCAN
+        elif PGVECTOR_INDEX_METHOD == "ivfflat":
+            settings["ivfflat.probes"] = PGVECTOR_IVFFLAT_PROBES
+        if PGVECTOR_COLLECTION_INDEX_MIN_ROWS > 0:
+            # Plan every search for its collection names, otherwise cached
+            # generic plans can't use the partial indexes
+            settings["plan_cache_mode"] = "force_custom_plan"
+
+        if not settings:
+            return None
+        return select(
+            *[
+                func.set_config(name, str(value), True)
+                for name, value in settings.items()
+            ]
+        )
+
     def adjust_vector_length(self, vector: List[float]) -> List[float]:
         # Adjust vector to have length VECTOR_LENGTH
         current_length = len(vector)
@@ -314,11 +600,119 @@ class PgvectorClient(VectorDBBase):
             log.exception(f"Error during upsert: {e}")
             raise
 
+    def _get_result_fields(self) -> list:
+        if PGVECTOR_PGCRYPTO:
+            return [
+                DocumentChunk.id,
+                pgcrypto_decrypt(DocumentChunk.text, PGVECTOR_PGCRYPTO_KEY, Text).label(
+                    "text"
+                ),
+                pgcrypto_decrypt(
+                    DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB
+                ).label("vmetadata"),
+            ]
+        return [DocumentChunk.id, DocumentChunk.text, DocumentChunk.vmetadata]
+
+    def _get_search_stmt(
+        self,
+        collection_names: List[str],
+        vectors: List[List[float]],
+        limit: Optional[int] = None,
+        include_vectors: bool = False,
+    ) -> Select:
+        def vector_expr(vector):
+            return cast(array(vector), Vector(VECTOR_LENGTH))
+
+        # Create the values for query vectors
+        qid_col = column("qid", Integer)
+        q_vector_col = column("q_vector", Vector(VECTOR_LENGTH))
+        query_vectors = (
+            values(qid_col, q_vector_col)
+            .data([(idx, vector_expr(vector)) for idx, vector in enumerate(vectors)])
+            .alias("query_vectors")
+        )
+
+        distance = DocumentChunk.vector.cosine_distance(query_vectors.c.q_vector)
+        result_fields = self._get_result_fields()
+        if include_vectors:
+            result_fields.append(DocumentChunk.vector)
+        result_fields.append(distance.label("distance"))
+
+        # One branch per collection, so each can use the collection's own
+        # partial index (or an exact scan for small collections)
+        branches = []
+        for collection_name in collection_names:
+            branch = (
+                select(*result_fields)
+                .where(DocumentChunk.collection_name == collection_name)
+                .order_by(distance)
+                .correlate(query_vectors)
+            )
+            if limit is not None:
+                branch = branch.limit(limit)
+            branches.append(branch)
+
+        # Build the lateral subquery for each query vector
+        if len(branches) == 1:
+            subq = branches[0]
+        else:
+            merged = union_all(*branches).subquery("collections")
+            subq = select(merged).order_by(merged.c.distance)
+            if limit is not None:
+                subq = subq.limit(limit)
+        subq = subq.lateral("result")
+
+        # Build the main query by joining query_vectors and the lateral subquery
+        return (
+            select(
+                query_vectors.c.qid,
+                subq.c.id,
+                subq.c.text,
+                subq.c.vmetadata,
+                *([subq.c.vector] if include_vectors else []),
+                subq.c.distance,
+            )
+            .select_from(query_vectors)
+            .join(subq, true())
+            .order_by(query_vectors.c.qid, subq.c.distance)
+        )
+
+    def _result_to_search_result(
+        self, results, num_queries: int, include_vectors: bool = False
+    ) -> SearchResult:
+        ids = [[] for _ in range(num_queries)]
+        distances = [[] for _ in range(num_queries)]
+        documents = [[] for _ in range(num_queries)]
+        metadatas = [[] for _ in range(num_queries)]
+        embeddings = [[] for _ in range(num_queries)]
+
+        for row in results:
+            qid = int(row.qid)
+            ids[qid].append(row.id)
+            # normalize and re-orders pgvec distance from [2, 0] to [0, 1] score range
+            # https://github.com/pgvector/pgvector?tab=readme-ov-file#querying
+            distances[qid].append((2.0 - row.distance) / 2.0)
+            documents[qid].append(row.text)
+            metadatas[qid].append(row.vmetadata)
+            if include_vectors:
+                embeddings[qid].append(
+                    row.vector.tolist() if hasattr(row.vector, "tolist") else row.vector
+                )
+
+        return SearchResult(
+            ids=ids,
+            distances=distances,
+            documents=documents,
+            metadatas=metadatas,
+            embeddings=embeddings if include_vectors else None,
+        )
+
     def search(
         self,
         collection_name: str,
         vectors: List[List[float]],
         limit: Optional[int] = None,
+        include_vectors: bool = False,
     ) -> Optional[SearchResult]:
         try:
             if not vectors:
@@ -326,157 +720,81 @@ class PgvectorClient(VectorDBBase):
 
             # Adjust query vectors to VECTOR_LENGTH
             vectors = [self.adjust_vector_length(vector) for vector in vectors]
-            num_queries = len(vectors)
-
-            def vector_expr(vector):
-                return cast(array(vector), Vector(VECTOR_LENGTH))
-
-            # Create the values for query vectors
-            qid_col = column("qid", Integer)
-            q_vector_col = column("q_vector", Vector(VECTOR_LENGTH))
-            query_vectors = (
-                values(qid_col, q_vector_col)
-                .data(
-                    [(idx, vector_expr(vector)) for idx, vector in enumerate(vectors)]
-                )
-                .alias("query_vectors")
-            )
 
-            result_fields = [
-                DocumentChunk.id,
-            ]
-            if PGVECTOR_PGCRYPTO:
-                result_fields.append(
-                    pgcrypto_decrypt(
-                        DocumentChunk.text, PGVECTOR_PGCRYPTO_KEY, Text
-                    ).label("text")
-                )
-                result_fields.append(
-                    pgcrypto_decrypt(
-                        DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB
-                    ).label("vmetadata")
-                )
-            else:
-                result_fields.append(DocumentChunk.text)
-                result_fields.append(DocumentChunk.vmetadata)
-            result_fields.append(
-                (DocumentChunk.vector.cosine_distance(query_vectors.c.q_vector)).label(
-                    "distance"
-                )
-            )
+            settings = self._get_search_settings_stmt(limit)
+            if settings is not None:
+                self.session.execute(settings)
 
-            # Build the lateral subquery for each query vector
-            subq = (
-                select(*result_fields)
-                .where(DocumentChunk.collection_name == collection_name)
-                .order_by(
-                    (DocumentChunk.vector.cosine_distance(query_vectors.c.q_vector))
-                )
-            )
-            if limit is not None:
-                subq = subq.limit(limit)
-            subq = subq.lateral("result")
-
-            # Build the main query by joining query_vectors and the lateral subquery
-            stmt = (
-                select(
-                    query_vectors.c.qid,
-                    subq.c.id,
-                    subq.c.text,
-                    subq.c.vmetadata,
-                    subq.c.distance,
-                )
-                .select_from(query_vectors)
-                .join(subq, true())
-                .order_by(query_vectors.c.qid, subq.c.distance)
+            stmt = self._get_search_stmt(
+                [collection_name], vectors, limit, include_vectors
             )
+            results = self.session.execute(stmt).all()
+            return self._result_to_search_result(results, len(vectors), include_vectors)
+        except Exception as e:
+            log.exception(f"Error during search: {e}")
+            return None
 
-            result_proxy = self.session.execute(stmt)
-            results = result_proxy.all()
+    def search_many(
+        self,
+        collection_names: List[str],
+        vectors: List[List[float]],
+        limit: int,
+    ) -> Optional[SearchResult]:
+        # A single statement: the top `limit` chunks of all collections for
+        # every query vector
+        try:
+            if not vectors or not collection_names:
+                return None
 
-            ids = [[] for _ in range(num_queries)]
-            distances = [[] for _ in range(num_queries)]
-            documents = [[] for _ in range(num_queries)]
-            metadatas = [[] for _ in range(num_queries)]
+            vectors = [self.adjust_vector_length(vector) for vector in vectors]
 
-            if not results:
-                return SearchResult(
-                    ids=ids,
-                    distances=distances,
-                    documents=documents,
-                    metadatas=metadatas,
-                )
+            settings = self._get_search_settings_stmt(limit)
+            if settings is not None:
+                self.session.execute(settings)
 
-            for row in results:
-                qid = int(row.qid)
-                ids[qid].append(row.id)
-                # normalize and re-orders pgvec distance from [2, 0] to [0, 1] score range
-                # https://github.com/pgvector/pgvector?tab=readme-ov-file#querying
-                distances[qid].append((2.0 - row.distance) / 2.0)
-                documents[qid].append(row.text)
-                metadatas[qid].append(row.vmetadata)
-
-            return SearchResult(
-                ids=ids, distances=distances, documents=documents, metadatas=metadatas
-            )
+            stmt = self._get_search_stmt(collection_names, vectors, limit)
+            results = self.session.execute(stmt).all()
+            return self._result_to_search_result(results, len(vectors))
         except Exception as e:
             log.exception(f"Error during search: {e}")
             return None
 
+    def _get_query_stmt(
+        self, collection_name: str, filter: Dict[str, Any], limit: Optional[int] = None
+    ) -> Select:
+        if PGVECTOR_PGCRYPTO:
+            # decrypt then check key: JSON filter after decryption
+            metadata = pgcrypto_decrypt(
+                DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB
+            )
+        else:
+            metadata = DocumentChunk.vmetadata
+
+        stmt = select(*self._get_result_fields()).where(
+            DocumentChunk.collection_name == collection_name,
+            *[metadata[key].astext == str(value) for key, value in filter.items()],
+        )
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return stmt
+
+    def _result_to_get_result(self, results) -> GetResult:
+        return GetResult(
+            ids=[[result.id for result in results]],
+            documents=[[result.text for result in results]],
+            metadatas=[[result.vmetadata for result in results]],
+        )
+
     def query(
         self, collection_name: str, filter: Dict[str, Any], limit: Optional[int] = None
     ) -> Optional[GetResult]:
         try:
-            if PGVECTOR_PGCRYPTO:
-                # Build where clause for vmetadata filter
-                where_clauses = [DocumentChunk.collection_name == collection_name]
-                for key, value in filter.items():
-                    # decrypt then check key: JSON filter after decryption
-                    where_clauses.append(
-                        pgcrypto_decrypt(
-                            DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB
-                        )[key].astext
-                        == str(value)
-                    )
-                stmt = select(
-                    DocumentChunk.id,
-                    pgcrypto_decrypt(
-                        DocumentChunk.text, PGVECTOR_PGCRYPTO_KEY, Text
-                    ).label("text"),
-                    pgcrypto_decrypt(
-                        DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB
-                    ).label("vmetadata"),
-                ).where(*where_clauses)
-                if limit is not None:
-                    stmt = stmt.limit(limit)
-                results = self.session.execute(stmt).all()
-            else:
-                query = self.session.query(DocumentChunk).filter(
-                    DocumentChunk.collection_name == collection_name
-                )
-
-                for key, value in filter.items():
-                    query = query.filter(
-                        DocumentChunk.vmetadata[key].astext == str(value)
-                    )
-
-                if limit is not None:
-                    query = query.limit(limit)
-
-                results = query.all()
-
+            stmt = self._get_query_stmt(collection_name, filter, limit)
+            results = self.session.execute(stmt).all()
             if not results:
                 return None
 
-            ids = [[result.id for result in results]]
-            documents = [[result.text for result in results]]
-            metadatas = [[result.vmetadata for result in results]]
-
-            return GetResult(
-                ids=ids,
-                documents=documents,
-                metadatas=metadatas,
-            )
+            return self._result_to_get_result(results)
         except Exception as e:
             log.exception(f"Error during query: {e}")
             return None
@@ -485,40 +803,12 @@ class PgvectorClient(VectorDBBase):
         self, collection_name: str, limit: Optional[int] = None
     ) -> Optional[GetResult]:
         try:
-            if PGVECTOR_PGCRYPTO:
-                stmt = select(
-                    DocumentChunk.id,
-                    pgcrypto_decrypt(
-                        DocumentChunk.text, PGVECTOR_PGCRYPTO_KEY, Text
-                    ).label("text"),
-                    pgcrypto_decrypt(
-                        DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB
-                    ).label("vmetadata"),
-                ).where(DocumentChunk.collection_name == collection_name)
-                if limit is not None:
-                    stmt = stmt.limit(limit)
-                results = self.session.execute(stmt).all()
-                ids = [[row.id for row in results]]
-                documents = [[row.text for row in results]]
-                metadatas = [[row.vmetadata for row in results]]
-            else:
-
-                query = self.session.query(DocumentChunk).filter(
-                    DocumentChunk.collection_name == collection_name
-                )
-                if limit is not None:
-                    query = query.limit(limit)
-
-                results = query.all()
-
-                if not results:
-                    return None
-
-                ids = [[result.id for result in results]]
-                documents = [[result.text for result in results]]
-                metadatas = [[result.vmetadata for result in results]]
+            stmt = self._get_query_stmt(collection_name, {}, limit)
+            results = self.session.execute(stmt).all()
+            if not results:
+                return None
 
-            return GetResult(ids=ids, documents=documents, metadatas=metadatas)
+            return self._result_to_get_result(results)
         except Exception as e:
             log.exception(f"Error during get: {e}")
             return None
@@ -594,4 +884,102 @@ class PgvectorClient(VectorDBBase):
 
     def delete_collection(self, collection_name: str) -> None:
         self.delete(collection_name)
+        if PGVECTOR_COLLECTION_INDEX_MIN_ROWS > 0:
+            with self.engine.connect().execution_options(
+                isolation_level="AUTOCOMMIT"
+            ) as connection:
+                connection.execute(
+                    text(
+                        "DROP INDEX CONCURRENTLY IF EXISTS "
+                        f"{get_collection_index_name(collection_name)}"
+                    )
+                )
         log.info(f"Collection '{collection_name}' deleted.")
+
+    async def search_async(
+        self,
+        collection_name: str,
+        vectors: List[List[float]],
+        limit: Optional[int] = None,
+        include_vectors: bool = False,
+    ) -> Optional[SearchResult]:
+        if self.async_engine is None:
+            return await super().search_async(
+                collection_name, vectors, limit, include_vectors
+            )
+
+        try:
+            if not vectors:
+                return None
+
+            vectors = [self.adjust_vector_length(vector) for vector in vectors]
+
+            settings = self._get_search_settings_stmt(limit)
+            stmt = self._get_search_stmt(
+                [collection_name], vectors, limit, include_vectors
+            )
+            async with self.async_engine.connect() as connection:
+                if settings is not None:
+                    await connection.execute(settings)
+                results = (await connection.execute(stmt)).all()
+            return self._result_to_search_result(results, len(vectors), include_vectors)
+        except Exception as e:
+            log.warning(f"Async search failed, searching in a thread instead: {e}")
+            return await super().search_async(
+                collection_name, vectors, limit, include_vectors
+            )
+
+    async def search_many_async(
+        self,
+        collection_names: List[str],
+        vectors: List[List[float]],
+        limit: int,
+    ) -> Optional[SearchResult]:
+        if self.async_engine is None:
+            return await asyncio.to_thread(
+                self.search_many, collection_names, vectors, limit
+            )
+
+        try:
+            if not vectors or not collection_names:
+                return None
+
+            vectors = [self.adjust_vector_length(vector) for vector in vectors]
+
+            settings = self._get_search_settings_stmt(limit)
+            stmt = self._get_search_stmt(collection_names, vectors, limit)
+            async with self.async_engine.connect() as connection:
+                if settings is not None:
+                    await connection.execute(settings)
+                results = (await connection.execute(stmt)).all()
+            return self._result_to_search_result(results, len(vectors))
+        except Exception as e:
+            log.warning(f"Async search failed, searching in a thread instead: {e}")
+            return await asyncio.to_thread(
+                self.search_many, collection_names, vectors, limit
+            )
+
+    async def query_async(
+        self, collection_name: str, filter: Dict[str, Any], limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        if self.async_engine is None:
+            return await super().query_async(collection_name, filter, limit)
+
+        try:
+            stmt = self._get_query_stmt(collection_name, filter, limit)
+            async with self.async_engine.connect() as connection:
+                results = (await connection.execute(stmt)).all()
+            if not results:
+                return None
+
+            return self._result_to_get_result(results)
+        except Exception as e:
+            log.warning(f"Async query failed, querying in a thread instead: {e}")
+            return await super().query_async(collection_name, filter, limit)
+
+    async def get_async(self, collection_name: str) -> Optional[GetResult]:
+        return await self.query_async(collection_name, {})
+
+    async def close_async(self) -> None:
+        if self.async_engine is not None:
+            await self.async_engine.dispose()
@@ -391,7 +391,11 @@ class PineconeClient(VectorDBBase):
         )
 
     def search(
-        self, collection_name: str, vectors: List[List[Union[float, int]]], limit: int
+        self,
+        collection_name: str,
+        vectors: List[List[Union[float, int]]],
+        limit: int,
+        include_vectors: bool = False,
     ) -> Optional[SearchResult]:
         """Search for similar vectors in a collection."""
         if not vectors or not vectors[0]:
@@ -414,6 +418,7 @@ class PineconeClient(VectorDBBase):
                 vector=query_vector,
                 top_k=limit,
                 include_metadata=True,
+                include_values=include_vectors,
                 filter={"collection_name": collection_name_with_prefix},
             )
 
@@ -443,6 +448,11 @@ class PineconeClient(VectorDBBase):
                 documents=get_result.documents,
                 metadatas=get_result.metadatas,
                 distances=distances,
+                embeddings=(
+                    [[getattr(match, "values", None) for match in matches]]
+                    if include_vectors
+                    else None
+                ),
             )
         except Exception as e:
             log.error(f"Error searching in '{collection_name_with_prefix}': {e}")
@@ -1,8 +1,9 @@
 from typing import Optional
+import asyncio
 import logging
 from urllib.parse import urlparse
 
-from qdrant_client import QdrantClient as Qclient
+from qdrant_client import AsyncQdrantClient, QdrantClient as Qclient
 from qdrant_client.http.models import PointStruct
 from qdrant_client.models import models
 
@@ -37,6 +38,8 @@ class QdrantClient(VectorDBBase):
         self.PREFER_GRPC = QDRANT_PREFER_GRPC
         self.GRPC_PORT = QDRANT_GRPC_PORT
 
+        self.async_client = None
+
         if not self.QDRANT_URI:
             self.client = None
             return
@@ -47,15 +50,25 @@ class QdrantClient(VectorDBBase):
         http_port = parsed.port or 6333  # default REST port
 
         if self.PREFER_GRPC:
-            self.client = Qclient(
-                host=host,
-                port=http_port,
-                grpc_port=self.GRPC_PORT,
-                prefer_grpc=self.PREFER_GRPC,
-                api_key=self.QDRANT_API_KEY,
-            )
+            self.client_kwargs = {
+                "host": host,
+                "port": http_port,
+                "grpc_port": self.GRPC_PORT,
+                "prefer_grpc": self.PREFER_GRPC,
+                "api_key": self.QDRANT_API_KEY,
+            }
         else:
-            self.client = Qclient(url=self.QDRANT_URI, api_key=self.QDRANT_API_KEY)
+            self.client_kwargs = {
+                "url": self.QDRANT_URI,
+                "api_key": self.QDRANT_API_KEY,
+            }
+        self.client = Qclient(**self.client_kwargs)
+
+    def _get_async_client(self) -> AsyncQdrantClient:
+        # Created on first use, so its connections belong to the event loop
+        if self.async_client is None:
+            self.async_client = AsyncQdrantClient(**self.client_kwargs)
+        return self.async_client
 
     def _result_to_get_result(self, points) -> GetResult:
         ids = []
@@ -76,6 +89,33 @@ class QdrantClient(VectorDBBase):
             }
         )
 
+    def _result_to_search_result(
+        self, query_response, include_vectors: bool = False
+    ) -> SearchResult:
+        get_result = self._result_to_get_result(query_response.points)
+        return SearchResult(
+            ids=get_result.ids,
+            documents=get_result.documents,
+            metadatas=get_result.metadatas,
+            # qdrant distance is [-1, 1], normalize to [0, 1]
+            distances=[[(point.score + 1.0) / 2.0 for point in query_response.points]],
+            embeddings=(
+                [[point.vector for point in query_response.points]]
+                if include_vectors
+                else None
+            ),
+        )
+
+    def _get_query_filter(self, filter: dict) -> models.Filter:
+        field_conditions = []
+        for key, value in filter.items():
+            field_conditions.append(
+                models.FieldCondition(
+                    key=f"metadata.{key}", match=models.MatchValue(value=value)
+                )
+            )
+        return models.Filter(should=field_conditions)
+
     def _create_collection(self, collection_name: str, dimension: int):
         collection_name_with_prefix = f"{self.collection_prefix}_{collection_name}"
         self.client.create_collection(
@@ -135,7 +175,11 @@ class QdrantClient(VectorDBBase):
         )
 
     def search(
-        self, collection_name: str, vectors: list[list[float | int]], limit: int
+        self,
+        collection_name: str,
+        vectors: list[list[float | int]],
+        limit: int,
+        include_vectors: bool = False,
     ) -> Optional[SearchResult]:
         # Search for the nearest neighbor items based on the vectors and return 'limit' number of results.
         if limit is None:
@@ -145,15 +189,9 @@ class QdrantClient(VectorDBBase):
             collection_name=f"{self.collection_prefix}_{collection_name}",
             query=vectors[0],
             limit=limit,
+            with_vectors=include_vectors,
         )
-        get_result = self._result_to_get_result(query_response.points)
-        return SearchResult(
-            ids=get_result.ids,
-            documents=get_result.documents,
-            metadatas=get_result.metadatas,
-            # qdrant distance is [-1, 1], normalize to [0, 1]
-            distances=[[(point.score + 1.0) / 2.0 for point in query_response.points]],
-        )
+        return self._result_to_search_result(query_response, include_vectors)
 
     def query(self, collection_name: str, filter: dict, limit: Optional[int] = None):
         # Construct the filter string for querying
@@ -163,17 +201,9 @@ class QdrantClient(VectorDBBase):
             if limit is None:
                 limit = NO_LIMIT  # otherwise qdrant would set limit to 10!
 
-            field_conditions = []
-            for key, value in filter.items():
-                field_conditions.append(
-                    models.FieldCondition(
-                        key=f"metadata.{key}", match=models.MatchValue(value=value)
-                    )
-                )
-
             points = self.client.query_points(
                 collection_name=f"{self.collection_prefix}_{collection_name}",
-                query_filter=models.Filter(should=field_conditions),
+                query_filter=self._get_query_filter(filter),
                 limit=limit,
             )
             return self._result_to_get_result(points.points)
@@ -208,17 +238,14 @@ class QdrantClient(VectorDBBase):
         filter: Optional[dict] = None,
     ):
         # Delete the items from the collection based on the ids.
-        field_conditions = []
-
         if ids:
-            for id_value in ids:
-                field_conditions.append(
-                    models.FieldCondition(
-                        key="metadata.id",
-                        match=models.MatchValue(value=id_value),
-                    ),
-                ),
-        elif filter:
+            return self.client.delete(
+                collection_name=f"{self.collection_prefix}_{collection_name}",
+                points_selector=models.PointIdsList(points=ids),
+            )
+
+        field_conditions = []
+        if filter:
             for key, value in filter.items():
                 field_conditions.append(
                     models.FieldCondition(
@@ -240,3 +267,69 @@ class QdrantClient(VectorDBBase):
         for collection_name in collection_names:
             if collection_name.name.startswith(self.collection_prefix):
                 self.client.delete_collection(collection_name=collection_name.name)
+
+    async def search_async(
+        self,
+        collection_name: str,
+        vectors: list[list[float | int]],
+        limit: int,
+        include_vectors: bool = False,
+    ) -> Optional[SearchResult]:
+        if limit is None:
+            limit = NO_LIMIT  # otherwise qdrant would set limit to 10!
+
+        query_response = await self._get_async_client().query_points(
+            collection_name=f"{self.collection_prefix}_{collection_name}",
+            query=vectors[0],
+            limit=limit,
+            with_vectors=include_vectors,
+        )
+        return self._result_to_search_result(query_response, include_vectors)
+
+    async def query_async(
+        self, collection_name: str, filter: dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        client = self._get_async_client()
+        if not await client.collection_exists(
+            f"{self.collection_prefix}_{collection_name}"
+        ):
+            return None
+        try:
+            if limit is None:
+                limit = NO_LIMIT  # otherwise qdrant would set limit to 10!
+
+            points = await client.query_points(
+                collection_name=f"{self.collection_prefix}_{collection_name}",
+                query_filter=self._get_query_filter(filter),
+                limit=limit,
+            )
+            return self._result_to_get_result(points.points)
+        except Exception as e:
+            log.exception(f"Error querying a collection '{collection_name}': {e}")
+            return None
+
+    async def get_async(self, collection_name: str) -> Optional[GetResult]:
+        points = await self._get_async_client().query_points(
+            collection_name=f"{self.collection_prefix}_{collection_name}",
+            limit=NO_LIMIT,  # otherwise qdrant would set limit to 10!
+        )
+        return self._result_to_get_result(points.points)
+
+    async def insert_async(self, collection_name: str, items: list[VectorItem]):
+        client = self._get_async_client()
+        if not await client.collection_exists(
+            f"{self.collection_prefix}_{collection_name}"
+        ):
+            await asyncio.to_thread(
+                self._create_collection_if_not_exists,
+                collection_name,
+                len(items[0]["vector"]),
+            )
+        await client.upsert(
+            f"{self.collection_prefix}_{collection_name}", self._create_points(items)
+        )
+
+    async def close_async(self):
+        if self.async_client is not None:
+            await self.async_client.close()
+            self.async_client = None
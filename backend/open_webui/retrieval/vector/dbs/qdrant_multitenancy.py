@@ -1,4 +1,6 @@
+import asyncio
 import logging
+from collections import defaultdict
 from typing import Optional, Tuple, List, Dict, Any
 from urllib.parse import urlparse
 
@@ -17,8 +19,9 @@ from open_webui.retrieval.vector.main import (
     SearchResult,
     VectorDBBase,
     VectorItem,
+    merge_search_results,
 )
-from qdrant_client import QdrantClient as Qclient
+from qdrant_client import AsyncQdrantClient, QdrantClient as Qclient
 from qdrant_client.http.exceptions import UnexpectedResponse
 from qdrant_client.http.models import PointStruct
 from qdrant_client.models import models
@@ -62,17 +65,19 @@ class QdrantClient(VectorDBBase):
         host = parsed.hostname or self.QDRANT_URI
         http_port = parsed.port or 6333  # default REST port
 
-        self.client = (
-            Qclient(
-                host=host,
-                port=http_port,
-                grpc_port=self.GRPC_PORT,
-                prefer_grpc=self.PREFER_GRPC,
-                api_key=self.QDRANT_API_KEY,
-            )
+        self.client_kwargs = (
+            {
+                "host": host,
+                "port": http_port,
+                "grpc_port": self.GRPC_PORT,
+                "prefer_grpc": self.PREFER_GRPC,
+                "api_key": self.QDRANT_API_KEY,
+            }
             if self.PREFER_GRPC
-            else Qclient(url=self.QDRANT_URI, api_key=self.QDRANT_API_KEY)
+            else {"url": self.QDRANT_URI, "api_key": self.QDRANT_API_KEY}
         )
+        self.client = Qclient(**self.client_kwargs)
+        self.async_client = None
 
         # Main collection types for multi-tenancy
         self.MEMORY_COLLECTION = f"{self.collection_prefix}_memories"
@@ -90,6 +95,30 @@ class QdrantClient(VectorDBBase):
             metadatas.append(payload["metadata"])
         return GetResult(ids=[ids], documents=[documents], metadatas=[metadatas])
 
+    def _result_to_search_result(
+        self, query_response, include_vectors: bool = False
+    ) -> SearchResult:
+        get_result = self._result_to_get_result(query_response.points)
+        return SearchResult(
+            ids=get_result.ids,
+            documents=get_result.documents,
+            metadatas=get_result.metadatas,
+            distances=[[(point.score + 1.0) / 2.0 for point in query_response.points]],
+            embeddings=(
+                [[point.vector for point in query_response.points]]
+                if include_vectors
+                else None
+            ),
+        )
+
+    def _get_async_client(self) -> AsyncQdrantClient:
+        """
+        Created on first use, so its connections belong to the event loop.
+        """
+        if self.async_client is None:
+            self.async_client = AsyncQdrantClient(**self.client_kwargs)
+        return self.async_client
+
     def _get_collection_and_tenant_id(self, collection_name: str) -> Tuple[str, str]:
         """
         Maps the traditional collection name to multi-tenant collection and tenant ID.
@@ -222,7 +251,7 @@ class QdrantClient(VectorDBBase):
         must_conditions = [_tenant_filter(tenant_id)]
         should_conditions = []
         if ids:
-            should_conditions = [_metadata_filter("id", id_value) for id_value in ids]
+            must_conditions.append(models.HasIdCondition(has_id=ids))
         elif filter:
             must_conditions += [_metadata_filter(k, v) for k, v in filter.items()]
 
@@ -234,7 +263,11 @@ class QdrantClient(VectorDBBase):
         )
 
     def search(
-        self, collection_name: str, vectors: List[List[float | int]], limit: int
+        self,
+        collection_name: str,
+        vectors: List[List[float | int]],
+        limit: int,
+        include_vectors: bool = False,
     ) -> Optional[SearchResult]:
         """
         Search for the nearest neighbor items based on the vectors with tenant isolation.
@@ -252,14 +285,83 @@ class QdrantClient(VectorDBBase):
             query=vectors[0],
             limit=limit,
             query_filter=models.Filter(must=[tenant_filter]),
+            with_vectors=include_vectors,
         )
-        get_result = self._result_to_get_result(query_response.points)
-        return SearchResult(
-            ids=get_result.ids,
-            documents=get_result.documents,
-            metadatas=get_result.metadatas,
-            distances=[[(point.score + 1.0) / 2.0 for point in query_response.points]],
-        )
+        return self._result_to_search_result(query_response, include_vectors)
+
+    def _get_search_requests(
+        self,
+        collection_names: List[str],
+        vectors: List[List[float | int]],
+        limit: int,
+    ) -> Dict[str, List[models.QueryRequest]]:
+        """
+        Groups the collections by multi-tenant collection, with one request
+        per query vector that searches all of their tenants at once.
+        """
+        tenant_ids = defaultdict(list)
+        for collection_name in collection_names:
+            mt_collection, tenant_id = self._get_collection_and_tenant_id(
+                collection_name
+            )
+            tenant_ids[mt_collection].append(tenant_id)
+
+        return {
+            mt_collection: [
+                models.QueryRequest(
+                    query=vector,
+                    limit=limit,
+                    filter=models.Filter(
+                        must=[
+                            models.FieldCondition(
+                                key=TENANT_ID_FIELD,
+                                match=models.MatchAny(any=ids),
+                            )
+                        ]
+                    ),
+                    with_payload=True,
+                )
+                for vector in vectors
+            ]
+            for mt_collection, ids in tenant_ids.items()
+        }
+
+    def _batch_result_to_search_results(
+        self, responses, num_vectors: int
+    ) -> List[SearchResult]:
+        return [
+            self._pad_search_result(
+                self._result_to_search_result(response), idx, num_vectors
+            )
+            for idx, response in enumerate(responses)
+        ]
+
+    def search_many(
+        self,
+        collection_names: List[str],
+        vectors: List[List[float | int]],
+        limit: int,
+    ) -> Optional[SearchResult]:
+        """
+        Search several collections with one batch request per multi-tenant
+        collection; Qdrant returns the best hits across the tenants.
+        """
+        if not self.client or not vectors or not collection_names:
+            return None
+
+        results = []
+        for mt_collection, requests in self._get_search_requests(
+            collection_names, vectors, limit
+        ).items():
+            if not self.client.collection_exists(collection_name=mt_collection):
+                continue
+            responses = self.client.query_batch_points(
+                collection_name=mt_collection, requests=requests
+            )
+            results.extend(
+                self._batch_result_to_search_results(responses, len(vectors))
+            )
+        return merge_search_results(results, len(vectors), limit)
 
     def query(
         self, collection_name: str, filter: Dict[str, Any], limit: Optional[int] = None
@@ -348,3 +450,131 @@ class QdrantClient(VectorDBBase):
                 filter=models.Filter(must=[_tenant_filter(tenant_id)])
             ),
         )
+
+    async def search_async(
+        self,
+        collection_name: str,
+        vectors: List[List[float | int]],
+        limit: int,
+        include_vectors: bool = False,
+    ) -> Optional[SearchResult]:
+        """
+        Async variant of search.
+        """
+        if not self.client or not vectors:
+            return None
+        client = self._get_async_client()
+        mt_collection, tenant_id = self._get_collection_and_tenant_id(collection_name)
+        if not await client.collection_exists(collection_name=mt_collection):
+            log.debug(f"Collection {mt_collection} doesn't exist, search returns None")
+            return None
+
+        query_response = await client.query_points(
+            collection_name=mt_collection,
+            query=vectors[0],
+            limit=limit,
+            query_filter=models.Filter(must=[_tenant_filter(tenant_id)]),
+            with_vectors=include_vectors,
+        )
+        return self._result_to_search_result(query_response, include_vectors)
+
+    async def search_many_async(
+        self,
+        collection_names: List[str],
+        vectors: List[List[float | int]],
+        limit: int,
+    ) -> Optional[SearchResult]:
+        """
+        Async variant of search_many.
+        """
+        if not self.client or not vectors or not collection_names:
+            return None
+        client = self._get_async_client()
+
+        async def search_collection(mt_collection, requests):
+            if not await client.collection_exists(collection_name=mt_collection):
+                return []
+            responses = await client.query_batch_points(
+                collection_name=mt_collection, requests=requests
+            )
+            return self._batch_result_to_search_results(responses, len(vectors))
+
+        results = await asyncio.gather(
+            *[
+                search_collection(mt_collection, requests)
+                for mt_collection, requests in self._get_search_requests(
+                    collection_names, vectors, limit
+                ).items()
+            ]
+        )
+        return merge_search_results(
+            [result for result_list in results for result in result_list],
+            len(vectors),
+            limit,
+        )
+
+    async def query_async(
+        self, collection_name: str, filter: Dict[str, Any], limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        """
+        Async variant of query.
+        """
+        if not self.client:
+            return None
+        client = self._get_async_client()
+        mt_collection, tenant_id = self._get_collection_and_tenant_id(collection_name)
+        if not await client.collection_exists(collection_name=mt_collection):
+            log.debug(f"Collection {mt_collection} doesn't exist, query returns None")
+            return None
+        if limit is None:
+            limit = NO_LIMIT
+        field_conditions = [_metadata_filter(k, v) for k, v in filter.items()]
+        points = await client.query_points(
+            collection_name=mt_collection,
+            query_filter=models.Filter(
+                must=[_tenant_filter(tenant_id), *field_conditions]
+            ),
+            limit=limit,
+        )
+        return self._result_to_get_result(points.points)
+
+    async def get_async(self, collection_name: str) -> Optional[GetResult]:
+        """
+        Async variant of get.
+        """
+        if not self.client:
+            return None
+        client = self._get_async_client()
+        mt_collection, tenant_id = self._get_collection_and_tenant_id(collection_name)
+        if not await client.collection_exists(collection_name=mt_collection):
+            log.debug(f"Collection {mt_collection} doesn't exist, get returns None")
+            return None
+        points = await client.query_points(
+            collection_name=mt_collection,
+            query_filter=models.Filter(must=[_tenant_filter(tenant_id)]),
+            limit=NO_LIMIT,
+        )
+        return self._result_to_get_result(points.points)
+
+    async def insert_async(self, collection_name: str, items: List[VectorItem]):
+        """
+        Async variant of insert.
+        """
+        if not self.client or not items:
+            return None
+        client = self._get_async_client()
+        mt_collection, tenant_id = self._get_collection_and_tenant_id(collection_name)
+        if not await client.collection_exists(collection_name=mt_collection):
+            await asyncio.to_thread(
+                self._ensure_collection, mt_collection, len(items[0]["vector"])
+            )
+        await client.upsert(mt_collection, self._create_points(items, tenant_id))
+        return None
+
+    async def close_async(self):
+        """
+        Close the async client's connections.
+        """
+        if self.async_client is not None:
+            await self.async_client.close()
+            self.async_client = None
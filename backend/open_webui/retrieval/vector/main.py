@@ -1,7 +1,15 @@
-from pydantic import BaseModel
+import asyncio
+import logging
+
+from pydantic import BaseModel, Field
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List, Optional, Union
 
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
 
 class VectorItem(BaseModel):
     id: str
@@ -18,6 +26,54 @@ class GetResult(BaseModel):
 
 class SearchResult(GetResult):
     distances: Optional[List[List[float | int]]]
+    # Stored vectors of the hits, so callers can re-score them without
+    # embedding the documents again. Not serialized in API responses.
+    embeddings: Optional[List[List[Optional[List[float | int]]]]] = Field(
+        default=None, exclude=True
+    )
+
+
+def merge_search_results(
+    results: List[Optional[SearchResult]], num_vectors: int, limit: int
+) -> Optional[SearchResult]:
+    """
+    Merges the results of searching several collections with the same query
+    vectors into the best `limit` hits per query vector.
+    """
+    results = [result for result in results if result is not None]
+    if not results:
+        return None
+
+    merged = SearchResult(
+        ids=[], distances=[], documents=[], metadatas=[], embeddings=[]
+    )
+    for idx in range(num_vectors):
+        hits = []
+        for result in results:
+            if idx >= len(result.ids or []):
+                continue
+            embeddings = (
+                result.embeddings[idx]
+                if result.embeddings and idx < len(result.embeddings)
+                else [None] * len(result.ids[idx])
+            )
+            hits.extend(
+                zip(
+                    result.distances[idx],
+                    result.ids[idx],
+                    result.documents[idx],
+                    result.metadatas[idx],
+                    embeddings,
+                )
+            )
+
+        hits = sorted(hits, key=lambda hit: hit[0], reverse=True)[:limit]
+        merged.distances.append([hit[0] for hit in hits])
+        merged.ids.append([hit[1] for hit in hits])
+        merged.documents.append([hit[2] for hit in hits])
+        merged.metadatas.append([hit[3] for hit in hits])
+        merged.embeddings.append([hit[4] for hit in hits])
+    return merged
 
 
 class VectorDBBase(ABC):
@@ -29,6 +85,15 @@ class VectorDBBase(ABC):
 
     Any custom vector database integration must inherit from this class and
     implement all abstract methods.
+
+    `search_many` searches several collections at once and returns the best
+    hits per query vector across all of them. Backends that can do this in a
+    single request override it; the default searches each collection and
+    vector separately and merges the results.
+
+    The `*_async` methods are used from the event loop (e.g. for RAG during
+    chat completions). Backends with an async client override them; the
+    defaults run the synchronous method on a worker thread.
     """
 
     @abstractmethod
@@ -53,11 +118,65 @@ class VectorDBBase(ABC):
 
     @abstractmethod
     def search(
-        self, collection_name: str, vectors: List[List[Union[float, int]]], limit: int
+        self,
+        collection_name: str,
+        vectors: List[List[Union[float, int]]],
+        limit: int,
+        include_vectors: bool = False,
     ) -> Optional[SearchResult]:
-        """Search for similar vectors in a collection."""
+        """
+        Search for similar vectors in a collection.
+
+        With `include_vectors`, backends also return the stored vector of
+        each hit in SearchResult.embeddings when it is available.
+        """
         pass
 
+    def search_many(
+        self,
+        collection_names: List[str],
+        vectors: List[List[Union[float, int]]],
+        limit: int,
+    ) -> Optional[SearchResult]:
+        """Search several collections, keeping the best `limit` hits per vector."""
+        results = []
+        error = None
+        for collection_name in collection_names:
+            for idx, vector in enumerate(vectors):
+                try:
+                    result = self.search(collection_name, [vector], limit)
+                except Exception as e:
+                    log.warning(f"Error when searching a collection: {e}")
+                    error = e
+                    continue
+                results.append(self._pad_search_result(result, idx, len(vectors)))
+
+        if error and not results:
+            raise error
+        return merge_search_results(results, len(vectors), limit)
+
+    def _pad_search_result(
+        self, result: Optional[SearchResult], idx: int, num_vectors: int
+    ) -> Optional[SearchResult]:
+        # Moves the single row of a one-vector search to row `idx`
+        if result is None or not result.ids:
+            return None
+
+        def pad(rows):
+            return (
+                [[] for _ in range(idx)]
+                + rows[:1]
+                + [[] for _ in range(num_vectors - idx - 1)]
+            )
+
+        return SearchResult(
+            ids=pad(result.ids),
+            distances=pad(result.distances),
+            documents=pad(result.documents),
+            metadatas=pad(result.metadatas),
+            embeddings=pad(result.embeddings) if result.embeddings else None,
+        )
+
     @abstractmethod
     def query(
         self, collection_name: str, filter: Dict, limit: Optional[int] = None
@@ -84,3 +203,71 @@ class VectorDBBase(ABC):
     def reset(self) -> None:
         """Reset the vector database by removing all collections or those matching a condition."""
         pass
+
+    def rebuild_index(self) -> None:
+        """Rebuild the ANN indexes, for backends that manage them."""
+        raise NotImplementedError(
+            f"{type(self).__name__} doesn't support rebuilding its indexes"
+        )
+
+    async def search_async(
+        self,
+        collection_name: str,
+        vectors: List[List[Union[float, int]]],
+        limit: int,
+        include_vectors: bool = False,
+    ) -> Optional[SearchResult]:
+        """Async variant of search."""
+        return await asyncio.to_thread(
+            self.search, collection_name, vectors, limit, include_vectors
+        )
+
+    async def search_many_async(
+        self,
+        collection_names: List[str],
+        vectors: List[List[Union[float, int]]],
+        limit: int,
+    ) -> Optional[SearchResult]:
+        """Async variant of search_many."""
+        results = await asyncio.gather(
+            *[
+                self.search_async(collection_name, [vector], limit)
+                for collection_name in collection_names
+                for vector in vectors
+            ],
+            return_exceptions=True,
+        )
+
+        errors = [result for result in results if isinstance(result, Exception)]
+        for error in errors:
+            log.warning(f"Error when searching a collection: {error}")
+        if errors and len(errors) == len(results):
+            raise errors[0]
+
+        return merge_search_results(
+            [
+                self._pad_search_result(result, idx % len(vectors), len(vectors))
+                for idx, result in enumerate(results)
+                if not isinstance(result, Exception)
+            ],
+            len(vectors),
+            limit,
+        )
+
+    async def query_async(
+        self, collection_name: str, filter: Dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        """Async variant of query."""
+        return await asyncio.to_thread(self.query, collection_name, filter, limit)
+
+    async def get_async(self, collection_name: str) -> Optional[GetResult]:
+        """Async variant of get."""
+        return await asyncio.to_thread(self.get, collection_name)
+
+    async def insert_async(self, collection_name: str, items: List[VectorItem]) -> None:
+        """Async variant of insert."""
+        return await asyncio.to_thread(self.insert, collection_name, items)
+
+    async def close_async(self) -> None:
+        """Closes the connections of the async client, if the backend has one."""
+        pass
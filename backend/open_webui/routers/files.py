@@ -20,7 +20,7 @@ from fastapi import (
 )
 from fastapi.responses import FileResponse, StreamingResponse
 from open_webui.constants import ERROR_MESSAGES
-from open_webui.env import SRC_LOG_LEVELS
+from open_webui.env import ENABLE_FILE_INGESTION_QUEUE, SRC_LOG_LEVELS
 
 from open_webui.models.users import Users
 from open_webui.models.files import (
@@ -30,12 +30,20 @@ from open_webui.models.files import (
     Files,
 )
 from open_webui.models.knowledge import Knowledges
+from open_webui.models.jobs import JOB_STATUS_RUNNING, JobModel, JobResponse, Jobs
 
 from open_webui.routers.knowledge import get_knowledge, get_knowledge_list
 from open_webui.routers.retrieval import ProcessFileForm, process_file
 from open_webui.routers.audio import transcribe
 from open_webui.storage.provider import Storage
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.jobs import (
+    JobContext,
+    JobFailed,
+    cancel_job,
+    enqueue_job,
+    register_job_handler,
+)
 from pydantic import BaseModel
 
 log = logging.getLogger(__name__)
@@ -77,6 +85,103 @@ def has_access_to_file(
     return has_access
 
 
+############################
+# Process Uploaded File
+############################
+
+FILE_INGESTION_JOB = "file_ingestion"
+
+FILE_STATUS_PENDING = "pending"
+
+# process_file reports every error as a 400, these won't go away on a retry
+FILE_INGESTION_PERMANENT_ERRORS = {
+    ERROR_MESSAGES.DUPLICATE_CONTENT,
+    ERROR_MESSAGES.EMPTY_CONTENT,
+    ERROR_MESSAGES.PANDOC_NOT_INSTALLED,
+}
+
+
+def is_transcribable(request: Request, content_type: Optional[str]) -> bool:
+    if not content_type:
+        return False
+
+    stt_supported_content_types = getattr(
+        request.app.state.config, "STT_SUPPORTED_CONTENT_TYPES", []
+    )
+
+    return any(
+        fnmatch(content_type, supported_content_type)
+        for supported_content_type in (
+            stt_supported_content_types
+            if stt_supported_content_types
+            and any(t.strip() for t in stt_supported_content_types)
+            else ["audio/*", "video/webm"]
+        )
+    )
+
+
+def should_process_file(request: Request, content_type: Optional[str]) -> bool:
+    return (
+        not content_type
+        or is_transcribable(request, content_type)
+        or not content_type.startswith(("image/", "video/"))
+        or request.app.state.config.CONTENT_EXTRACTION_ENGINE == "external"
+    )
+
+
+def process_uploaded_file(
+    request: Request, file: FileModel, file_metadata: dict, user, context=None
+):
+    content_type = file.meta.get("content_type") if file.meta else None
+
+    if is_transcribable(request, content_type):
+        file_path = Storage.get_file(file.path)
+        result = transcribe(request, file_path, file_metadata)
+
+        if context:
+            context.check_cancelled()
+
+        process_file(
+            request,
+            ProcessFileForm(file_id=file.id, content=result.get("text", "")),
+            user=user,
+        )
+    else:
+        if not content_type:
+            log.info(
+                f"File type {content_type} is not provided, but trying to process anyway"
+            )
+        process_file(request, ProcessFileForm(file_id=file.id), user=user)
+
+
+def finish_file_ingestion_job(job: JobModel):
+    data = {"status": job.status}
+    if job.error:
+        data["error"] = job.error
+    Files.update_file_data_by_id(job.item_id, data)
+
+
+@register_job_handler(FILE_INGESTION_JOB, on_finish=finish_file_ingestion_job)
+def run_file_ingestion_job(request: Request, job: JobModel, context: JobContext):
+    file = Files.get_file_by_id(job.item_id)
+    if not file:
+        raise JobFailed(ERROR_MESSAGES.NOT_FOUND)
+
+    user = Users.get_user_by_id(job.user_id)
+    if not user:
+        raise JobFailed(ERROR_MESSAGES.NOT_FOUND)
+
+    Files.update_file_data_by_id(file.id, {"status": JOB_STATUS_RUNNING})
+    try:
+        process_uploaded_file(
+            request, file, (job.payload or {}).get("metadata", {}), user, context
+        )
+    except HTTPException as e:
+        if e.detail in FILE_INGESTION_PERMANENT_ERRORS:
+            raise JobFailed(e.detail)
+        raise
+
+
 ############################
 # Upload File
 ############################
@@ -88,6 +193,7 @@ def upload_file(
     file: UploadFile = File(...),
     metadata: Optional[dict | str] = Form(None),
     process: bool = Query(True),
+    process_in_background: bool = Query(False),
     internal: bool = False,
     user=Depends(get_verified_user),
 ):
@@ -134,7 +240,7 @@ def upload_file(
             "OpenWebUI-User-Name": user.name,
             "OpenWebUI-File-Id": id,
         }
-        contents, file_path = Storage.upload_file(file.file, filename, tags)
+        stored_file, file_path = Storage.upload_file(file.file, filename, tags)
 
         file_item = Files.insert_new_file(
             user.id,
@@ -146,56 +252,38 @@ def upload_file(
                     "meta": {
                         "name": name,
                         "content_type": file.content_type,
-                        "size": len(contents),
+                        "size": stored_file.size,
+                        "sha256": stored_file.sha256,
                         "data": file_metadata,
                     },
                 }
             ),
         )
-        if process:
-            try:
-                if file.content_type:
-                    stt_supported_content_types = getattr(
-                        request.app.state.config, "STT_SUPPORTED_CONTENT_TYPES", []
-                    )
-
-                    if any(
-                        fnmatch(file.content_type, content_type)
-                        for content_type in (
-                            stt_supported_content_types
-                            if stt_supported_content_types
-                            and any(t.strip() for t in stt_supported_content_types)
-                            else ["audio/*", "video/webm"]
-                        )
-                    ):
-                        file_path = Storage.get_file(file_path)
-                        result = transcribe(request, file_path, file_metadata)
-
-                        process_file(
-                            request,
-                            ProcessFileForm(file_id=id, content=result.get("text", "")),
-                            user=user,
-                        )
-                    elif (not file.content_type.startswith(("image/", "video/"))) or (
-                        request.app.state.config.CONTENT_EXTRACTION_ENGINE == "external"
-                    ):
-                        process_file(request, ProcessFileForm(file_id=id), user=user)
-                else:
-                    log.info(
-                        f"File type {file.content_type} is not provided, but trying to process anyway"
-                    )
-                    process_file(request, ProcessFileForm(file_id=id), user=user)
-
-                file_item = Files.get_file_by_id(id=id)
-            except Exception as e:
-                log.exception(e)
-                log.error(f"Error processing file: {file_item.id}")
-                file_item = FileModelResponse(
-                    **{
-                        **file_item.model_dump(),
-                        "error": str(e.detail) if hasattr(e, "detail") else str(e),
-                    }
+        if process and should_process_file(request, file.content_type):
+            if process_in_background and not internal and ENABLE_FILE_INGESTION_QUEUE:
+                file_item = Files.update_file_data_by_id(
+                    id, {"status": FILE_STATUS_PENDING}
+                )
+                enqueue_job(
+                    request.app,
+                    user.id,
+                    FILE_INGESTION_JOB,
+                    item_id=id,
+                    payload={"metadata": file_metadata},
                 )
+            else:
+                try:
+                    process_uploaded_file(request, file_item, file_metadata, user)
+                    file_item = Files.get_file_by_id(id=id)
+                except Exception as e:
+                    log.exception(e)
+                    log.error(f"Error processing file: {file_item.id}")
+                    file_item = FileModelResponse(
+                        **{
+                            **file_item.model_dump(),
+                            "error": str(e.detail) if hasattr(e, "detail") else str(e),
+                        }
+                    )
 
         if file_item:
             return file_item
@@ -329,6 +417,75 @@ async def get_file_by_id(id: str, user=Depends(get_verified_user)):
         )
 
 
+############################
+# Get File Process Status By Id
+############################
+
+
+@router.get("/{id}/process/status")
+async def get_file_process_status_by_id(id: str, user=Depends(get_verified_user)):
+    file = Files.get_file_by_id(id)
+
+    if not file:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ERROR_MESSAGES.NOT_FOUND,
+        )
+
+    if (
+        file.user_id == user.id
+        or user.role == "admin"
+        or has_access_to_file(id, "read", user)
+    ):
+        job = Jobs.get_latest_job_by_item_id(id, FILE_INGESTION_JOB)
+        return {
+            "status": (file.data or {}).get("status"),
+            "error": (file.data or {}).get("error"),
+            "job": JobResponse(**job.model_dump()) if job else None,
+        }
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ERROR_MESSAGES.NOT_FOUND,
+        )
+
+
+############################
+# Cancel File Processing By Id
+############################
+
+
+@router.post("/{id}/process/cancel")
+async def cancel_file_process_by_id(id: str, user=Depends(get_verified_user)):
+    file = Files.get_file_by_id(id)
+
+    if not file:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ERROR_MESSAGES.NOT_FOUND,
+        )
+
+    if (
+        file.user_id == user.id
+        or user.role == "admin"
+        or has_access_to_file(id, "write", user)
+    ):
+        job = Jobs.get_latest_job_by_item_id(id, FILE_INGESTION_JOB)
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=ERROR_MESSAGES.NOT_FOUND,
+            )
+
+        job = await cancel_job(job.id)
+        return JobResponse(**job.model_dump())
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ERROR_MESSAGES.NOT_FOUND,
+        )
+
+
 ############################
 # Get File Data Content By Id
 ############################
@@ -605,6 +762,7 @@ async def delete_file_by_id(id: str, user=Depends(get_verified_user)):
     ):
         # We should add Chroma cleanup here
 
+        Jobs.cancel_jobs_by_item_id(id)
         result = Files.delete_file_by_id(id)
         if result:
             try:
@@ -0,0 +1,63 @@
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from open_webui.constants import ERROR_MESSAGES
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.models.jobs import JobResponse, Jobs
+from open_webui.utils.auth import get_verified_user
+from open_webui.utils.jobs import cancel_job
+
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+router = APIRouter()
+
+
+def get_job_or_404(id: str, user):
+    job = Jobs.get_job_by_id(id)
+    if not job or (job.user_id != user.id and user.role != "admin"):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ERROR_MESSAGES.NOT_FOUND,
+        )
+    return job
+
+
+############################
+# GetJobs
+############################
+
+
+@router.get("/", response_model=list[JobResponse])
+async def get_jobs(
+    status: Optional[str] = None,
+    limit: int = 100,
+    user=Depends(get_verified_user),
+):
+    return Jobs.get_jobs(user_id=user.id, status=status, limit=min(limit, 1000))
+
+
+############################
+# GetJobById
+############################
+
+
+@router.get("/{id}", response_model=JobResponse)
+async def get_job_by_id(id: str, user=Depends(get_verified_user)):
+    return get_job_or_404(id, user)
+
+
+############################
+# CancelJobById
+############################
+
+
+@router.post("/{id}/cancel", response_model=JobResponse)
+async def cancel_job_by_id(id: str, user=Depends(get_verified_user)):
+    get_job_or_404(id, user)
+
+    job = await cancel_job(id)
+    return job
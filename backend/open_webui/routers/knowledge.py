@@ -2,6 +2,8 @@ from typing import List, Optional
 from pydantic import BaseModel
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 from open_webui.models.knowledge import (
     Knowledges,
@@ -10,8 +12,12 @@ from open_webui.models.knowledge import (
     KnowledgeUserResponse,
 )
 from open_webui.models.files import Files, FileModel, FileMetadataResponse
+from open_webui.models.jobs import JOB_FINAL_STATUSES, JobModel, JobResponse, Jobs
+from open_webui.models.users import Users
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.retrieval.bm25 import BM25_INDEX
 from open_webui.routers.retrieval import (
+    get_chunk_embedding_config,
     process_file,
     ProcessFileForm,
     process_files_batch,
@@ -20,11 +26,24 @@ from open_webui.routers.retrieval import (
 from open_webui.storage.provider import Storage
 
 from open_webui.constants import ERROR_MESSAGES
-from open_webui.utils.auth import get_verified_user
+from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.access_control import has_access, has_permission
+from open_webui.utils.jobs import (
+    JobCancelled,
+    JobContext,
+    JobFailed,
+    cancel_job,
+    enqueue_job,
+    register_job_handler,
+)
+from open_webui.utils.model_catalog import invalidate_models
 
 
-from open_webui.env import SRC_LOG_LEVELS
+from open_webui.env import (
+    KNOWLEDGE_REINDEX_FILES_PER_MINUTE,
+    KNOWLEDGE_REINDEX_WORKERS,
+    SRC_LOG_LEVELS,
+)
 from open_webui.models.models import Models, ModelForm
 
 
@@ -165,21 +184,100 @@ async def create_new_knowledge(
 # ReindexKnowledgeFiles
 ############################
 
+KNOWLEDGE_REINDEX_JOB = "knowledge_reindex"
 
-@router.post("/reindex", response_model=bool)
-async def reindex_knowledge_files(request: Request, user=Depends(get_verified_user)):
-    if user.role != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=ERROR_MESSAGES.UNAUTHORIZED,
+# Errors of single files that retrying won't fix
+KNOWLEDGE_REINDEX_PERMANENT_ERRORS = {
+    ERROR_MESSAGES.DUPLICATE_CONTENT,
+    ERROR_MESSAGES.EMPTY_CONTENT,
+}
+
+KNOWLEDGE_REINDEX_FILE_ATTEMPTS = 3
+
+# Base delay in seconds before a failed file is retried, doubled each attempt
+KNOWLEDGE_REINDEX_RETRY_DELAY = 5
+
+# Failed files listed in the job progress, the rest are only counted
+KNOWLEDGE_REINDEX_MAX_REPORTED_FAILURES = 100
+
+
+def has_knowledge_embedding_changed(
+    request: Request, knowledge_id: str, file_ids: list[str]
+) -> bool:
+    """
+    Whether the collection of a knowledge base was embedded with another model
+    than the current one, going by a chunk of the first file that has any.
+    """
+    if not VECTOR_DB_CLIENT.has_collection(collection_name=knowledge_id):
+        return False
+
+    embedding_config = get_chunk_embedding_config(request)
+    for file_id in file_ids:
+        result = VECTOR_DB_CLIENT.query(
+            collection_name=knowledge_id, filter={"file_id": file_id}, limit=1
         )
+        if result is not None and result.ids and result.ids[0]:
+            metadata = (result.metadatas[0][0] if result.metadatas else None) or {}
+            return metadata.get("embedding_config") != embedding_config
+    return False
 
-    knowledge_bases = Knowledges.get_knowledge_bases()
 
-    log.info(f"Starting reindexing for {len(knowledge_bases)} knowledge bases")
+def reset_knowledge_collection(
+    request: Request, knowledge_id: str, file_ids: list[str]
+):
+    # Vectors of another model can't be diffed against, and may not even
+    # have the dimension of the current one, which the vector DB would
+    # reject on insert, so the collection is built again from scratch
+    try:
+        if has_knowledge_embedding_changed(request, knowledge_id, file_ids):
+            log.info(
+                f"Embedding model of knowledge base {knowledge_id} changed, recreating its collection"
+            )
+            VECTOR_DB_CLIENT.delete_collection(collection_name=knowledge_id)
+            BM25_INDEX.delete(knowledge_id)
+    except Exception as e:
+        log.error(f"Error recreating collection {knowledge_id}: {e}")
 
-    deleted_knowledge_bases = []
 
+def reindex_knowledge_file(
+    request: Request, knowledge_id: str, file_id: str, user, context: JobContext
+):
+    for attempt in range(KNOWLEDGE_REINDEX_FILE_ATTEMPTS):
+        context.check_cancelled()
+        try:
+            # With an unchanged embedding model chunks are diffed against the
+            # collection (see update_docs_in_vector_db), so files that were
+            # already reindexed before an interruption are cheap to go over
+            # again
+            process_file(
+                request,
+                ProcessFileForm(file_id=file_id, collection_name=knowledge_id),
+                user=user,
+            )
+            return
+        except HTTPException as e:
+            if (
+                e.detail in KNOWLEDGE_REINDEX_PERMANENT_ERRORS
+                or attempt == KNOWLEDGE_REINDEX_FILE_ATTEMPTS - 1
+            ):
+                raise
+
+            # Most likely the embedding backend being overloaded
+            log.warning(f"Error reindexing file {file_id}, retrying: {e.detail}")
+            time.sleep(KNOWLEDGE_REINDEX_RETRY_DELAY * 2**attempt)
+
+
+@register_job_handler(KNOWLEDGE_REINDEX_JOB)
+def run_knowledge_reindex_job(request: Request, job: JobModel, context: JobContext):
+    user = Users.get_user_by_id(job.user_id)
+    if not user:
+        raise JobFailed(ERROR_MESSAGES.NOT_FOUND)
+
+    knowledge_bases = sorted(Knowledges.get_knowledge_bases(), key=lambda k: k.id)
+    log.info(f"Starting reindexing for {len(knowledge_bases)} knowledge bases")
+
+    items = []
+    knowledge_file_ids = {}
     for knowledge_base in knowledge_bases:
         # -- Robust error handling for missing or invalid data
         if not knowledge_base.data or not isinstance(knowledge_base.data, dict):
@@ -188,58 +286,178 @@ async def reindex_knowledge_files(request: Request, user=Depends(get_verified_us
             )
             try:
                 Knowledges.delete_knowledge_by_id(id=knowledge_base.id)
-                deleted_knowledge_bases.append(knowledge_base.id)
             except Exception as e:
                 log.error(
                     f"Failed to delete invalid knowledge base {knowledge_base.id}: {e}"
                 )
             continue
 
-        try:
-            file_ids = knowledge_base.data.get("file_ids", [])
-            files = Files.get_files_by_ids(file_ids)
-            try:
-                if VECTOR_DB_CLIENT.has_collection(collection_name=knowledge_base.id):
-                    VECTOR_DB_CLIENT.delete_collection(
-                        collection_name=knowledge_base.id
-                    )
-            except Exception as e:
-                log.error(f"Error deleting collection {knowledge_base.id}: {str(e)}")
-                continue  # Skip, don't raise
+        file_ids = [
+            file.id
+            for file in Files.get_files_by_ids(knowledge_base.data.get("file_ids", []))
+        ]
+        items.extend([knowledge_base.id, file_id] for file_id in file_ids)
+        knowledge_file_ids[knowledge_base.id] = file_ids
+
+    # Everything up to the checkpoint was done by an earlier attempt, which
+    # was interrupted or lost its instance
+    progress = job.progress or {}
+    checkpoint = progress.get("checkpoint")
+    start = items.index(checkpoint) + 1 if checkpoint in items else 0
+    if start:
+        log.info(f"Resuming reindexing after {start} of {len(items)} files")
+
+    failed = progress.get("failed", []) if start else []
+    failed_count = progress.get("failed_count", 0) if start else 0
+
+    done = set()
+    watermark = start
+
+    def report():
+        context.update_progress(
+            total=len(items),
+            done=watermark + len(done),
+            failed_count=failed_count,
+            failed=failed,
+            checkpoint=items[watermark - 1] if watermark else None,
+        )
+
+    report()
+
+    interval = (
+        60 / KNOWLEDGE_REINDEX_FILES_PER_MINUTE
+        if KNOWLEDGE_REINDEX_FILES_PER_MINUTE
+        else 0
+    )
+    next_start = time.monotonic()
 
-            failed_files = []
-            for file in files:
-                try:
-                    process_file(
-                        request,
-                        ProcessFileForm(
-                            file_id=file.id, collection_name=knowledge_base.id
-                        ),
-                        user=user,
+    executor = ThreadPoolExecutor(
+        max_workers=KNOWLEDGE_REINDEX_WORKERS, thread_name_prefix="knowledge-reindex"
+    )
+    pending = {}
+    # Knowledge bases whose collection was checked for a changed model
+    checked = set()
+    try:
+        index = start
+        while index < len(items) or pending:
+            while index < len(items) and len(pending) < KNOWLEDGE_REINDEX_WORKERS:
+                context.check_cancelled()
+                delay = next_start - time.monotonic()
+                if delay > 0:
+                    if pending:
+                        # Collect finished files while throttled
+                        break
+                    context.cancelled.wait(delay)
+                    context.check_cancelled()
+                next_start = max(next_start, time.monotonic()) + interval
+
+                knowledge_id, file_id = items[index]
+                if knowledge_id not in checked:
+                    # Done before any of its files, which are next to each
+                    # other, is submitted. After a resume the files reindexed
+                    # earlier already have the current model.
+                    reset_knowledge_collection(
+                        request, knowledge_id, knowledge_file_ids[knowledge_id]
                     )
+                    checked.add(knowledge_id)
+
+                future = executor.submit(
+                    reindex_knowledge_file,
+                    request,
+                    knowledge_id,
+                    file_id,
+                    user,
+                    context,
+                )
+                pending[future] = index
+                index += 1
+
+            finished, _ = wait(
+                pending,
+                timeout=(
+                    max(next_start - time.monotonic(), 0)
+                    if index < len(items) and len(pending) < KNOWLEDGE_REINDEX_WORKERS
+                    else None
+                ),
+                return_when=FIRST_COMPLETED,
+            )
+            for future in finished:
+                item = pending.pop(future)
+                try:
+                    future.result()
+                except JobCancelled:
+                    raise
                 except Exception as e:
+                    error = str(e.detail) if hasattr(e, "detail") else str(e)
+                    knowledge_id, file_id = items[item]
                     log.error(
-                        f"Error processing file {file.filename} (ID: {file.id}): {str(e)}"
+                        f"Error reindexing file {file_id} of knowledge base {knowledge_id}: {error}"
                     )
-                    failed_files.append({"file_id": file.id, "error": str(e)})
-                    continue
-
-        except Exception as e:
-            log.error(f"Error processing knowledge base {knowledge_base.id}: {str(e)}")
-            # Don't raise, just continue
-            continue
-
-        if failed_files:
-            log.warning(
-                f"Failed to process {len(failed_files)} files in knowledge base {knowledge_base.id}"
-            )
-            for failed in failed_files:
-                log.warning(f"File ID: {failed['file_id']}, Error: {failed['error']}")
+                    failed_count += 1
+                    if len(failed) < KNOWLEDGE_REINDEX_MAX_REPORTED_FAILURES:
+                        failed.append(
+                            {
+                                "knowledge_id": knowledge_id,
+                                "file_id": file_id,
+                                "error": error,
+                            }
+                        )
+
+                done.add(item)
+                while watermark in done:
+                    done.remove(watermark)
+                    watermark += 1
+
+            if finished:
+                report()
+    finally:
+        # Files in progress finish, they aren't interrupted midway
+        executor.shutdown(wait=True, cancel_futures=True)
 
     log.info(
-        f"Reindexing completed. Deleted {len(deleted_knowledge_bases)} invalid knowledge bases: {deleted_knowledge_bases}"
+        f"Reindexing completed, {failed_count} of {len(items)} files failed to reindex"
     )
-    return True
+    return {"total": len(items), "failed_count": failed_count}
+
+
+@router.post("/reindex", response_model=JobResponse)
+async def reindex_knowledge_files(request: Request, user=Depends(get_verified_user)):
+    if user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=ERROR_MESSAGES.UNAUTHORIZED,
+        )
+
+    # A reindex that is already queued or running is picked up where it is
+    job = Jobs.get_latest_job_by_type(KNOWLEDGE_REINDEX_JOB)
+    if job and job.status not in JOB_FINAL_STATUSES:
+        return job
+
+    job = enqueue_job(request.app, user.id, KNOWLEDGE_REINDEX_JOB)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ERROR_MESSAGES.DEFAULT(),
+        )
+    return job
+
+
+@router.get("/reindex/status", response_model=Optional[JobResponse])
+async def get_reindex_knowledge_files_status(user=Depends(get_admin_user)):
+    return Jobs.get_latest_job_by_type(KNOWLEDGE_REINDEX_JOB)
+
+
+@router.post("/reindex/cancel", response_model=JobResponse)
+async def cancel_reindex_knowledge_files(user=Depends(get_admin_user)):
+    job = Jobs.get_latest_job_by_type(KNOWLEDGE_REINDEX_JOB)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ERROR_MESSAGES.NOT_FOUND,
+        )
+
+    job = await cancel_job(job.id)
+    return job
 
 
 ############################
@@ -447,12 +665,7 @@ def update_file_from_knowledge_by_id(
             detail=ERROR_MESSAGES.NOT_FOUND,
         )
 
-    # Remove content from the vector database
-    VECTOR_DB_CLIENT.delete(
-        collection_name=knowledge.id, filter={"file_id": form_data.file_id}
-    )
-
-    # Add content to the vector database
+    # Re-embeds only the chunks of the file that changed
     try:
         process_file(
             request,
@@ -522,6 +735,7 @@ def remove_file_from_knowledge_by_id(
         VECTOR_DB_CLIENT.delete(
             collection_name=knowledge.id, filter={"file_id": form_data.file_id}
         )
+        BM25_INDEX.remove(knowledge.id, filter={"file_id": form_data.file_id})
     except Exception as e:
         log.debug("This was most likely caused by bypassing embedding processing")
         log.debug(e)
@@ -532,6 +746,7 @@ def remove_file_from_knowledge_by_id(
         file_collection = f"file-{form_data.file_id}"
         if VECTOR_DB_CLIENT.has_collection(collection_name=file_collection):
             VECTOR_DB_CLIENT.delete_collection(collection_name=file_collection)
+        BM25_INDEX.delete(file_collection)
     except Exception as e:
         log.debug("This was most likely caused by bypassing embedding processing")
         log.debug(e)
@@ -580,7 +795,9 @@ def remove_file_from_knowledge_by_id(
 
 
 @router.delete("/{id}/delete", response_model=bool)
-async def delete_knowledge_by_id(id: str, user=Depends(get_verified_user)):
+async def delete_knowledge_by_id(
+    request: Request, id: str, user=Depends(get_verified_user)
+):
     knowledge = Knowledges.get_knowledge_by_id(id=id)
     if not knowledge:
         raise HTTPException(
@@ -605,6 +822,7 @@ async def delete_knowledge_by_id(id: str, user=Depends(get_verified_user)):
     log.info(f"Found {len(models)} models to check for knowledge base {id}")
 
     # Update models that reference this knowledge base
+    updated_models = False
     for model in models:
         if model.meta and hasattr(model.meta, "knowledge"):
             knowledge_list = model.meta.knowledge or []
@@ -626,6 +844,10 @@ async def delete_knowledge_by_id(id: str, user=Depends(get_verified_user)):
                     is_active=model.is_active,
                 )
                 Models.update_model_by_id(model.id, model_form)
+                updated_models = True
+
+    if updated_models:
+        await invalidate_models(request)
 
     # Clean up vector DB
     try:
@@ -633,6 +855,7 @@ async def delete_knowledge_by_id(id: str, user=Depends(get_verified_user)):
     except Exception as e:
         log.debug(e)
         pass
+    BM25_INDEX.delete(id)
     result = Knowledges.delete_knowledge_by_id(id=id)
     return result
 
@@ -666,6 +889,7 @@ async def reset_knowledge_by_id(id: str, user=Depends(get_verified_user)):
     except Exception as e:
         log.debug(e)
         pass
+    BM25_INDEX.delete(id)
 
     knowledge = Knowledges.update_knowledge_data_by_id(id=id, data={"file_ids": []})
 
@@ -1,12 +1,7 @@
-# TODO: Implement a more intelligent load balancing mechanism for distributing requests among multiple backend instances.
-# Current implementation uses a simple round-robin approach (random.choice). Consider incorporating algorithms like weighted round-robin,
-# least connections, or least response time for better resource utilization and performance optimization.
-
 import asyncio
 import json
 import logging
 import os
-import random
 import re
 import time
 from datetime import datetime
@@ -51,6 +46,9 @@ from open_webui.utils.payload import (
 )
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.access_control import has_access
+from open_webui.utils.http_client import UPSTREAM_CLIENT_POOL
+from open_webui.utils.model_catalog import invalidate_models
+from open_webui.utils.routing import OLLAMA_ROUTER, UpstreamLease
 
 
 from open_webui.config import (
@@ -81,26 +79,27 @@ log.setLevel(SRC_LOG_LEVELS["OLLAMA"])
 async def send_get_request(url, key=None, user: UserModel = None):
     timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST)
     try:
-        async with aiohttp.ClientSession(timeout=timeout, trust_env=True) as session:
-            async with session.get(
-                url,
-                headers={
-                    "Content-Type": "application/json",
-                    **({"Authorization": f"Bearer {key}"} if key else {}),
-                    **(
-                        {
-                            "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
-                            "X-OpenWebUI-User-Id": user.id,
-                            "X-OpenWebUI-User-Email": user.email,
-                            "X-OpenWebUI-User-Role": user.role,
-                        }
-                        if ENABLE_FORWARD_USER_INFO_HEADERS and user
-                        else {}
-                    ),
-                },
-                ssl=AIOHTTP_CLIENT_SESSION_SSL,
-            ) as response:
-                return await response.json()
+        session = UPSTREAM_CLIENT_POOL.get_session(url)
+        async with session.get(
+            url,
+            timeout=timeout,
+            headers={
+                "Content-Type": "application/json",
+                **({"Authorization": f"Bearer {key}"} if key else {}),
+                **(
+                    {
+                        "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
+                        "X-OpenWebUI-User-Id": user.id,
+                        "X-OpenWebUI-User-Email": user.email,
+                        "X-OpenWebUI-User-Role": user.role,
+                    }
+                    if ENABLE_FORWARD_USER_INFO_HEADERS and user
+                    else {}
+                ),
+            },
+            ssl=AIOHTTP_CLIENT_SESSION_SSL,
+        ) as response:
+            return await response.json()
     except Exception as e:
         # Handle connection error here
         log.error(f"Connection error: {e}")
@@ -109,12 +108,13 @@ async def send_get_request(url, key=None, user: UserModel = None):
 
 async def cleanup_response(
     response: Optional[aiohttp.ClientResponse],
-    session: Optional[aiohttp.ClientSession],
+    lease: Optional[UpstreamLease] = None,
 ):
+    # The session is shared, releasing hands the connection back to its pool
     if response:
-        response.close()
-    if session:
-        await session.close()
+        response.release()
+    if lease:
+        lease.finish(response.status if response else None)
 
 
 async def send_post_request(
@@ -124,17 +124,16 @@ async def send_post_request(
     key: Optional[str] = None,
     content_type: Optional[str] = None,
     user: UserModel = None,
+    lease: Optional[UpstreamLease] = None,
 ):
 
     r = None
     try:
-        session = aiohttp.ClientSession(
-            trust_env=True, timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
-        )
-
+        session = UPSTREAM_CLIENT_POOL.get_session(url)
         r = await session.post(
             url,
             data=payload,
+            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
             headers={
                 "Content-Type": "application/json",
                 **({"Authorization": f"Bearer {key}"} if key else {}),
@@ -151,11 +150,13 @@ async def send_post_request(
             },
             ssl=AIOHTTP_CLIENT_SESSION_SSL,
         )
+        if lease:
+            lease.mark_response()
 
         if r.ok is False:
             try:
                 res = await r.json()
-                await cleanup_response(r, session)
+                await cleanup_response(r, lease)
                 if "error" in res:
                     raise HTTPException(status_code=r.status, detail=res["error"])
             except HTTPException as e:
@@ -178,18 +179,18 @@ async def send_post_request(
                 r.content,
                 status_code=r.status,
                 headers=response_headers,
-                background=BackgroundTask(
-                    cleanup_response, response=r, session=session
-                ),
+                background=BackgroundTask(cleanup_response, response=r, lease=lease),
             )
         else:
             res = await r.json()
-            await cleanup_response(r, session)
+            await cleanup_response(r, lease)
             return res
 
     except HTTPException as e:
+        await cleanup_response(r, lease)
         raise e  # Re-raise HTTPException to be handled by FastAPI
     except Exception as e:
+        await cleanup_response(r, lease)
         detail = f"Ollama: {e}"
 
         raise HTTPException(
@@ -198,6 +199,15 @@ async def send_post_request(
         )
 
 
+def select_ollama_url_idx(request: Request, model: str) -> int:
+    return OLLAMA_ROUTER.select(
+        request.app.state.OLLAMA_MODELS[model].get("urls", []),
+        request.app.state.config.OLLAMA_BASE_URLS,
+        request.app.state.config.OLLAMA_API_CONFIGS,
+        model,
+    )
+
+
 def get_api_key(idx, url, configs):
     parsed_url = urlparse(url)
     base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
@@ -308,6 +318,9 @@ async def update_config(
         if key in keys
     }
 
+    await get_all_models.cache.clear()
+    await invalidate_models(request, base_models=True)
+
     return {
         "ENABLE_OLLAMA_API": request.app.state.config.ENABLE_OLLAMA_API,
         "OLLAMA_BASE_URLS": request.app.state.config.OLLAMA_BASE_URLS,
@@ -331,7 +344,15 @@ def merge_ollama_models_lists(model_lists):
     return list(merged_models.values())
 
 
-@cached(ttl=MODELS_CACHE_TTL)
+def get_all_models_cache_key(f, request: Request, user: UserModel = None) -> str:
+    # Shared by all requests, the request isn't part of the key. With user
+    # info forwarded upstream the list may differ by user.
+    if ENABLE_FORWARD_USER_INFO_HEADERS and user:
+        return f"ollama_models:{user.id}"
+    return "ollama_models"
+
+
+@cached(ttl=MODELS_CACHE_TTL, key_builder=get_all_models_cache_key)
 async def get_all_models(request: Request, user: UserModel = None):
     log.info("get_all_models()")
     if request.app.state.config.ENABLE_OLLAMA_API:
@@ -955,7 +976,7 @@ async def show_model_info(
             detail=ERROR_MESSAGES.MODEL_NOT_FOUND(model),
         )
 
-    url_idx = random.choice(models[model]["urls"])
+    url_idx = select_ollama_url_idx(request, model)
 
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
     key = get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS)
@@ -1029,7 +1050,7 @@ async def embed(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = select_ollama_url_idx(request, model)
         else:
             raise HTTPException(
                 status_code=400,
@@ -1047,6 +1068,8 @@ async def embed(
     if prefix_id:
         form_data.model = form_data.model.replace(f"{prefix_id}.", "")
 
+    r = None
+    lease = OLLAMA_ROUTER.acquire(url)
     try:
         r = requests.request(
             method="POST",
@@ -1067,12 +1090,14 @@ async def embed(
             },
             data=form_data.model_dump_json(exclude_none=True).encode(),
         )
+        lease.finish(r.status_code)
         r.raise_for_status()
 
         data = r.json()
         return data
     except Exception as e:
         log.exception(e)
+        lease.finish(r.status_code if r is not None else None)
 
         detail = None
         if r is not None:
@@ -1116,7 +1141,7 @@ async def embeddings(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = select_ollama_url_idx(request, model)
         else:
             raise HTTPException(
                 status_code=400,
@@ -1134,6 +1159,8 @@ async def embeddings(
     if prefix_id:
         form_data.model = form_data.model.replace(f"{prefix_id}.", "")
 
+    r = None
+    lease = OLLAMA_ROUTER.acquire(url)
     try:
         r = requests.request(
             method="POST",
@@ -1154,12 +1181,14 @@ async def embeddings(
             },
             data=form_data.model_dump_json(exclude_none=True).encode(),
         )
+        lease.finish(r.status_code)
         r.raise_for_status()
 
         data = r.json()
         return data
     except Exception as e:
         log.exception(e)
+        lease.finish(r.status_code if r is not None else None)
 
         detail = None
         if r is not None:
@@ -1199,17 +1228,17 @@ async def generate_completion(
     url_idx: Optional[int] = None,
     user=Depends(get_verified_user),
 ):
+    model = form_data.model
+
+    if ":" not in model:
+        model = f"{model}:latest"
+
     if url_idx is None:
         await get_all_models(request, user=user)
         models = request.app.state.OLLAMA_MODELS
 
-        model = form_data.model
-
-        if ":" not in model:
-            model = f"{model}:latest"
-
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = select_ollama_url_idx(request, model)
         else:
             raise HTTPException(
                 status_code=400,
@@ -1231,6 +1260,7 @@ async def generate_completion(
         payload=form_data.model_dump_json(exclude_none=True).encode(),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
+        lease=OLLAMA_ROUTER.acquire(url, model),
     )
 
 
@@ -1276,7 +1306,7 @@ async def get_ollama_url(request: Request, model: str, url_idx: Optional[int] =
                 status_code=400,
                 detail=ERROR_MESSAGES.MODEL_NOT_FOUND(model),
             )
-        url_idx = random.choice(models[model].get("urls", []))
+        url_idx = select_ollama_url_idx(request, model)
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
     return url, url_idx
 
@@ -1346,7 +1376,8 @@ async def generate_chat_completion(
     if ":" not in payload["model"]:
         payload["model"] = f"{payload['model']}:latest"
 
-    url, url_idx = await get_ollama_url(request, payload["model"], url_idx)
+    model = payload["model"]
+    url, url_idx = await get_ollama_url(request, model, url_idx)
     api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
         str(url_idx),
         request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
@@ -1363,6 +1394,7 @@ async def generate_chat_completion(
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         content_type="application/x-ndjson",
         user=user,
+        lease=OLLAMA_ROUTER.acquire(url, model),
     )
 
 
@@ -1449,7 +1481,8 @@ async def generate_openai_completion(
     if ":" not in payload["model"]:
         payload["model"] = f"{payload['model']}:latest"
 
-    url, url_idx = await get_ollama_url(request, payload["model"], url_idx)
+    model = payload["model"]
+    url, url_idx = await get_ollama_url(request, model, url_idx)
     api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
         str(url_idx),
         request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
@@ -1466,6 +1499,7 @@ async def generate_openai_completion(
         stream=payload.get("stream", False),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
+        lease=OLLAMA_ROUTER.acquire(url, model),
     )
 
 
@@ -1531,7 +1565,8 @@ async def generate_openai_chat_completion(
     if ":" not in payload["model"]:
         payload["model"] = f"{payload['model']}:latest"
 
-    url, url_idx = await get_ollama_url(request, payload["model"], url_idx)
+    model = payload["model"]
+    url, url_idx = await get_ollama_url(request, model, url_idx)
     api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
         str(url_idx),
         request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
@@ -1547,6 +1582,7 @@ async def generate_openai_chat_completion(
         stream=payload.get("stream", False),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
+        lease=OLLAMA_ROUTER.acquire(url, model),
     )
 
 
@@ -23,9 +23,10 @@ from open_webui.config import CACHE_DIR
 from open_webui.constants import ERROR_MESSAGES
 
 
-from open_webui.routers.openai import get_all_models_responses
+from open_webui.routers.openai import get_all_models, get_all_models_responses
 
 from open_webui.utils.auth import get_admin_user
+from open_webui.utils.model_catalog import invalidate_models
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MAIN"])
@@ -238,6 +239,10 @@ async def upload_pipeline(
         r.raise_for_status()
         data = r.json()
 
+        # Pipelines are listed as models of the connection
+        await get_all_models.cache.clear()
+        await invalidate_models(request, base_models=True)
+
         return {**data}
     except Exception as e:
         # Handle connection error here
@@ -289,6 +294,10 @@ async def add_pipeline(
         r.raise_for_status()
         data = r.json()
 
+        # Pipelines are listed as models of the connection
+        await get_all_models.cache.clear()
+        await invalidate_models(request, base_models=True)
+
         return {**data}
     except Exception as e:
         # Handle connection error here
@@ -334,6 +343,10 @@ async def delete_pipeline(
         r.raise_for_status()
         data = r.json()
 
+        # Pipelines are listed as models of the connection
+        await get_all_models.cache.clear()
+        await invalidate_models(request, base_models=True)
+
         return {**data}
     except Exception as e:
         # Handle connection error here
@@ -7,9 +7,12 @@ import asyncio
 
 
 import uuid
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import chain
 from pathlib import Path
-from typing import Iterator, List, Optional, Sequence, Union
+from typing import Iterable, Iterator, List, Optional, Sequence, Union
 
 from fastapi import (
     Depends,
@@ -38,6 +41,8 @@ from open_webui.storage.provider import Storage
 
 
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.retrieval.bm25 import BM25_INDEX
+from open_webui.retrieval.embedding_cache import EMBEDDING_CACHE
 
 # Document loaders
 from open_webui.retrieval.loaders.main import Loader
@@ -101,6 +106,8 @@ from open_webui.env import (
     SENTENCE_TRANSFORMERS_MODEL_KWARGS,
     SENTENCE_TRANSFORMERS_CROSS_ENCODER_BACKEND,
     SENTENCE_TRANSFORMERS_CROSS_ENCODER_MODEL_KWARGS,
+    DOCUMENT_INGESTION_BATCH_SIZE,
+    DOCUMENT_INGESTION_MAX_PENDING_BATCHES,
 )
 
 from open_webui.constants import ERROR_MESSAGES
@@ -383,6 +390,14 @@ async def update_embedding_config(
         )
 
 
+@router.get("/embedding/cache")
+async def get_embedding_cache_stats(user=Depends(get_admin_user)):
+    if EMBEDDING_CACHE is None:
+        return {"status": True, "enabled": False}
+
+    return {"status": True, "enabled": True, **EMBEDDING_CACHE.stats()}
+
+
 @router.get("/config")
 async def get_rag_config(request: Request, user=Depends(get_admin_user)):
     return {
@@ -1104,9 +1119,250 @@ async def update_rag_config(
 ####################################
 
 
+def get_text_splitter_docs(request: Request, docs: Iterable[Document]):
+    """
+    Splits documents per the configured TEXT_SPLITTER, one document at a
+    time, so chunks can be embedded while later pages are still loading.
+    """
+    if request.app.state.config.TEXT_SPLITTER in ["", "character"]:
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=request.app.state.config.CHUNK_SIZE,
+            chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
+            add_start_index=True,
+        )
+        for doc in docs:
+            yield from text_splitter.split_documents([doc])
+    elif request.app.state.config.TEXT_SPLITTER == "token":
+        log.info(
+            f"Using token text splitter: {request.app.state.config.TIKTOKEN_ENCODING_NAME}"
+        )
+
+        tiktoken.get_encoding(str(request.app.state.config.TIKTOKEN_ENCODING_NAME))
+        text_splitter = TokenTextSplitter(
+            encoding_name=str(request.app.state.config.TIKTOKEN_ENCODING_NAME),
+            chunk_size=request.app.state.config.CHUNK_SIZE,
+            chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
+            add_start_index=True,
+        )
+        for doc in docs:
+            yield from text_splitter.split_documents([doc])
+    elif request.app.state.config.TEXT_SPLITTER == "markdown_header":
+        log.info("Using markdown header text splitter")
+
+        # Define headers to split on - covering most common markdown header levels
+        headers_to_split_on = [
+            ("#", "Header 1"),
+            ("##", "Header 2"),
+            ("###", "Header 3"),
+            ("####", "Header 4"),
+            ("#####", "Header 5"),
+            ("######", "Header 6"),
+        ]
+
+        markdown_splitter = MarkdownHeaderTextSplitter(
+            headers_to_split_on=headers_to_split_on,
+            strip_headers=False,  # Keep headers in content for context
+        )
+
+        for doc in docs:
+            md_header_splits = markdown_splitter.split_text(doc.page_content)
+            text_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=request.app.state.config.CHUNK_SIZE,
+                chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
+                add_start_index=True,
+            )
+            md_header_splits = text_splitter.split_documents(md_header_splits)
+
+            # Convert back to Document objects, preserving original metadata
+            for split_chunk in md_header_splits:
+                headings_list = []
+                # Extract header values in order based on headers_to_split_on
+                for _, header_meta_key_name in headers_to_split_on:
+                    if header_meta_key_name in split_chunk.metadata:
+                        headings_list.append(split_chunk.metadata[header_meta_key_name])
+
+                yield Document(
+                    page_content=split_chunk.page_content,
+                    metadata={**doc.metadata, "headings": headings_list},
+                )
+    else:
+        raise ValueError(ERROR_MESSAGES.DEFAULT("Invalid text splitter"))
+
+
+def get_chunk_embedding_config(request: Request) -> str:
+    """
+    Identifies the embedding model, stored with every chunk so chunks embedded
+    with another model can be told apart.
+    """
+    return json.dumps(
+        {
+            "engine": request.app.state.config.RAG_EMBEDDING_ENGINE,
+            "model": request.app.state.config.RAG_EMBEDDING_MODEL,
+        }
+    )
+
+
+def get_docs_metadatas(
+    request: Request, docs: list[Document], metadata: Optional[dict] = None
+) -> list[dict]:
+    metadatas = [
+        {
+            **doc.metadata,
+            **(metadata if metadata else {}),
+            # Lets updates skip chunks that did not change
+            "chunk_hash": calculate_sha256_string(doc.page_content),
+            "embedding_config": get_chunk_embedding_config(request),
+        }
+        for doc in docs
+    ]
+
+    # ChromaDB does not like datetime formats
+    # for meta-data so convert them to string.
+    for metadata in metadatas:
+        for key, value in metadata.items():
+            if (
+                isinstance(value, datetime)
+                or isinstance(value, list)
+                or isinstance(value, dict)
+            ):
+                metadata[key] = str(value)
+
+    return metadatas
+
+
+def get_ingestion_embedding_function(request: Request):
+    return get_embedding_function(
+        request.app.state.config.RAG_EMBEDDING_ENGINE,
+        request.app.state.config.RAG_EMBEDDING_MODEL,
+        request.app.state.ef,
+        (
+            request.app.state.config.RAG_OPENAI_API_BASE_URL
+            if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
+            else (
+                request.app.state.config.RAG_OLLAMA_BASE_URL
+                if request.app.state.config.RAG_EMBEDDING_ENGINE == "ollama"
+                else request.app.state.config.RAG_AZURE_OPENAI_BASE_URL
+            )
+        ),
+        (
+            request.app.state.config.RAG_OPENAI_API_KEY
+            if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
+            else (
+                request.app.state.config.RAG_OLLAMA_API_KEY
+                if request.app.state.config.RAG_EMBEDDING_ENGINE == "ollama"
+                else request.app.state.config.RAG_AZURE_OPENAI_API_KEY
+            )
+        ),
+        request.app.state.config.RAG_EMBEDDING_BATCH_SIZE,
+        azure_api_version=(
+            request.app.state.config.RAG_AZURE_OPENAI_API_VERSION
+            if request.app.state.config.RAG_EMBEDDING_ENGINE == "azure_openai"
+            else None
+        ),
+    )
+
+
+def insert_docs_to_vector_db(
+    request: Request,
+    docs: Iterable[Document],
+    collection_name: str,
+    metadata: Optional[dict] = None,
+    user=None,
+) -> int:
+    """
+    Embeds and inserts chunks in batches of DOCUMENT_INGESTION_BATCH_SIZE.
+
+    Batches are embedded on a separate thread while the next ones are being
+    loaded and split, with at most DOCUMENT_INGESTION_MAX_PENDING_BATCHES
+    waiting, so memory stays bounded however long the document is and what
+    has been inserted so far can already be queried.
+
+    If a batch fails, the chunks inserted before it are removed again.
+    """
+    embedding_function = get_ingestion_embedding_function(request)
+    inserted_ids = []
+
+    def insert_batch(batch: list[Document]) -> list[str]:
+        texts = [doc.page_content for doc in batch]
+        metadatas = get_docs_metadatas(request, batch, metadata)
+
+        embeddings = embedding_function(
+            list(map(lambda x: x.replace("\n", " "), texts)),
+            prefix=RAG_EMBEDDING_CONTENT_PREFIX,
+            user=user,
+        )
+
+        items = [
+            {
+                "id": str(uuid.uuid4()),
+                "text": text,
+                "vector": embeddings[idx],
+                "metadata": metadatas[idx],
+            }
+            for idx, text in enumerate(texts)
+        ]
+
+        VECTOR_DB_CLIENT.insert(
+            collection_name=collection_name,
+            items=items,
+        )
+        ids = [item["id"] for item in items]
+        inserted_ids.extend(ids)
+
+        BM25_INDEX.add(
+            collection_name,
+            ids=ids,
+            texts=texts,
+            metadatas=metadatas,
+        )
+        return ids
+
+    # A single thread keeps batches in document order
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingestion")
+    pending = deque()
+    count = 0
+    try:
+        batch = []
+        for doc in docs:
+            batch.append(doc)
+            if len(batch) < DOCUMENT_INGESTION_BATCH_SIZE:
+                continue
+
+            pending.append(executor.submit(insert_batch, batch))
+            batch = []
+            if len(pending) > DOCUMENT_INGESTION_MAX_PENDING_BATCHES:
+                count += len(pending.popleft().result())
+
+        if batch:
+            pending.append(executor.submit(insert_batch, batch))
+        while pending:
+            count += len(pending.popleft().result())
+
+        return count
+    except Exception:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+        if inserted_ids:
+            log.info(
+                f"removing {len(inserted_ids)} partially inserted chunks from {collection_name}"
+            )
+            try:
+                VECTOR_DB_CLIENT.delete(
+                    collection_name=collection_name, ids=inserted_ids
+                )
+                BM25_INDEX.remove(collection_name, ids=inserted_ids)
+            except Exception as e:
+                log.exception(e)
+        raise
+    finally:
+        executor.shutdown(wait=False)
+
+
 def save_docs_to_vector_db(
     request: Request,
-    docs,
+    docs: Iterable[Document],
     collection_name,
     metadata: Optional[dict] = None,
     overwrite: bool = False,
@@ -1114,6 +1370,11 @@ def save_docs_to_vector_db(
     add: bool = False,
     user=None,
 ) -> bool:
+    """
+    `docs` may be a list or an iterator of pages; iterators are consumed as
+    they are embedded, see `insert_docs_to_vector_db`.
+    """
+
     def _get_docs_info(docs: list[Document]) -> str:
         docs_info = set()
 
@@ -1131,7 +1392,7 @@ def save_docs_to_vector_db(
         return ", ".join(docs_info)
 
     log.info(
-        f"save_docs_to_vector_db: document {_get_docs_info(docs)} {collection_name}"
+        f"save_docs_to_vector_db: document {_get_docs_info(docs) if isinstance(docs, list) else ''} {collection_name}"
     )
 
     # Check if entries with the same hash (metadata.hash) already exist
@@ -1148,103 +1409,14 @@ def save_docs_to_vector_db(
                 raise ValueError(ERROR_MESSAGES.DUPLICATE_CONTENT)
 
     if split:
-        if request.app.state.config.TEXT_SPLITTER in ["", "character"]:
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=request.app.state.config.CHUNK_SIZE,
-                chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
-                add_start_index=True,
-            )
-            docs = text_splitter.split_documents(docs)
-        elif request.app.state.config.TEXT_SPLITTER == "token":
-            log.info(
-                f"Using token text splitter: {request.app.state.config.TIKTOKEN_ENCODING_NAME}"
-            )
-
-            tiktoken.get_encoding(str(request.app.state.config.TIKTOKEN_ENCODING_NAME))
-            text_splitter = TokenTextSplitter(
-                encoding_name=str(request.app.state.config.TIKTOKEN_ENCODING_NAME),
-                chunk_size=request.app.state.config.CHUNK_SIZE,
-                chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
-                add_start_index=True,
-            )
-            docs = text_splitter.split_documents(docs)
-        elif request.app.state.config.TEXT_SPLITTER == "markdown_header":
-            log.info("Using markdown header text splitter")
-
-            # Define headers to split on - covering most common markdown header levels
-            headers_to_split_on = [
-                ("#", "Header 1"),
-                ("##", "Header 2"),
-                ("###", "Header 3"),
-                ("####", "Header 4"),
-                ("#####", "Header 5"),
-                ("######", "Header 6"),
-            ]
+        docs = get_text_splitter_docs(request, docs)
 
-            markdown_splitter = MarkdownHeaderTextSplitter(
-                headers_to_split_on=headers_to_split_on,
-                strip_headers=False,  # Keep headers in content for context
-            )
-
-            md_split_docs = []
-            for doc in docs:
-                md_header_splits = markdown_splitter.split_text(doc.page_content)
-                text_splitter = RecursiveCharacterTextSplitter(
-                    chunk_size=request.app.state.config.CHUNK_SIZE,
-                    chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
-                    add_start_index=True,
-                )
-                md_header_splits = text_splitter.split_documents(md_header_splits)
-
-                # Convert back to Document objects, preserving original metadata
-                for split_chunk in md_header_splits:
-                    headings_list = []
-                    # Extract header values in order based on headers_to_split_on
-                    for _, header_meta_key_name in headers_to_split_on:
-                        if header_meta_key_name in split_chunk.metadata:
-                            headings_list.append(
-                                split_chunk.metadata[header_meta_key_name]
-                            )
-
-                    md_split_docs.append(
-                        Document(
-                            page_content=split_chunk.page_content,
-                            metadata={**doc.metadata, "headings": headings_list},
-                        )
-                    )
-
-            docs = md_split_docs
-        else:
-            raise ValueError(ERROR_MESSAGES.DEFAULT("Invalid text splitter"))
-
-    if len(docs) == 0:
+    # Pulls in the first page only, the rest is read while embedding
+    docs = iter(docs)
+    first_doc = next(docs, None)
+    if first_doc is None:
         raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
-
-    texts = [doc.page_content for doc in docs]
-    metadatas = [
-        {
-            **doc.metadata,
-            **(metadata if metadata else {}),
-            "embedding_config": json.dumps(
-                {
-                    "engine": request.app.state.config.RAG_EMBEDDING_ENGINE,
-                    "model": request.app.state.config.RAG_EMBEDDING_MODEL,
-                }
-            ),
-        }
-        for doc in docs
-    ]
-
-    # ChromaDB does not like datetime formats
-    # for meta-data so convert them to string.
-    for metadata in metadatas:
-        for key, value in metadata.items():
-            if (
-                isinstance(value, datetime)
-                or isinstance(value, list)
-                or isinstance(value, dict)
-            ):
-                metadata[key] = str(value)
+    docs = chain([first_doc], docs)
 
     try:
         if VECTOR_DB_CLIENT.has_collection(collection_name=collection_name):
@@ -1252,6 +1424,7 @@ def save_docs_to_vector_db(
 
             if overwrite:
                 VECTOR_DB_CLIENT.delete_collection(collection_name=collection_name)
+                BM25_INDEX.delete(collection_name)
                 log.info(f"deleting existing collection {collection_name}")
             elif add is False:
                 log.info(
@@ -1260,63 +1433,88 @@ def save_docs_to_vector_db(
                 return True
 
         log.info(f"adding to collection {collection_name}")
-        embedding_function = get_embedding_function(
-            request.app.state.config.RAG_EMBEDDING_ENGINE,
-            request.app.state.config.RAG_EMBEDDING_MODEL,
-            request.app.state.ef,
-            (
-                request.app.state.config.RAG_OPENAI_API_BASE_URL
-                if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
-                else (
-                    request.app.state.config.RAG_OLLAMA_BASE_URL
-                    if request.app.state.config.RAG_EMBEDDING_ENGINE == "ollama"
-                    else request.app.state.config.RAG_AZURE_OPENAI_BASE_URL
-                )
-            ),
-            (
-                request.app.state.config.RAG_OPENAI_API_KEY
-                if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
-                else (
-                    request.app.state.config.RAG_OLLAMA_API_KEY
-                    if request.app.state.config.RAG_EMBEDDING_ENGINE == "ollama"
-                    else request.app.state.config.RAG_AZURE_OPENAI_API_KEY
-                )
-            ),
-            request.app.state.config.RAG_EMBEDDING_BATCH_SIZE,
-            azure_api_version=(
-                request.app.state.config.RAG_AZURE_OPENAI_API_VERSION
-                if request.app.state.config.RAG_EMBEDDING_ENGINE == "azure_openai"
-                else None
-            ),
-        )
-
-        embeddings = embedding_function(
-            list(map(lambda x: x.replace("\n", " "), texts)),
-            prefix=RAG_EMBEDDING_CONTENT_PREFIX,
-            user=user,
-        )
-
-        items = [
-            {
-                "id": str(uuid.uuid4()),
-                "text": text,
-                "vector": embeddings[idx],
-                "metadata": metadatas[idx],
-            }
-            for idx, text in enumerate(texts)
-        ]
-
-        VECTOR_DB_CLIENT.insert(
-            collection_name=collection_name,
-            items=items,
+        insert_docs_to_vector_db(
+            request, docs, collection_name, metadata=metadata, user=user
         )
-
         return True
     except Exception as e:
         log.exception(e)
         raise e
 
 
+def update_docs_in_vector_db(
+    request: Request,
+    docs: Iterable[Document],
+    collection_name: str,
+    filter: dict,
+    metadata: Optional[dict] = None,
+    split: bool = True,
+    user=None,
+) -> dict:
+    """
+    Re-indexes the chunks matching `filter` (e.g. those of one file) from
+    `docs`, by the `chunk_hash` stored with every chunk: only new or changed
+    chunks are embedded, and chunks that are gone are deleted, so editing a
+    document costs work proportional to the edit.
+
+    Chunks embedded with another model, or stored before chunk hashes were
+    recorded, are embedded again.
+    """
+    embedding_config = get_chunk_embedding_config(request)
+
+    # chunk_hash -> ids of the chunks that can be kept
+    existing_ids = defaultdict(list)
+    stale_ids = []
+
+    result = None
+    if VECTOR_DB_CLIENT.has_collection(collection_name=collection_name):
+        result = VECTOR_DB_CLIENT.query(collection_name=collection_name, filter=filter)
+    if result is not None and result.ids:
+        for id, chunk_metadata in zip(result.ids[0], result.metadatas[0]):
+            chunk_metadata = chunk_metadata or {}
+            if (
+                chunk_metadata.get("chunk_hash")
+                and chunk_metadata.get("embedding_config") == embedding_config
+            ):
+                existing_ids[chunk_metadata["chunk_hash"]].append(id)
+            else:
+                stale_ids.append(id)
+
+    if split:
+        docs = get_text_splitter_docs(request, docs)
+
+    unchanged = 0
+
+    def get_changed_docs():
+        nonlocal unchanged
+        for doc in docs:
+            ids = existing_ids.get(calculate_sha256_string(doc.page_content))
+            if ids:
+                ids.pop()
+                unchanged += 1
+            else:
+                yield doc
+
+    added = insert_docs_to_vector_db(
+        request, get_changed_docs(), collection_name, metadata=metadata, user=user
+    )
+
+    # Removed only now, so the document stays searchable while it is updated
+    removed_ids = stale_ids + [id for ids in existing_ids.values() for id in ids]
+    if removed_ids:
+        VECTOR_DB_CLIENT.delete(collection_name=collection_name, ids=removed_ids)
+        BM25_INDEX.remove(collection_name, ids=removed_ids)
+
+    log.info(
+        f"updated collection {collection_name}: {added} added, {len(removed_ids)} removed, {unchanged} unchanged"
+    )
+
+    if added + unchanged == 0:
+        raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+
+    return {"added": added, "removed": len(removed_ids), "unchanged": unchanged}
+
+
 class ProcessFileForm(BaseModel):
     file_id: str
     content: Optional[str] = None
@@ -1337,16 +1535,14 @@ def process_file(
         if collection_name is None:
             collection_name = f"file-{file.id}"
 
+        # Whether the file's chunks already in the collection are updated in
+        # place, instead of the file being added
+        update = False
+
         if form_data.content:
             # Update the content in the file
             # Usage: /files/{file_id}/data/content/update, /files/ (audio file upload pipeline)
-
-            try:
-                # /files/{file_id}/data/content/update
-                VECTOR_DB_CLIENT.delete_collection(collection_name=f"file-{file.id}")
-            except:
-                # Audio file upload pipeline
-                pass
+            update = True
 
             docs = [
                 Document(
@@ -1366,6 +1562,11 @@ def process_file(
             # Check if the file has already been processed and save the content
             # Usage: /knowledge/{id}/file/add, /knowledge/{id}/file/update
 
+            existing = VECTOR_DB_CLIENT.query(
+                collection_name=collection_name, filter={"file_id": file.id}, limit=1
+            )
+            update = existing is not None and len(existing.ids[0]) > 0
+
             result = VECTOR_DB_CLIENT.query(
                 collection_name=f"file-{file.id}", filter={"file_id": file.id}
             )
@@ -1427,23 +1628,28 @@ def process_file(
                     DOCUMENT_INTELLIGENCE_KEY=request.app.state.config.DOCUMENT_INTELLIGENCE_KEY,
                     MISTRAL_OCR_API_KEY=request.app.state.config.MISTRAL_OCR_API_KEY,
                 )
-                docs = loader.load(
-                    file.filename, file.meta.get("content_type"), file_path
-                )
+                pages = []
+
+                def load_docs():
+                    # Pages are embedded as they are read, the content is
+                    # only complete once every page went through
+                    for doc in loader.lazy_load(
+                        file.filename, file.meta.get("content_type"), file_path
+                    ):
+                        pages.append(doc.page_content)
+                        yield Document(
+                            page_content=doc.page_content,
+                            metadata={
+                                **doc.metadata,
+                                "name": file.filename,
+                                "created_by": file.user_id,
+                                "file_id": file.id,
+                                "source": file.filename,
+                            },
+                        )
 
-                docs = [
-                    Document(
-                        page_content=doc.page_content,
-                        metadata={
-                            **doc.metadata,
-                            "name": file.filename,
-                            "created_by": file.user_id,
-                            "file_id": file.id,
-                            "source": file.filename,
-                        },
-                    )
-                    for doc in docs
-                ]
+                docs = load_docs()
+                text_content = None
             else:
                 docs = [
                     Document(
@@ -1457,31 +1663,55 @@ def process_file(
                         },
                     )
                 ]
-            text_content = " ".join([doc.page_content for doc in docs])
+                text_content = " ".join([doc.page_content for doc in docs])
 
-        log.debug(f"text_content: {text_content}")
-        Files.update_file_data_by_id(
-            file.id,
-            {"content": text_content},
-        )
+        def update_file_content(text_content: str) -> str:
+            log.debug(f"text_content: {text_content}")
+            Files.update_file_data_by_id(
+                file.id,
+                {"content": text_content},
+            )
 
-        hash = calculate_sha256_string(text_content)
-        Files.update_file_hash_by_id(file.id, hash)
+            hash = calculate_sha256_string(text_content)
+            Files.update_file_hash_by_id(file.id, hash)
+            return hash
+
+        metadata = {
+            "file_id": file.id,
+            "name": file.filename,
+        }
+        if text_content is not None:
+            # Streamed pages are hashed once they are all read
+            metadata["hash"] = update_file_content(text_content)
 
         if not request.app.state.config.BYPASS_EMBEDDING_AND_RETRIEVAL:
             try:
-                result = save_docs_to_vector_db(
-                    request,
-                    docs=docs,
-                    collection_name=collection_name,
-                    metadata={
-                        "file_id": file.id,
-                        "name": file.filename,
-                        "hash": hash,
-                    },
-                    add=(True if form_data.collection_name else False),
-                    user=user,
-                )
+                if update:
+                    update_docs_in_vector_db(
+                        request,
+                        docs=docs,
+                        collection_name=collection_name,
+                        filter={"file_id": file.id},
+                        metadata=metadata,
+                        user=user,
+                    )
+                    result = True
+                else:
+                    result = save_docs_to_vector_db(
+                        request,
+                        docs=docs,
+                        collection_name=collection_name,
+                        metadata=metadata,
+                        add=(True if form_data.collection_name else False),
+                        user=user,
+                    )
+
+                if text_content is None:
+                    # Drain the pages if the collection already existed
+                    for _ in docs:
+                        pass
+                    text_content = " ".join(pages)
+                    update_file_content(text_content)
 
                 if result:
                     Files.update_file_metadata_by_id(
@@ -1500,6 +1730,12 @@ def process_file(
             except Exception as e:
                 raise e
         else:
+            if text_content is None:
+                for _ in docs:
+                    pass
+                text_content = " ".join(pages)
+                update_file_content(text_content)
+
             return {
                 "status": True,
                 "collection_name": None,
@@ -2037,13 +2273,8 @@ def query_doc_handler(
 ):
     try:
         if request.app.state.config.ENABLE_RAG_HYBRID_SEARCH:
-            collection_results = {}
-            collection_results[form_data.collection_name] = VECTOR_DB_CLIENT.get(
-                collection_name=form_data.collection_name
-            )
             return query_doc_with_hybrid_search(
                 collection_name=form_data.collection_name,
-                collection_result=collection_results[form_data.collection_name],
                 query=form_data.query,
                 embedding_function=lambda query, prefix: request.app.state.EMBEDDING_FUNCTION(
                     query, prefix=prefix, user=user
@@ -2162,12 +2393,14 @@ class DeleteForm(BaseModel):
 def delete_entries_from_collection(form_data: DeleteForm, user=Depends(get_admin_user)):
     try:
         if VECTOR_DB_CLIENT.has_collection(collection_name=form_data.collection_name):
-            file = Files.get_file_by_id(form_data.file_id)
-            hash = file.hash
-
+            # Chunks left unchanged by an update keep the hash of the
+            # content they were first added with
             VECTOR_DB_CLIENT.delete(
                 collection_name=form_data.collection_name,
-                metadata={"hash": hash},
+                filter={"file_id": form_data.file_id},
+            )
+            BM25_INDEX.remove(
+                form_data.collection_name, filter={"file_id": form_data.file_id}
             )
             return {"status": True}
         else:
@@ -2180,6 +2413,7 @@ def delete_entries_from_collection(form_data: DeleteForm, user=Depends(get_admin
 @router.post("/reset/db")
 def reset_vector_db(user=Depends(get_admin_user)):
     VECTOR_DB_CLIENT.reset()
+    BM25_INDEX.reset()
     Knowledges.delete_all_knowledge()
 
 
@@ -1,12 +1,17 @@
 import os
 import shutil
 import json
+import hashlib
 import logging
 import re
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import BinaryIO, Tuple, Dict
+from collections import OrderedDict
+from typing import BinaryIO, Callable, NamedTuple, Optional, Tuple, Dict
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.config import Config
 from botocore.exceptions import ClientError
 from open_webui.config import (
@@ -25,6 +30,9 @@ from open_webui.config import (
     AZURE_STORAGE_CONTAINER_NAME,
     AZURE_STORAGE_KEY,
     STORAGE_PROVIDER,
+    STORAGE_CACHE_MAX_SIZE,
+    STORAGE_CACHE_VALIDATION_TTL,
+    STORAGE_UPLOAD_CHUNK_SIZE,
     UPLOAD_DIR,
 )
 from google.cloud import storage
@@ -40,6 +48,206 @@ log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MAIN"])
 
 
+class StoredFile(NamedTuple):
+    size: int
+    sha256: str
+
+
+def copy_file_chunked(file: BinaryIO, file_path: str) -> StoredFile:
+    """
+    Copies `file` to `file_path` one chunk at a time, hashing as it goes, so
+    uploads of any size use a constant amount of memory.
+    """
+    size = 0
+    sha256 = hashlib.sha256()
+    with open(file_path, "wb") as f:
+        while chunk := file.read(STORAGE_UPLOAD_CHUNK_SIZE):
+            f.write(chunk)
+            sha256.update(chunk)
+            size += len(chunk)
+
+    if not size:
+        os.remove(file_path)
+        raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+    return StoredFile(size=size, sha256=sha256.hexdigest())
+
+
+class StorageCache:
+    """
+    Read-through cache of remote objects in UPLOAD_DIR.
+
+    Local copies are checked against the object's ETag (or GCS generation)
+    at most once per `validation_ttl`, so repeated reads of a hot file don't
+    transfer it again. Concurrent reads of the same uncached file share a
+    single download, and the least recently used copies are evicted once the
+    cache grows beyond `max_size` bytes.
+
+    Worker processes share UPLOAD_DIR but each keeps its own entries, so a
+    read touches the copy's mtime and copies used within `EVICTION_GRACE`
+    seconds are never evicted: a path just returned, by this or another
+    worker, isn't removed before its caller opens it.
+    """
+
+    LOCK_STRIPES = 64
+    EVICTION_GRACE = 60
+
+    def __init__(
+        self,
+        max_size: int = STORAGE_CACHE_MAX_SIZE,
+        validation_ttl: float = STORAGE_CACHE_VALIDATION_TTL,
+    ):
+        self.max_size = max_size
+        self.validation_ttl = validation_ttl
+
+        # name -> {"size", "etag", "validated_at"}, least recently used first
+        self.entries: OrderedDict[str, dict] = OrderedDict()
+        self.size = 0
+        self.loaded = False
+        self.lock = threading.Lock()
+        self.download_locks = [threading.Lock() for _ in range(self.LOCK_STRIPES)]
+
+    @staticmethod
+    def get_path(name: str) -> str:
+        return f"{UPLOAD_DIR}/{name}"
+
+    def _load(self):
+        # Adopt copies left by a previous run, oldest first, they are
+        # validated on their first read
+        if self.loaded:
+            return
+        self.loaded = True
+
+        try:
+            files = [
+                entry
+                for entry in os.scandir(UPLOAD_DIR)
+                if entry.is_file() and not entry.name.endswith(".part")
+            ]
+        except FileNotFoundError:
+            return
+
+        for entry in sorted(files, key=lambda entry: entry.stat().st_atime):
+            if entry.name not in self.entries:
+                self._set(entry.name, entry.stat().st_size, None, 0)
+
+    def _set(self, name: str, size: int, etag: Optional[str], validated_at: float):
+        previous = self.entries.pop(name, None)
+        if previous:
+            self.size -= previous["size"]
+
+        self.entries[name] = {
+            "size": size,
+            "etag": etag,
+            "validated_at": validated_at,
+        }
+        self.size += size
+
+    @staticmethod
+    def _touch(path: str) -> bool:
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _evict(self, keep: str):
+        evicted = []
+        with self.lock:
+            if not self.max_size or self.size <= self.max_size:
+                return
+
+            used_since = time.time() - self.EVICTION_GRACE
+            for name in list(self.entries):
+                if self.size <= self.max_size:
+                    break
+                if name == keep:
+                    continue
+
+                try:
+                    if os.stat(self.get_path(name)).st_mtime > used_since:
+                        continue
+                    evicted.append(name)
+                except FileNotFoundError:
+                    # Already evicted by another worker
+                    pass
+                self.size -= self.entries.pop(name)["size"]
+
+        for name in evicted:
+            try:
+                os.remove(self.get_path(name))
+            except FileNotFoundError:
+                pass
+
+    def get(
+        self,
+        name: str,
+        stat: Callable[[], Tuple[str, int]],
+        download: Callable[[str], None],
+    ) -> str:
+        """
+        Returns the local path of `name`, downloading it only if there is no
+        valid local copy. `stat` returns the remote (etag, size) and
+        `download` writes the object to the given path.
+        """
+        path = self.get_path(name)
+
+        with self.download_locks[hash(name) % self.LOCK_STRIPES]:
+            with self.lock:
+                self._load()
+                entry = self.entries.get(name)
+                if entry:
+                    self.entries.move_to_end(name)
+
+            if entry and self._touch(path):
+                if time.time() - entry["validated_at"] < self.validation_ttl:
+                    return path
+
+                etag, size = stat()
+                if entry["etag"] == etag or (
+                    entry["etag"] is None and entry["size"] == size
+                ):
+                    with self.lock:
+                        self._set(name, entry["size"], etag, time.time())
+                    return path
+            else:
+                etag, size = stat()
+
+            # Download next to the final path so readers never see a partial file
+            tmp_path = f"{path}.part"
+            try:
+                download(tmp_path)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+            with self.lock:
+                self._set(name, os.path.getsize(path), etag, time.time())
+
+        self._evict(keep=name)
+        return path
+
+    def put(self, name: str, size: int, etag: Optional[str] = None):
+        """
+        Records a local copy written by an upload.
+        """
+        with self.lock:
+            self._load()
+            self._set(name, size, etag, time.time())
+        self._evict(keep=name)
+
+    def remove(self, name: str):
+        with self.lock:
+            entry = self.entries.pop(name, None)
+            if entry:
+                self.size -= entry["size"]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
 class StorageProvider(ABC):
     @abstractmethod
     def get_file(self, file_path: str) -> str:
@@ -48,7 +256,7 @@ class StorageProvider(ABC):
     @abstractmethod
     def upload_file(
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
+    ) -> Tuple[StoredFile, str]:
         pass
 
     @abstractmethod
@@ -64,14 +272,10 @@ class LocalStorageProvider(StorageProvider):
     @staticmethod
     def upload_file(
         file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
-        contents = file.read()
-        if not contents:
-            raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+    ) -> Tuple[StoredFile, str]:
         file_path = f"{UPLOAD_DIR}/{filename}"
-        with open(file_path, "wb") as f:
-            f.write(contents)
-        return contents, file_path
+        stored_file = copy_file_chunked(file, file_path)
+        return stored_file, file_path
 
     @staticmethod
     def get_file(file_path: str) -> str:
@@ -137,6 +341,13 @@ class S3StorageProvider(StorageProvider):
         self.bucket_name = S3_BUCKET_NAME
         self.key_prefix = S3_KEY_PREFIX if S3_KEY_PREFIX else ""
 
+        # Files larger than one chunk are sent as multipart uploads
+        self.transfer_config = TransferConfig(
+            multipart_threshold=STORAGE_UPLOAD_CHUNK_SIZE,
+            multipart_chunksize=STORAGE_UPLOAD_CHUNK_SIZE,
+        )
+        self.cache = StorageCache()
+
     @staticmethod
     def sanitize_tag_value(s: str) -> str:
         """Only include S3 allowed characters."""
@@ -144,12 +355,14 @@ class S3StorageProvider(StorageProvider):
 
     def upload_file(
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
+    ) -> Tuple[StoredFile, str]:
         """Handles uploading of the file to S3 storage."""
-        _, file_path = LocalStorageProvider.upload_file(file, filename, tags)
+        stored_file, file_path = LocalStorageProvider.upload_file(file, filename, tags)
         s3_key = os.path.join(self.key_prefix, filename)
         try:
-            self.s3_client.upload_file(file_path, self.bucket_name, s3_key)
+            self.s3_client.upload_file(
+                file_path, self.bucket_name, s3_key, Config=self.transfer_config
+            )
             if S3_ENABLE_TAGGING and tags:
                 sanitized_tags = {
                     self.sanitize_tag_value(k): self.sanitize_tag_value(v)
@@ -165,10 +378,8 @@ class S3StorageProvider(StorageProvider):
                     Key=s3_key,
                     Tagging=tagging,
                 )
-            return (
-                open(file_path, "rb").read(),
-                f"s3://{self.bucket_name}/{s3_key}",
-            )
+            self.cache.put(filename, stored_file.size)
+            return stored_file, f"s3://{self.bucket_name}/{s3_key}"
         except ClientError as e:
             raise RuntimeError(f"Error uploading file to S3: {e}")
 
@@ -176,9 +387,20 @@ class S3StorageProvider(StorageProvider):
         """Handles downloading of the file from S3 storage."""
         try:
             s3_key = self._extract_s3_key(file_path)
-            local_file_path = self._get_local_file_path(s3_key)
-            self.s3_client.download_file(self.bucket_name, s3_key, local_file_path)
-            return local_file_path
+
+            def stat():
+                response = self.s3_client.head_object(
+                    Bucket=self.bucket_name, Key=s3_key
+                )
+                return response["ETag"], response["ContentLength"]
+
+            return self.cache.get(
+                s3_key.split("/")[-1],
+                stat,
+                lambda path: self.s3_client.download_file(
+                    self.bucket_name, s3_key, path, Config=self.transfer_config
+                ),
+            )
         except ClientError as e:
             raise RuntimeError(f"Error downloading file from S3: {e}")
 
@@ -191,6 +413,7 @@ class S3StorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting file from S3: {e}")
 
         # Always delete from local storage
+        self.cache.remove(file_path.split("/")[-1])
         LocalStorageProvider.delete_file(file_path)
 
     def delete_all_files(self) -> None:
@@ -210,15 +433,13 @@ class S3StorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting all files from S3: {e}")
 
         # Always delete from local storage
+        self.cache.clear()
         LocalStorageProvider.delete_all_files()
 
     # The s3 key is the name assigned to an object. It excludes the bucket name, but includes the internal path and the file name.
     def _extract_s3_key(self, full_file_path: str) -> str:
         return "/".join(full_file_path.split("//")[1].split("/")[1:])
 
-    def _get_local_file_path(self, s3_key: str) -> str:
-        return f"{UPLOAD_DIR}/{s3_key.split('/')[-1]}"
-
 
 class GCSStorageProvider(StorageProvider):
     def __init__(self):
@@ -234,16 +455,19 @@ class GCSStorageProvider(StorageProvider):
             # if running on a Compute Engine instance, credentials would be from Google Metadata server
             self.gcs_client = storage.Client()
         self.bucket = self.gcs_client.bucket(GCS_BUCKET_NAME)
+        self.cache = StorageCache()
 
     def upload_file(
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
+    ) -> Tuple[StoredFile, str]:
         """Handles uploading of the file to GCS storage."""
-        contents, file_path = LocalStorageProvider.upload_file(file, filename, tags)
+        stored_file, file_path = LocalStorageProvider.upload_file(file, filename, tags)
         try:
-            blob = self.bucket.blob(filename)
+            # Setting a chunk size makes this a chunked resumable upload
+            blob = self.bucket.blob(filename, chunk_size=STORAGE_UPLOAD_CHUNK_SIZE)
             blob.upload_from_filename(file_path)
-            return contents, "gs://" + self.bucket_name + "/" + filename
+            self.cache.put(filename, stored_file.size, str(blob.generation))
+            return stored_file, "gs://" + self.bucket_name + "/" + filename
         except GoogleCloudError as e:
             raise RuntimeError(f"Error uploading file to GCS: {e}")
 
@@ -251,11 +475,21 @@ class GCSStorageProvider(StorageProvider):
         """Handles downloading of the file from GCS storage."""
         try:
             filename = file_path.removeprefix("gs://").split("/")[1]
-            local_file_path = f"{UPLOAD_DIR}/{filename}"
-            blob = self.bucket.get_blob(filename)
-            blob.download_to_filename(local_file_path)
-
-            return local_file_path
+            blob = None
+
+            def stat():
+                nonlocal blob
+                blob = self.bucket.get_blob(filename)
+                if blob is None:
+                    raise NotFound(f"{filename} not found")
+                return str(blob.generation), blob.size
+
+            return self.cache.get(
+                filename,
+                stat,
+                # Pinned to the generation that was just checked
+                lambda path: blob.download_to_filename(path),
+            )
         except NotFound as e:
             raise RuntimeError(f"Error downloading file from GCS: {e}")
 
@@ -269,6 +503,7 @@ class GCSStorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting file from GCS: {e}")
 
         # Always delete from local storage
+        self.cache.remove(file_path.split("/")[-1])
         LocalStorageProvider.delete_file(file_path)
 
     def delete_all_files(self) -> None:
@@ -283,6 +518,7 @@ class GCSStorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting all files from GCS: {e}")
 
         # Always delete from local storage
+        self.cache.clear()
         LocalStorageProvider.delete_all_files()
 
 
@@ -295,27 +531,39 @@ class AzureStorageProvider(StorageProvider):
         if storage_key:
             # Configure using the Azure Storage Account Endpoint and Key
             self.blob_service_client = BlobServiceClient(
-                account_url=self.endpoint, credential=storage_key
+                account_url=self.endpoint,
+                credential=storage_key,
+                max_single_put_size=STORAGE_UPLOAD_CHUNK_SIZE,
+                max_block_size=STORAGE_UPLOAD_CHUNK_SIZE,
             )
         else:
             # Configure using the Azure Storage Account Endpoint and DefaultAzureCredential
             # If the key is not configured, then the DefaultAzureCredential will be used to support Managed Identity authentication
             self.blob_service_client = BlobServiceClient(
-                account_url=self.endpoint, credential=DefaultAzureCredential()
+                account_url=self.endpoint,
+                credential=DefaultAzureCredential(),
+                max_single_put_size=STORAGE_UPLOAD_CHUNK_SIZE,
+                max_block_size=STORAGE_UPLOAD_CHUNK_SIZE,
             )
         self.container_client = self.blob_service_client.get_container_client(
             self.container_name
         )
+        self.cache = StorageCache()
 
     def upload_file(
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
+    ) -> Tuple[StoredFile, str]:
         """Handles uploading of the file to Azure Blob Storage."""
-        contents, file_path = LocalStorageProvider.upload_file(file, filename, tags)
+        stored_file, file_path = LocalStorageProvider.upload_file(file, filename, tags)
         try:
             blob_client = self.container_client.get_blob_client(filename)
-            blob_client.upload_blob(contents, overwrite=True)
-            return contents, f"{self.endpoint}/{self.container_name}/{filename}"
+            # Streams the file as staged blocks once it exceeds one chunk
+            with open(file_path, "rb") as f:
+                response = blob_client.upload_blob(
+                    f, length=stored_file.size, overwrite=True
+                )
+            self.cache.put(filename, stored_file.size, response.get("etag"))
+            return stored_file, f"{self.endpoint}/{self.container_name}/{filename}"
         except Exception as e:
             raise RuntimeError(f"Error uploading file to Azure Blob Storage: {e}")
 
@@ -323,11 +571,17 @@ class AzureStorageProvider(StorageProvider):
         """Handles downloading of the file from Azure Blob Storage."""
         try:
             filename = file_path.split("/")[-1]
-            local_file_path = f"{UPLOAD_DIR}/{filename}"
             blob_client = self.container_client.get_blob_client(filename)
-            with open(local_file_path, "wb") as download_file:
-                download_file.write(blob_client.download_blob().readall())
-            return local_file_path
+
+            def stat():
+                properties = blob_client.get_blob_properties()
+                return properties.etag, properties.size
+
+            def download(path: str):
+                with open(path, "wb") as download_file:
+                    blob_client.download_blob().readinto(download_file)
+
+            return self.cache.get(filename, stat, download)
         except ResourceNotFoundError as e:
             raise RuntimeError(f"Error downloading file from Azure Blob Storage: {e}")
 
@@ -341,6 +595,7 @@ class AzureStorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting file from Azure Blob Storage: {e}")
 
         # Always delete from local storage
+        self.cache.remove(file_path.split("/")[-1])
         LocalStorageProvider.delete_file(file_path)
 
     def delete_all_files(self) -> None:
@@ -353,6 +608,7 @@ class AzureStorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting all files from Azure Blob Storage: {e}")
 
         # Always delete from local storage
+        self.cache.clear()
         LocalStorageProvider.delete_all_files()
 
 
@@ -0,0 +1,90 @@
+import os
+import threading
+
+from open_webui.retrieval.bm25 import BM25IndexManager
+from open_webui.retrieval.vector.main import GetResult
+
+
+def get_loader(ids, texts):
+    return lambda: GetResult(
+        ids=[ids], documents=[texts], metadatas=[[{"file_id": id} for id in ids]]
+    )
+
+
+def no_loader():
+    return None
+
+
+def search_ids(index, query):
+    return [document.metadata["file_id"] for document in index.search(query, 10)]
+
+
+def test_writes_append_to_the_journal(tmp_path):
+    manager = BM25IndexManager(str(tmp_path))
+    manager.get_or_build("c", get_loader(["a", "b"], ["apple pie", "banana bread"]))
+    path = manager._path("c")
+    snapshot = os.stat(path)
+
+    manager.add("c", ["c"], ["cherry pie"], [{"file_id": "c"}])
+
+    # The snapshot isn't rewritten for a small change
+    assert os.stat(path).st_mtime_ns == snapshot.st_mtime_ns
+    assert os.path.getsize(f"{path}.journal") > 0
+
+    # A restarted worker gets the snapshot plus the journal
+    restarted = BM25IndexManager(str(tmp_path))
+    index = restarted.get_or_build("c", no_loader)
+    assert sorted(search_ids(index, "pie")) == ["a", "c"]
+
+
+def test_changes_from_other_workers_are_applied(tmp_path):
+    worker = BM25IndexManager(str(tmp_path))
+    other = BM25IndexManager(str(tmp_path))
+    loader = get_loader(["a", "b"], ["apple pie", "banana bread"])
+    index = worker.get_or_build("c", loader)
+    other.get_or_build("c", loader)
+
+    other.add("c", ["c"], ["cherry pie"], [{"file_id": "c"}])
+    other.remove("c", filter={"file_id": "a"})
+    assert search_ids(worker.get_or_build("c", loader), "pie") == ["c"]
+
+    # Enough changes to fold the journal into a new snapshot
+    snapshot = os.stat(other._path("c"))
+    for i in range(50):
+        other.add("c", [f"d{i}"], [f"date cake {i}"], [{"file_id": f"d{i}"}])
+    assert os.stat(other._path("c")).st_mtime_ns != snapshot.st_mtime_ns
+
+    index = worker.get_or_build("c", no_loader)
+    assert len(index) == 52
+    assert search_ids(index, "pie") == ["c"]
+
+    other.delete("c")
+    assert worker.get_or_build("c", no_loader) is None
+
+
+def test_building_an_index_doesnt_block_other_collections(tmp_path):
+    manager = BM25IndexManager(str(tmp_path))
+    manager.get_or_build("warm", get_loader(["a"], ["apple pie"]))
+    loading = threading.Event()
+    release = threading.Event()
+    loaded = threading.Event()
+
+    def slow_loader():
+        loading.set()
+        release.wait(5)
+        loaded.set()
+        return get_loader(["b"], ["banana bread"])()
+
+    builder = threading.Thread(target=manager.get_or_build, args=("cold", slow_loader))
+    builder.start()
+    try:
+        assert loading.wait(5)
+        # Served while the other collection is still loading
+        assert search_ids(manager.get_or_build("warm", no_loader), "pie") == ["a"]
+        manager.add("warm", ["c"], ["cherry pie"], [{"file_id": "c"}])
+        assert not loaded.is_set()
+    finally:
+        release.set()
+        builder.join()
+
+    assert search_ids(manager.get_or_build("cold", no_loader), "bread") == ["b"]
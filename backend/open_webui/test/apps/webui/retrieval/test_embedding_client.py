@@ -0,0 +1,43 @@
+import asyncio
+import threading
+import time
+
+from aiohttp import web
+
+from open_webui.retrieval.embedding_client import EmbeddingClient
+
+
+def test_retry_wait_doesnt_hold_a_request_slot():
+    started = []
+
+    async def embed(request):
+        payload = await request.json()
+        started.append((payload["input"], time.monotonic()))
+        if payload["input"] == "limited" and len(started) == 1:
+            return web.Response(status=429, headers={"Retry-After": "1"})
+        return web.json_response({"input": payload["input"]})
+
+    loop = asyncio.new_event_loop()
+    app = web.Application()
+    app.router.add_post("/embed", embed)
+    runner = web.AppRunner(app)
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    loop.run_until_complete(site.start())
+    port = runner.addresses[0][1]
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+
+    try:
+        client = EmbeddingClient(concurrency=1, max_retries=1)
+        url = f"http://127.0.0.1:{port}/embed"
+        results = client.post_many(
+            [(url, {}, {"input": "limited"}), (url, {}, {"input": "other"})]
+        )
+    finally:
+        asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+    assert results == [{"input": "limited"}, {"input": "other"}]
+    # The other request ran while the rate limited one waited to retry
+    assert [input for input, _ in started] == ["limited", "other", "limited"]
+    assert started[1][1] - started[0][1] < 0.5
@@ -0,0 +1,134 @@
+import asyncio
+import ssl
+
+import pytest
+from sqlalchemy.engine import make_url
+
+from open_webui.retrieval.vector.dbs import pgvector
+from open_webui.retrieval.vector.main import GetResult, SearchResult
+
+
+def test_asyncpg_url_translates_libpq_options():
+    url, connect_args = pgvector.get_asyncpg_url(
+        make_url(
+            "postgresql://user:secret@db:5432/webui?sslmode=require&connect_timeout=10"
+            "&application_name=webui&target_session_attrs=read-write"
+            "&options=-c%20search_path%3Dvectors%20-cstatement_timeout%3D5000"
+        )
+    )
+
+    assert url.drivername == "postgresql+asyncpg"
+    assert (url.username, url.password, url.host, url.port, url.database) == (
+        "user",
+        "secret",
+        "db",
+        5432,
+        "webui",
+    )
+    assert dict(url.query) == {}
+    assert connect_args == {
+        "ssl": "require",
+        "timeout": 10.0,
+        "target_session_attrs": "read-write",
+        "server_settings": {
+            "application_name": "webui",
+            "search_path": "vectors",
+            "statement_timeout": "5000",
+        },
+    }
+
+
+def test_asyncpg_url_drops_unsupported_options():
+    url, connect_args = pgvector.get_asyncpg_url(
+        make_url("postgresql://db/webui?keepalives=1&gssencmode=disable")
+    )
+
+    assert dict(url.query) == {}
+    assert connect_args == {}
+
+
+def test_asyncpg_url_builds_ssl_context_for_certificates():
+    certifi = pytest.importorskip("certifi")
+
+    _, connect_args = pgvector.get_asyncpg_url(
+        make_url(
+            f"postgresql://db/webui?sslmode=verify-ca&sslrootcert={certifi.where()}"
+        )
+    )
+    context = connect_args["ssl"]
+    assert isinstance(context, ssl.SSLContext)
+    assert context.verify_mode == ssl.CERT_REQUIRED
+    assert not context.check_hostname
+
+    _, connect_args = pgvector.get_asyncpg_url(
+        make_url(f"postgresql://db/webui?sslmode=disable&sslrootcert={certifi.where()}")
+    )
+    assert connect_args == {"ssl": "disable"}
+
+
+def test_async_engine_gets_connect_args(monkeypatch):
+    pytest.importorskip("asyncpg")
+    monkeypatch.setattr(
+        pgvector, "PGVECTOR_DB_URL", "postgresql://user@db/webui?sslmode=require"
+    )
+
+    engine = pgvector.create_async_vector_engine()
+    try:
+        assert engine.url.drivername == "postgresql+asyncpg"
+        assert dict(engine.url.query) == {}
+    finally:
+        asyncio.run(engine.dispose())
+
+
+class BrokenEngine:
+    def connect(self):
+        raise OSError("could not connect")
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # Without a database: only the async paths are exercised
+    client = pgvector.PgvectorClient.__new__(pgvector.PgvectorClient)
+    client.async_engine = BrokenEngine()
+    monkeypatch.setattr(pgvector, "VECTOR_LENGTH", 3)
+    return client
+
+
+def test_search_falls_back_to_sync_search(client, monkeypatch):
+    calls = []
+    result = SearchResult(
+        ids=[["a"]], distances=[[1.0]], documents=[["a"]], metadatas=[[{}]]
+    )
+
+    def search(collection_name, vectors, limit=None, include_vectors=False):
+        calls.append(("search", collection_name, vectors, limit, include_vectors))
+        return result
+
+    def search_many(collection_names, vectors, limit):
+        calls.append(("search_many", collection_names, vectors, limit))
+        return result
+
+    monkeypatch.setattr(client, "search", search)
+    monkeypatch.setattr(client, "search_many", search_many)
+
+    assert (
+        asyncio.run(client.search_async("docs", [[1.0, 0.0, 0.0]], 2, True)) == result
+    )
+    assert (
+        asyncio.run(client.search_many_async(["docs", "more"], [[1.0, 0.0, 0.0]], 2))
+        == result
+    )
+    assert calls == [
+        ("search", "docs", [[1.0, 0.0, 0.0]], 2, True),
+        ("search_many", ["docs", "more"], [[1.0, 0.0, 0.0]], 2),
+    ]
+
+
+def test_query_falls_back_to_sync_query(client, monkeypatch):
+    result = GetResult(ids=[["a"]], documents=[["a"]], metadatas=[[{}]])
+    monkeypatch.setattr(
+        client, "query", lambda collection_name, filter, limit=None: result
+    )
+
+    assert asyncio.run(client.query_async("docs", {"file_id": "a"})) == result
+    assert asyncio.run(client.get_async("docs")) == result
@@ -0,0 +1,182 @@
+import asyncio
+import threading
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from open_webui.retrieval import utils as retrieval_utils
+from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+
+
+def get_request():
+    return SimpleNamespace(
+        app=SimpleNamespace(
+            state=SimpleNamespace(
+                config=SimpleNamespace(BYPASS_EMBEDDING_AND_RETRIEVAL=False)
+            )
+        )
+    )
+
+
+def get_sources(items, queries, embedding_function, user=None, **kwargs):
+    return asyncio.run(
+        retrieval_utils.get_sources_from_items(
+            request=get_request(),
+            items=items,
+            queries=queries,
+            embedding_function=embedding_function,
+            k=2,
+            reranking_function=None,
+            k_reranker=2,
+            r=0.0,
+            hybrid_bm25_weight=0.5,
+            hybrid_search=False,
+            user=user or SimpleNamespace(id="user", role="admin"),
+            **kwargs,
+        )
+    )
+
+
+def get_file(id, content):
+    return SimpleNamespace(id=id, filename=f"{id}.txt", data={"content": content})
+
+
+@pytest.fixture
+def collections():
+    names = [f"test-sources-{uuid.uuid4().hex[:8]}" for _ in range(2)]
+    for index, name in enumerate(names):
+        VECTOR_DB_CLIENT.insert(
+            name,
+            [
+                {
+                    "id": f"{name}-{i}",
+                    "text": f"{name} chunk {i}",
+                    "vector": [float(index), float(i), 1.0],
+                    "metadata": {"file_id": name, "name": name},
+                }
+                for i in range(3)
+            ],
+        )
+    yield names
+    for name in names:
+        VECTOR_DB_CLIENT.delete_collection(name)
+
+
+def test_lookups_run_off_the_event_loop(monkeypatch):
+    main_thread = threading.get_ident()
+    threads = []
+
+    def record(result):
+        threads.append(threading.get_ident())
+        return result
+
+    note = SimpleNamespace(
+        id="note",
+        title="Note",
+        access_control=None,
+        data={"content": {"md": "note content"}},
+    )
+    knowledge = SimpleNamespace(
+        access_control=None, data={"file_ids": ["b", "missing", "a"]}
+    )
+    files = {"a": get_file("a", "content a"), "b": get_file("b", "content b")}
+
+    monkeypatch.setattr(
+        retrieval_utils.Notes, "get_note_by_id", lambda id: record(note)
+    )
+    monkeypatch.setattr(
+        retrieval_utils.Knowledges,
+        "get_knowledge_by_id",
+        lambda id: record(knowledge),
+    )
+    monkeypatch.setattr(
+        retrieval_utils.Files, "get_file_by_id", lambda id: record(files.get(id))
+    )
+    # Knowledge base files are fetched in one query, in no particular order
+    monkeypatch.setattr(
+        retrieval_utils.Files,
+        "get_files_by_ids",
+        lambda ids: record([files[id] for id in sorted(ids) if id in files]),
+    )
+
+    sources = get_sources(
+        [
+            {"type": "note", "id": "note"},
+            {"type": "file", "id": "a", "context": "full"},
+            {"type": "collection", "id": "knowledge", "context": "full"},
+        ],
+        ["query"],
+        embedding_function=None,
+    )
+
+    assert threads and main_thread not in threads
+    assert len(threads) == 4
+    assert [source["document"] for source in sources] == [
+        ["note content"],
+        ["content a"],
+        ["content b", "content a"],
+    ]
+    assert [metadata["file_id"] for metadata in sources[2]["metadata"]] == ["b", "a"]
+
+
+def test_inaccessible_note_is_skipped(monkeypatch):
+    note = SimpleNamespace(
+        id="note",
+        title="Note",
+        access_control={},
+        data={"content": {"md": "note content"}},
+    )
+    monkeypatch.setattr(retrieval_utils.Notes, "get_note_by_id", lambda id: note)
+    monkeypatch.setattr(
+        retrieval_utils, "has_access", lambda user_id, type, access_control: False
+    )
+
+    sources = get_sources(
+        [{"type": "note", "id": "note"}, {"type": "note", "id": "missing"}],
+        ["query"],
+        embedding_function=None,
+        user=SimpleNamespace(id="user", role="user"),
+    )
+    assert sources == []
+
+
+def test_collections_are_searched_with_shared_query_embeddings(collections):
+    calls = []
+
+    def embedding_function(queries, prefix=None, user=None):
+        calls.append(list(queries))
+        return [[0.0, 0.0, 1.0] for _ in queries]
+
+    sources = get_sources(
+        [
+            {"collection_name": collections[0]},
+            {"collection_name": collections[1]},
+            # Already searched for the first item
+            {"collection_name": collections[0]},
+        ],
+        ["first query", "second query"],
+        embedding_function=embedding_function,
+    )
+
+    # Embedded once for all items
+    assert calls == [["first query", "second query"]]
+    assert len(sources) == 2
+    for source, name in zip(sources, collections):
+        assert len(source["document"]) == 2
+        assert {metadata["file_id"] for metadata in source["metadata"]} == {name}
+        assert source["distances"] == sorted(source["distances"], reverse=True)
+
+
+def test_full_context_returns_every_chunk(collections):
+    sources = get_sources(
+        [{"collection_name": collections[0]}],
+        ["query"],
+        embedding_function=None,
+        full_context=True,
+    )
+
+    assert len(sources) == 1
+    assert sorted(sources[0]["document"]) == [
+        f"{collections[0]} chunk {i}" for i in range(3)
+    ]
@@ -0,0 +1,160 @@
+import json
+
+import pytest
+
+from open_webui.config import AppConfig, PersistentConfig
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def set(self, key, value):
+        self.commands.append((self.redis.set, key, value))
+
+    def incr(self, key):
+        self.commands.append((self.redis.incr, key))
+
+    def execute(self):
+        return [command(*args) for command, *args in self.commands]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.published = []
+        self.calls = []
+
+    def get(self, key):
+        self.calls.append(("get", key))
+        return self.data.get(key)
+
+    def mget(self, keys):
+        self.calls.append(("mget", keys))
+        return [self.data.get(key) for key in keys]
+
+    def set(self, key, value):
+        self.data[key] = value
+        return True
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+
+
+def get_config_item(name, value):
+    # Not read from or registered with the database
+    item = PersistentConfig.__new__(PersistentConfig)
+    item.env_name = name
+    item.config_path = f"test.{name.lower()}"
+    item.env_value = value
+    item.config_value = None
+    item.value = value
+    return item
+
+
+def get_app_config(redis, **values):
+    config = AppConfig()
+    object.__setattr__(config, "_redis", redis)
+    for key, value in values.items():
+        setattr(config, key, get_config_item(key, value))
+    return config
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    monkeypatch.setattr(PersistentConfig, "save", lambda self: None)
+    return FakeRedis()
+
+
+def test_values_are_loaded_once_and_read_from_memory(redis):
+    redis.data["open-webui:config:TITLE"] = json.dumps("From Redis")
+    config = get_app_config(redis, TITLE="Default", LIMIT=10)
+    assert redis.calls == []
+
+    # Every value is loaded with the first read
+    assert config.TITLE == "From Redis"
+    assert config.LIMIT == 10
+    assert redis.calls == [
+        ("mget", ["open-webui:config:TITLE", "open-webui:config:LIMIT"])
+    ]
+
+    for _ in range(100):
+        assert config.TITLE == "From Redis"
+    assert len(redis.calls) == 1
+
+    with pytest.raises(AttributeError):
+        config.MISSING
+
+
+def test_update_is_written_and_announced(redis):
+    config = get_app_config(redis, LIMIT=10)
+    other = get_app_config(redis, LIMIT=10)
+
+    config.LIMIT = 20
+
+    assert config.LIMIT == 20
+    assert redis.data["open-webui:config:LIMIT"] == "20"
+    assert redis.data["open-webui:config:version"] == "1"
+    channel, message = redis.published[-1]
+    assert channel == "open-webui:config:updates"
+    assert json.loads(message) == {"key": "LIMIT", "version": 1}
+
+    other._on_update(message)
+    assert other.LIMIT == 20
+    assert other._version == 1
+
+
+def test_missed_updates_reload_every_value(redis):
+    config = get_app_config(redis, TITLE="Default", LIMIT=10)
+    redis.calls.clear()
+
+    # Updates 1 to 4 were published while the listener was disconnected
+    redis.data.update(
+        {
+            "open-webui:config:TITLE": json.dumps("Renamed"),
+            "open-webui:config:LIMIT": "30",
+            "open-webui:config:version": "5",
+        }
+    )
+    config._on_update(json.dumps({"key": "LIMIT", "version": 5}))
+
+    assert (config.TITLE, config.LIMIT) == ("Renamed", 30)
+    assert config._version == 5
+    assert (
+        "mget",
+        ["open-webui:config:TITLE", "open-webui:config:LIMIT"],
+    ) in redis.calls
+
+    # The next update follows on, only its key is read
+    redis.calls.clear()
+    redis.data["open-webui:config:TITLE"] = json.dumps("Renamed again")
+    config._on_update(json.dumps({"key": "TITLE", "version": 6}))
+
+    assert config.TITLE == "Renamed again"
+    assert config._version == 6
+    assert redis.calls == [("get", "open-webui:config:TITLE")]
+
+
+def test_stale_and_unknown_updates(redis):
+    config = get_app_config(redis, LIMIT=10)
+    object.__setattr__(config, "_version", 3)
+    redis.calls.clear()
+
+    # Keys this instance doesn't have only advance the version
+    config._on_update(json.dumps({"key": "OTHER", "version": 4}))
+    assert config._version == 4
+    assert redis.calls == []
+
+    # An announcement arriving late doesn't move the version back
+    redis.data["open-webui:config:LIMIT"] = "not json"
+    config._on_update(json.dumps({"key": "LIMIT", "version": 2}))
+    assert config._version == 4
+    assert config.LIMIT == 10
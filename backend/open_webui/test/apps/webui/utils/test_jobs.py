@@ -0,0 +1,233 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from open_webui.internal.db import get_db
+from open_webui.models.jobs import (
+    JOB_STATUS_CANCELLED,
+    JOB_STATUS_COMPLETED,
+    JOB_STATUS_FAILED,
+    JOB_STATUS_PENDING,
+    JOB_STATUS_RUNNING,
+    Job,
+    Jobs,
+)
+from open_webui.utils import jobs as jobs_utils
+
+JOB_TYPE = "test_job"
+
+
+@pytest.fixture(autouse=True)
+def clean_jobs(monkeypatch):
+    monkeypatch.setattr(jobs_utils, "JOB_HANDLERS", {})
+    monkeypatch.setattr(jobs_utils, "JOB_FINISH_HANDLERS", {})
+    with get_db() as db:
+        db.query(Job).delete()
+        db.commit()
+    yield
+
+
+@pytest.fixture
+def finished():
+    jobs = []
+    jobs_utils.register_job_handler(JOB_TYPE, on_finish=jobs.append)(
+        lambda request, job, context: None
+    )
+    return jobs
+
+
+def enqueue(user_id, max_attempts=1, type=JOB_TYPE):
+    job = Jobs.insert_new_job(user_id, type, max_attempts=max_attempts)
+    # created_at orders the queue, keep it strictly increasing
+    time.sleep(0.001)
+    return job
+
+
+def claim(worker_id="worker", lease_timeout=60, max_running_per_user=0):
+    return Jobs.claim_next_job(
+        worker_id, [JOB_TYPE], lease_timeout, max_running_per_user
+    )
+
+
+def expire_lease(id):
+    with get_db() as db:
+        db.query(Job).filter_by(id=id).update({"lease_expires_at": 0})
+        db.commit()
+
+
+def test_claim_serves_users_round_robin():
+    a1, a2, a3 = enqueue("a"), enqueue("a"), enqueue("a")
+    b1 = enqueue("b")
+
+    # The oldest job first, then the user with fewer running jobs
+    assert claim().id == a1.id
+    assert claim().id == b1.id
+    assert claim().id == a2.id
+    assert claim().id == a3.id
+    assert claim() is None
+
+
+def test_claim_limits_running_jobs_per_user():
+    a1, a2 = enqueue("a"), enqueue("a")
+    b1 = enqueue("b")
+
+    assert claim(max_running_per_user=1).id == a1.id
+    assert claim(max_running_per_user=1).id == b1.id
+    assert claim(max_running_per_user=1) is None
+
+    Jobs.finish_job(a1.id, "worker", JOB_STATUS_COMPLETED)
+    assert claim(max_running_per_user=1).id == a2.id
+
+
+def test_claim_takes_only_runnable_jobs():
+    enqueue("a", type="other_job")
+    later = enqueue("a")
+    with get_db() as db:
+        db.query(Job).filter_by(id=later.id).update(
+            {"available_at": time.time_ns() + 60 * 1_000_000_000}
+        )
+        db.commit()
+    assert claim() is None
+
+    job = enqueue("a")
+    claimed = claim(worker_id="worker-1")
+    assert claimed.id == job.id
+    assert claimed.status == JOB_STATUS_RUNNING
+    assert claimed.worker_id == "worker-1"
+    assert claimed.attempts == 1
+
+
+def test_leases_are_renewed_by_their_worker_only():
+    job = enqueue("a")
+    claimed = claim(worker_id="worker-1", lease_timeout=10)
+
+    assert Jobs.renew_leases("worker-1", [job.id], 60) == []
+    renewed = Jobs.get_job_by_id(job.id)
+    assert renewed.lease_expires_at > claimed.lease_expires_at
+
+    # Not held by this worker, so it has to stop
+    assert Jobs.renew_leases("worker-2", [job.id], 60) == [job.id]
+    assert Jobs.get_job_by_id(job.id).lease_expires_at == renewed.lease_expires_at
+
+
+def test_expired_leases_are_requeued_then_failed():
+    job = enqueue("a", max_attempts=2)
+    claim()
+    assert Jobs.requeue_expired_jobs() == []
+
+    expire_lease(job.id)
+    [requeued] = Jobs.requeue_expired_jobs()
+    assert requeued.id == job.id
+    assert requeued.status == JOB_STATUS_PENDING
+    assert requeued.worker_id is None
+
+    # The worker that lost the job can't finish it anymore
+    assert Jobs.finish_job(job.id, "worker", JOB_STATUS_COMPLETED) is None
+
+    assert claim().attempts == 2
+    expire_lease(job.id)
+    [failed] = Jobs.requeue_expired_jobs()
+    assert failed.status == JOB_STATUS_FAILED
+    assert failed.error == "Job was interrupted"
+
+    # Handled once, even if several instances look for expired leases
+    assert Jobs.requeue_expired_jobs() == []
+
+
+def test_cancel_finishes_jobs_without_a_worker(finished):
+    pending = enqueue("a")
+    job = asyncio.run(jobs_utils.cancel_job(pending.id))
+    assert job.status == JOB_STATUS_CANCELLED
+    assert [job.id for job in finished] == [pending.id]
+
+    # Cancelling again does nothing
+    asyncio.run(jobs_utils.cancel_job(pending.id))
+    assert len(finished) == 1
+
+    # Its worker died, nobody else would finish it
+    orphaned = enqueue("a")
+    claim()
+    expire_lease(orphaned.id)
+    asyncio.run(jobs_utils.cancel_job(orphaned.id))
+    assert [job.id for job in finished] == [pending.id, orphaned.id]
+
+
+def test_cancel_leaves_running_jobs_to_their_worker(finished):
+    running = enqueue("a")
+    claim()
+
+    job = asyncio.run(jobs_utils.cancel_job(running.id))
+    assert job.status == JOB_STATUS_CANCELLED
+    assert finished == []
+    assert Jobs.renew_leases("worker", [running.id], 60) == [running.id]
+    assert Jobs.finish_job(running.id, "worker", JOB_STATUS_COMPLETED) is None
+
+
+def get_pool(**kwargs):
+    app = SimpleNamespace(state=SimpleNamespace())
+    return jobs_utils.JobWorkerPool(app, workers=1, poll_interval=0.1, **kwargs)
+
+
+async def run_until_started(pool, started):
+    await pool.start()
+    for _ in range(100):
+        if started.is_set():
+            return
+        await asyncio.sleep(0.05)
+    raise AssertionError("Job did not start")
+
+
+def test_stop_releases_jobs_once_their_handler_exited(finished):
+    started = threading.Event()
+
+    @jobs_utils.register_job_handler(JOB_TYPE)
+    def handler(request, job, context):
+        started.set()
+        while not context.is_cancelled():
+            time.sleep(0.01)
+        context.check_cancelled()
+
+    job = enqueue("a")
+
+    async def main():
+        pool = get_pool(shutdown_timeout=5)
+        await run_until_started(pool, started)
+        await pool.stop()
+
+    asyncio.run(main())
+
+    released = Jobs.get_job_by_id(job.id)
+    assert released.status == JOB_STATUS_PENDING
+    assert released.attempts == 0
+    assert released.worker_id is None
+
+
+def test_stop_keeps_jobs_whose_handler_is_still_running(finished):
+    started = threading.Event()
+    release = threading.Event()
+
+    @jobs_utils.register_job_handler(JOB_TYPE)
+    def handler(request, job, context):
+        # Doesn't check for cancellation
+        started.set()
+        release.wait(5)
+
+    job = enqueue("a")
+    pool = get_pool(shutdown_timeout=0.1)
+
+    async def main():
+        await run_until_started(pool, started)
+        await pool.stop()
+
+    try:
+        asyncio.run(main())
+        # Requeued only once its lease expires
+        kept = Jobs.get_job_by_id(job.id)
+        assert kept.status == JOB_STATUS_RUNNING
+        assert kept.lease_expires_at is not None
+    finally:
+        release.set()
+        pool.executor.shutdown(wait=True)
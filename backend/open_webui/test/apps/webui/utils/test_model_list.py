@@ -0,0 +1,140 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from open_webui.models.models import ModelMeta, ModelModel, ModelParams
+from open_webui.utils import models as models_utils
+
+
+def get_request():
+    return SimpleNamespace(
+        app=SimpleNamespace(
+            state=SimpleNamespace(
+                MODELS={},
+                BASE_MODELS=[],
+                config=SimpleNamespace(
+                    ENABLE_BASE_MODELS_CACHE=False,
+                    ENABLE_EVALUATION_ARENA_MODELS=False,
+                    EVALUATION_ARENA_MODELS=[],
+                ),
+            )
+        )
+    )
+
+
+def get_base_models(count):
+    return [
+        {
+            "id": f"model-{i}:latest",
+            "name": f"model-{i}:latest",
+            "object": "model",
+            "created": 0,
+            "owned_by": "ollama",
+        }
+        for i in range(count)
+    ]
+
+
+def get_custom_model(id, base_model_id=None, is_active=True):
+    return ModelModel(
+        id=id,
+        user_id="user",
+        base_model_id=base_model_id,
+        name=f"Custom {id}",
+        params=ModelParams(),
+        meta=ModelMeta(),
+        is_active=is_active,
+        updated_at=0,
+        created_at=0,
+    )
+
+
+def get_custom_models(count):
+    # Half override base models, half are presets on top of them
+    return [
+        (
+            get_custom_model(f"model-{i}")
+            if i % 2
+            else get_custom_model(f"preset-{i}", base_model_id=f"model-{i}")
+        )
+        for i in range(count)
+    ]
+
+
+def mock_sources(monkeypatch, base_models, custom_models):
+    async def get_all_base_models(request, user=None):
+        return base_models
+
+    monkeypatch.setattr(models_utils, "get_all_base_models", get_all_base_models)
+    monkeypatch.setattr(
+        models_utils.Models, "get_all_models", lambda *args: custom_models
+    )
+    monkeypatch.setattr(
+        models_utils.Functions, "get_functions", lambda *args, **kwargs: []
+    )
+
+
+def build(monkeypatch, count):
+    mock_sources(monkeypatch, get_base_models(count), get_custom_models(count))
+    return asyncio.run(models_utils.build_all_models(get_request()))
+
+
+def test_build_all_models_applies_custom_models(monkeypatch):
+    mock_sources(
+        monkeypatch,
+        get_base_models(3),
+        [
+            get_custom_model("model-0"),
+            get_custom_model("model-1:latest", is_active=False),
+            get_custom_model("preset", base_model_id="model-2"),
+        ],
+    )
+    models = asyncio.run(models_utils.build_all_models(get_request()))
+
+    assert [model["id"] for model in models] == [
+        "model-0:latest",
+        "model-2:latest",
+        "preset",
+    ]
+    assert models[0]["name"] == "Custom model-0"
+    assert models[2]["preset"] is True
+    assert models[2]["owned_by"] == "ollama"
+
+
+class CountingModel(dict):
+    """Counts the reads of model fields, copies share the count."""
+
+    reads = 0
+
+    def __getitem__(self, key):
+        CountingModel.reads += 1
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        CountingModel.reads += 1
+        return super().get(key, default)
+
+    def copy(self):
+        return CountingModel(self)
+
+
+def count_reads(monkeypatch, count):
+    mock_sources(
+        monkeypatch,
+        [CountingModel(model) for model in get_base_models(count)],
+        get_custom_models(count),
+    )
+    CountingModel.reads = 0
+    models = asyncio.run(models_utils.build_all_models(get_request()))
+    assert len(models) == count + count // 2
+    return CountingModel.reads
+
+
+@pytest.mark.parametrize("count", [100])
+def test_build_all_models_scales_linearly(monkeypatch, count):
+    # Every base model is looked at a fixed number of times, so doubling the
+    # models doubles the reads; scanning all models per custom model would
+    # read about four times as much
+    reads = count_reads(monkeypatch, count)
+    assert count_reads(monkeypatch, 2 * count) <= 2 * reads
@@ -1,12 +1,64 @@
-from typing import Optional, Union, List, Dict, Any
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Union, List, Dict, Any, Iterable
 from open_webui.models.users import Users, UserModel
-from open_webui.models.groups import Groups
+from open_webui.models.groups import Groups, get_groups_version
 
 
 from open_webui.config import DEFAULT_USER_PERMISSIONS
+from open_webui.env import ACCESS_CONTROL_CACHE_TTL
 import json
 
 
+class UserAccess:
+    """
+    A user's group ids and group permissions, loaded once and shared by every
+    access check until the groups change or the entry expires.
+    """
+
+    def __init__(self, groups: list, version: int, expires_at: float):
+        self.group_ids = frozenset(group.id for group in groups)
+        self.group_permissions = [group.permissions or {} for group in groups]
+        self.version = version
+        self.expires_at = expires_at
+
+        # Serialized effective permissions keyed by the serialized defaults
+        self.permissions: Dict[str, str] = {}
+
+
+class AccessControlEngine:
+    def __init__(self, ttl: float = 5, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self._entries: OrderedDict[str, UserAccess] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str) -> UserAccess:
+        version = get_groups_version()
+        now = time.monotonic()
+
+        with self._lock:
+            access = self._entries.get(user_id)
+            if access and access.version == version and access.expires_at > now:
+                self._entries.move_to_end(user_id)
+                return access
+
+        access = UserAccess(
+            Groups.get_groups_by_member_id(user_id), version, now + self.ttl
+        )
+        with self._lock:
+            self._entries[user_id] = access
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return access
+
+
+ACCESS_CONTROL = AccessControlEngine(ttl=ACCESS_CONTROL_CACHE_TTL)
+
+
 def fill_missing_permissions(
     permissions: Dict[str, Any], default_permissions: Dict[str, Any]
 ) -> Dict[str, Any]:
@@ -53,20 +105,24 @@ def get_permissions(
                     )  # Use the most permissive value (True > False)
         return permissions
 
-    user_groups = Groups.get_groups_by_member_id(user_id)
+    access = ACCESS_CONTROL.get(user_id)
 
-    # Deep copy default permissions to avoid modifying the original dict
-    permissions = json.loads(json.dumps(default_permissions))
+    # The effective permissions are compiled once per set of defaults
+    default_permissions_key = json.dumps(default_permissions, sort_keys=True)
+    if default_permissions_key not in access.permissions:
+        # Deep copy default permissions to avoid modifying the original dict
+        permissions = json.loads(default_permissions_key)
 
-    # Combine permissions from all user groups
-    for group in user_groups:
-        group_permissions = group.permissions or {}
-        permissions = combine_permissions(permissions, group_permissions)
+        # Combine permissions from all user groups
+        for group_permissions in access.group_permissions:
+            permissions = combine_permissions(permissions, group_permissions)
 
-    # Ensure all fields from default_permissions are present and filled in
-    permissions = fill_missing_permissions(permissions, default_permissions)
+        # Ensure all fields from default_permissions are present and filled in
+        permissions = fill_missing_permissions(permissions, default_permissions)
+        access.permissions[default_permissions_key] = json.dumps(permissions)
 
-    return permissions
+    # Callers get their own copy of the cached result
+    return json.loads(access.permissions[default_permissions_key])
 
 
 def has_permission(
@@ -93,10 +149,7 @@ def has_permission(
     permission_hierarchy = permission_key.split(".")
 
     # Retrieve user group permissions
-    user_groups = Groups.get_groups_by_member_id(user_id)
-
-    for group in user_groups:
-        group_permissions = group.permissions
+    for group_permissions in ACCESS_CONTROL.get(user_id).group_permissions:
         if get_permission(group_permissions, permission_hierarchy):
             return True
 
@@ -115,17 +168,48 @@ def has_access(
     if access_control is None:
         return type == "read"
 
-    user_groups = Groups.get_groups_by_member_id(user_id)
-    user_group_ids = [group.id for group in user_groups]
+    return _has_access(
+        user_id, ACCESS_CONTROL.get(user_id).group_ids, type, access_control
+    )
+
+
+def _has_access(
+    user_id: str,
+    user_group_ids: frozenset,
+    type: str,
+    access_control: Optional[dict],
+) -> bool:
+    if access_control is None:
+        return type == "read"
+
     permission_access = access_control.get(type, {})
     permitted_group_ids = permission_access.get("group_ids", [])
     permitted_user_ids = permission_access.get("user_ids", [])
 
-    return user_id in permitted_user_ids or any(
-        group_id in permitted_group_ids for group_id in user_group_ids
+    return user_id in permitted_user_ids or not user_group_ids.isdisjoint(
+        permitted_group_ids
     )
 
 
+def filter_accessible(
+    user_id: str,
+    resources: Iterable[Any],
+    type: str = "read",
+) -> list:
+    """
+    Return the resources (anything with `user_id` and `access_control`
+    attributes) that the user owns or has `type` access to. The user's groups
+    are resolved once for the whole batch.
+    """
+    user_group_ids = ACCESS_CONTROL.get(user_id).group_ids
+    return [
+        resource
+        for resource in resources
+        if resource.user_id == user_id
+        or _has_access(user_id, user_group_ids, type, resource.access_control)
+    ]
+
+
 # Get all users with access to a resource
 def get_users_with_access(
     type: str = "write", access_control: Optional[dict] = None
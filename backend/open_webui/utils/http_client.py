@@ -0,0 +1,122 @@
+import logging
+from urllib.parse import urlparse
+
+import aiohttp
+
+from open_webui.env import (
+    AIOHTTP_CLIENT_DNS_CACHE_TTL,
+    AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT,
+    AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST,
+    SRC_LOG_LEVELS,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class UpstreamMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.in_flight = 0
+        self.errors = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.queued = 0
+
+    def get_trace_config(self) -> aiohttp.TraceConfig:
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(session, context, params):
+            self.requests += 1
+            self.in_flight += 1
+
+        async def on_request_end(session, context, params):
+            self.in_flight -= 1
+
+        async def on_request_exception(session, context, params):
+            self.in_flight -= 1
+            self.errors += 1
+
+        async def on_connection_create_end(session, context, params):
+            self.connections_created += 1
+
+        async def on_connection_reuseconn(session, context, params):
+            self.connections_reused += 1
+
+        async def on_connection_queued_start(session, context, params):
+            self.queued += 1
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_request_exception.append(on_request_exception)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace_config.on_connection_queued_start.append(on_connection_queued_start)
+        return trace_config
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "in_flight": self.in_flight,
+            "errors": self.errors,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "queued": self.queued,
+        }
+
+
+class UpstreamClientPool:
+    """
+    Long-lived aiohttp sessions for the model upstreams, one per origin.
+
+    Requests to the same upstream share a keep-alive connection pool, so
+    chat completions don't pay for DNS, TCP and TLS setup every time. The
+    sessions live for the lifetime of the app and are closed on shutdown.
+    """
+
+    def __init__(
+        self,
+        limit_per_host: int = AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST,
+        keepalive_timeout: float = AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT,
+        dns_cache_ttl: int = AIOHTTP_CLIENT_DNS_CACHE_TTL,
+    ):
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+
+        self.sessions: dict[str, aiohttp.ClientSession] = {}
+        self.metrics: dict[str, UpstreamMetrics] = {}
+
+    def get_session(self, url: str) -> aiohttp.ClientSession:
+        parsed = urlparse(url)
+        origin = f"{parsed.scheme}://{parsed.netloc}"
+
+        session = self.sessions.get(origin)
+        if session is None or session.closed:
+            metrics = self.metrics.setdefault(origin, UpstreamMetrics())
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    # Limited per upstream by limit_per_host
+                    limit=0,
+                    limit_per_host=self.limit_per_host,
+                    keepalive_timeout=self.keepalive_timeout,
+                    ttl_dns_cache=self.dns_cache_ttl or None,
+                    use_dns_cache=self.dns_cache_ttl > 0,
+                ),
+                trust_env=True,
+                trace_configs=[metrics.get_trace_config()],
+            )
+            self.sessions[origin] = session
+            log.debug(f"Created connection pool for {origin}")
+        return session
+
+    def get_metrics(self) -> dict:
+        return {origin: metrics.to_dict() for origin, metrics in self.metrics.items()}
+
+    async def close(self):
+        sessions, self.sessions = self.sessions, {}
+        for session in sessions.values():
+            await session.close()
+
+
+UPSTREAM_CLIENT_POOL = UpstreamClientPool()
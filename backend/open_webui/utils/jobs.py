@@ -0,0 +1,359 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from fastapi import FastAPI, Request
+from starlette.datastructures import Headers
+
+from open_webui.models.jobs import (
+    JOB_FINAL_STATUSES,
+    JOB_STATUS_COMPLETED,
+    JOB_STATUS_FAILED,
+    JOB_STATUS_PENDING,
+    JobModel,
+    Jobs,
+)
+from open_webui.socket.main import sio, USER_POOL
+from open_webui.env import (
+    INSTANCE_ID,
+    JOB_QUEUE_LEASE_TIMEOUT,
+    JOB_QUEUE_MAX_ATTEMPTS,
+    JOB_QUEUE_MAX_RUNNING_PER_USER,
+    JOB_QUEUE_POLL_INTERVAL,
+    JOB_QUEUE_RETRY_DELAY,
+    JOB_QUEUE_SHUTDOWN_TIMEOUT,
+    JOB_QUEUE_WORKERS,
+    SRC_LOG_LEVELS,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+# Finished jobs are kept this long for status lookups
+JOB_RETENTION_SECONDS = 7 * 24 * 60 * 60
+
+# Handlers by job type: handler(request, job, context) -> Optional[dict]
+JOB_HANDLERS: dict[str, Callable] = {}
+
+# Called with the job once it completed, failed for good or was cancelled
+JOB_FINISH_HANDLERS: dict[str, Callable] = {}
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobFailed(Exception):
+    """
+    Raised by handlers for errors that retrying won't fix.
+    """
+
+
+def register_job_handler(type: str, on_finish: Optional[Callable] = None):
+    def decorator(handler: Callable):
+        JOB_HANDLERS[type] = handler
+        if on_finish:
+            JOB_FINISH_HANDLERS[type] = on_finish
+        return handler
+
+    return decorator
+
+
+def finish_job(job: JobModel):
+    on_finish = JOB_FINISH_HANDLERS.get(job.type)
+    if on_finish and job.status in JOB_FINAL_STATUSES:
+        try:
+            on_finish(job)
+        except Exception as e:
+            log.exception(f"Error finishing job {job.id}: {e}")
+
+
+async def cancel_job(id: str) -> Optional[JobModel]:
+    job, cancelled_from = Jobs.cancel_job_by_id(id)
+    if cancelled_from is None:
+        # Already finished
+        return job
+
+    # Running jobs are finished by their worker once they stop
+    if cancelled_from == JOB_STATUS_PENDING:
+        await asyncio.to_thread(finish_job, job)
+    await emit_job_event(job)
+    return job
+
+
+def get_job_request(app: FastAPI) -> Request:
+    # Handlers share the router functions, which expect a request
+    return Request(
+        {
+            "type": "http",
+            "asgi.version": "3.0",
+            "asgi.spec_version": "2.0",
+            "method": "POST",
+            "path": "/internal/jobs",
+            "query_string": b"",
+            "headers": Headers({}).raw,
+            "client": ("127.0.0.1", 12345),
+            "server": ("127.0.0.1", 80),
+            "scheme": "http",
+            "app": app,
+        }
+    )
+
+
+async def emit_job_event(job: JobModel):
+    await asyncio.gather(
+        *[
+            sio.emit(
+                "job-events",
+                {
+                    "id": job.id,
+                    "type": job.type,
+                    "item_id": job.item_id,
+                    "status": job.status,
+                    "progress": job.progress,
+                    "error": job.error,
+                },
+                to=session_id,
+            )
+            for session_id in USER_POOL.get(job.user_id, [])
+        ]
+    )
+
+
+def enqueue_job(
+    app: FastAPI,
+    user_id: str,
+    type: str,
+    item_id: Optional[str] = None,
+    payload: Optional[dict] = None,
+    max_attempts: int = JOB_QUEUE_MAX_ATTEMPTS,
+) -> Optional[JobModel]:
+    job = Jobs.insert_new_job(
+        user_id, type, item_id=item_id, payload=payload, max_attempts=max_attempts
+    )
+
+    pool = getattr(app.state, "job_worker_pool", None)
+    if job and pool:
+        pool.notify()
+    return job
+
+
+class JobContext:
+    """
+    Passed to handlers to report progress and to check for cancellation.
+    """
+
+    def __init__(self, pool: "JobWorkerPool", job: JobModel):
+        self.pool = pool
+        self.job = job
+        self.cancelled = threading.Event()
+
+    def is_cancelled(self) -> bool:
+        return self.cancelled.is_set()
+
+    def check_cancelled(self):
+        if self.cancelled.is_set():
+            raise JobCancelled()
+
+    def update_progress(self, **progress):
+        job = Jobs.update_job_progress(self.job.id, self.pool.worker_id, progress)
+        if job is None:
+            self.cancelled.set()
+            raise JobCancelled()
+
+        self.job = job
+        self.pool.emit(job)
+
+
+class JobWorkerPool:
+    """
+    Runs queued jobs on a dedicated thread pool, so ingestion throughput is
+    tuned with JOB_QUEUE_WORKERS without competing with request handling.
+
+    Jobs live in the database: every instance claims work from the same
+    table, leases are renewed while jobs run and jobs of instances that died
+    are picked up again once their lease expires.
+    """
+
+    def __init__(
+        self,
+        app: FastAPI,
+        workers: int = JOB_QUEUE_WORKERS,
+        poll_interval: float = JOB_QUEUE_POLL_INTERVAL,
+        lease_timeout: int = JOB_QUEUE_LEASE_TIMEOUT,
+        max_running_per_user: int = JOB_QUEUE_MAX_RUNNING_PER_USER,
+        shutdown_timeout: float = JOB_QUEUE_SHUTDOWN_TIMEOUT,
+    ):
+        self.app = app
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_timeout = lease_timeout
+        self.max_running_per_user = max_running_per_user
+        self.shutdown_timeout = shutdown_timeout
+        self.worker_id = f"{INSTANCE_ID}:{id(self)}"
+
+        self.executor = ThreadPoolExecutor(
+            max_workers=max(workers, 1), thread_name_prefix="job-worker"
+        )
+        self.running: dict[str, JobContext] = {}
+        self.job_tasks: set[asyncio.Task] = set()
+        self.tasks: list[asyncio.Task] = []
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.wakeup: Optional[asyncio.Event] = None
+
+    async def start(self):
+        if self.workers <= 0:
+            return
+
+        self.loop = asyncio.get_running_loop()
+        self.wakeup = asyncio.Event()
+        self.tasks = [
+            asyncio.create_task(self._dispatch()),
+            asyncio.create_task(self._maintain()),
+        ]
+        log.info(f"Started job worker pool with {self.workers} workers")
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        self.tasks = []
+
+        stopping = list(self.running.keys())
+        for context in self.running.values():
+            context.cancelled.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+        # Handlers stop at their next checkpoint. Jobs are only released once
+        # their handler has exited, so they never run twice at once; the
+        # lease of those still running expires and they are requeued then
+        if self.job_tasks:
+            await asyncio.wait(self.job_tasks, timeout=self.shutdown_timeout)
+
+        # Let another instance pick up what was interrupted
+        await asyncio.to_thread(
+            Jobs.release_jobs,
+            self.worker_id,
+            [id for id in stopping if id not in self.running],
+        )
+
+    def notify(self):
+        if self.loop and self.wakeup:
+            self.loop.call_soon_threadsafe(self.wakeup.set)
+
+    def emit(self, job: JobModel):
+        if self.loop:
+            asyncio.run_coroutine_threadsafe(emit_job_event(job), self.loop)
+
+    async def _dispatch(self):
+        slots = asyncio.Semaphore(self.workers)
+        while True:
+            await slots.acquire()
+            try:
+                job = await asyncio.to_thread(
+                    Jobs.claim_next_job,
+                    self.worker_id,
+                    list(JOB_HANDLERS.keys()),
+                    self.lease_timeout,
+                    self.max_running_per_user,
+                )
+            except Exception as e:
+                log.exception(f"Error claiming job: {e}")
+                job = None
+
+            if job is None:
+                slots.release()
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self.wakeup.clear()
+                continue
+
+            context = JobContext(self, job)
+            self.running[job.id] = context
+
+            task = asyncio.create_task(self._run(context))
+            self.job_tasks.add(task)
+            task.add_done_callback(self.job_tasks.discard)
+            task.add_done_callback(lambda _: slots.release())
+
+    async def _run(self, context: JobContext):
+        try:
+            await emit_job_event(context.job)
+            await self.loop.run_in_executor(self.executor, self._execute, context)
+        except Exception as e:
+            log.exception(f"Error running job {context.job.id}: {e}")
+        finally:
+            self.running.pop(context.job.id, None)
+            # A finished job frees a slot for whatever is queued
+            self.wakeup.set()
+
+    def _execute(self, context: JobContext):
+        job = context.job
+        handler = JOB_HANDLERS[job.type]
+
+        try:
+            result = handler(get_job_request(self.app), job, context)
+            job = Jobs.finish_job(
+                job.id, self.worker_id, JOB_STATUS_COMPLETED, result=result
+            )
+        except JobCancelled:
+            job = None
+        except Exception as e:
+            error = str(e.detail) if hasattr(e, "detail") else str(e)
+            retry_at = None
+            if not isinstance(e, JobFailed) and job.attempts < job.max_attempts:
+                retry_at = time.time_ns() + int(
+                    JOB_QUEUE_RETRY_DELAY * 2 ** (job.attempts - 1) * 1_000_000_000
+                )
+                log.warning(f"Job {job.id} failed, retrying: {error}")
+            else:
+                log.exception(f"Job {job.id} failed: {e}")
+
+            job = Jobs.finish_job(
+                job.id,
+                self.worker_id,
+                JOB_STATUS_FAILED,
+                error=error,
+                retry_at=retry_at,
+            )
+
+        if job is None:
+            # Cancelled while running
+            job = Jobs.get_job_by_id(context.job.id)
+        if job:
+            finish_job(job)
+            self.emit(job)
+
+    async def _maintain(self):
+        interval = max(self.lease_timeout / 3, 1)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                lost = await asyncio.to_thread(
+                    Jobs.renew_leases,
+                    self.worker_id,
+                    list(self.running.keys()),
+                    self.lease_timeout,
+                )
+                for id in lost:
+                    if id in self.running:
+                        self.running[id].cancelled.set()
+
+                for job in await asyncio.to_thread(Jobs.requeue_expired_jobs):
+                    if job.status == JOB_STATUS_PENDING:
+                        self.wakeup.set()
+                    else:
+                        # Out of attempts, its worker is gone
+                        await asyncio.to_thread(finish_job, job)
+                    await emit_job_event(job)
+
+                await asyncio.to_thread(
+                    Jobs.delete_finished_jobs,
+                    time.time_ns() - JOB_RETENTION_SECONDS * 1_000_000_000,
+                )
+            except Exception as e:
+                log.exception(f"Error maintaining job leases: {e}")
@@ -15,14 +15,13 @@ import re
 import ast
 
 from uuid import uuid4
-from concurrent.futures import ThreadPoolExecutor
 
 
 from fastapi import Request, HTTPException
 from starlette.responses import Response, StreamingResponse
 
 
-from open_webui.models.chats import Chats
+from open_webui.models.chats import Chats, ChatMessageWriteBuffer
 from open_webui.models.folders import Folders
 from open_webui.models.users import Users
 from open_webui.socket.main import (
@@ -96,6 +95,8 @@ from open_webui.env import (
     GLOBAL_LOG_LEVEL,
     BYPASS_MODEL_ACCESS_CONTROL,
     ENABLE_REALTIME_CHAT_SAVE,
+    REALTIME_CHAT_SAVE_INTERVAL,
+    REALTIME_CHAT_SAVE_BUFFER_SIZE,
 )
 from open_webui.constants import TASKS
 
@@ -639,36 +640,30 @@ async def chat_completion_files_handler(
             queries = [get_last_user_message(body["messages"])]
 
         try:
-            # Offload get_sources_from_items to a separate thread
-            loop = asyncio.get_running_loop()
-            with ThreadPoolExecutor() as executor:
-                sources = await loop.run_in_executor(
-                    executor,
-                    lambda: get_sources_from_items(
-                        request=request,
-                        items=files,
-                        queries=queries,
-                        embedding_function=lambda query, prefix: request.app.state.EMBEDDING_FUNCTION(
-                            query, prefix=prefix, user=user
-                        ),
-                        k=request.app.state.config.TOP_K,
-                        reranking_function=(
-                            lambda sentences: (
-                                request.app.state.RERANKING_FUNCTION(
-                                    sentences, user=user
-                                )
-                                if request.app.state.RERANKING_FUNCTION
-                                else None
-                            )
-                        ),
-                        k_reranker=request.app.state.config.TOP_K_RERANKER,
-                        r=request.app.state.config.RELEVANCE_THRESHOLD,
-                        hybrid_bm25_weight=request.app.state.config.HYBRID_BM25_WEIGHT,
-                        hybrid_search=request.app.state.config.ENABLE_RAG_HYBRID_SEARCH,
-                        full_context=request.app.state.config.RAG_FULL_CONTEXT,
-                        user=user,
-                    ),
-                )
+            # Vector searches are awaited on the event loop, blocking work
+            # (embedding, hybrid search) is offloaded to the default executor
+            sources = await get_sources_from_items(
+                request=request,
+                items=files,
+                queries=queries,
+                embedding_function=lambda query, prefix: request.app.state.EMBEDDING_FUNCTION(
+                    query, prefix=prefix, user=user
+                ),
+                k=request.app.state.config.TOP_K,
+                reranking_function=(
+                    lambda sentences: (
+                        request.app.state.RERANKING_FUNCTION(sentences, user=user)
+                        if request.app.state.RERANKING_FUNCTION
+                        else None
+                    )
+                ),
+                k_reranker=request.app.state.config.TOP_K_RERANKER,
+                r=request.app.state.config.RELEVANCE_THRESHOLD,
+                hybrid_bm25_weight=request.app.state.config.HYBRID_BM25_WEIGHT,
+                hybrid_search=request.app.state.config.ENABLE_RAG_HYBRID_SEARCH,
+                full_context=request.app.state.config.RAG_FULL_CONTEXT,
+                user=user,
+            )
         except Exception as e:
             log.exception(e)
 
@@ -1757,6 +1752,13 @@ async def process_chat_response(
 
             solution_tags = [("|begin_of_solution|", "|end_of_solution|")]
 
+            message_buffer = ChatMessageWriteBuffer(
+                metadata["chat_id"],
+                metadata["message_id"],
+                interval=REALTIME_CHAT_SAVE_INTERVAL,
+                max_bytes=REALTIME_CHAT_SAVE_BUFFER_SIZE,
+            )
+
             try:
                 for event in events:
                     await event_emitter(
@@ -2011,15 +2013,13 @@ async def process_chat_response(
                                             )
 
                                         if ENABLE_REALTIME_CHAT_SAVE:
-                                            # Save message in the database
-                                            Chats.upsert_message_to_chat_by_id_and_message_id(
-                                                metadata["chat_id"],
-                                                metadata["message_id"],
+                                            # Buffer the message, it is written to the database periodically
+                                            message_buffer.update(
                                                 {
                                                     "content": serialize_content_blocks(
                                                         content_blocks
                                                     ),
-                                                },
+                                                }
                                             )
                                         else:
                                             data = {
@@ -2417,7 +2417,14 @@ async def process_chat_response(
                     "title": title,
                 }
 
-                if not ENABLE_REALTIME_CHAT_SAVE:
+                if ENABLE_REALTIME_CHAT_SAVE:
+                    message_buffer.update(
+                        {
+                            "content": serialize_content_blocks(content_blocks),
+                        }
+                    )
+                    message_buffer.flush(final=True)
+                else:
                     # Save message in the database
                     Chats.upsert_message_to_chat_by_id_and_message_id(
                         metadata["chat_id"],
@@ -2455,7 +2462,14 @@ async def process_chat_response(
                 log.warning("Task was cancelled!")
                 await event_emitter({"type": "task-cancelled"})
 
-                if not ENABLE_REALTIME_CHAT_SAVE:
+                if ENABLE_REALTIME_CHAT_SAVE:
+                    message_buffer.update(
+                        {
+                            "content": serialize_content_blocks(content_blocks),
+                        }
+                    )
+                    message_buffer.flush(final=True)
+                else:
                     # Save message in the database
                     Chats.upsert_message_to_chat_by_id_and_message_id(
                         metadata["chat_id"],
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+from fastapi import FastAPI, Request
+
+from open_webui.env import INSTANCE_ID, MODELS_CACHE_TTL, SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+MODELS_PUBSUB_CHANNEL = "open-webui:models:invalidate"
+
+
+class ModelCatalog:
+    """
+    Keeps the assembled model list in memory.
+
+    Once the list is older than `ttl` it is still served, while a rebuild
+    runs in the background (stale-while-revalidate). Changes to models,
+    functions or connections invalidate the list on every instance through
+    Redis, and the next read waits for the rebuild so the change shows up.
+    Concurrent rebuilds are joined into one.
+    """
+
+    def __init__(self, ttl: Optional[int] = MODELS_CACHE_TTL):
+        self.ttl = ttl
+        self.models: Optional[list] = None
+        self.updated_at = 0.0
+        self.version = 0
+        self.built_version = -1
+
+        self.task: Optional[asyncio.Task] = None
+        self.task_refresh = False
+        self.task_version = 0
+
+    def is_invalidated(self) -> bool:
+        return self.built_version != self.version
+
+    def is_stale(self) -> bool:
+        return self.ttl is not None and time.monotonic() - self.updated_at > self.ttl
+
+    async def get_models(
+        self,
+        request: Request,
+        build: Callable[..., Awaitable[list]],
+        refresh: bool = False,
+        user=None,
+    ) -> list:
+        if self.models is None or refresh or self.is_invalidated():
+            return await asyncio.shield(self.start_build(request, build, refresh, user))
+
+        if self.is_stale():
+            self.start_build(request, build, False, user)
+        return self.models
+
+    def start_build(
+        self,
+        request: Request,
+        build: Callable[..., Awaitable[list]],
+        refresh: bool,
+        user,
+    ) -> asyncio.Task:
+        # A refresh also refetches the base models, so it only joins another
+        # refresh. Builds started before an invalidation aren't joined either
+        if (
+            self.task
+            and not self.task.done()
+            and (self.task_refresh or not refresh)
+            and self.task_version == self.version
+        ):
+            return self.task
+
+        self.task = asyncio.create_task(self._build(request, build, refresh, user))
+        self.task_refresh = refresh
+        self.task_version = self.version
+        self.task.add_done_callback(log_build_error)
+        return self.task
+
+    async def _build(
+        self,
+        request: Request,
+        build: Callable[..., Awaitable[list]],
+        refresh: bool,
+        user,
+    ) -> list:
+        version = self.version
+        models = await build(request, refresh=refresh, user=user)
+
+        # An older build finishing late doesn't replace a newer list
+        if version >= self.built_version:
+            self.models = models
+            self.updated_at = time.monotonic()
+            # Invalidated while building, the next read rebuilds again
+            self.built_version = version
+        return models
+
+    def invalidate(self):
+        self.version += 1
+
+
+def log_build_error(task: asyncio.Task):
+    if not task.cancelled() and task.exception():
+        log.error(f"Error building the model list: {task.exception()}")
+
+
+MODEL_CATALOG = ModelCatalog()
+
+
+def invalidate_local_models(app: FastAPI, base_models: bool = False):
+    MODEL_CATALOG.invalidate()
+    if base_models:
+        # Kept until refreshed with ENABLE_BASE_MODELS_CACHE
+        app.state.BASE_MODELS = []
+
+
+async def invalidate_models(request: Request, base_models: bool = False):
+    """
+    Rebuilds the model list on next use, here and on the other instances.
+    `base_models` also drops the base models, i.e. the model lists of the
+    Ollama and OpenAI connections and of pipe functions.
+    """
+    invalidate_local_models(request.app, base_models)
+
+    redis = getattr(request.app.state, "redis", None)
+    if redis is not None:
+        try:
+            await redis.publish(
+                MODELS_PUBSUB_CHANNEL,
+                json.dumps({"instance_id": INSTANCE_ID, "base_models": base_models}),
+            )
+        except Exception as e:
+            log.warning(f"Could not publish model list invalidation: {e}")
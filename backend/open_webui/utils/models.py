@@ -1,4 +1,5 @@
 import time
+import json
 import logging
 import asyncio
 import sys
@@ -19,13 +20,23 @@ from open_webui.utils.plugin import (
     get_function_module_from_cache,
 )
 from open_webui.utils.access_control import has_access
+from open_webui.utils.model_catalog import (
+    MODEL_CATALOG,
+    MODELS_PUBSUB_CHANNEL,
+    invalidate_local_models,
+)
 
 
 from open_webui.config import (
     DEFAULT_ARENA_MODEL,
 )
 
-from open_webui.env import SRC_LOG_LEVELS, GLOBAL_LOG_LEVEL
+from open_webui.env import (
+    ENABLE_FORWARD_USER_INFO_HEADERS,
+    INSTANCE_ID,
+    SRC_LOG_LEVELS,
+    GLOBAL_LOG_LEVEL,
+)
 from open_webui.models.users import UserModel
 
 
@@ -77,6 +88,17 @@ async def get_all_base_models(request: Request, user: UserModel = None):
 
 
 async def get_all_models(request, refresh: bool = False, user: UserModel = None):
+    if ENABLE_FORWARD_USER_INFO_HEADERS and user:
+        # The connections may list other models for every user, so the list
+        # isn't shared; the connection lists are still cached per user
+        return await build_all_models(request, refresh=refresh, user=user)
+
+    return await MODEL_CATALOG.get_models(
+        request, build_all_models, refresh=refresh, user=user
+    )
+
+
+async def build_all_models(request, refresh: bool = False, user: UserModel = None):
     if (
         request.app.state.MODELS
         and request.app.state.BASE_MODELS
@@ -129,97 +151,124 @@ async def get_all_models(request, refresh: bool = False, user: UserModel = None)
             ]
         models = models + arena_models
 
+    functions = Functions.get_functions(active_only=True)
+    functions_by_id = {function.id: function for function in functions}
+
+    enabled_action_ids = {
+        function.id for function in functions if function.type == "action"
+    }
     global_action_ids = [
-        function.id for function in Functions.get_global_action_functions()
-    ]
-    enabled_action_ids = [
         function.id
-        for function in Functions.get_functions_by_type("action", active_only=True)
+        for function in functions
+        if function.type == "action" and function.is_global
     ]
 
+    enabled_filter_ids = {
+        function.id for function in functions if function.type == "filter"
+    }
     global_filter_ids = [
-        function.id for function in Functions.get_global_filter_functions()
-    ]
-    enabled_filter_ids = [
         function.id
-        for function in Functions.get_functions_by_type("filter", active_only=True)
+        for function in functions
+        if function.type == "filter" and function.is_global
     ]
 
+    # Ollama may return model ids in different formats (e.g., 'llama3' vs.
+    # 'llama3:7b'), a custom model applies to every tag of the model
+    models_by_id = {}
+    ollama_models_by_name = {}
+    for model in models:
+        models_by_id.setdefault(model["id"], []).append(model)
+        if model.get("owned_by") == "ollama":
+            ollama_models_by_name.setdefault(model["id"].split(":")[0], []).append(
+                model
+            )
+
     custom_models = Models.get_all_models()
+
+    removed_ids = set()
     for custom_model in custom_models:
-        if custom_model.base_model_id is None:
-            # Applied directly to a base model
-            for model in models:
-                if custom_model.id == model["id"] or (
-                    model.get("owned_by") == "ollama"
-                    and custom_model.id
-                    == model["id"].split(":")[
-                        0
-                    ]  # Ollama may return model ids in different formats (e.g., 'llama3' vs. 'llama3:7b')
-                ):
-                    if custom_model.is_active:
-                        model["name"] = custom_model.name
-                        model["info"] = custom_model.model_dump()
-
-                        # Set action_ids and filter_ids
-                        action_ids = []
-                        filter_ids = []
-
-                        if "info" in model and "meta" in model["info"]:
-                            action_ids.extend(
-                                model["info"]["meta"].get("actionIds", [])
-                            )
-                            filter_ids.extend(
-                                model["info"]["meta"].get("filterIds", [])
-                            )
-
-                        model["action_ids"] = action_ids
-                        model["filter_ids"] = filter_ids
-                    else:
-                        models.remove(model)
-
-        elif custom_model.is_active and (
-            custom_model.id not in [model["id"] for model in models]
+        if custom_model.base_model_id is not None:
+            continue
+
+        # Applied directly to a base model
+        matches = models_by_id.get(custom_model.id, []) + [
+            model
+            for model in ollama_models_by_name.get(custom_model.id, [])
+            if model["id"] != custom_model.id
+        ]
+        for model in matches:
+            if custom_model.is_active:
+                model["name"] = custom_model.name
+                model["info"] = custom_model.model_dump()
+
+                # Set action_ids and filter_ids
+                action_ids = []
+                filter_ids = []
+
+                if "info" in model and "meta" in model["info"]:
+                    action_ids.extend(model["info"]["meta"].get("actionIds", []))
+                    filter_ids.extend(model["info"]["meta"].get("filterIds", []))
+
+                model["action_ids"] = action_ids
+                model["filter_ids"] = filter_ids
+            else:
+                removed_ids.add(model["id"])
+
+    if removed_ids:
+        models = [model for model in models if model["id"] not in removed_ids]
+
+    # Base model of a preset by id or by id without the tag, the first
+    # matching model in the list wins
+    base_models_by_id = {}
+    for model in models:
+        base_models_by_id.setdefault(model["id"], model)
+        base_models_by_id.setdefault(model["id"].split(":")[0], model)
+
+    model_ids = {model["id"] for model in models}
+    for custom_model in custom_models:
+        if (
+            custom_model.base_model_id is None
+            or not custom_model.is_active
+            or custom_model.id in model_ids
         ):
-            owned_by = "openai"
-            pipe = None
+            continue
 
-            action_ids = []
-            filter_ids = []
+        owned_by = "openai"
+        pipe = None
 
-            for model in models:
-                if (
-                    custom_model.base_model_id == model["id"]
-                    or custom_model.base_model_id == model["id"].split(":")[0]
-                ):
-                    owned_by = model.get("owned_by", "unknown owner")
-                    if "pipe" in model:
-                        pipe = model["pipe"]
-                    break
+        action_ids = []
+        filter_ids = []
 
-            if custom_model.meta:
-                meta = custom_model.meta.model_dump()
+        base_model = base_models_by_id.get(custom_model.base_model_id)
+        if base_model:
+            owned_by = base_model.get("owned_by", "unknown owner")
+            if "pipe" in base_model:
+                pipe = base_model["pipe"]
 
-                if "actionIds" in meta:
-                    action_ids.extend(meta["actionIds"])
+        if custom_model.meta:
+            meta = custom_model.meta.model_dump()
 
-                if "filterIds" in meta:
-                    filter_ids.extend(meta["filterIds"])
+            if "actionIds" in meta:
+                action_ids.extend(meta["actionIds"])
 
-            models.append(
-                {
-                    "id": f"{custom_model.id}",
-                    "name": custom_model.name,
-                    "object": "model",
-                    "created": custom_model.created_at,
-                    "owned_by": owned_by,
-                    "info": custom_model.model_dump(),
-                    "preset": True,
-                    **({"pipe": pipe} if pipe is not None else {}),
-                    "action_ids": action_ids,
-                    "filter_ids": filter_ids,
-                }
-            )
+            if "filterIds" in meta:
+                filter_ids.extend(meta["filterIds"])
+
+        model = {
+            "id": f"{custom_model.id}",
+            "name": custom_model.name,
+            "object": "model",
+            "created": custom_model.created_at,
+            "owned_by": owned_by,
+            "info": custom_model.model_dump(),
+            "preset": True,
+            **({"pipe": pipe} if pipe is not None else {}),
+            "action_ids": action_ids,
+            "filter_ids": filter_ids,
+        }
+        models.append(model)
+        model_ids.add(model["id"])
+        base_models_by_id.setdefault(model["id"], model)
 
     # Process action_ids to get the actions
     def get_action_items_from_module(function, module):
@@ -265,10 +314,35 @@ async def get_all_models(request, refresh: bool = False, user: UserModel = None)
             }
         ]
 
+    # Items are the same for every model, so each function is loaded once
+    action_items = {}
+    filter_items = {}
+
     def get_function_module_by_id(function_id):
-        function_module, _, _ = get_function_module_from_cache(request, function_id)
+        function_module, _, _ = get_function_module_from_cache(
+            request, function_id, function=functions_by_id[function_id]
+        )
         return function_module
 
+    def get_action_items(action_id):
+        if action_id not in action_items:
+            action_items[action_id] = get_action_items_from_module(
+                functions_by_id[action_id], get_function_module_by_id(action_id)
+            )
+        return action_items[action_id]
+
+    def get_filter_items(filter_id):
+        if filter_id not in filter_items:
+            function_module = get_function_module_by_id(filter_id)
+            filter_items[filter_id] = (
+                get_filter_items_from_module(
+                    functions_by_id[filter_id], function_module
+                )
+                if getattr(function_module, "toggle", None)
+                else []
+            )
+        return filter_items[filter_id]
+
     for model in models:
         action_ids = [
             action_id
@@ -283,27 +357,24 @@ async def get_all_models(request, refresh: bool = False, user: UserModel = None)
 
         model["actions"] = []
         for action_id in action_ids:
-            action_function = Functions.get_function_by_id(action_id)
-            if action_function is None:
-                raise Exception(f"Action not found: {action_id}")
-
-            function_module = get_function_module_by_id(action_id)
-            model["actions"].extend(
-                get_action_items_from_module(action_function, function_module)
-            )
+            model["actions"].extend(get_action_items(action_id))
 
         model["filters"] = []
         for filter_id in filter_ids:
-            filter_function = Functions.get_function_by_id(filter_id)
-            if filter_function is None:
-                raise Exception(f"Filter not found: {filter_id}")
+            model["filters"].extend(get_filter_items(filter_id))
 
-            function_module = get_function_module_by_id(filter_id)
+        try:
+            model_tags = [
+                tag.get("name")
+                for tag in model.get("info", {}).get("meta", {}).get("tags", [])
+            ]
+            tags = [tag.get("name") for tag in model.get("tags", [])]
 
-            if getattr(function_module, "toggle", None):
-                model["filters"].extend(
-                    get_filter_items_from_module(filter_function, function_module)
-                )
+            tags = list(set(model_tags + tags))
+            model["tags"] = [{"name": tag} for tag in tags]
+        except Exception as e:
+            log.debug(f"Error processing model tags: {e}")
+            model["tags"] = []
 
     log.debug(f"get_all_models() returned {len(models)} models")
 
@@ -332,3 +403,23 @@ def check_model_access(user, model):
             )
         ):
             raise Exception("Model not found")
+
+
+async def model_catalog_listener(app):
+    pubsub = app.state.redis.pubsub()
+    await pubsub.subscribe(MODELS_PUBSUB_CHANNEL)
+
+    async for message in pubsub.listen():
+        if message["type"] != "message":
+            continue
+        try:
+            data = json.loads(message["data"])
+            if data.get("instance_id") == INSTANCE_ID:
+                continue
+
+            invalidate_local_models(app, data.get("base_models", False))
+            if data.get("base_models", False):
+                await ollama.get_all_models.cache.clear()
+                await openai.get_all_models.cache.clear()
+        except Exception as e:
+            log.exception(f"Error handling model list invalidation: {e}")
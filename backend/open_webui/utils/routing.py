@@ -0,0 +1,347 @@
+import asyncio
+import logging
+import random
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import aiohttp
+from fastapi import FastAPI
+
+from open_webui.env import (
+    AIOHTTP_CLIENT_SESSION_SSL,
+    AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST,
+    SRC_LOG_LEVELS,
+    UPSTREAM_EJECTION_TIME,
+    UPSTREAM_HEALTH_CHECK_INTERVAL,
+    UPSTREAM_MAX_FAILURES,
+    UPSTREAM_ROUTING_STRATEGY,
+)
+from open_webui.utils.http_client import UPSTREAM_CLIENT_POOL
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+# Weight of the newest sample in the response time average
+EWMA_ALPHA = 0.3
+
+# Models remembered per connection for model_affinity, roughly what a GPU
+# box keeps loaded
+AFFINITY_MODELS = 8
+
+# A connection that has the model loaded is preferred unless it has this
+# many more requests in flight than the least busy one
+AFFINITY_MAX_IMBALANCE = 2
+
+# Ejections back off exponentially up to 2**MAX_EJECTION_BACKOFF times the
+# ejection time
+MAX_EJECTION_BACKOFF = 5
+
+
+class UpstreamBackend:
+    def __init__(self, url: str):
+        self.url = url
+        self.outstanding = 0
+        self.latency: Optional[float] = None
+        self.failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.models: OrderedDict[str, None] = OrderedDict()
+
+    def is_ejected(self, now: float) -> bool:
+        return self.ejected_until > now
+
+    def to_dict(self) -> dict:
+        return {
+            "outstanding": self.outstanding,
+            "latency": self.latency,
+            "failures": self.failures,
+            "ejected": self.is_ejected(time.monotonic()),
+            "requests": self.requests,
+            "errors": self.errors,
+            "models": list(self.models.keys()),
+        }
+
+
+class UpstreamLease:
+    """
+    Accounts one request against a connection, from sending it until the
+    response (or stream) is finished.
+    """
+
+    def __init__(
+        self,
+        router: "UpstreamRouter",
+        backend: UpstreamBackend,
+        model: Optional[str] = None,
+    ):
+        self.router = router
+        self.backend = backend
+        self.model = model
+        self.started = time.monotonic()
+        self.latency: Optional[float] = None
+        self.finished = False
+
+        backend.outstanding += 1
+        backend.requests += 1
+
+    def mark_response(self):
+        # Time to the response headers, which includes queueing upstream
+        if self.latency is None:
+            self.latency = time.monotonic() - self.started
+
+    def finish(self, status: Optional[int] = None):
+        if self.finished:
+            return
+        self.finished = True
+        self.backend.outstanding -= 1
+
+        if status is None or status >= 500:
+            self.router.record_failure(self.backend)
+        else:
+            self.mark_response()
+            self.router.record_success(self.backend, self.latency, self.model)
+
+
+class UpstreamRouter:
+    """
+    Picks which connection serves a request when several Ollama or OpenAI
+    connections offer the same model.
+
+    Connections that keep failing, either for requests or for the periodic
+    health probes, are left out for a while. If every connection serving a
+    model is out, they are all tried anyway. State is kept per process.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        strategy: str = UPSTREAM_ROUTING_STRATEGY,
+        max_failures: int = UPSTREAM_MAX_FAILURES,
+        ejection_time: int = UPSTREAM_EJECTION_TIME,
+    ):
+        self.name = name
+        self.strategy = strategy
+        self.max_failures = max_failures
+        self.ejection_time = ejection_time
+
+        self.backends: dict[str, UpstreamBackend] = {}
+
+    def get_backend(self, url: str) -> UpstreamBackend:
+        backend = self.backends.get(url)
+        if backend is None:
+            backend = self.backends[url] = UpstreamBackend(url)
+        return backend
+
+    def select(
+        self,
+        url_indices: list[int],
+        urls: list[str],
+        configs: dict,
+        model: Optional[str] = None,
+    ) -> int:
+        if len(url_indices) == 1:
+            return url_indices[0]
+
+        now = time.monotonic()
+        candidates = [
+            idx
+            for idx in url_indices
+            if not self.get_backend(urls[idx]).is_ejected(now)
+        ] or list(url_indices)
+
+        if len(candidates) == 1 or self.strategy == "random":
+            return random.choice(candidates)
+
+        backends = {idx: self.get_backend(urls[idx]) for idx in candidates}
+
+        if self.strategy == "weighted":
+            weights = [
+                get_weight(configs.get(str(idx), configs.get(urls[idx], {})))
+                for idx in candidates
+            ]
+            if sum(weights) > 0:
+                return random.choices(candidates, weights=weights)[0]
+            return random.choice(candidates)
+
+        if self.strategy == "ewma":
+            # Connections without samples yet score 0, so they get tried
+            return pick_lowest(
+                candidates,
+                lambda idx: (backends[idx].latency or 0)
+                * (backends[idx].outstanding + 1),
+            )
+
+        least_busy = pick_lowest(candidates, lambda idx: backends[idx].outstanding)
+
+        if self.strategy == "model_affinity" and model:
+            warm = [idx for idx in candidates if model in backends[idx].models]
+            if warm:
+                idx = pick_lowest(warm, lambda idx: backends[idx].outstanding)
+                if (
+                    backends[idx].outstanding - backends[least_busy].outstanding
+                    <= AFFINITY_MAX_IMBALANCE
+                ):
+                    return idx
+
+        return least_busy
+
+    def acquire(self, url: str, model: Optional[str] = None) -> UpstreamLease:
+        return UpstreamLease(self, self.get_backend(url), model)
+
+    def record_success(
+        self,
+        backend: UpstreamBackend,
+        latency: Optional[float] = None,
+        model: Optional[str] = None,
+    ):
+        if backend.ejections:
+            log.info(f"{self.name} connection {backend.url} is healthy again")
+        backend.failures = 0
+        backend.ejections = 0
+        backend.ejected_until = 0.0
+
+        if latency is not None:
+            backend.latency = (
+                latency
+                if backend.latency is None
+                else EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * backend.latency
+            )
+
+        if model:
+            backend.models[model] = None
+            backend.models.move_to_end(model)
+            while len(backend.models) > AFFINITY_MODELS:
+                backend.models.popitem(last=False)
+
+    def record_failure(self, backend: UpstreamBackend):
+        backend.errors += 1
+        backend.failures += 1
+        if backend.failures < self.max_failures:
+            return
+
+        now = time.monotonic()
+        if backend.is_ejected(now):
+            return
+
+        duration = self.ejection_time * 2 ** min(
+            backend.ejections, MAX_EJECTION_BACKOFF
+        )
+        backend.ejections += 1
+        backend.ejected_until = now + duration
+        log.warning(
+            f"{self.name} connection {backend.url} failed {backend.failures} times, "
+            f"leaving it out for {duration} seconds"
+        )
+
+    def get_status(self) -> dict:
+        return {
+            "strategy": self.strategy,
+            "connections": {
+                url: backend.to_dict() for url, backend in self.backends.items()
+            },
+        }
+
+
+def get_weight(api_config: dict) -> float:
+    # Set per connection as "weight" in its API config, defaults to 1
+    try:
+        return max(float(api_config.get("weight", 1)), 0.0)
+    except (TypeError, ValueError):
+        return 1.0
+
+
+def pick_lowest(candidates: list[int], key) -> int:
+    # Ties are broken randomly, so idle connections share the load
+    lowest = min(key(idx) for idx in candidates)
+    return random.choice([idx for idx in candidates if key(idx) == lowest])
+
+
+OLLAMA_ROUTER = UpstreamRouter("Ollama")
+OPENAI_ROUTER = UpstreamRouter("OpenAI")
+
+
+async def probe_upstream(router: UpstreamRouter, url: str, path: str, headers: dict):
+    backend = router.get_backend(url)
+    try:
+        session = UPSTREAM_CLIENT_POOL.get_session(url)
+        async with session.get(
+            f"{url}{path}",
+            headers=headers,
+            ssl=AIOHTTP_CLIENT_SESSION_SSL,
+            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST),
+        ) as r:
+            # Anything but a server error means the connection is reachable
+            if r.status < 500:
+                router.record_success(backend)
+                return
+    except Exception as e:
+        log.debug(f"Health probe of {url}{path} failed: {e}")
+    router.record_failure(backend)
+
+
+def get_health_probes(app: FastAPI) -> list:
+    config = app.state.config
+    probes = []
+
+    if config.ENABLE_OLLAMA_API and len(config.OLLAMA_BASE_URLS) > 1:
+        for idx, url in enumerate(config.OLLAMA_BASE_URLS):
+            api_config = config.OLLAMA_API_CONFIGS.get(
+                str(idx), config.OLLAMA_API_CONFIGS.get(url, {})
+            )
+            if not api_config.get("enable", True):
+                continue
+            key = api_config.get("key", None)
+            probes.append(
+                probe_upstream(
+                    OLLAMA_ROUTER,
+                    url,
+                    "/api/version",
+                    {"Authorization": f"Bearer {key}"} if key else {},
+                )
+            )
+
+    if config.ENABLE_OPENAI_API and len(config.OPENAI_API_BASE_URLS) > 1:
+        for idx, url in enumerate(config.OPENAI_API_BASE_URLS):
+            api_config = config.OPENAI_API_CONFIGS.get(
+                str(idx), config.OPENAI_API_CONFIGS.get(url, {})
+            )
+            if not api_config.get("enable", True) or api_config.get("azure", False):
+                continue
+            key = (
+                config.OPENAI_API_KEYS[idx] if idx < len(config.OPENAI_API_KEYS) else ""
+            )
+            probes.append(
+                probe_upstream(
+                    OPENAI_ROUTER,
+                    url,
+                    "/models",
+                    {"Authorization": f"Bearer {key}"} if key else {},
+                )
+            )
+
+    return probes
+
+
+async def run_upstream_health_checks(
+    app: FastAPI, interval: int = UPSTREAM_HEALTH_CHECK_INTERVAL
+):
+    """
+    Probes every connection periodically, so a dead one is left out before
+    requests run into it and an ejected one is let back in once it recovers.
+    Only runs probes when a provider has more than one connection to choose
+    from.
+    """
+    if interval <= 0:
+        return
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            probes = get_health_probes(app)
+            if probes:
+                await asyncio.gather(*probes)
+        except Exception as e:
+            log.exception(f"Error checking upstream health: {e}")
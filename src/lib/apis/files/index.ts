@@ -9,7 +9,8 @@ export const uploadFile = async (token: string, file: File, metadata?: object |
 
 	let error = null;
 
-	const res = await fetch(`${WEBUI_API_BASE_URL}/files/`, {
+	// Processed in the background, the API defaults to processing during the upload
+	const res = await fetch(`${WEBUI_API_BASE_URL}/files/?process_in_background=true`, {
 		method: 'POST',
 		headers: {
 			Accept: 'application/json',
@@ -31,9 +32,69 @@ export const uploadFile = async (token: string, file: File, metadata?: object |
 		throw error;
 	}
 
+	if (res && ['pending', 'running'].includes(res?.data?.status)) {
+		// Content is extracted in the background, wait for it so callers get the processed file
+		return await waitForFileProcessing(token, res.id);
+	}
+
 	return res;
 };
 
+export const getFileProcessStatusById = async (token: string, id: string) => {
+	let error = null;
+
+	const res = await fetch(`${WEBUI_API_BASE_URL}/files/${id}/process/status`, {
+		method: 'GET',
+		headers: {
+			Accept: 'application/json',
+			'Content-Type': 'application/json',
+			authorization: `Bearer ${token}`
+		}
+	})
+		.then(async (res) => {
+			if (!res.ok) throw await res.json();
+			return res.json();
+		})
+		.catch((err) => {
+			error = err.detail;
+			console.error(err);
+			return null;
+		});
+
+	if (error) {
+		throw error;
+	}
+
+	return res;
+};
+
+export const waitForFileProcessing = async (
+	token: string,
+	id: string,
+	interval = 1000,
+	timeout = 10 * 60 * 1000
+) => {
+	const deadline = Date.now() + timeout;
+	let processStatus = await getFileProcessStatusById(token, id);
+
+	while (['pending', 'running'].includes(processStatus?.status)) {
+		if (Date.now() >= deadline) {
+			// e.g. no instance is running the job queue (JOB_QUEUE_WORKERS=0)
+			throw 'File processing did not finish in time, please try again later.';
+		}
+
+		await new Promise((resolve) => setTimeout(resolve, interval));
+		processStatus = await getFileProcessStatusById(token, id);
+	}
+
+	const file = await getFileById(token, id);
+	if (file && processStatus?.status !== 'completed') {
+		file.error = processStatus?.error ?? processStatus?.status;
+	}
+
+	return file;
+};
+
 export const uploadDir = async (token: string) => {
 	let error = null;
 